@@ -0,0 +1,98 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class LatencyTracker:
+    """Rolling window of request latencies used to pick the hedge delay"""
+
+    def __init__(self, window: int = 200, quantile: float = 0.95, min_samples: int = 20,
+                 default_delay: float = 0.5, min_delay: float = 0.05, max_delay: float = 2.0):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._samples = deque(maxlen=window)
+
+    def record(self, latency: float):
+        self._samples.append(latency)
+
+    def percentile(self) -> Optional[float]:
+        """Latency at the configured quantile, or None until enough samples are collected"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(self.quantile * len(ordered)))
+        return ordered[index]
+
+    def hedge_delay(self) -> float:
+        """How long to wait for the primary before sending the hedge"""
+        value = self.percentile()
+        if value is None:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, value))
+
+
+def _is_success(result) -> bool:
+    return isinstance(result, dict) and "error" not in result
+
+
+async def hedged_request(
+    primary: Callable[[], Awaitable[Dict]],
+    hedge: Optional[Callable[[], Awaitable[Dict]]],
+    tracker: LatencyTracker,
+    deadline: float,
+) -> Dict:
+    """
+    Run primary; if it has not answered after the p95 delay, also run hedge.
+    The first successful response wins and the other request is cancelled.
+
+    Args:
+        primary: Coroutine factory for the usual provider/endpoint
+        hedge: Coroutine factory for the backup provider/endpoint (None disables hedging)
+        tracker: Latency history of the primary, updated here
+        deadline: Overall time budget in seconds
+
+    Returns:
+        The winning result dict, or the last error dict if every request failed
+    """
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + deadline
+    started = time.monotonic()
+
+    primary_task = asyncio.ensure_future(primary())
+    tasks = {primary_task: "primary"}
+    result = {"error": "Request timed out"}
+
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=min(tracker.hedge_delay(), deadline))
+        primary_ok = bool(done) and primary_task.exception() is None and _is_success(primary_task.result())
+        if hedge is not None and not primary_ok:
+            # Primary is slow (past p95) or already failed: send the backup request now
+            tasks[asyncio.ensure_future(hedge())] = "hedge"
+
+        pending = set(tasks)
+        while pending:
+            remaining = expires_at - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if tasks[task] == "primary":
+                    tracker.record(time.monotonic() - started)
+                if task.exception() is not None:
+                    result = {"error": str(task.exception())}
+                    continue
+                if _is_success(task.result()):
+                    return task.result()
+                result = task.result()
+        return result
+    finally:
+        for task in tasks:
+            if not task.done():
+                if tasks[task] == "primary":
+                    # Lower bound of the primary latency: still useful for the p95 estimate
+                    tracker.record(time.monotonic() - started)
+                task.cancel()
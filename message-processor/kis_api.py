@@ -2,6 +2,7 @@ import os
 import aiohttp
 import asyncio
 from datetime import datetime, timedelta
+from typing import Optional
 import json
 
 class KisApi:
@@ -12,6 +13,8 @@ class KisApi:
         self.base_url = os.getenv('KIS_BASE_URL', 'https://openapi.koreainvestment.com:9443')
         self.token = None
         self.token_expiry = None
+        # Exchange where each ticker was last found, tried first next time
+        self.exchange_cache = {}
 
     async def get_token(self):
         """Get or refresh access token"""
@@ -45,8 +48,23 @@ class KisApi:
                 print(f"Error getting token: {e}")
                 return None
 
-    async def get_current_price(self, ticker: str):
-        """Get current price for a US stock ticker"""
+    async def get_current_price(self, ticker: str, timeout: Optional[float] = None):
+        """
+        Get current price for a US stock ticker
+
+        Args:
+            ticker: US stock ticker
+            timeout: Overall time budget in seconds for the token refresh and all exchange lookups (None = no limit)
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                return await self._lookup_price(ticker)
+        except TimeoutError:
+            print(f"Timed out fetching price for {ticker}")
+            return {"error": f"Could not find price for {ticker}"}
+
+    async def _lookup_price(self, ticker: str):
+        """Look up the price on each exchange in turn until one has it"""
         if not self.app_key or not self.app_secret:
             return {"error": "API credentials not configured"}
 
@@ -64,8 +82,11 @@ class KisApi:
             "tr_id": "HHDFS00000300"
         }
 
-        # Try exchanges in order of likelihood
+        # Try exchanges in order of likelihood, starting from where the ticker was found last time
         exchanges = ['NAS', 'NYS', 'AMS']
+        cached = self.exchange_cache.get(ticker.upper())
+        if cached:
+            exchanges = [cached] + [e for e in exchanges if e != cached]
 
         async with aiohttp.ClientSession() as session:
             for excd in exchanges:
@@ -84,6 +105,7 @@ class KisApi:
                                 output = data.get('output', {})
                                 # If price is empty or invalid, it might be the wrong exchange
                                 if output and output.get('last'):
+                                    self.exchange_cache[ticker.upper()] = excd
                                     return {
                                         "ticker": ticker.upper(),
                                         "price": output.get('last'),
@@ -91,6 +113,9 @@ class KisApi:
                                         "rate": output.get('rate'),
                                         "exchange": excd
                                     }
+                except asyncio.TimeoutError:
+                    print(f"Timed out fetching price for {ticker} from {excd}")
+                    continue
                 except Exception as e:
                     print(f"Error fetching price from {excd}: {e}")
                     continue
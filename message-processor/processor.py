@@ -1,20 +1,70 @@
 import os
 import asyncio
 import json
+import time
 import aiohttp
 from typing import Dict, Any
 from nats.aio.client import Client as NATS
 from dotenv import load_dotenv
 from kis_api import KisApi
+from tiingo_api import TiingoApi
+from hedging import LatencyTracker, hedged_request
+from metrics import counter, gauge, histogram, start_metrics_server
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
 NATS_URL = os.getenv('NATS_URL', 'nats://localhost:4222')
+# Overall time budget for a price lookup (seconds)
+PRICE_DEADLINE_SECONDS = float(os.getenv('PRICE_DEADLINE_SECONDS', '5'))
+# Port for the Prometheus /metrics endpoint (0 disables it)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9109'))
 DEBUG_WEBHOOK_URL = os.getenv('DEBUG_WEBHOOK_URL', 'https://discord.com/api/webhooks/1363503466194141326/HygTxWYN51KKtOiSh6hlV2ljI-rXtWBwDJgEOCo5K8vuEXgnmMSBbkOmmDqrzVFWSYpv')
 
 
+API_REQUEST_SECONDS = histogram(
+    "message_processor_api_request_seconds",
+    "Price lookup latency by provider and endpoint (seconds)",
+    ("provider", "endpoint", "outcome"),
+)
+MESSAGE_SECONDS = histogram(
+    "message_processor_message_seconds",
+    "Time to handle one discord.messages message, from receipt to published response (seconds)",
+    ("command",),
+)
+MESSAGES = counter("message_processor_messages_total", "Handled messages", ("command", "outcome"))
+QUEUE_DEPTH = gauge(
+    "message_processor_queue_depth",
+    "Messages waiting in the discord.messages subscription (pending) or being handled (inflight)",
+    ("kind",),
+)
+
+
+async def timed_lookup(provider: str, endpoint: str, lookup) -> Dict[str, Any]:
+    """Await a price lookup and record its latency; cancelled hedge losers are recorded too"""
+    started = time.perf_counter()
+    outcome = "cancelled"
+    try:
+        result = await lookup
+        outcome = "error" if "error" in result else "ok"
+        return result
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        API_REQUEST_SECONDS.labels(provider=provider, endpoint=endpoint, outcome=outcome).observe(
+            time.perf_counter() - started
+        )
+
+
+def command_of(content: str) -> str:
+    """Low-cardinality command label for a message"""
+    return "price" if content.startswith('!가격') else "other"
+
+
 async def send_debug_webhook(title: str, data: dict, color: int = 3447003):
     """Send debug information to Discord webhook"""
     if not DEBUG_WEBHOOK_URL:
@@ -50,6 +100,33 @@ class MessageProcessor:
     def __init__(self):
         self.nc = NATS()
         self.kis_api = KisApi()
+        self.tiingo_api = TiingoApi()
+        self.price_latency = LatencyTracker()
+        self.subscription = None
+        self.inflight = 0
+        QUEUE_DEPTH.set_function(self.queue_depth)
+
+    def queue_depth(self) -> Dict[tuple, float]:
+        pending = self.subscription.pending_msgs if self.subscription is not None else 0
+        return {("pending",): pending, ("inflight",): self.inflight}
+
+    async def get_current_price(self, ticker: str) -> Dict[str, Any]:
+        """
+        Get current price with a hedged request.
+        KIS is asked first; if it has not answered after its p95 latency, Tiingo
+        (or a second KIS request when no Tiingo key is set) is asked too and the
+        first successful answer wins.
+        """
+        def primary():
+            return timed_lookup("kis", "price", self.kis_api.get_current_price(ticker, timeout=PRICE_DEADLINE_SECONDS))
+
+        if self.tiingo_api.configured:
+            def hedge():
+                return timed_lookup("tiingo", "iex", self.tiingo_api.get_current_price(ticker, timeout=PRICE_DEADLINE_SECONDS))
+        else:
+            hedge = primary
+
+        return await hedged_request(primary, hedge, self.price_latency, PRICE_DEADLINE_SECONDS)
     
     async def connect(self):
         """Connect to NATS server"""
@@ -113,7 +190,7 @@ class MessageProcessor:
                 ticker = parts[1]
 
                 # Fetch price
-                result = await self.kis_api.get_current_price(ticker)
+                result = await self.get_current_price(ticker)
 
                 if "error" in result:
                     return f"오류 발생: {result['error']}"
@@ -147,9 +224,14 @@ class MessageProcessor:
     
     async def handle_discord_message(self, msg):
         """Handle incoming messages from Discord"""
+        started = time.perf_counter()
+        command = "unknown"
+        outcome = "error"
+        self.inflight += 1
         try:
             # Parse message data
             message_data = json.loads(msg.data.decode())
+            command = command_of(message_data.get('content', ''))
             print(f"Received message: {message_data}")
             print(f"[메시지처리기 ← Discord] 수신 데이터: {json.dumps(message_data, ensure_ascii=False, indent=2)}")
 
@@ -184,18 +266,24 @@ class MessageProcessor:
                 json.dumps(response_data).encode()
             )
             print(f"Sent response for message {message_data.get('message_id')}")
-            
+            outcome = "ok"
+
         except json.JSONDecodeError as e:
             print(f"Error decoding message: {e}")
         except Exception as e:
             print(f"Error handling message: {e}")
+        finally:
+            self.inflight -= 1
+            MESSAGE_SECONDS.labels(command=command).observe(time.perf_counter() - started)
+            MESSAGES.labels(command=command, outcome=outcome).inc()
     
     async def start(self):
         """Start the message processor"""
         await self.connect()
-        
+        metrics_runner = await start_metrics_server(METRICS_PORT)
+
         # Subscribe to Discord messages
-        await self.nc.subscribe("discord.messages", cb=self.handle_discord_message)
+        self.subscription = await self.nc.subscribe("discord.messages", cb=self.handle_discord_message)
         print("Subscribed to discord.messages - waiting for messages...")
         
         # Keep the service running
@@ -206,6 +294,8 @@ class MessageProcessor:
             print("\nShutting down...")
         finally:
             await self.nc.close()
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
 
 
 async def main():
@@ -0,0 +1,69 @@
+import os
+import asyncio
+import aiohttp
+from typing import Optional
+
+
+class TiingoApi:
+    """Tiingo IEX quote client, used as the hedge for KIS current price requests"""
+
+    def __init__(self):
+        self.api_key = os.getenv('Tiingo_API_KEY')
+        self.base_url = "https://api.tiingo.com"
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    async def get_current_price(self, ticker: str, timeout: Optional[float] = None):
+        """
+        Get current price for a US stock ticker from the IEX top-of-book endpoint
+
+        Args:
+            ticker: US stock ticker
+            timeout: Overall time budget in seconds for the request (None = no limit)
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                return await self._lookup_price(ticker)
+        except TimeoutError:
+            print(f"Timed out fetching price for {ticker} from Tiingo")
+            return {"error": f"Could not find price for {ticker}"}
+
+    async def _lookup_price(self, ticker: str):
+        if not self.api_key:
+            return {"error": "Tiingo API key not configured"}
+
+        url = f"{self.base_url}/iex/{ticker.upper()}"
+        headers = {"Content-Type": "application/json"}
+        params = {"token": self.api_key}
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, headers=headers, params=params) as response:
+                    if response.status != 200:
+                        return {"error": f"Tiingo returned status {response.status}"}
+                    data = await response.json()
+        except Exception as e:
+            print(f"Error fetching price from Tiingo: {e}")
+            return {"error": f"Could not find price for {ticker}"}
+
+        if not data:
+            return {"error": f"Could not find price for {ticker}"}
+
+        quote = data[0]
+        last = quote.get('last') or quote.get('tngoLast')
+        prev_close = quote.get('prevClose')
+        if not last:
+            return {"error": f"Could not find price for {ticker}"}
+
+        diff = last - prev_close if prev_close else 0.0
+        rate = diff / prev_close * 100 if prev_close else 0.0
+        # Same shape as KisApi.get_current_price
+        return {
+            "ticker": ticker.upper(),
+            "price": last,
+            "diff": round(diff, 4),
+            "rate": round(rate, 2),
+            "exchange": "IEX"
+        }
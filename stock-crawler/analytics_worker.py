@@ -0,0 +1,218 @@
+"""candles.updated 이벤트 기반 분석 워커.
+
+수집기가 캔들을 저장할 때 발행하는 candles.updated 이벤트(common/candle_events.py)를 구독해
+바뀐 (종목, 주기)의 분석 결과만 다시 계산합니다.
+
+    - 봉별 지표: 수집기에서 보조지표를 갱신하지 않은 이벤트(indicators=false)만 저장된 상태에 바뀐 첫 봉부터 반영
+      (이전 봉이 바뀐 경우에만 전체 재계산)
+    - 시그널: 일봉 이벤트의 종목을 모아 바뀐 첫 거래일부터 ticker_signal_history에 다시 저장
+
+이벤트는 ANALYTICS_DEBOUNCE_SECONDS 동안 모아 (종목, 주기)별로 가장 이른 봉부터 한 번만 계산하고,
+계산이 실패한 묶음은 다음 묶음에 다시 합칩니다. 여러 워커를 띄우면 analytics-workers 큐 그룹으로 이벤트를 나눠 받습니다.
+
+사용법:
+    python analytics_worker.py
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from nats.aio.client import Client as NATS
+
+from common import (
+    close_pool,
+    ensure_candle_features_table,
+    ensure_indicator_state_table,
+    ensure_us_stock_candles_table,
+    init_pool,
+)
+from common.candle_events import ANALYTICS_QUEUE_GROUP, CANDLES_UPDATED_SUBJECT, CandlesUpdated
+from common.indicator_state import IndicatorEngine
+from common.metrics import counter, gauge, histogram, start_metrics_server
+from common.signal_history import ensure_signal_history_table, refresh_signal_history
+
+logger = logging.getLogger(__name__)
+
+EVENTS_RECEIVED = counter("stock_crawler_analytics_events_total", "받은 candles.updated 이벤트 수", ("interval",))
+REFRESH_SECONDS = histogram(
+    "stock_crawler_analytics_refresh_seconds",
+    "분석 갱신 한 번에 걸린 시간 (초, kind: features/signals)",
+    ("kind",),
+)
+LAG_SECONDS = histogram(
+    "stock_crawler_analytics_lag_seconds",
+    "candles.updated 발행부터 분석 결과 저장까지 걸린 시간 (초)",
+    ("interval",),
+)
+PENDING_KEYS = gauge("stock_crawler_analytics_pending", "다음 갱신을 기다리는 (종목, 주기) 수")
+
+
+@dataclass
+class PendingRange:
+    """다음 갱신에서 다시 계산할 (종목, 주기)의 범위."""
+
+    start: datetime  # 바뀐 가장 이른 봉 시각
+    indicators: bool  # 모든 이벤트에서 수집기가 보조지표를 이미 갱신했는지 여부
+    published_at: float  # 가장 이른 이벤트 발행 시각
+
+    def merge(self, event: CandlesUpdated) -> None:
+        self.merge_range(PendingRange(event.start_time, event.indicators, event.published_at))
+
+    def merge_range(self, other: "PendingRange") -> None:
+        self.start = min(self.start, other.start)
+        self.indicators = self.indicators and other.indicators
+        self.published_at = min(self.published_at, other.published_at)
+
+
+class AnalyticsWorker:
+    """candles.updated를 구독해 바뀐 종목의 봉별 지표와 시그널을 다시 계산합니다."""
+
+    def __init__(
+        self,
+        settings,
+        engine: Optional[IndicatorEngine],
+        debounce_seconds: float = 2.0,
+        signals: bool = True,
+    ):
+        """
+        Args:
+            settings: 설정
+            engine: 봉별 지표를 다시 계산할 엔진 (None이면 시그널만 계산)
+            debounce_seconds: 이벤트를 모으는 시간 (초)
+            signals: 일봉 이벤트로 시그널 이력을 다시 계산할지 여부
+        """
+        self.settings = settings
+        self.engine = engine
+        self.debounce_seconds = debounce_seconds
+        self.signals = signals
+        self.nc = NATS()
+        self.name = socket.gethostname()
+        self._pending: Dict[Tuple[str, str], PendingRange] = {}
+        self.logger = logging.getLogger(__name__)
+
+    async def run(self) -> None:
+        """이벤트를 구독하고 모인 (종목, 주기)를 주기적으로 다시 계산합니다."""
+        await self.nc.connect(self.settings.nats_url, name=f"analytics-worker-{self.name}")
+        await self.nc.subscribe(CANDLES_UPDATED_SUBJECT, queue=ANALYTICS_QUEUE_GROUP, cb=self._on_event)
+        self.logger.info(
+            "분석 워커 시작 (%s, 봉별 지표: %s, 시그널: %s)",
+            self.name,
+            "켜짐" if self.engine else "꺼짐",
+            "켜짐" if self.signals else "꺼짐",
+        )
+        try:
+            while True:
+                await asyncio.sleep(self.debounce_seconds)
+                if not self._pending:
+                    continue
+                batch, self._pending = self._pending, {}
+                # 계산은 스레드에서 실행하고 그동안 들어온 이벤트는 다음 묶음으로 모음
+                if not await asyncio.to_thread(self.refresh, batch):
+                    self._requeue(batch)
+        finally:
+            await self.nc.drain()
+
+    async def _on_event(self, msg) -> None:
+        event = CandlesUpdated.from_bytes(msg.data)
+        EVENTS_RECEIVED.labels(interval=event.interval).inc()
+        key = (event.symbol, event.interval)
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = PendingRange(event.start_time, event.indicators, event.published_at)
+        else:
+            pending.merge(event)
+
+    def _requeue(self, batch: Dict[Tuple[str, str], PendingRange]) -> None:
+        """실패한 묶음을 대기 중인 범위에 다시 합칩니다. (더 이른 시작 시각 유지)"""
+        for key, pending in batch.items():
+            current = self._pending.get(key)
+            if current is None:
+                self._pending[key] = pending
+            else:
+                current.merge_range(pending)
+
+    def pending_count(self) -> float:
+        """다음 갱신을 기다리는 (종목, 주기) 수 (메트릭)."""
+        return len(self._pending)
+
+    def refresh(self, batch: Dict[Tuple[str, str], PendingRange]) -> bool:
+        """모인 (종목, 주기)의 봉별 지표와 시그널을 다시 계산해 저장합니다.
+
+        Returns:
+            성공 여부 (실패하면 호출한 쪽이 묶음을 다음 갱신으로 넘김)
+        """
+        features = {key: pending.start for key, pending in batch.items() if not pending.indicators}
+        daily = {symbol: pending.start.date() for (symbol, interval), pending in batch.items() if interval == "daily"}
+        saved_features = saved_signals = 0
+        try:
+            if self.engine is not None and features:
+                with REFRESH_SECONDS.labels(kind="features").time():
+                    saved_features = self.engine.apply_ranges(features)
+            if self.signals and daily:
+                with REFRESH_SECONDS.labels(kind="signals").time():
+                    saved_signals = refresh_signal_history(daily)
+        except Exception:
+            # 같은 종목의 새 이벤트가 오지 않을 수도 있으므로 묶음을 버리지 않고 다음 갱신에서 다시 계산
+            self.logger.exception("분석 갱신 실패 (%d개 종목·주기, 다음 갱신에서 재시도)", len(batch))
+            return False
+
+        now = time.time()
+        for (_symbol, interval), pending in batch.items():
+            LAG_SECONDS.labels(interval=interval).observe(max(0.0, now - pending.published_at))
+        self.logger.info(
+            "분석 갱신: %d개 종목·주기 (봉별 지표 %d, 시그널 %d종목 %d행)",
+            len(batch),
+            saved_features,
+            len(daily) if self.signals else 0,
+            saved_signals,
+        )
+        return True
+
+
+def main() -> None:
+    """메인 함수."""
+    from dotenv import load_dotenv
+    from config import Settings
+
+    load_dotenv()
+
+    # 로깅 설정
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(threadName)s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    # 설정 로드
+    settings = Settings.from_env()
+
+    # DB 초기화
+    init_pool(settings.db_dsn, maxconn=settings.db_pool_max_connections)
+    ensure_us_stock_candles_table()
+    ensure_signal_history_table()
+    engine = settings.indicator_engine()
+    if engine is not None:
+        ensure_indicator_state_table()
+        if engine.store_features:
+            ensure_candle_features_table()
+
+    worker = AnalyticsWorker(settings, engine, debounce_seconds=settings.analytics_debounce_seconds)
+    PENDING_KEYS.set_function(worker.pending_count)
+    start_metrics_server(settings.metrics_port)
+
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@ from __future__ import annotations
 
 import logging
 import time
-from dataclasses import dataclass
 from typing import List, Optional
 
 import schedule
@@ -11,28 +10,20 @@ import schedule
 from common import (
     KisApi,
     ManagedTicker,
+    enable_candle_events,
+    enable_extremes_updates,
+    enable_indicator_updates,
     ensure_managed_tickers_table,
     ensure_us_stock_candles_table,
-    get_active_tickers,
-    save_us_stock_candles,
-    update_last_collected,
 )
+from common.providers import KisProvider
+from orchestrator import CandleOrchestrator, CollectionResult
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class CollectionResult:
-    """수집 결과."""
-
-    symbol: str
-    success: bool
-    records_saved: int = 0
-    error_message: Optional[str] = None
-
-
 class CandleCollector:
-    """미국 주식 캔들 수집기."""
+    """미국 주식 캔들 수집기 (KIS 제공자)."""
 
     def __init__(self, kis_api: KisApi, api_request_delay: float = 0.5):
         """
@@ -42,125 +33,45 @@ class CandleCollector:
         """
         self.kis_api = kis_api
         self.api_request_delay = api_request_delay
+        self.orchestrator = CandleOrchestrator(KisProvider(kis_api), min_request_interval=api_request_delay)
         self.logger = logging.getLogger(__name__)
 
-    def collect_60m_candles(self) -> List[CollectionResult]:
+    def collect_60m_candles(self, tickers: Optional[List[ManagedTicker]] = None) -> List[CollectionResult]:
         """모든 활성 티커의 60분봉을 수집합니다.
 
+        Args:
+            tickers: 수집할 티커 목록 (None이면 DB의 활성 티커)
+
         Returns:
             각 티커별 수집 결과 리스트
         """
-        tickers = get_active_tickers()
-        self.logger.info("60분봉 수집 시작 (활성 티커: %d개)", len(tickers))
+        return self.orchestrator.collect("60m", tickers=tickers)
+
+    def collect_daily_candles(self, tickers: Optional[List[ManagedTicker]] = None) -> List[CollectionResult]:
+        """모든 활성 티커의 일봉을 수집합니다.
 
-        results = []
-        for ticker in tickers:
-            result = self._collect_ticker_60m(ticker)
-            results.append(result)
-            if ticker != tickers[-1]:
-                time.sleep(self.api_request_delay)
+        Args:
+            tickers: 수집할 티커 목록 (None이면 DB의 활성 티커)
 
-        success_count = sum(1 for r in results if r.success)
-        fail_count = len(results) - success_count
-        self.logger.info("60분봉 수집 완료 (성공: %d, 실패: %d)", success_count, fail_count)
+        Returns:
+            각 티커별 수집 결과 리스트
+        """
+        return self.orchestrator.collect("daily", tickers=tickers)
 
-        return results
+    def backfill_60m_candles(self, days: int = 30) -> List[CollectionResult]:
+        """모든 활성 티커의 과거 60분봉을 연속 조회로 채웁니다.
 
-    def collect_daily_candles(self) -> List[CollectionResult]:
-        """모든 활성 티커의 일봉을 수집합니다.
+        Args:
+            days: 오늘로부터 거슬러 올라갈 일수
 
         Returns:
             각 티커별 수집 결과 리스트
         """
-        tickers = get_active_tickers()
-        self.logger.info("일봉 수집 시작 (활성 티커: %d개)", len(tickers))
-
-        results = []
-        for ticker in tickers:
-            result = self._collect_ticker_daily(ticker)
-            results.append(result)
-            if ticker != tickers[-1]:
-                time.sleep(self.api_request_delay)
-
-        success_count = sum(1 for r in results if r.success)
-        fail_count = len(results) - success_count
-        self.logger.info("일봉 수집 완료 (성공: %d, 실패: %d)", success_count, fail_count)
-
-        return results
-
-    def _collect_ticker_60m(self, ticker: ManagedTicker) -> CollectionResult:
-        """단일 티커의 60분봉을 수집합니다."""
-        try:
-            candles = self.kis_api.fetch_us_stock_candles_60m(
-                symbol=ticker.symbol,
-                exchange=ticker.exchange,
-            )
-
-            if not candles:
-                return CollectionResult(
-                    symbol=ticker.symbol,
-                    success=True,
-                    records_saved=0,
-                )
-
-            saved_count = save_us_stock_candles(
-                symbol=ticker.symbol,
-                interval="60m",
-                candles=candles,
-            )
-            update_last_collected(ticker.id)
-
-            self.logger.info("%s: %d건 저장 완료", ticker.symbol, saved_count)
-            return CollectionResult(
-                symbol=ticker.symbol,
-                success=True,
-                records_saved=saved_count,
-            )
-
-        except Exception as e:
-            self.logger.error("%s: 수집 실패 - %s", ticker.symbol, e)
-            return CollectionResult(
-                symbol=ticker.symbol,
-                success=False,
-                error_message=str(e),
-            )
-
-    def _collect_ticker_daily(self, ticker: ManagedTicker) -> CollectionResult:
-        """단일 티커의 일봉을 수집합니다."""
-        try:
-            candles = self.kis_api.fetch_us_stock_candles_daily(
-                symbol=ticker.symbol,
-                exchange=ticker.exchange,
-            )
-
-            if not candles:
-                return CollectionResult(
-                    symbol=ticker.symbol,
-                    success=True,
-                    records_saved=0,
-                )
-
-            saved_count = save_us_stock_candles(
-                symbol=ticker.symbol,
-                interval="daily",
-                candles=candles,
-            )
-            update_last_collected(ticker.id)
-
-            self.logger.info("%s: %d건 저장 완료", ticker.symbol, saved_count)
-            return CollectionResult(
-                symbol=ticker.symbol,
-                success=True,
-                records_saved=saved_count,
-            )
-
-        except Exception as e:
-            self.logger.error("%s: 수집 실패 - %s", ticker.symbol, e)
-            return CollectionResult(
-                symbol=ticker.symbol,
-                success=False,
-                error_message=str(e),
-            )
+        return self.orchestrator.collect("60m", days=days)
+
+    def backfill_ticker_60m(self, ticker: ManagedTicker, days: int = 30) -> CollectionResult:
+        """단일 티커의 과거 60분봉을 연속 조회로 채웁니다."""
+        return self.orchestrator.collect("60m", tickers=[ticker], days=days)[0]
 
     def start(self, interval_60m: int = 60, daily_time: str = "07:00") -> None:
         """스케줄러를 시작합니다.
@@ -215,6 +126,9 @@ def main() -> None:
     init_pool(settings.db_dsn)
     ensure_managed_tickers_table()
     ensure_us_stock_candles_table()
+    enable_indicator_updates(settings.indicator_engine())
+    enable_extremes_updates(settings.extremes_engine())
+    enable_candle_events(settings.candle_event_publisher())
 
     # KIS API 클라이언트 생성
     kis_api = KisApi.from_env()
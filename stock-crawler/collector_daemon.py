@@ -0,0 +1,415 @@
+"""통합 캔들 수집 데몬.
+
+KIS, yfinance, Tiingo 제공자를 하나의 프로세스에서 플러그인 소스로 실행합니다.
+커넥션 풀, 티커 목록, 쓰기 버퍼, 스케줄러를 공유하며
+소스별 전용 스레드에서 동시에 수집합니다.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+import schedule
+
+from common import (
+    CandleWriteBuffer,
+    ManagedTicker,
+    TickerRegistry,
+    close_pool,
+    enable_candle_events,
+    enable_extremes_updates,
+    enable_indicator_updates,
+    ensure_collection_runs_table,
+    ensure_managed_tickers_table,
+    ensure_symbol_failures_table,
+    ensure_us_stock_candles_table,
+    init_pool,
+    set_write_buffer,
+)
+from common.deadline import Deadline, deadline_scope
+from common.freshness import FreshnessTracker
+from common.metrics import start_metrics_server
+from common.profiling import profile_run
+from common.providers import CandleProvider, create_provider
+from orchestrator import CandleOrchestrator, RoutedCollector
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SourceJob:
+    """소스가 데몬에 등록하는 주기 작업.
+
+    every_seconds, every_minutes, at 중 하나를 지정합니다.
+    """
+
+    name: str
+    run: Callable[[List[ManagedTicker]], object]
+    every_minutes: Optional[int] = None
+    every_seconds: Optional[float] = None
+    budget_seconds: Optional[float] = None  # 한 번 실행의 마감 시간 (None이면 제한 없음)
+    at: Optional[str] = None  # 매일 실행 시간 (HH:MM)
+
+
+class CollectorSource:
+    """통합 데몬에 올라가는 수집 소스의 기본 클래스."""
+
+    name = ""
+
+    def jobs(self) -> List[SourceJob]:
+        """데몬에 등록할 작업 목록을 반환합니다."""
+        raise NotImplementedError
+
+
+def _freshness_tracker(settings) -> FreshnessTracker:
+    """60분봉 작업용 SLA 추적기. 일반 티커의 SLA는 60분봉 수집 간격입니다."""
+    return FreshnessTracker(
+        default_sla=settings.candle_60m_interval_minutes * 60,
+        tick_seconds=settings.freshness_tick_seconds,
+    )
+
+
+class ProviderSource(CollectorSource):
+    """캔들 제공자를 데몬 소스로 감쌉니다.
+
+    시간당 요청 제한이 없는 제공자는 60분봉을 신선도 SLA가 임박한 티커부터 수시로, 일봉을 매일 수집합니다.
+    정기 주기보다 짧은 SLA로 돌아온 티커는 최신 봉만 조회합니다.
+    시간당 요청 제한이 있는 제공자는 하루 한 번 60분봉과 일봉을 함께 수집합니다.
+    """
+
+    def __init__(self, provider: CandleProvider, settings, min_request_interval: Optional[float] = None):
+        """
+        Args:
+            provider: 캔들 제공자
+            settings: 설정
+            min_request_interval: 요청 간 최소 간격 (초)
+        """
+        self.name = provider.name
+        self.settings = settings
+        self.orchestrator = CandleOrchestrator(
+            provider,
+            min_request_interval=min_request_interval,
+            breaker=settings.symbol_breaker(),
+            run_ledger=settings.run_ledger(),
+        )
+
+    @property
+    def capabilities(self):
+        """제공자 capabilities."""
+        return self.orchestrator.provider.capabilities
+
+    def jobs(self) -> List[SourceJob]:
+        caps = self.capabilities
+        if caps.requests_per_hour is None:
+            freshness = _freshness_tracker(self.settings)
+
+            def collect_due(tickers: List[ManagedTicker]) -> None:
+                full, latest = freshness.take_due_split(tickers)
+                self.orchestrator.collect("60m", tickers=full)
+                if latest:
+                    self.orchestrator.collect("60m", tickers=latest, latest_only=True)
+
+            return [
+                SourceJob(
+                    name=f"{self.name}:60m",
+                    run=collect_due,
+                    every_seconds=self.settings.freshness_tick_seconds,
+                    budget_seconds=self.settings.candle_60m_interval_minutes * 60,
+                ),
+                SourceJob(
+                    name=f"{self.name}:daily",
+                    run=lambda tickers: self.orchestrator.collect("daily", tickers=tickers),
+                    at=self.settings.daily_candle_collect_time,
+                    budget_seconds=self.settings.daily_job_budget_seconds,
+                ),
+            ]
+
+        def daily_job(tickers: List[ManagedTicker]) -> None:
+            if not caps.fits_hourly_budget(len(tickers)):
+                logger.warning(
+                    "[%s] 티커 %d개는 시간당 요청 제한(%d)을 넘어 수집이 %d시간 이상 걸립니다.",
+                    self.name,
+                    len(tickers),
+                    caps.requests_per_hour,
+                    caps.requests_needed(len(tickers)) // caps.requests_per_hour,
+                )
+            self.orchestrator.collect("60m", tickers=tickers)
+            self.orchestrator.collect("daily", tickers=tickers)
+
+        return [
+            SourceJob(
+                name=f"{self.name}:daily",
+                run=daily_job,
+                at=self.settings.daily_candle_collect_time,
+                budget_seconds=self.settings.daily_job_budget_seconds,
+            ),
+        ]
+
+
+class RoutedSource(CollectorSource):
+    """여러 제공자를 하나의 소스로 묶어 (종목, 주기)마다 비용이 가장 낮은 제공자 하나만 호출합니다."""
+
+    name = "routed"
+
+    def __init__(self, sources: List[ProviderSource], settings):
+        """
+        Args:
+            sources: 라우팅 대상 제공자 소스
+            settings: 설정
+        """
+        self.settings = settings
+        self.collector = RoutedCollector(
+            [source.orchestrator for source in sources],
+            breaker=settings.symbol_breaker(),
+        )
+
+    def jobs(self) -> List[SourceJob]:
+        freshness = _freshness_tracker(self.settings)
+
+        def collect_due(tickers: List[ManagedTicker]) -> None:
+            full, latest = freshness.take_due_split(tickers)
+            if full:
+                self.collector.collect("60m", tickers=full)
+            if latest:
+                self.collector.collect("60m", tickers=latest, latest_only=True)
+
+        return [
+            SourceJob(
+                name="routed:60m",
+                run=collect_due,
+                every_seconds=self.settings.freshness_tick_seconds,
+                budget_seconds=self.settings.candle_60m_interval_minutes * 60,
+            ),
+            SourceJob(
+                name="routed:daily",
+                run=lambda tickers: self.collector.collect("daily", tickers=tickers),
+                at=self.settings.daily_candle_collect_time,
+                budget_seconds=self.settings.daily_job_budget_seconds,
+            ),
+        ]
+
+
+def _kis_source(settings) -> ProviderSource:
+    return ProviderSource(create_provider("kis"), settings, settings.api_request_delay)
+
+
+def _yfinance_source(settings) -> ProviderSource:
+    return ProviderSource(create_provider("yf"), settings, 1.0)
+
+
+def _tiingo_source(settings) -> ProviderSource:
+    return ProviderSource(create_provider("tiingo"), settings)
+
+
+# 이름으로 활성화할 수 있는 소스 목록
+SOURCE_FACTORIES: Dict[str, Callable[..., CollectorSource]] = {
+    "kis": _kis_source,
+    "yf": _yfinance_source,
+    "tiingo": _tiingo_source,
+}
+
+
+def _describe_schedule(job: SourceJob) -> str:
+    if job.every_seconds:
+        return f"{job.every_seconds:g}초 간격 (SLA 임박 티커만)"
+    if job.every_minutes:
+        return f"{job.every_minutes}분 간격"
+    return f"매일 {job.at}"
+
+
+class CollectorDaemon:
+    """여러 수집 소스를 하나의 프로세스에서 실행하는 데몬."""
+
+    def __init__(
+        self,
+        sources: List[CollectorSource],
+        registry: TickerRegistry,
+        write_buffer: CandleWriteBuffer,
+        profile_dir: Optional[str] = None,
+        profile_memory: bool = False,
+        profile_interval: float = 0.005,
+    ):
+        """
+        Args:
+            sources: 실행할 수집 소스 목록
+            registry: 공유 티커 목록 캐시
+            write_buffer: 공유 쓰기 버퍼
+            profile_dir: 작업별 첫 실행(수집 한 주기)의 프로파일을 저장할 디렉토리 (None이면 프로파일링 안 함)
+            profile_memory: 프로파일에 tracemalloc 피크 스냅샷 포함 여부
+            profile_interval: 프로파일 샘플링 간격 (초)
+        """
+        self.sources = sources
+        self.registry = registry
+        self.write_buffer = write_buffer
+        self.profile_dir = profile_dir
+        self.profile_memory = profile_memory
+        self.profile_interval = profile_interval
+        self._profiled: Set[str] = set()
+        self.scheduler = schedule.Scheduler()
+        # 소스별 단일 스레드: 소스 내부는 순차(rate limit 준수), 소스 간에는 동시 실행
+        self._executors = {
+            source.name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"collector-{source.name}")
+            for source in sources
+        }
+        self._running: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, source: CollectorSource, job: SourceJob) -> None:
+        """작업을 소스 전용 스레드에 제출합니다. 이전 실행이 끝나지 않았으면 건너뜁니다."""
+        with self._lock:
+            if self._running.get(job.name):
+                # 짧은 간격의 SLA 작업은 이전 실행이 길어지면 매번 겹치므로 경고하지 않음
+                level = logging.DEBUG if job.every_seconds else logging.WARNING
+                self.logger.log(level, "[%s] 이전 실행이 진행 중이어서 이번 주기는 건너뜁니다.", job.name)
+                return
+            self._running[job.name] = True
+
+        self._executors[source.name].submit(self._run_job, job)
+
+    def _should_profile(self, job: SourceJob) -> bool:
+        """프로파일링 중이면 작업마다 첫 실행 한 번만 프로파일링합니다."""
+        if self.profile_dir is None:
+            return False
+        with self._lock:
+            if job.name in self._profiled:
+                return False
+            self._profiled.add(job.name)
+            return True
+
+    def _run_job(self, job: SourceJob) -> None:
+        started = time.monotonic()
+        deadline = Deadline(job.budget_seconds) if job.budget_seconds else None
+        profiling = (
+            profile_run(job.name, self.profile_dir, self.profile_interval, self.profile_memory)
+            if self._should_profile(job)
+            else nullcontext()
+        )
+        try:
+            with profiling, deadline_scope(deadline):
+                job.run(self.registry.get_active())
+        except Exception as e:
+            self.logger.error("[%s] 작업 실패 - %s", job.name, e)
+        finally:
+            with self._lock:
+                self._running[job.name] = False
+            level = logging.DEBUG if job.every_seconds else logging.INFO
+            self.logger.log(level, "[%s] 작업 종료 (%.1f초)", job.name, time.monotonic() - started)
+
+    def start(self) -> None:
+        """스케줄을 등록하고 초기 수집 후 스케줄러 루프를 실행합니다."""
+        self.write_buffer.start()
+
+        for source in self.sources:
+            for job in source.jobs():
+                def trigger(source=source, job=job):
+                    self.submit(source, job)
+
+                if job.every_seconds:
+                    self.scheduler.every(job.every_seconds).seconds.do(trigger)
+                elif job.every_minutes:
+                    self.scheduler.every(job.every_minutes).minutes.do(trigger)
+                elif job.at:
+                    self.scheduler.every().day.at(job.at).do(trigger)
+                self.logger.info(
+                    "[%s] 작업 등록 (%s)",
+                    job.name,
+                    _describe_schedule(job),
+                )
+
+                # 시작 시 즉시 한 번 수집
+                trigger()
+
+        self.logger.info("통합 수집 데몬 시작 (소스: %s)", ", ".join(s.name for s in self.sources))
+        try:
+            while True:
+                self.scheduler.run_pending()
+                time.sleep(1)
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """실행 중인 작업을 마무리하고 버퍼를 비웁니다."""
+        self.logger.info("통합 수집 데몬 종료 중...")
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+        self.write_buffer.stop()
+
+
+def main() -> None:
+    """메인 함수."""
+    from dotenv import load_dotenv
+    from config import Settings
+
+    load_dotenv()
+
+    # 로깅 설정
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(threadName)s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    # 설정 로드
+    settings = Settings.from_env()
+
+    # DB 초기화 (모든 소스가 하나의 풀을 공유)
+    init_pool(settings.db_dsn, maxconn=settings.db_pool_max_connections)
+    ensure_managed_tickers_table()
+    ensure_us_stock_candles_table()
+    ensure_symbol_failures_table()
+    ensure_collection_runs_table()
+    enable_indicator_updates(settings.indicator_engine())
+    enable_extremes_updates(settings.extremes_engine())
+    enable_candle_events(settings.candle_event_publisher())
+
+    write_buffer = CandleWriteBuffer(
+        max_rows=settings.write_buffer_max_rows,
+        flush_interval=settings.write_buffer_flush_seconds,
+    )
+    set_write_buffer(write_buffer)
+
+    sources = []
+    for name in settings.collector_sources:
+        factory = SOURCE_FACTORIES.get(name)
+        if factory is None:
+            logger.error("알 수 없는 수집 소스입니다: %s", name)
+            continue
+        try:
+            sources.append(factory(settings))
+        except ValueError as e:
+            # 자격 증명 누락 등으로 초기화할 수 없는 소스는 제외
+            logger.error("[%s] 소스 초기화 실패 - %s", name, e)
+
+    if not sources:
+        raise SystemExit("실행할 수집 소스가 없습니다. COLLECTOR_SOURCES를 확인하세요.")
+
+    if settings.collector_routing == "planner":
+        # 모든 소스를 중복 수집하지 않고 종목별로 제공자 하나에 배정
+        sources = [RoutedSource(sources, settings)]
+
+    start_metrics_server(settings.metrics_port)
+    daemon = CollectorDaemon(
+        sources,
+        TickerRegistry(),
+        write_buffer,
+        profile_dir=settings.profile_dir if settings.profile_collection else None,
+        profile_memory=settings.profile_memory,
+        profile_interval=settings.profile_interval_ms / 1000.0,
+    )
+    try:
+        daemon.start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        set_write_buffer(None)
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
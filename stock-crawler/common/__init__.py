@@ -9,6 +9,11 @@ from .db import (
     execute_command,
     ensure_us_stock_candles_table,
     save_us_stock_candles,
+    upsert_candle_records,
+    write_candle_records,
+    set_write_buffer,
+    add_upsert_listener,
+    remove_upsert_listener,
 )
 from .kis_api import KisApi
 from .ticker_repository import (
@@ -21,6 +26,45 @@ from .ticker_repository import (
     update_last_collected,
     get_ticker,
     update_ticker,
+    TickerRegistry,
+)
+from .write_buffer import CandleWriteBuffer
+from .rate_limiter import RateLimiter
+from .api_errors import (
+    CredentialError,
+    RateLimitedError,
+    AuthError,
+    TokenExpiredError,
+    NoCredentialAvailableError,
+    ProviderError,
+)
+from .credential_pool import CredentialPool
+from .symbol_breaker import SymbolBreaker, SymbolFailure, ensure_symbol_failures_table
+from .run_ledger import CollectionRun, RunLedger, ensure_collection_runs_table
+from .run_metrics import StageMetrics
+from .daily_panel import DailyPanel, load_daily_panel
+from .indicator_state import (
+    IndicatorEngine,
+    enable_indicator_updates,
+    ensure_candle_features_table,
+    ensure_indicator_state_table,
+    get_candle_features,
+)
+from .rolling_extremes import ExtremesEngine, ExtremeValues, enable_extremes_updates, get_rolling_extremes
+from .candle_events import CandleEventPublisher, CandlesUpdated, disable_candle_events, enable_candle_events
+from .screening import ScreeningCriteria, ScreeningResult, run_screening, ensure_screening_results_table
+from .pattern_index import PatternIndex, PatternMatch, build_pattern_index, load_pattern_index
+from .peer_context import PeerContext, ensure_peer_context_table, get_peer_context, run_peer_context
+from .panel_cache import load_daily_panel_cached
+from .backtest import BacktestStats, ExitRule, RuleSet, run_backtest
+from .param_sweep import SweepParams, SweepResult, run_sweep
+from .providers import (
+    ProviderCapabilities,
+    CandleProvider,
+    KisProvider,
+    YFinanceProvider,
+    TiingoProvider,
+    create_provider,
 )
 from .yfinance_api import YFinanceApi, CandleData
 from .tiingo_api import TiingoApi, TiingoCandleData
@@ -36,6 +80,12 @@ __all__ = [
     "execute_command",
     "ensure_us_stock_candles_table",
     "save_us_stock_candles",
+    "upsert_candle_records",
+    "write_candle_records",
+    "set_write_buffer",
+    "add_upsert_listener",
+    "remove_upsert_listener",
+    "CandleWriteBuffer",
     # KIS API
     "KisApi",
     # yfinance API
@@ -44,6 +94,71 @@ __all__ = [
     # Tiingo API
     "TiingoApi",
     "TiingoCandleData",
+    # Providers
+    "ProviderCapabilities",
+    "CandleProvider",
+    "KisProvider",
+    "YFinanceProvider",
+    "TiingoProvider",
+    "create_provider",
+    "RateLimiter",
+    # Credentials
+    "CredentialPool",
+    "CredentialError",
+    "RateLimitedError",
+    "AuthError",
+    "TokenExpiredError",
+    "NoCredentialAvailableError",
+    "ProviderError",
+    # Symbol Breaker
+    "SymbolBreaker",
+    "SymbolFailure",
+    "ensure_symbol_failures_table",
+    # Run Ledger
+    "CollectionRun",
+    "RunLedger",
+    "StageMetrics",
+    "ensure_collection_runs_table",
+    # Indicator State
+    "IndicatorEngine",
+    "enable_indicator_updates",
+    "ensure_indicator_state_table",
+    "ensure_candle_features_table",
+    "get_candle_features",
+    # Rolling Extremes
+    "ExtremesEngine",
+    "ExtremeValues",
+    "enable_extremes_updates",
+    "get_rolling_extremes",
+    # Candle Events
+    "CandleEventPublisher",
+    "CandlesUpdated",
+    "enable_candle_events",
+    "disable_candle_events",
+    # Screening
+    "DailyPanel",
+    "load_daily_panel",
+    "ScreeningCriteria",
+    "ScreeningResult",
+    "run_screening",
+    "ensure_screening_results_table",
+    "PeerContext",
+    "ensure_peer_context_table",
+    "get_peer_context",
+    "run_peer_context",
+    "PatternIndex",
+    "PatternMatch",
+    "build_pattern_index",
+    "load_pattern_index",
+    # Backtest
+    "load_daily_panel_cached",
+    "BacktestStats",
+    "ExitRule",
+    "RuleSet",
+    "run_backtest",
+    "SweepParams",
+    "SweepResult",
+    "run_sweep",
     # Ticker Repository
     "ManagedTicker",
     "ensure_managed_tickers_table",
@@ -54,4 +169,5 @@ __all__ = [
     "update_last_collected",
     "get_ticker",
     "update_ticker",
+    "TickerRegistry",
 ]
@@ -0,0 +1,58 @@
+"""API 자격 증명 관련 오류와 제공자 조회 실패.
+
+API 클라이언트는 요청 한도 초과와 인증 실패를 일반 조회 실패와 구분해
+CredentialError로 알립니다. 자격 증명 풀은 이를 보고 해당 키를 순환에서 제외합니다.
+
+네트워크 오류, 5xx, API 오류 코드 응답은 ProviderError로 알리고, 빈 결과는
+제공자가 정상 응답했지만 데이터가 없는 경우(상장 폐지, 종목 없음)에만 반환합니다.
+수집기는 빈 결과만 서킷 브레이커에 '데이터 없음'으로 기록합니다.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+
+class CredentialError(RuntimeError):
+    """자격 증명 단위로 처리해야 하는 API 오류."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitedError(CredentialError):
+    """요청 한도 초과 (HTTP 429, KIS EGW00201 등)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message, status_code)
+        self.retry_after = retry_after
+
+
+class AuthError(CredentialError):
+    """인증 실패 (잘못된 키, 권한 없음)."""
+
+
+class TokenExpiredError(AuthError):
+    """접근 토큰 만료. 토큰을 다시 발급하면 같은 키로 재시도할 수 있습니다."""
+
+
+class NoCredentialAvailableError(CredentialError):
+    """순환 중인 자격 증명이 없음."""
+
+
+class ProviderError(RuntimeError):
+    """제공자 조회 실패 (네트워크 오류, 5xx, API 오류 코드). 데이터 없음과 구분합니다."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초)를 파싱합니다."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
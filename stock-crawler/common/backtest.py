@@ -0,0 +1,330 @@
+"""일봉 벡터화 백테스트.
+
+저장된 일봉 패널에 진입 규칙(눌림목 프리셋, 시그널 레벨)과 청산 규칙(보유 기간, 손절, 익절)을 적용해
+규칙 세트별 승률, 평균 수익률, 최대 낙폭을 계산합니다.
+
+    - 패널은 panel_cache의 메모리 매핑 캐시로 한 번만 DB에서 읽고, 작업 프로세스는 자기 종목 묶음(행 범위)만 매핑합니다.
+    - 묶음 안에서는 지표(daily_features)와 진입 신호를 (종목, 봉) 행렬로 한 번에 계산하고,
+      모든 진입 후보의 보유 구간을 (후보, 보유 봉) 행렬로 모아 손절/익절 도달 봉을 한 번에 찾습니다.
+    - 종목마다 포지션은 하나만 가지므로, 보유 중에 나온 신호는 건너뜁니다 (봉 축 반복, 종목 축은 벡터 연산).
+
+체결 가정:
+    - 신호가 나온 봉의 종가로 판단하고 다음 봉 시가에 진입합니다.
+    - 손절/익절은 진입 봉부터 고가/저가로 판정하고, 시가가 이미 기준을 넘었으면 시가에 체결합니다.
+      같은 봉에서 둘 다 닿으면 손절로 봅니다 (보수적).
+    - 둘 다 닿지 않으면 보유 기간 마지막 봉 종가에 청산합니다. 데이터 끝까지 청산되지 않은 거래는 제외합니다.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .daily_features import WINDOW_BARS, DailyFeatures, compute_daily_features
+from .panel_cache import cached_panel_path, open_panel
+from .screening import PRESETS, pullback_signals
+from .signal_history import signal_levels
+
+logger = logging.getLogger(__name__)
+
+# 청산 사유
+EXIT_TIME = 0
+EXIT_STOP = 1
+EXIT_TARGET = 2
+
+
+@dataclass(frozen=True)
+class ExitRule:
+    """청산 규칙. None인 기준은 적용하지 않습니다."""
+
+    hold_bars: int = 10  # 진입 봉을 포함한 최대 보유 봉 수
+    stop_loss_pct: Optional[float] = 7.0
+    take_profit_pct: Optional[float] = 15.0
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """진입 규칙 이름(ENTRY_RULES)과 청산 규칙의 조합."""
+
+    name: str
+    entry: str
+    exit: ExitRule = field(default_factory=ExitRule)
+
+
+# 진입 규칙: 이름 → 지표 행렬에서 (종목, 봉) 신호를 만드는 함수
+ENTRY_RULES: Dict[str, Callable[[DailyFeatures], np.ndarray]] = {
+    "pullback-basic": lambda f: pullback_signals(f, PRESETS["basic"]),
+    "pullback-trend": lambda f: pullback_signals(f, PRESETS["trend"]),
+    "signal-5": lambda f: signal_levels(f) == 5,
+    "signal-4+": lambda f: signal_levels(f) >= 4,
+}
+
+DEFAULT_RULE_SETS = tuple(RuleSet(name=name, entry=name) for name in ENTRY_RULES)
+
+
+@dataclass
+class Trades:
+    """체결된 거래. 모든 배열은 길이가 같습니다."""
+
+    symbols: np.ndarray  # object
+    entry_days: np.ndarray  # datetime64[D]
+    exit_days: np.ndarray  # datetime64[D]
+    returns: np.ndarray  # 수익률 (0.05 = 5%)
+    bars: np.ndarray  # 보유 봉 수
+    reasons: np.ndarray  # EXIT_TIME / EXIT_STOP / EXIT_TARGET
+
+    def __len__(self) -> int:
+        return len(self.returns)
+
+    @classmethod
+    def empty(cls) -> "Trades":
+        return cls(
+            symbols=np.array([], dtype=object),
+            entry_days=np.array([], "datetime64[D]"),
+            exit_days=np.array([], "datetime64[D]"),
+            returns=np.array([]),
+            bars=np.array([], dtype=np.int64),
+            reasons=np.array([], dtype=np.int64),
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["Trades"]) -> "Trades":
+        if not parts:
+            return cls.empty()
+        return cls(*(np.concatenate([getattr(p, name) for p in parts]) for name in cls.__dataclass_fields__))
+
+
+@dataclass
+class BacktestStats:
+    """규칙 세트 하나의 성과 요약. 수익률 단위는 %입니다."""
+
+    rule_set: str
+    trades: int
+    hit_rate: Optional[float]
+    avg_return_pct: Optional[float]
+    median_return_pct: Optional[float]
+    avg_win_pct: Optional[float]
+    avg_loss_pct: Optional[float]
+    profit_factor: Optional[float]
+    avg_bars: Optional[float]
+    stop_rate: Optional[float]
+    target_rate: Optional[float]
+    total_return_pct: Optional[float]
+    max_drawdown_pct: Optional[float]
+
+
+def simulate(f: DailyFeatures, entries: np.ndarray, rule: ExitRule) -> Trades:
+    """진입 신호 행렬로 거래를 시뮬레이션합니다.
+
+    Args:
+        f: 지표 행렬
+        entries: (종목, 봉) 진입 신호 (신호 봉 종가 기준, 다음 봉 시가에 진입)
+        rule: 청산 규칙
+    """
+    width = f.shape[1]
+    hold = max(rule.hold_bars, 1)
+    # 다음 봉 시가가 있는 신호만 후보
+    candidates = entries.copy()
+    candidates[:, -1] = False
+    candidates[:, :-1] &= ~np.isnan(f.open[:, 1:])
+    rows, cols = np.nonzero(candidates)
+    if not len(rows):
+        return Trades.empty()
+
+    # 후보별 보유 구간 (진입 봉부터 hold봉). 데이터 범위를 벗어난 칸은 NaN
+    path_cols = cols[:, None] + 1 + np.arange(hold)[None, :]
+    inside = path_cols < width
+    path_cols = np.minimum(path_cols, width - 1)
+
+    def path(values: np.ndarray) -> np.ndarray:
+        return np.where(inside, values[rows[:, None], path_cols], np.nan)
+
+    opens, highs, lows, closes = path(f.open), path(f.high), path(f.low), path(f.close)
+    entry = opens[:, 0]
+
+    hit_stop = np.zeros(opens.shape, dtype=bool)
+    hit_target = np.zeros(opens.shape, dtype=bool)
+    stop = target = None
+    if rule.stop_loss_pct is not None:
+        stop = entry * (1.0 - rule.stop_loss_pct / 100.0)
+        hit_stop = lows <= stop[:, None]
+    if rule.take_profit_pct is not None:
+        target = entry * (1.0 + rule.take_profit_pct / 100.0)
+        hit_target = highs >= target[:, None]
+
+    hit = hit_stop | hit_target
+    touched = hit.any(axis=1)
+    first = np.where(touched, hit.argmax(axis=1), hold - 1)
+    picked = np.arange(len(rows))
+    stopped = touched & hit_stop[picked, first]
+    targeted = touched & ~stopped
+    first_open = opens[picked, first]
+    exit_price = closes[picked, first]
+    if stop is not None:
+        exit_price = np.where(stopped, np.minimum(first_open, stop), exit_price)
+    if target is not None:
+        exit_price = np.where(targeted, np.maximum(first_open, target), exit_price)
+
+    # 보유 기간이 데이터 끝을 넘는데 청산되지 않은 거래는 결과에서 제외
+    complete = (touched | inside[:, -1]) & ~np.isnan(exit_price) & (entry > 0)
+    exit_cols = cols + 1 + first
+
+    # 종목별 포지션 1개: 이전 거래의 청산 봉 이후의 신호만 진입 (청산 봉 종가 신호는 다음 봉에 진입 가능)
+    exit_at = np.full(f.shape, -1, dtype=np.int64)
+    exit_at[rows[complete], cols[complete]] = exit_cols[complete]
+    taken = np.zeros(f.shape, dtype=bool)
+    busy_until = np.full(f.shape[0], -1, dtype=np.int64)
+    for j in range(width - 1):
+        take = (exit_at[:, j] >= 0) & (j >= busy_until)
+        taken[:, j] = take
+        busy_until = np.where(take, exit_at[:, j], busy_until)
+    keep = complete & taken[rows, cols]
+
+    reasons = np.where(stopped, EXIT_STOP, np.where(targeted, EXIT_TARGET, EXIT_TIME))
+    rows, cols, exit_cols = rows[keep], cols[keep], exit_cols[keep]
+    return Trades(
+        symbols=np.asarray(f.symbols, dtype=object)[rows],
+        entry_days=f.dates(rows, cols + 1),
+        exit_days=f.dates(rows, exit_cols),
+        returns=exit_price[keep] / entry[keep] - 1.0,
+        bars=first[keep] + 1,
+        reasons=reasons[keep],
+    )
+
+
+def summarize(name: str, trades: Trades) -> BacktestStats:
+    """거래 목록의 성과 요약.
+
+    누적 수익률과 최대 낙폭은 청산일별로 그날 청산된 거래의 평균 수익률을 복리로 이은 자산 곡선 기준입니다.
+    (청산일마다 같은 금액을 그날 청산된 거래에 나눠 건 것과 같음)
+    """
+    if not len(trades):
+        return BacktestStats(name, 0, *([None] * 11))
+    returns = trades.returns
+    wins = returns[returns > 0]
+    losses = returns[returns <= 0]
+    gross_loss = -losses.sum()
+
+    exit_days, inverse = np.unique(trades.exit_days, return_inverse=True)
+    daily = np.bincount(inverse, weights=returns) / np.bincount(inverse)
+    equity = np.cumprod(1.0 + daily)
+    peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    drawdown = equity / peak - 1.0
+
+    def pct(value: float) -> float:
+        return float(value) * 100.0
+
+    return BacktestStats(
+        rule_set=name,
+        trades=len(trades),
+        hit_rate=len(wins) / len(returns),
+        avg_return_pct=pct(returns.mean()),
+        median_return_pct=pct(np.median(returns)),
+        avg_win_pct=pct(wins.mean()) if len(wins) else None,
+        avg_loss_pct=pct(losses.mean()) if len(losses) else None,
+        profit_factor=float(wins.sum() / gross_loss) if gross_loss > 0 else None,
+        avg_bars=float(trades.bars.mean()),
+        stop_rate=float(np.mean(trades.reasons == EXIT_STOP)),
+        target_rate=float(np.mean(trades.reasons == EXIT_TARGET)),
+        total_return_pct=pct(equity[-1] - 1.0),
+        max_drawdown_pct=pct(drawdown.min()),
+    )
+
+
+def backtest_features(f: DailyFeatures, rule_sets: Sequence[RuleSet], start: Optional[date] = None) -> Dict[str, Trades]:
+    """지표 행렬 하나에 여러 규칙 세트를 적용합니다.
+
+    Args:
+        f: 지표 행렬
+        rule_sets: 규칙 세트
+        start: 이 날짜 이전 신호는 무시 (지표 계산용 앞 구간)
+    """
+    in_range = ~np.isnan(f.day)
+    if start is not None:
+        in_range &= f.day >= (np.datetime64(start, "D") - np.datetime64("1970-01-01", "D")).astype(np.int64)
+    signals: Dict[str, np.ndarray] = {}
+    trades = {}
+    for rule_set in rule_sets:
+        if rule_set.entry not in signals:
+            signals[rule_set.entry] = ENTRY_RULES[rule_set.entry](f) & in_range
+        trades[rule_set.name] = simulate(f, signals[rule_set.entry], rule_set.exit)
+    return trades
+
+
+def _backtest_shard(path: str, rows: slice, rule_sets: Sequence[RuleSet], start: Optional[date]) -> Dict[str, Trades]:
+    """캐시된 패널의 행 범위 하나를 백테스트합니다. (작업 프로세스에서 실행)"""
+    panel = open_panel(path, rows)
+    return backtest_features(compute_daily_features(panel), rule_sets, start)
+
+
+def run_backtest(
+    rule_sets: Sequence[RuleSet] = DEFAULT_RULE_SETS,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    symbols: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    shard_size: int = 250,
+    cache_dir: Optional[str] = None,
+    refresh: bool = False,
+) -> List[BacktestStats]:
+    """저장된 일봉으로 규칙 세트들을 백테스트합니다.
+
+    Args:
+        rule_sets: 규칙 세트
+        start: 첫 신호일 (None이면 3년 전)
+        end: 마지막 거래일 (None이면 오늘)
+        symbols: 종목 목록 (None이면 활성 티커 전체)
+        workers: 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 실행)
+        shard_size: 프로세스 하나가 한 번에 처리할 종목 수 (클수록 메모리 사용량 증가)
+        cache_dir: 패널 캐시 디렉토리
+        refresh: 패널 캐시를 무시하고 DB에서 다시 읽을지 여부
+
+    Returns:
+        규칙 세트별 성과 요약 (rule_sets 순서)
+    """
+    for rule_set in rule_sets:
+        if rule_set.entry not in ENTRY_RULES:
+            raise ValueError(f"알 수 없는 진입 규칙: {rule_set.entry} (사용 가능: {', '.join(ENTRY_RULES)})")
+    end = end or date.today()
+    start = start or end - timedelta(days=365 * 3)
+    # 지표(365봉 고점, MA60, EMA 수렴)를 채우도록 start보다 넉넉히 앞부터 읽음
+    load_start = start - timedelta(days=WINDOW_BARS * 2)
+
+    started = time.perf_counter()
+    path = cached_panel_path(load_start, end, symbols=symbols, cache_dir=cache_dir, refresh=refresh)
+    total = open_panel(path).shape[0]
+    shards = [slice(i, min(i + shard_size, total)) for i in range(0, total, shard_size)]
+    workers = min(workers or os.cpu_count() or 1, max(len(shards), 1))
+
+    parts: Dict[str, List[Trades]] = {rule_set.name: [] for rule_set in rule_sets}
+    if workers <= 1:
+        for rows in shards:
+            for name, trades in _backtest_shard(path, rows, rule_sets, start).items():
+                parts[name].append(trades)
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(_backtest_shard, path, rows, rule_sets, start) for rows in shards]
+            for done, future in enumerate(as_completed(futures), start=1):
+                for name, trades in future.result().items():
+                    parts[name].append(trades)
+                logger.info("백테스트: 묶음 %d/%d", done, len(shards))
+
+    stats = [summarize(rule_set.name, Trades.concat(parts[rule_set.name])) for rule_set in rule_sets]
+    logger.info(
+        "백테스트 완료: %d종목, 규칙 %d개, %s ~ %s, %.1fs (프로세스 %d개)",
+        total,
+        len(rule_sets),
+        start,
+        end,
+        time.perf_counter() - started,
+        workers,
+    )
+    return stats
@@ -0,0 +1,230 @@
+"""캔들 저장 완료 이벤트 (NATS candles.updated).
+
+수집기는 캔들 UPSERT가 커밋될 때마다 (종목, 주기, 소스)별로 저장된 봉의 시각 범위를
+candles.updated subject로 발행합니다. 분석 워커(analytics_worker.py)는 이 이벤트를 받아
+바뀐 종목의 봉별 지표와 시그널만 다시 계산하므로, 데이터가 들어오면 수 초 안에 결과가 따라오고
+새 데이터가 없는 종목은 계산하지 않습니다.
+
+발행은 수집 스레드를 막지 않도록 별도 스레드의 이벤트 루프에서 처리하며,
+NATS에 연결할 수 없으면 이벤트를 버리고 캔들 저장은 그대로 진행합니다.
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from nats.aio.client import Client as NATS
+
+from .db import add_upsert_listener, remove_upsert_listener
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+# NATS subject
+CANDLES_UPDATED_SUBJECT = "candles.updated"
+ANALYTICS_QUEUE_GROUP = "analytics-workers"
+
+# 연결 실패 후 다시 연결을 시도하기까지 기다리는 시간 (초)
+RECONNECT_AFTER_SECONDS = 30.0
+
+EVENTS_PUBLISHED = counter(
+    "stock_crawler_candle_events_total",
+    "발행한 candles.updated 이벤트 수 (outcome: published/dropped)",
+    ("interval", "outcome"),
+)
+
+
+@dataclass
+class CandlesUpdated:
+    """(종목, 주기, 소스) 하나의 캔들 저장 결과."""
+
+    symbol: str
+    interval: str
+    source: str
+    start: str  # 저장된 첫 봉 시각 (ISO 8601)
+    end: str  # 저장된 마지막 봉 시각 (ISO 8601)
+    inserted: int = 0
+    updated: int = 0
+    indicators: bool = False  # 발행한 프로세스가 indicator_state/candle_features를 이미 갱신했는지 여부
+    published_at: float = 0.0  # 발행 시각 (time.time())
+
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromisoformat(self.start)
+
+    @property
+    def end_time(self) -> datetime:
+        return datetime.fromisoformat(self.end)
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(asdict(self)).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CandlesUpdated":
+        return cls(**json.loads(data))
+
+
+def candle_events_from_rows(rows: Iterable[tuple], indicators: bool = False) -> List[CandlesUpdated]:
+    """UPSERT 결과 행을 (종목, 주기, 소스)별 이벤트로 묶습니다.
+
+    Args:
+        rows: (symbol, interval, candle_time, high, low, close, volume, source, inserted) 행 목록 (db.UPSERT_CANDLES_SQL의 RETURNING)
+        indicators: 같은 UPSERT로 보조지표가 이미 갱신되었는지 여부
+    """
+    groups: Dict[Tuple[str, str, str], list] = {}
+    for symbol, interval, candle_time, _high, _low, _close, _volume, source, inserted in rows:
+        group = groups.setdefault((symbol, interval, source), [candle_time, candle_time, 0, 0])
+        group[0] = min(group[0], candle_time)
+        group[1] = max(group[1], candle_time)
+        group[2 if inserted else 3] += 1
+
+    now = time.time()
+    return [
+        CandlesUpdated(
+            symbol=symbol,
+            interval=interval,
+            source=source,
+            start=start.isoformat(),
+            end=end.isoformat(),
+            inserted=inserted,
+            updated=updated,
+            indicators=indicators,
+            published_at=now,
+        )
+        for (symbol, interval, source), (start, end, inserted, updated) in groups.items()
+    ]
+
+
+class CandleEventPublisher:
+    """캔들 UPSERT 결과를 candles.updated로 발행합니다.
+
+    add_upsert_listener(publisher.on_upsert)로 등록하면 수집기가 캔들을 저장할 때마다 호출됩니다.
+    """
+
+    def __init__(self, nats_url: str, indicators: bool = False, name: str = "candle-events"):
+        """
+        Args:
+            nats_url: NATS 서버 주소
+            indicators: 같은 프로세스에서 보조지표 엔진이 먼저 갱신하는지 여부 (이벤트에 표시)
+            name: NATS 연결 이름
+        """
+        self.nats_url = nats_url
+        self.indicators = indicators
+        self.name = name
+        self._nc: Optional[NATS] = None
+        self._last_attempt = 0.0
+        self._loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """발행 스레드를 시작하고 NATS에 연결합니다. 연결에 실패해도 다음 발행 때 다시 시도합니다."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop.run_forever, name="candle-events", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._ensure_connected(), self._loop).result()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """남은 이벤트를 내보내고 연결과 스레드를 정리합니다."""
+        if self._thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result(timeout)
+        except Exception:
+            logger.exception("candles.updated 연결 종료 실패")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def on_upsert(self, rows: Iterable[tuple]) -> None:
+        """UPSERT된 행을 이벤트로 묶어 발행을 예약합니다. (수집 스레드에서 호출, 기다리지 않음)"""
+        events = candle_events_from_rows(rows, self.indicators)
+        if events and self._thread is not None:
+            asyncio.run_coroutine_threadsafe(self._publish(events), self._loop)
+
+    async def _ensure_connected(self) -> bool:
+        if self._nc is not None and self._nc.is_connected:
+            return True
+        if self._last_attempt and time.monotonic() - self._last_attempt < RECONNECT_AFTER_SECONDS:
+            return False
+        self._last_attempt = time.monotonic()
+        nc = NATS()
+        try:
+            # 클라이언트 자체 재연결은 끄고(첫 연결도 서버당 두 번만 시도), 끊기면 다음 발행 때 새로 연결
+            await nc.connect(
+                self.nats_url,
+                name=self.name,
+                connect_timeout=5,
+                allow_reconnect=False,
+                max_reconnect_attempts=1,
+                error_cb=self._on_error,
+            )
+        except Exception as e:
+            logger.warning("candles.updated NATS 연결 실패 (%s) - %s", self.nats_url, e)
+            return False
+        self._nc = nc
+        self._last_attempt = 0.0
+        logger.info("candles.updated 발행 연결 완료 (%s)", self.nats_url)
+        return True
+
+    @staticmethod
+    async def _on_error(e: Exception) -> None:
+        logger.debug("candles.updated NATS 오류 - %s", e)
+
+    async def _publish(self, events: List[CandlesUpdated]) -> None:
+        connected = await self._ensure_connected()
+        for event in events:
+            outcome = "dropped"
+            if connected:
+                try:
+                    await self._nc.publish(CANDLES_UPDATED_SUBJECT, event.to_bytes())
+                    outcome = "published"
+                except Exception as e:
+                    logger.warning("[%s %s] candles.updated 발행 실패 - %s", event.symbol, event.interval, e)
+            EVENTS_PUBLISHED.labels(interval=event.interval, outcome=outcome).inc()
+
+    async def _drain(self) -> None:
+        if self._nc is not None and self._nc.is_connected:
+            await self._nc.drain()
+        self._nc = None
+
+
+_publisher: Optional[CandleEventPublisher] = None
+
+
+def enable_candle_events(publisher: Optional[CandleEventPublisher]) -> None:
+    """캔들 UPSERT마다 candles.updated 이벤트를 발행하도록 등록합니다.
+
+    enable_indicator_updates 다음에 호출하면 보조지표 갱신이 커밋된 뒤에 이벤트가 나갑니다.
+    프로세스가 끝날 때 남은 이벤트를 내보내고 연결을 닫습니다.
+
+    Args:
+        publisher: 이벤트 발행기 (None이면 아무것도 하지 않음, Settings.candle_event_publisher() 참고)
+    """
+    global _publisher
+    if publisher is None:
+        return
+    disable_candle_events()
+    publisher.start()
+    add_upsert_listener(publisher.on_upsert)
+    _publisher = publisher
+
+
+def disable_candle_events() -> None:
+    """등록된 이벤트 발행기를 해제하고 연결을 닫습니다."""
+    global _publisher
+    if _publisher is None:
+        return
+    remove_upsert_listener(_publisher.on_upsert)
+    _publisher.close()
+    _publisher = None
+
+
+atexit.register(disable_candle_events)
@@ -0,0 +1,66 @@
+"""분산 수집 작업 메시지.
+
+코디네이터는 (종목, 주기, 소스) 단위 작업을 collector.tasks.<source> subject로 발행하고,
+워커는 큐 그룹으로 작업을 나눠 받아 처리한 뒤 collector.results로 결과를 보고합니다.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+# NATS subject
+TASK_SUBJECT_PREFIX = "collector.tasks"
+RESULT_SUBJECT = "collector.results"
+WORKER_QUEUE_GROUP = "collector-workers"
+
+
+def task_subject(source: str) -> str:
+    """소스별 작업 subject를 반환합니다."""
+    return f"{TASK_SUBJECT_PREFIX}.{source}"
+
+
+@dataclass
+class CollectionTask:
+    """(종목, 주기, 소스) 단위 수집 작업."""
+
+    task_id: str
+    cycle_id: str
+    ticker_id: int
+    symbol: str
+    exchange: str
+    interval: str
+    source: str
+    days: int
+    attempt: int = 1
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(asdict(self)).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CollectionTask":
+        return cls(**json.loads(data))
+
+
+@dataclass
+class TaskResult:
+    """워커가 보고하는 작업 결과."""
+
+    task_id: str
+    cycle_id: str
+    symbol: str
+    interval: str
+    source: str
+    attempt: int
+    success: bool
+    records_saved: int = 0
+    latency: float = 0.0  # 조회에 걸린 시간 (초)
+    error_message: Optional[str] = None
+    worker: str = ""
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(asdict(self)).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TaskResult":
+        return cls(**json.loads(data))
@@ -0,0 +1,195 @@
+"""제공자별 다중 자격 증명 풀.
+
+키마다 토큰, 요청 속도 제한기, 상태(지연 시간/오류율)를 따로 두고
+요청을 키 사이에 분산합니다. 요청 한도 초과(429)나 인증 실패를 돌려준 키는
+일정 시간 순환에서 제외하고, 남은 키로 같은 요청을 다시 시도합니다.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, List, Optional, Set, TypeVar
+
+from .api_errors import (
+    AuthError,
+    NoCredentialAvailableError,
+    RateLimitedError,
+    TokenExpiredError,
+)
+from .http_transport import request_gate
+from .provider_health import ProviderHealth
+from .quota_ledger import QuotaLedger, quota_limits
+from .rate_limiter import RateLimiter
+from .run_metrics import timed_stage
+
+if TYPE_CHECKING:
+    from .providers import ProviderCapabilities
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class PooledCredential:
+    """풀에 속한 자격 증명 하나."""
+
+    key_id: str
+    client: object
+    limiter: RateLimiter
+    health: ProviderHealth = field(default_factory=ProviderHealth)
+    disabled_until: float = 0.0  # time.monotonic() 기준
+    disabled_reason: Optional[str] = None
+    in_flight: int = 0
+
+    def is_active(self, now: float) -> bool:
+        return now >= self.disabled_until
+
+
+class CredentialPool:
+    """자격 증명 풀. 요청마다 가장 여유 있는 키를 골라 실행합니다."""
+
+    def __init__(
+        self,
+        name: str,
+        clients: List[object],
+        capabilities: ProviderCapabilities,
+        rate_limit_cooldown: float = 60.0,
+        auth_cooldown: float = 3600.0,
+        ledger: Optional[QuotaLedger] = None,
+    ):
+        """
+        Args:
+            name: 제공자 이름 (쿼터 장부 키 접두사)
+            clients: API 클라이언트 목록 (key_id 속성이 있으면 식별자로 사용)
+            capabilities: 키 하나의 요청 한도
+            rate_limit_cooldown: 요청 한도 초과 시 순환에서 제외할 시간 (초, Retry-After가 없을 때)
+            auth_cooldown: 인증 실패 시 순환에서 제외할 시간 (초)
+            ledger: 여러 노드가 공유하는 쿼터 장부 (키별 한도 적용)
+        """
+        if not clients:
+            raise ValueError(f"{name}: 자격 증명이 없습니다.")
+        self.name = name
+        self.capabilities = capabilities
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.auth_cooldown = auth_cooldown
+        self.ledger = ledger
+        self._quota_limits = quota_limits(capabilities)
+        self.credentials = [
+            PooledCredential(
+                key_id=getattr(client, "key_id", f"#{i}"),
+                client=client,
+                limiter=RateLimiter(
+                    requests_per_second=capabilities.requests_per_second,
+                    requests_per_hour=capabilities.requests_per_hour,
+                ),
+            )
+            for i, client in enumerate(clients)
+        ]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    def active_count(self) -> int:
+        """현재 순환 중인 키 수."""
+        now = time.monotonic()
+        return sum(1 for c in self.credentials if c.is_active(now))
+
+    def _pick(self, exclude: Set[str]) -> PooledCredential:
+        """순환 중인 키 중 진행 중인 요청이 가장 적고 쿼터가 많이 남은 키를 고릅니다."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [c for c in self.credentials if c.is_active(now) and c.key_id not in exclude]
+            if not candidates:
+                raise NoCredentialAvailableError(f"{self.name}: 사용 가능한 자격 증명이 없습니다.")
+
+            def load(c: PooledCredential):
+                remaining = c.limiter.remaining_this_hour()
+                return (c.in_flight, -(math.inf if remaining is None else remaining), c.health.error_rate)
+
+            credential = min(candidates, key=load)
+            credential.in_flight += 1
+            return credential
+
+    def _disable(self, credential: PooledCredential, seconds: float, reason: str) -> None:
+        with self._lock:
+            credential.disabled_until = time.monotonic() + seconds
+            credential.disabled_reason = reason
+        logger.warning(
+            "[%s] 자격 증명 %s 순환 제외 (%.0f초, 남은 키: %d개) - %s",
+            self.name,
+            credential.key_id,
+            seconds,
+            self.active_count(),
+            reason,
+        )
+
+    @staticmethod
+    def _record_failure(credential: PooledCredential, started: float) -> None:
+        credential.health.record(max(0.0, time.monotonic() - started), success=False)
+
+    def remaining_this_hour(self) -> Optional[int]:
+        """순환 중인 키들의 이번 시간 남은 요청 수 합계. 시간당 제한이 없으면 None."""
+        now = time.monotonic()
+        remaining = [c.limiter.remaining_this_hour() for c in self.credentials if c.is_active(now)]
+        if any(r is None for r in remaining):
+            return None
+        return sum(remaining)
+
+    def _charge(self, credential: PooledCredential, waited: List[float]) -> None:
+        """키의 요청 속도 제한과 전역 쿼터에서 요청 1건을 차감하고 대기 시간을 waited에 더합니다. (HTTP 요청마다 호출)"""
+        started = time.monotonic()
+        with timed_stage("wait"):
+            credential.limiter.acquire()
+            if self.ledger is not None:
+                self.ledger.acquire(f"{self.name}:{credential.key_id}", self._quota_limits)
+        waited[0] += time.monotonic() - started
+
+    def run(self, call: Callable[[object], T]) -> T:
+        """키 하나를 골라 call(client)을 실행합니다.
+
+        call 안에서 보내는 HTTP 요청마다 그 키의 속도 제한과 전역 쿼터를 차감하므로
+        페이지 연속 조회처럼 여러 번 요청하는 호출도 실제 요청 수만큼 한도를 씁니다.
+        요청 한도 초과나 인증 실패가 나면 해당 키를 제외하고 다른 키로 다시 시도하며,
+        토큰 만료는 같은 키로 한 번 더 시도합니다.
+
+        Raises:
+            NoCredentialAvailableError: 시도할 키가 남지 않았을 때
+        """
+        tried: Set[str] = set()
+        refreshed: Set[str] = set()
+        while True:
+            credential = self._pick(tried)
+            started = time.monotonic()
+            # 키 상태의 지연 시간에는 한도 대기 시간을 넣지 않음
+            waited = [0.0]
+            try:
+                with request_gate(lambda: self._charge(credential, waited)):
+                    result = call(credential.client)
+                credential.health.record(time.monotonic() - started - waited[0], success=True)
+                return result
+            except TokenExpiredError as e:
+                self._record_failure(credential, started + waited[0])
+                if credential.key_id in refreshed:
+                    self._disable(credential, self.auth_cooldown, str(e))
+                    tried.add(credential.key_id)
+                else:
+                    refreshed.add(credential.key_id)
+            except RateLimitedError as e:
+                self._record_failure(credential, started + waited[0])
+                self._disable(credential, e.retry_after or self.rate_limit_cooldown, str(e))
+                tried.add(credential.key_id)
+            except AuthError as e:
+                self._record_failure(credential, started + waited[0])
+                self._disable(credential, self.auth_cooldown, str(e))
+                tried.add(credential.key_id)
+            except Exception:
+                self._record_failure(credential, started + waited[0])
+                raise
+            finally:
+                with self._lock:
+                    credential.in_flight -= 1
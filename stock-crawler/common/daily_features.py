@@ -0,0 +1,201 @@
+"""일봉 패널의 거래일별 지표 행렬.
+
+종목별 봉을 오른쪽으로 모은 (종목, 봉) 행렬에 이동 윈도우를 적용해 모든 거래일의 지표를 한 번에 계산합니다.
+열 j는 '종목마다 j번째 봉'이므로 윈도우는 달력이 아니라 봉 기준이고, 봉이 모자란 구간은 NaN입니다.
+시그널 이력, 백테스트, 파라미터 탐색이 같은 지표를 공유합니다.
+
+    - 이동 평균: 누적합 차이
+    - 고점/저점: sliding_window_view (복사 없는 윈도우 뷰)
+    - EMA, Wilder RSI: 봉 축으로 반복하되 종목 축은 벡터 연산
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .daily_panel import DailyPanel
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+# 대시보드 분석 구간 (최근 365봉)과 2주 고점 구간
+WINDOW_BARS = 365
+HIGH_2W_BARS = 14
+
+
+def rolling_mean(values: np.ndarray, bars: int) -> np.ndarray:
+    """봉 축 이동 평균. 구간에 NaN(봉 부족)이 있으면 NaN."""
+    filled = np.nan_to_num(values)
+    sums = np.cumsum(filled, axis=1)
+    sums = np.concatenate([np.zeros((values.shape[0], 1)), sums], axis=1)
+    counts = np.cumsum(~np.isnan(values), axis=1)
+    counts = np.concatenate([np.zeros((values.shape[0], 1), dtype=counts.dtype), counts], axis=1)
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] >= bars:
+        window_sum = sums[:, bars:] - sums[:, :-bars]
+        window_count = counts[:, bars:] - counts[:, :-bars]
+        result[:, bars - 1:] = np.where(window_count == bars, window_sum / bars, np.nan)
+    return result
+
+
+def windows(values: np.ndarray, bars: int, fill: float) -> np.ndarray:
+    """각 봉에서 끝나는 길이 bars의 윈도우 뷰 (S, T, bars). 앞쪽 부족분과 NaN은 fill."""
+    padded = np.concatenate([np.full((values.shape[0], bars - 1), fill), np.where(np.isnan(values), fill, values)], axis=1)
+    return sliding_window_view(padded, bars, axis=1)
+
+
+def shift(values: np.ndarray, bars: int) -> np.ndarray:
+    """봉 축으로 bars만큼 뒤로 민 배열 (앞쪽은 NaN). 음수면 앞으로 당김."""
+    result = np.full(values.shape, np.nan)
+    if bars > 0:
+        result[:, bars:] = values[:, :-bars]
+    elif bars < 0:
+        result[:, :bars] = values[:, -bars:]
+    else:
+        result[:] = values
+    return result
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """종목별 첫 값으로 시작하는 EMA (대시보드 calculateEMA와 같음)."""
+    k = 2.0 / (period + 1)
+    result = np.full(values.shape, np.nan)
+    current = np.full(values.shape[0], np.nan)
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        current = np.where(np.isnan(current), column, current + k * (column - current))
+        result[:, j] = current
+    return result
+
+
+def wilder_rsi(close: np.ndarray, position: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI (대시보드 calculateRSI와 같음: 손실이 없으면 RS=100, RSI가 0이면 50으로 읽음)."""
+    result = np.full(close.shape, np.nan)
+    avg_gain = np.zeros(close.shape[0])
+    avg_loss = np.zeros(close.shape[0])
+    for j in range(1, close.shape[1]):
+        change = close[:, j] - close[:, j - 1]
+        gain = np.where(change > 0, change, 0.0)
+        loss = np.where(change < 0, -change, 0.0)
+        pos = position[:, j]
+        warmup = (pos >= 1) & (pos <= period)
+        avg_gain = np.where(warmup, avg_gain + gain, avg_gain)
+        avg_loss = np.where(warmup, avg_loss + loss, avg_loss)
+        first = pos == period
+        avg_gain = np.where(first, avg_gain / period, avg_gain)
+        avg_loss = np.where(first, avg_loss / period, avg_loss)
+        smooth = pos > period
+        avg_gain = np.where(smooth, (avg_gain * (period - 1) + gain) / period, avg_gain)
+        avg_loss = np.where(smooth, (avg_loss * (period - 1) + loss) / period, avg_loss)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = np.where(avg_loss == 0, 100.0, avg_gain / avg_loss)
+        rsi = 100.0 - 100.0 / (1.0 + rs)
+        result[:, j] = np.where(pos >= period, np.where(rsi == 0, 50.0, rsi), np.nan)
+    return result
+
+
+def rolling_high(high: np.ndarray, bars: int, latest: bool = False):
+    """최근 bars봉 고점과 고점 이후 지난 봉 수.
+
+    Args:
+        latest: 같은 고점이 여러 번이면 가장 최근 봉 기준 (False면 가장 이른 봉)
+
+    Returns:
+        (고점, 고점 이후 봉 수) 행렬
+    """
+    view = windows(high, bars, -np.inf)
+    back = view[:, :, ::-1].argmax(axis=2) if latest else bars - 1 - view.argmax(axis=2)
+    peak = view.max(axis=2)
+    return np.where(np.isinf(peak), np.nan, peak), back
+
+
+def value_back(values: np.ndarray, back: np.ndarray) -> np.ndarray:
+    """각 봉에서 back봉 전의 값 (범위를 벗어나면 NaN)."""
+    source = np.arange(values.shape[1])[None, :] - back
+    picked = np.take_along_axis(values, np.clip(source, 0, values.shape[1] - 1), axis=1)
+    return np.where(source >= 0, picked, np.nan)
+
+
+@dataclass
+class DailyFeatures:
+    """(종목, 봉) 지표 행렬. 모든 행렬의 shape은 (len(symbols), 봉 수)이고 마지막 열이 종목별 최신 봉입니다."""
+
+    symbols: List[str]
+    day: np.ndarray  # 거래일 (1970-01-01부터 일수, 봉이 없으면 NaN)
+    position: np.ndarray  # 종목별 봉 순번 (0부터, 봉이 없으면 -1)
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    ma20: np.ndarray
+    ma60: np.ndarray
+    rsi14: np.ndarray
+    macd_hist: np.ndarray
+    macd_hist_prev: np.ndarray
+    bb_upper: np.ndarray
+    bb_lower: np.ndarray
+    volume_ratio: np.ndarray  # 5일 평균 / 20일 평균 (20일 평균이 0이면 0)
+    high_2w: np.ndarray  # 최근 14봉 고점 (같으면 최근 봉)
+    days_since_high_2w: np.ndarray  # 2주 고점 이후 달력 일수
+    low_5d: np.ndarray  # 최근 5봉 최저가
+    consolidation_rate: np.ndarray  # 최근 5봉 (최고가 - 최저가) / 최저가 × 100 (최저가가 0 이하이면 0)
+    high_52w: np.ndarray  # 최근 365봉 고점 (대시보드 분석 구간)
+
+    @property
+    def shape(self) -> tuple:
+        return self.close.shape
+
+    def dates(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """(행, 열) 위치의 거래일 (datetime64[D])."""
+        return _EPOCH + self.day[rows, cols].astype(np.int64).astype("timedelta64[D]")
+
+
+def compute_daily_features(panel: DailyPanel) -> DailyFeatures:
+    """패널의 모든 (종목, 봉)에 대해 지표를 계산합니다."""
+    day_number = (panel.days - _EPOCH).astype(np.int64).astype(float)
+    high, low, open_, close, volume, day = panel.right_aligned(
+        "high", "low", "open", "close", "volume", np.broadcast_to(day_number, panel.shape)
+    )
+    position = np.cumsum(~np.isnan(close), axis=1) - 1
+
+    ma20 = rolling_mean(close, 20)
+    high_2w, back = rolling_high(high, HIGH_2W_BARS, latest=True)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_vol20 = rolling_mean(volume, 20)
+        volume_ratio = np.where(avg_vol20 > 0, rolling_mean(volume, 5) / avg_vol20, 0.0)
+        max_high5 = windows(high, 5, -np.inf).max(axis=2)
+        min_low5 = windows(low, 5, np.inf).min(axis=2)
+        consolidation_rate = np.where(min_low5 > 0, (max_high5 - min_low5) / min_low5 * 100.0, 0.0)
+
+    macd = ema(close, 12) - ema(close, 26)
+    macd = np.where(position >= 25, macd, np.nan)
+    macd_hist = np.where(position >= 25 + 8, macd - ema(macd, 9), np.nan)
+    deviation = 2.0 * windows(close, 20, np.nan).std(axis=2)
+
+    return DailyFeatures(
+        symbols=list(panel.symbols),
+        day=day,
+        position=position,
+        open=open_,
+        high=high,
+        low=low,
+        close=close,
+        volume=volume,
+        ma20=ma20,
+        ma60=rolling_mean(close, 60),
+        rsi14=wilder_rsi(close, position),
+        macd_hist=macd_hist,
+        macd_hist_prev=shift(macd_hist, 1),
+        bb_upper=ma20 + deviation,
+        bb_lower=ma20 - deviation,
+        volume_ratio=volume_ratio,
+        high_2w=high_2w,
+        days_since_high_2w=day - value_back(day, back),
+        low_5d=np.where(np.isinf(min_low5), np.nan, min_low5),
+        consolidation_rate=consolidation_rate,
+        high_52w=windows(high, WINDOW_BARS, -np.inf).max(axis=2),
+    )
@@ -0,0 +1,166 @@
+"""일봉 패널 (종목 × 거래일 행렬).
+
+활성 티커 전체의 일봉을 한 번의 쿼리로 읽어 종목 × 거래일 2차원 배열로 만듭니다.
+같은 날짜에 여러 소스의 봉이 있으면 SOURCE_PRIORITY 순서로 하나만 사용합니다.
+봉이 없는 칸(상장 전, 수집 누락)은 NaN입니다.
+
+쿼리는 종목별로 배열을 묶어(array_agg) 반환하므로 행 수가 종목 수와 같고,
+psycopg2가 float8[]/int[]를 C에서 변환해 수천 종목도 수 초 안에 읽습니다.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# 같은 날짜에 여러 소스가 있으면 앞쪽 소스를 사용
+SOURCE_PRIORITY = ("kis", "tiingo", "yf")
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+@dataclass
+class DailyPanel:
+    """종목 × 거래일 일봉 배열. 값 배열의 shape은 (len(symbols), len(days))입니다."""
+
+    symbols: List[str]
+    days: np.ndarray  # datetime64[D], 오름차순
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def shape(self) -> tuple:
+        return self.close.shape
+
+    def index_of(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def last_days(self) -> np.ndarray:
+        """종목별 마지막 봉 날짜 (봉이 없으면 NaT)."""
+        valid = ~np.isnan(self.close)
+        last = self.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        days = self.days[np.minimum(last, len(self.days) - 1)] if len(self.days) else np.array([], "datetime64[D]")
+        return np.where(valid.any(axis=1), days, np.datetime64("NaT"))
+
+    def right_aligned(self, *fields: Union[str, np.ndarray]) -> List[np.ndarray]:
+        """종목별 유효한 봉을 오른쪽으로 모은 배열들을 반환합니다.
+
+        수집 누락일을 건너뛰고 종목마다 '최근 N개 봉'을 같은 열 범위로 다루기 위해 사용합니다.
+        마지막 열이 각 종목의 최신 봉이고, 봉이 모자라는 왼쪽은 NaN입니다.
+
+        Args:
+            fields: 필드 이름("close" 등) 또는 패널과 같은 shape의 배열
+        """
+        valid = ~np.isnan(self.close)
+        # NaN 칸을 앞으로, 유효한 칸은 순서를 유지한 채 뒤로 (안정 정렬)
+        order = np.argsort(valid, axis=1, kind="stable")
+        aligned = []
+        for field in fields:
+            values = getattr(self, field) if isinstance(field, str) else field
+            aligned.append(np.where(np.take_along_axis(valid, order, axis=1), np.take_along_axis(values, order, axis=1), np.nan))
+        return aligned
+
+
+def panel_from_series(series: Dict[str, Dict[str, np.ndarray]]) -> DailyPanel:
+    """종목별 시계열로 패널을 만듭니다.
+
+    Args:
+        series: {종목: {"days": datetime64[D] 배열, "open"/"high"/"low"/"close"/"volume": 배열}}
+    """
+    symbols = sorted(series)
+    if not symbols:
+        empty = np.empty((0, 0))
+        return DailyPanel([], np.array([], "datetime64[D]"), empty, empty, empty, empty, empty)
+    days = np.unique(np.concatenate([np.asarray(series[s]["days"], "datetime64[D]") for s in symbols]))
+    fields = {name: np.full((len(symbols), len(days)), np.nan) for name in ("open", "high", "low", "close", "volume")}
+    for row, symbol in enumerate(symbols):
+        columns = np.searchsorted(days, np.asarray(series[symbol]["days"], "datetime64[D]"))
+        for name, values in fields.items():
+            values[row, columns] = series[symbol][name]
+    return DailyPanel(symbols=symbols, days=days, **fields)
+
+
+def load_daily_panel(
+    lookback_days: int = 400,
+    symbols: Optional[Sequence[str]] = None,
+    end: Optional[date] = None,
+    source_priority: Sequence[str] = SOURCE_PRIORITY,
+    start: Optional[date] = None,
+) -> DailyPanel:
+    """일봉 패널을 한 번의 쿼리로 읽습니다.
+
+    Args:
+        lookback_days: 조회 기간 (달력 일수, end 기준)
+        symbols: 종목 목록 (None이면 활성 티커 전체)
+        end: 마지막 날짜 (None이면 오늘까지)
+        source_priority: 같은 날짜에 여러 소스가 있을 때 우선순위
+        start: 시작 날짜 (지정하면 lookback_days 대신 사용)
+
+    Returns:
+        종목 × 거래일 패널
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=lookback_days)
+    if symbols is None:
+        symbol_filter = "c.symbol IN (SELECT symbol FROM managed_tickers WHERE is_active = TRUE)"
+        params: tuple = ()
+    else:
+        symbol_filter = "c.symbol = ANY(%s)"
+        params = ([s.upper() for s in symbols],)
+
+    query = f"""
+        WITH daily AS (
+            SELECT DISTINCT ON (c.symbol, c.candle_time::date)
+                c.symbol,
+                c.candle_time::date AS day,
+                c.open_price::float8 AS open,
+                c.high_price::float8 AS high,
+                c.low_price::float8 AS low,
+                c.close_price::float8 AS close,
+                c.volume::float8 AS volume
+            FROM us_stock_candles c
+            WHERE c.interval = 'daily'
+              AND c.candle_time >= %s AND c.candle_time < %s::date + 1
+              AND {symbol_filter}
+            ORDER BY c.symbol, c.candle_time::date, array_position(%s::text[], c.source), c.candle_time DESC
+        )
+        SELECT
+            symbol,
+            array_agg(day - DATE '1970-01-01' ORDER BY day),
+            array_agg(open ORDER BY day),
+            array_agg(high ORDER BY day),
+            array_agg(low ORDER BY day),
+            array_agg(close ORDER BY day),
+            array_agg(volume ORDER BY day)
+        FROM daily
+        GROUP BY symbol
+    """
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, (start, end) + params + (list(source_priority),))
+            rows = cursor.fetchall()
+
+    series = {
+        row[0]: {
+            "days": _EPOCH + np.asarray(row[1], dtype="timedelta64[D]"),
+            "open": row[2],
+            "high": row[3],
+            "low": row[4],
+            "close": row[5],
+            "volume": row[6],
+        }
+        for row in rows
+    }
+    panel = panel_from_series(series)
+    logger.info("일봉 패널 로드: %d종목 × %d거래일 (%s ~ %s)", panel.shape[0], panel.shape[1], start, end)
+    return panel
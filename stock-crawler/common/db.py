@@ -2,18 +2,57 @@
 from __future__ import annotations
 
 import logging
+import time
 from contextlib import contextmanager
-from typing import Iterable, List, Optional
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extensions import connection
+from psycopg2.extras import execute_values
+
+from .metrics import counter, gauge, histogram
+from .run_metrics import record_upserts, timed
 
 logger = logging.getLogger(__name__)
 
+DB_POOL_WAIT_SECONDS = histogram(
+    "stock_crawler_db_pool_wait_seconds",
+    "커넥션 풀에서 커넥션을 얻기까지 걸린 시간 (초)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+DB_POOL_IN_USE = gauge("stock_crawler_db_pool_connections_in_use", "사용 중인 풀 커넥션 수")
+UPSERT_ROWS = counter(
+    "stock_crawler_candle_upsert_rows_total",
+    "UPSERT한 캔들 행 수 (outcome: inserted/updated)",
+    ("interval", "source", "outcome"),
+)
+UPSERT_SECONDS = histogram("stock_crawler_candle_upsert_seconds", "캔들 UPSERT 한 번의 소요 시간 (초)")
+
 # 전역 커넥션 풀
 _pool: Optional[pool.ThreadedConnectionPool] = None
 
+# 전역 쓰기 버퍼 (설정 시 캔들 저장이 버퍼를 거쳐 일괄 처리됨)
+_write_buffer = None
+
+# UPSERT 직후 저장된 행을 받는 함수 (예: 보조지표 증분 갱신)
+_upsert_listeners: List[Callable[[List[tuple]], None]] = []
+
+# 캔들 레코드 컬럼 순서: (symbol, interval, candle_time, open, high, low, close, volume, source)
+UPSERT_CANDLES_SQL = """
+    INSERT INTO us_stock_candles (symbol, interval, candle_time, open_price, high_price, low_price, close_price, volume, source)
+    VALUES %s
+    ON CONFLICT ON CONSTRAINT uq_us_stock_candles DO UPDATE SET
+        open_price = EXCLUDED.open_price,
+        high_price = EXCLUDED.high_price,
+        low_price = EXCLUDED.low_price,
+        close_price = EXCLUDED.close_price,
+        volume = EXCLUDED.volume
+    RETURNING symbol, interval, candle_time, high_price::float8, low_price::float8, close_price::float8, volume::float8,
+              source, (xmax = 0) AS inserted
+"""
+
 
 def init_pool(dsn: str, minconn: int = 1, maxconn: int = 10) -> pool.ThreadedConnectionPool:
     """커넥션 풀을 초기화합니다."""
@@ -43,10 +82,14 @@ def close_pool() -> None:
 @contextmanager
 def get_connection():
     """풀에서 커넥션을 가져오는 컨텍스트 매니저."""
+    started = time.perf_counter()
     conn = get_pool().getconn()
+    DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+    DB_POOL_IN_USE.inc()
     try:
         yield conn
     finally:
+        DB_POOL_IN_USE.dec()
         get_pool().putconn(conn)
 
 
@@ -123,20 +166,96 @@ def ensure_us_stock_candles_table() -> None:
     logger.info("us_stock_candles 테이블을 확인했습니다.")
 
 
-def save_us_stock_candles(symbol: str, interval: str, candles: List[dict], source: str = "kis") -> int:
-    """미국주식 캔들 데이터를 저장합니다.
+def set_write_buffer(write_buffer) -> None:
+    """캔들 저장에 사용할 전역 쓰기 버퍼를 설정합니다. None이면 즉시 저장합니다."""
+    global _write_buffer
+    _write_buffer = write_buffer
+
+
+def add_upsert_listener(listener: Callable[[List[tuple]], None]) -> None:
+    """캔들 UPSERT가 커밋될 때마다 호출할 함수를 추가합니다. 등록한 순서대로 호출됩니다.
 
     Args:
-        symbol: 종목 코드 (예: AAPL)
-        interval: 주기 (예: '60m', '1d')
-        candles: API 응답 데이터 리스트
-        source: 데이터 소스 ('kis': 한국투자증권, 'yf': yfinance)
+        listener: (symbol, interval, candle_time, high, low, close, volume, source, inserted) 행 목록을 받는 함수.
+            candle_time과 가격은 DB에 저장된 값(타임존, 소수점 4자리)입니다.
     """
-    if not candles:
+    if listener not in _upsert_listeners:
+        _upsert_listeners.append(listener)
+
+
+def remove_upsert_listener(listener: Callable[[List[tuple]], None]) -> None:
+    """add_upsert_listener로 등록한 함수를 해제합니다."""
+    if listener in _upsert_listeners:
+        _upsert_listeners.remove(listener)
+
+
+def upsert_candle_records_counted(records: List[tuple]) -> Dict[Tuple[str, str], List[int]]:
+    """캔들 레코드를 한 번의 다중 VALUES 문으로 UPSERT하고 결과를 집계합니다.
+
+    같은 키(symbol, interval, candle_time, source)가 중복되면 마지막 값만 사용합니다.
+
+    Returns:
+        {(interval, source): [신규 건수, 갱신 건수]}
+    """
+    counts: Dict[Tuple[str, str], List[int]] = {}
+    if not records:
+        return counts
+
+    unique = {(r[0], r[1], r[2], r[8]): r for r in records}
+    with UPSERT_SECONDS.time():
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                rows = execute_values(cursor, UPSERT_CANDLES_SQL, list(unique.values()), page_size=1000, fetch=True)
+                conn.commit()
+    for _symbol, interval, _candle_time, _high, _low, _close, _volume, source, inserted in rows:
+        outcome = counts.setdefault((interval, source), [0, 0])
+        outcome[0 if inserted else 1] += 1
+    for (interval, source), (inserted, updated) in counts.items():
+        UPSERT_ROWS.labels(interval=interval, source=source, outcome="inserted").inc(inserted)
+        UPSERT_ROWS.labels(interval=interval, source=source, outcome="updated").inc(updated)
+
+    for listener in list(_upsert_listeners):
+        # 후속 처리 실패가 캔들 저장 결과나 다른 후속 처리에 영향을 주지 않도록 함
+        try:
+            listener(rows)
+        except Exception:
+            logger.exception("캔들 UPSERT 후속 처리 실패")
+    return counts
+
+
+def upsert_candle_records(records: List[tuple]) -> int:
+    """캔들 레코드를 UPSERT하고 저장 건수를 반환합니다. 신규/갱신 건수는 수집 측정값에 기록합니다."""
+    counts = upsert_candle_records_counted(records)
+    inserted = sum(c[0] for c in counts.values())
+    updated = sum(c[1] for c in counts.values())
+    record_upserts(inserted, updated)
+    return inserted + updated
+
+
+def write_candle_records(records: List[tuple], on_saved: Optional[Callable[[], None]] = None) -> int:
+    """캔들 레코드를 저장합니다. 쓰기 버퍼가 설정되어 있으면 버퍼에 적재합니다.
+
+    Args:
+        records: 저장할 캔들 레코드
+        on_saved: 레코드가 DB에 저장된 뒤 호출할 함수. 버퍼에 적재한 경우 flush 후에 호출됩니다
+
+    Returns:
+        지금 저장한 건수. 쓰기 버퍼에 적재한 경우 0 (아직 저장되지 않음)
+    """
+    if not records:
         return 0
+    if _write_buffer is not None:
+        _write_buffer.add(records, on_saved)
+        return 0
+    saved = upsert_candle_records(records)
+    if on_saved is not None:
+        on_saved()
+    return saved
 
-    from datetime import datetime
 
+@timed("parse")
+def kis_candles_to_records(symbol: str, interval: str, candles: List[dict], source: str = "kis") -> List[tuple]:
+    """KIS API 캔들 응답을 저장용 레코드로 변환합니다."""
     records = []
     for item in candles:
         try:
@@ -161,25 +280,56 @@ def save_us_stock_candles(symbol: str, interval: str, candles: List[dict], sourc
             logger.warning("캔들 데이터 파싱 실패: %s", e)
             continue
 
+    return records
+
+
+def save_us_stock_candles(symbol: str, interval: str, candles: List[dict], source: str = "kis") -> int:
+    """미국주식 캔들 데이터를 저장합니다.
+
+    Args:
+        symbol: 종목 코드 (예: AAPL)
+        interval: 주기 (예: '60m', '1d')
+        candles: API 응답 데이터 리스트
+        source: 데이터 소스 ('kis': 한국투자증권, 'yf': yfinance)
+
+    Returns:
+        저장된 레코드 수. 쓰기 버퍼에 적재한 경우 0 (write_candle_records 참고)
+    """
+    if not candles:
+        return 0
+
+    records = kis_candles_to_records(symbol, interval, candles, source)
     if not records:
         return 0
 
-    with get_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.executemany(
-                """
-                INSERT INTO us_stock_candles (symbol, interval, candle_time, open_price, high_price, low_price, close_price, volume, source)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT ON CONSTRAINT uq_us_stock_candles DO UPDATE SET
-                    open_price = EXCLUDED.open_price,
-                    high_price = EXCLUDED.high_price,
-                    low_price = EXCLUDED.low_price,
-                    close_price = EXCLUDED.close_price,
-                    volume = EXCLUDED.volume;
-                """,
-                records,
-            )
-            conn.commit()
+    saved = write_candle_records(records)
+    if saved:
+        logger.info("%s: %d건의 %s 데이터를 저장했습니다. (source=%s)", symbol, saved, interval, source)
+    else:
+        logger.info(
+            "%s: %d건의 %s 데이터를 쓰기 버퍼에 적재했습니다. (source=%s)",
+            symbol,
+            len(records),
+            interval,
+            source,
+        )
+    return saved
+
+
+def get_latest_candle_times(interval: str, source: Optional[str] = None) -> Dict[str, datetime]:
+    """종목별 가장 최근 캔들 시각을 조회합니다.
 
-    logger.info("%s: %d건의 %s 데이터를 저장했습니다. (source=%s)", symbol, len(records), interval, source)
-    return len(records)
+    Args:
+        interval: 주기 ('60m' 또는 'daily')
+        source: 데이터 소스 (None이면 모든 소스 중 최신)
+
+    Returns:
+        {종목 코드: 최근 캔들 시각}
+    """
+    query = "SELECT symbol, MAX(candle_time) FROM us_stock_candles WHERE interval = %s"
+    params: tuple = (interval,)
+    if source is not None:
+        query += " AND source = %s"
+        params += (source,)
+    query += " GROUP BY symbol"
+    return {symbol: candle_time for symbol, candle_time in execute_query(query, params)}
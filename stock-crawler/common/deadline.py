@@ -0,0 +1,84 @@
+"""작업 예산에서 내려오는 요청 마감 시간.
+
+수집 작업은 시작할 때 예산(예: 다음 실행까지 남은 시간)으로 Deadline을 만들고
+deadline_scope()로 현재 컨텍스트에 설정합니다. API 클라이언트는 고정 타임아웃 대신
+request_timeout()으로 남은 시간을 넘지 않는 타임아웃을 쓰고, 속도 제한 대기도
+마감 시간을 넘기지 않습니다. 마감 시간이 지나면 DeadlineExceededError로 남은 요청을 중단합니다.
+
+컨텍스트 변수는 스레드 풀로 자동 전달되지 않으므로 submit_in_context()로 제출합니다.
+"""
+from __future__ import annotations
+
+import contextvars
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+
+class DeadlineExceededError(TimeoutError):
+    """작업 예산을 모두 사용함."""
+
+
+class Deadline:
+    """time.monotonic() 기준 마감 시각."""
+
+    def __init__(self, budget_seconds: float):
+        """
+        Args:
+            budget_seconds: 지금부터 사용할 수 있는 시간 (초)
+        """
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    def remaining(self) -> float:
+        """남은 시간 (초, 0 이상)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """마감 시간이 지났으면 DeadlineExceededError를 발생시킵니다."""
+        if self.expired:
+            raise DeadlineExceededError(f"작업 예산 {self.budget_seconds:.0f}초를 모두 사용했습니다.")
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """현재 컨텍스트의 마감 시간 (없으면 None)."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """블록 안에서 마감 시간을 설정합니다. 바깥 마감 시간이 더 이르면 바깥 것을 유지합니다."""
+    outer = _current.get()
+    if deadline is None or (outer is not None and outer.expires_at <= deadline.expires_at):
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def request_timeout(default: float) -> float:
+    """요청 타임아웃 (초). 마감 시간이 있으면 남은 시간을 넘지 않습니다.
+
+    Raises:
+        DeadlineExceededError: 마감 시간이 이미 지났을 때
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    deadline.check()
+    return min(default, deadline.remaining())
+
+
+def submit_in_context(executor: Executor, fn: Callable, *args, **kwargs) -> Future:
+    """현재 컨텍스트(마감 시간 포함)를 복사해 스레드 풀에 제출합니다."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
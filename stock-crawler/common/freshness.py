@@ -0,0 +1,80 @@
+"""신선도 SLA 기반 수집 대상 선정.
+
+정기 수집 주기마다 전체 티커를 한 번에 조회하는 대신, 짧은 간격(tick)으로 깨어나
+다음 tick 전에 SLA를 위반할 티커만 골라 조회합니다. 일반 티커는 기존과 같이
+SLA(정기 주기)마다 한 번 조회되므로 전체 요청 수는 늘지 않고,
+관심/보유/알림 종목은 우선순위별 짧은 SLA로 자주 갱신됩니다.
+
+짧은 SLA의 갱신은 정기 주기마다 한 번만 전체 조회 기간을 받고, 그 사이에는 최신 봉만
+조회합니다 (take_due_split). 티커당 요청 수는 SLA마다 1건이지만 응답과 저장량은 봉 몇 개입니다.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .ticker_repository import ManagedTicker
+
+
+class FreshnessTracker:
+    """티커별 마지막 조회 시각을 기억하고 SLA가 임박한 티커를 고릅니다."""
+
+    def __init__(self, default_sla: float, tick_seconds: float):
+        """
+        Args:
+            default_sla: 우선순위별 기본값이 없는 티커의 SLA (초, 정기 수집 주기)
+            tick_seconds: 대상 선정 간격 (초)
+        """
+        self.default_sla = default_sla
+        self.tick_seconds = tick_seconds
+        self._last_attempt: Dict[str, float] = {}
+        self._last_full: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def slack(self, ticker: ManagedTicker, now: Optional[float] = None) -> float:
+        """SLA 위반까지 남은 시간 (초). 이 프로세스에서 조회한 적이 없으면 -inf."""
+        now = time.monotonic() if now is None else now
+        last = self._last_attempt.get(ticker.symbol)
+        if last is None:
+            return float("-inf")
+        return ticker.sla_seconds(self.default_sla) - (now - last)
+
+    def take_due(self, tickers: List[ManagedTicker], now: Optional[float] = None) -> List[ManagedTicker]:
+        """다음 tick 전에 SLA를 위반할 티커를 SLA 여유 오름차순으로 반환하고 조회 시각을 기록합니다.
+
+        실패한 조회도 기록하므로 실패 종목이 매 tick 재시도되지 않습니다.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            due = [t for t in tickers if self.slack(t, now) < self.tick_seconds]
+            # 시작 직후처럼 조회 이력이 없으면 DB의 마지막 수집 시각으로 순서를 정함
+            due.sort(key=lambda t: (self.slack(t, now), t.freshness_slack(self.default_sla), -t.priority, t.symbol))
+            for ticker in due:
+                self._last_attempt[ticker.symbol] = now
+        return due
+
+    def take_due_split(
+        self, tickers: List[ManagedTicker], now: Optional[float] = None
+    ) -> Tuple[List[ManagedTicker], List[ManagedTicker]]:
+        """take_due 결과를 전체 기간을 조회할 티커와 최신 봉만 조회할 티커로 나눕니다.
+
+        마지막 전체 조회 후 정기 주기(default_sla)가 지난 티커만 전체 기간을 조회하고,
+        그 전에 SLA가 돌아온 티커는 최신 봉만 조회합니다.
+
+        Returns:
+            (전체 기간 조회 티커, 최신 봉 조회 티커)
+        """
+        now = time.monotonic() if now is None else now
+        full: List[ManagedTicker] = []
+        latest: List[ManagedTicker] = []
+        due = self.take_due(tickers, now)
+        with self._lock:
+            for ticker in due:
+                last = self._last_full.get(ticker.symbol)
+                if last is None or now - last >= self.default_sla - self.tick_seconds:
+                    self._last_full[ticker.symbol] = now
+                    full.append(ticker)
+                else:
+                    latest.append(ticker)
+        return full, latest
@@ -0,0 +1,276 @@
+"""캔들 누락 구간 탐지 및 복구 큐 모듈.
+
+저장된 캔들의 거래일을 거래일 그리드와 비교하여 누락 구간을 찾고,
+최소한의 조회 범위만 candle_repair_queue에 등록합니다.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .db import get_connection
+from .market_calendar import trading_days
+
+logger = logging.getLogger(__name__)
+
+# 완료(done)/실패(failed)한 구간이 다시 탐지되어도 이 기간이 지나야 다시 대기(pending)로 돌림
+# (제공자에 데이터가 없는 구간을 스캔마다 다시 조회하지 않도록)
+REQUEUE_COOLDOWN = timedelta(days=7)
+
+
+@dataclass
+class GapRange:
+    """누락 구간 (거래일 기준, 양끝 포함)."""
+
+    symbol: str
+    interval: str
+    source: str
+    start_date: date
+    end_date: date
+    missing_days: int
+
+
+@dataclass
+class RepairTask:
+    """복구 큐 항목."""
+
+    id: int
+    symbol: str
+    interval: str
+    source: str
+    start_date: date
+    end_date: date
+    attempts: int
+
+
+def find_missing_ranges(
+    grid: np.ndarray,
+    stored_days: np.ndarray,
+    stored_counts: Optional[np.ndarray] = None,
+    min_bars_per_day: int = 1,
+) -> List[Tuple[date, date, int]]:
+    """거래일 그리드에서 누락된 연속 구간을 찾습니다.
+
+    Args:
+        grid: 기대 거래일 (datetime64[D], 오름차순)
+        stored_days: 저장된 캔들의 거래일 (datetime64[D], 중복 없음)
+        stored_counts: 거래일별 저장된 봉 개수 (None이면 모두 1로 간주)
+        min_bars_per_day: 이 개수 미만이면 해당 거래일을 누락으로 판단
+
+    Returns:
+        (시작일, 종료일, 누락 거래일 수) 리스트
+    """
+    if grid.size == 0:
+        return []
+
+    # 그리드 위치별 저장 봉 개수
+    counts = np.zeros(grid.size, dtype=np.int64)
+    if stored_days.size:
+        pos = np.searchsorted(grid, stored_days)
+        valid = (pos < grid.size) & (grid[np.minimum(pos, grid.size - 1)] == stored_days)
+        values = np.ones(stored_days.size, dtype=np.int64) if stored_counts is None else stored_counts
+        np.add.at(counts, pos[valid], values[valid])
+
+    missing = np.flatnonzero(counts < min_bars_per_day)
+    if missing.size == 0:
+        return []
+
+    # 그리드 인덱스가 끊기는 지점에서 구간 분리 (주말/휴장일은 그리드에 없으므로 연속으로 취급)
+    breaks = np.flatnonzero(np.diff(missing) > 1)
+    starts = np.concatenate(([missing[0]], missing[breaks + 1]))
+    ends = np.concatenate((missing[breaks], [missing[-1]]))
+
+    return [
+        (grid[s].astype(date), grid[e].astype(date), int(e - s + 1))
+        for s, e in zip(starts, ends)
+    ]
+
+
+def load_stored_days(
+    symbol: str,
+    interval: str,
+    source: str,
+    start_date: date,
+    end_date: date,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """기간 내 저장된 캔들의 거래일과 거래일별 봉 개수를 조회합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT candle_time::date AS day, COUNT(*)
+                FROM us_stock_candles
+                WHERE symbol = %s AND interval = %s AND source = %s
+                  AND candle_time >= %s AND candle_time < %s::date + 1
+                GROUP BY day
+                ORDER BY day
+                """,
+                (symbol, interval, source, start_date, end_date),
+            )
+            rows = cursor.fetchall()
+
+    days = np.array([row[0] for row in rows], dtype="datetime64[D]")
+    counts = np.array([row[1] for row in rows], dtype=np.int64)
+    return days, counts
+
+
+def scan_symbol_gaps(
+    symbol: str,
+    interval: str,
+    source: str,
+    start_date: date,
+    end_date: date,
+    min_bars_per_day: int = 1,
+) -> List[GapRange]:
+    """단일 종목의 누락 구간을 탐지합니다.
+
+    첫 저장일 이전은 누락으로 보지 않으며(신규 티커의 과거 구간 제외),
+    저장된 데이터가 전혀 없으면 전체 기간을 하나의 구간으로 반환합니다.
+    """
+    days, counts = load_stored_days(symbol, interval, source, start_date, end_date)
+    if days.size:
+        start_date = max(start_date, days[0].astype(date))
+
+    grid = trading_days(start_date, end_date)
+    ranges = find_missing_ranges(grid, days, counts, min_bars_per_day)
+    return [
+        GapRange(
+            symbol=symbol,
+            interval=interval,
+            source=source,
+            start_date=start,
+            end_date=end,
+            missing_days=missing,
+        )
+        for start, end, missing in ranges
+    ]
+
+
+def ensure_candle_repair_queue_table() -> None:
+    """candle_repair_queue 테이블이 없으면 생성합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS candle_repair_queue (
+                    id SERIAL PRIMARY KEY,
+                    symbol VARCHAR(20) NOT NULL,
+                    interval TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    start_date DATE NOT NULL,
+                    end_date DATE NOT NULL,
+                    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    CONSTRAINT uq_candle_repair_queue
+                        UNIQUE(symbol, interval, source, start_date, end_date)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_candle_repair_queue_pending
+                    ON candle_repair_queue(created_at) WHERE status = 'pending';
+                """
+            )
+            conn.commit()
+    logger.info("candle_repair_queue 테이블을 확인했습니다.")
+
+
+def enqueue_gaps(gaps: List[GapRange], requeue_after: timedelta = REQUEUE_COOLDOWN) -> int:
+    """누락 구간을 복구 큐에 등록합니다.
+
+    이미 등록된 구간 중 완료/실패 처리된 뒤 requeue_after가 지난 구간만 시도 횟수를 초기화해
+    다시 pending으로 돌립니다. 대기 중이거나 최근에 처리된 구간은 그대로 둡니다.
+    """
+    if not gaps:
+        return 0
+
+    records = [(g.symbol, g.interval, g.source, g.start_date, g.end_date) for g in gaps]
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.executemany(
+                """
+                INSERT INTO candle_repair_queue (symbol, interval, source, start_date, end_date)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT ON CONSTRAINT uq_candle_repair_queue DO UPDATE SET
+                    status = 'pending',
+                    attempts = 0,
+                    last_error = NULL,
+                    updated_at = NOW()
+                WHERE candle_repair_queue.status <> 'pending'
+                  AND candle_repair_queue.updated_at < NOW() - %s
+                """,
+                [record + (requeue_after,) for record in records],
+            )
+            conn.commit()
+
+    logger.info("복구 큐에 %d개 구간을 등록했습니다.", len(records))
+    return len(records)
+
+
+def get_pending_repairs(limit: int = 100, max_attempts: int = 3) -> List[RepairTask]:
+    """대기 중인 복구 작업을 조회합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, symbol, interval, source, start_date, end_date, attempts
+                FROM candle_repair_queue
+                WHERE status = 'pending' AND attempts < %s
+                ORDER BY created_at, id
+                LIMIT %s
+                """,
+                (max_attempts, limit),
+            )
+            rows = cursor.fetchall()
+
+    return [
+        RepairTask(
+            id=row[0],
+            symbol=row[1],
+            interval=row[2],
+            source=row[3],
+            start_date=row[4],
+            end_date=row[5],
+            attempts=row[6],
+        )
+        for row in rows
+    ]
+
+
+def mark_repair_done(task_id: int) -> None:
+    """복구 작업을 완료 처리합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE candle_repair_queue
+                SET status = 'done', last_error = NULL, updated_at = NOW()
+                WHERE id = %s
+                """,
+                (task_id,),
+            )
+            conn.commit()
+
+
+def mark_repair_failed(task_id: int, error_message: str, max_attempts: int = 3) -> None:
+    """복구 작업 실패를 기록합니다. 최대 시도 횟수에 도달하면 failed 상태가 됩니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE candle_repair_queue
+                SET attempts = attempts + 1,
+                    last_error = %s,
+                    status = CASE WHEN attempts + 1 >= %s THEN 'failed' ELSE 'pending' END,
+                    updated_at = NOW()
+                WHERE id = %s
+                """,
+                (error_message, max_attempts, task_id),
+            )
+            conn.commit()
+
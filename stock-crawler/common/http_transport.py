@@ -0,0 +1,273 @@
+"""API 클라이언트의 HTTP 전송 계층 (실시간/녹화/재생).
+
+HTTP_TRANSPORT 환경 변수로 선택합니다.
+
+- live (기본): requests로 실제 엔드포인트를 호출합니다.
+- record: 실제 응답을 HTTP_FIXTURE_DIR에 픽스처 파일로 저장합니다.
+- replay: 네트워크 없이 저장된 픽스처로 응답합니다. 없는 요청은 연결 오류로 처리합니다.
+
+픽스처 키는 메서드, URL 경로, 자격 증명을 뺀 요청 파라미터로 만들므로
+호스트가 달라도(예: 로컬 대역 서버) 같은 픽스처를 찾을 수 있습니다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from .metrics import counter, histogram
+from .run_metrics import record_payload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "..", "fixtures", "http")
+
+# 픽스처 키와 파일에서 제외하는 자격 증명 필드
+SECRET_FIELDS = {"token", "appkey", "appsecret", "authorization"}
+
+
+API_REQUEST_SECONDS = histogram(
+    "stock_crawler_api_request_seconds",
+    "API HTTP 요청 소요 시간 (초)",
+    ("provider", "endpoint"),
+)
+API_REQUESTS = counter(
+    "stock_crawler_api_requests_total",
+    "API HTTP 요청 수 (status: HTTP 상태 코드 또는 error)",
+    ("provider", "endpoint", "status"),
+)
+
+
+# 실제 요청 직전에 호출할 함수 (자격 증명 풀이 키별 속도 제한/쿼터를 HTTP 요청마다 차감)
+_request_gate: ContextVar[Optional[Callable[[], None]]] = ContextVar("http_request_gate", default=None)
+
+
+@contextmanager
+def request_gate(gate: Callable[[], None]) -> Iterator[None]:
+    """블록 안에서 보내는 HTTP 요청마다 gate()를 먼저 호출합니다. (페이지 연속 조회도 요청마다 차감)"""
+    token = _request_gate.set(gate)
+    try:
+        yield
+    finally:
+        _request_gate.reset(token)
+
+
+class FixtureNotFoundError(requests.ConnectionError):
+    """재생할 픽스처가 없음."""
+
+
+def fixture_key(method: str, url: str, params: Optional[Dict[str, Any]] = None, body: Any = None) -> str:
+    """요청을 식별하는 픽스처 키 (sha1)."""
+    public_params = sorted(
+        (str(k), str(v)) for k, v in (params or {}).items() if str(k).lower() not in SECRET_FIELDS
+    )
+    if isinstance(body, dict):
+        body = {k: v for k, v in body.items() if str(k).lower() not in SECRET_FIELDS}
+    raw = json.dumps(
+        [method.upper(), urlsplit(url).path, public_params, body],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def fixture_path(fixture_dir: str, key: str) -> str:
+    return os.path.join(fixture_dir, key[:2], f"{key}.json")
+
+
+def load_fixture(fixture_dir: str, key: str) -> Optional[dict]:
+    """픽스처를 읽습니다. 없으면 None."""
+    path = fixture_path(fixture_dir, key)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fixture(fixture_dir: str, key: str, fixture: dict) -> str:
+    """픽스처를 저장하고 경로를 반환합니다."""
+    path = fixture_path(fixture_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _query_params(kwargs: dict) -> Dict[str, Any]:
+    params = kwargs.get("params") or {}
+    return dict(params) if not isinstance(params, dict) else params
+
+
+def _redact_body(text: str) -> str:
+    """토큰 발급 응답의 접근 토큰을 픽스처에 남기지 않도록 가립니다."""
+    if "access_token" not in text:
+        return text
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return text
+    if isinstance(payload, dict) and "access_token" in payload:
+        payload["access_token"] = "recorded-token"
+        return json.dumps(payload, ensure_ascii=False)
+    return text
+
+
+def api_endpoint(url: str) -> Tuple[str, str]:
+    """요청 URL의 (제공자, 엔드포인트) 메트릭 레이블.
+
+    호스트가 대역 서버여도 같은 레이블이 되도록 경로로 구분하고, 경로의 종목 코드는 뺍니다.
+    """
+    parts = [p for p in urlsplit(url).path.split("/") if p]
+    if parts[:1] in (["uapi"], ["oauth2"]):
+        return "kis", parts[-1]
+    if parts[:1] == ["iex"]:
+        return "tiingo", "iex.prices" if len(parts) > 1 else "iex"
+    if parts[:2] == ["tiingo", "daily"]:
+        return "tiingo", "daily.prices"
+    host = urlsplit(url).hostname or "unknown"
+    if "yahoo" in host:
+        # /v8/finance/chart/AAPL, /v1/test/getcrumb
+        return "yf", parts[2] if len(parts) > 2 else parts[-1] if parts else "/"
+    return host, parts[0] if parts else "/"
+
+
+def _observe(response: requests.Response) -> requests.Response:
+    """응답 본문 크기를 수집 측정값에 기록합니다."""
+    record_payload(len(response.content or b""))
+    return response
+
+
+def _send(send: Callable[..., requests.Response], method: str, url: str, **kwargs) -> requests.Response:
+    """요청 한도를 차감한 뒤 요청을 보내고 소요 시간, 상태, 응답 크기를 기록합니다."""
+    gate = _request_gate.get()
+    if gate is not None:
+        gate()
+    provider, endpoint = api_endpoint(url)
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = send(method, url, **kwargs)
+        status = str(response.status_code)
+        return _observe(response)
+    finally:
+        API_REQUEST_SECONDS.labels(provider=provider, endpoint=endpoint).observe(time.perf_counter() - started)
+        API_REQUESTS.labels(provider=provider, endpoint=endpoint, status=status).inc()
+
+
+class LiveTransport:
+    """실제 엔드포인트를 호출하는 전송 객체 (requests 모듈 함수와 같은 인터페이스)."""
+
+    def get(self, url, **kwargs) -> requests.Response:
+        return _send(requests.request, "GET", url, **kwargs)
+
+    def post(self, url, **kwargs) -> requests.Response:
+        return _send(requests.request, "POST", url, **kwargs)
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        return _send(requests.request, method, url, **kwargs)
+
+
+class RecordingSession(requests.Session):
+    """실제 요청을 보내고 응답을 픽스처로 저장하는 세션."""
+
+    def __init__(self, fixture_dir: str = DEFAULT_FIXTURE_DIR):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+
+    def request(self, method, url, **kwargs):
+        response = _send(super().request, method, url, **kwargs)
+        params = _query_params(kwargs)
+        body = kwargs.get("json")
+        key = fixture_key(method, url, params, body)
+        save_fixture(
+            self.fixture_dir,
+            key,
+            {
+                "method": method.upper(),
+                "path": urlsplit(url).path,
+                "params": {k: v for k, v in params.items() if str(k).lower() not in SECRET_FIELDS},
+                "status": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "retry-after")},
+                "body": _redact_body(response.text),
+            },
+        )
+        logger.debug("픽스처 녹화: %s %s → %s", method, urlsplit(url).path, key)
+        return response
+
+
+class ReplaySession(requests.Session):
+    """저장된 픽스처로만 응답하는 세션 (네트워크 미사용)."""
+
+    def __init__(self, fixture_dir: str = DEFAULT_FIXTURE_DIR):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+
+    def request(self, method, url, **kwargs):
+        key = fixture_key(method, url, _query_params(kwargs), kwargs.get("json"))
+        fixture = load_fixture(self.fixture_dir, key)
+        if fixture is None:
+            raise FixtureNotFoundError(f"픽스처가 없습니다: {method} {urlsplit(url).path} ({key})")
+        return _observe(fixture_response(fixture, url))
+
+
+def fixture_response(fixture: dict, url: str = "") -> requests.Response:
+    """픽스처로 requests.Response를 만듭니다."""
+    response = requests.Response()
+    response.status_code = fixture["status"]
+    response._content = fixture["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.headers.update(fixture.get("headers") or {})
+    response.url = url
+    return response
+
+
+_http = None
+_http_lock = threading.Lock()
+
+
+def http():
+    """API 클라이언트가 사용할 HTTP 전송 객체 (LiveTransport 또는 Session)."""
+    global _http
+    if _http is None:
+        with _http_lock:
+            if _http is None:
+                _http = _from_env()
+    return _http
+
+
+def set_http(transport) -> None:
+    """HTTP 전송 객체를 교체합니다. None이면 환경 변수로 다시 선택합니다."""
+    global _http
+    _http = transport
+
+
+def yfinance_session() -> Optional[requests.Session]:
+    """yfinance에 넘길 세션. 실시간 모드에서는 None (yfinance 기본 세션 사용)."""
+    transport = http()
+    return transport if isinstance(transport, requests.Session) else None
+
+
+def _from_env():
+    mode = os.getenv("HTTP_TRANSPORT", "live").lower()
+    fixture_dir = os.getenv("HTTP_FIXTURE_DIR", DEFAULT_FIXTURE_DIR)
+    if mode == "record":
+        logger.info("HTTP 녹화 모드 (픽스처: %s)", fixture_dir)
+        return RecordingSession(fixture_dir)
+    if mode == "replay":
+        logger.info("HTTP 재생 모드 (픽스처: %s)", fixture_dir)
+        return ReplaySession(fixture_dir)
+    if mode != "live":
+        raise ValueError(f"알 수 없는 HTTP_TRANSPORT입니다: {mode} (live, record, replay)")
+    return LiveTransport()
@@ -0,0 +1,723 @@
+"""보조지표 증분 상태 (indicator_state).
+
+(종목, 주기)마다 MA20, MA60, RSI(14), MACD(12, 26, 9), 볼린저 밴드(20, 2σ)를 1년치 봉으로 다시 계산하지 않고
+새 봉 하나로 갱신할 수 있도록 누적 합계, EMA, Wilder 평균과 최근 봉 링 버퍼를 한 행에 저장합니다.
+계산 방식은 대시보드(stock-dashboard/src/lib/indicators/calculations.ts)와 같습니다.
+
+상태는 '마지막 봉 직전까지 반영한 누적값'과 '마지막 봉'으로 나뉘며, 수집기가 캔들을 UPSERT할 때마다 갱신됩니다.
+    - 마지막 봉보다 새로운 봉: 마지막 봉을 누적값에 반영하고 새 봉을 마지막 봉으로 둡니다.
+    - 마지막 봉과 같은 시각의 봉 (장중 재수집): 마지막 봉만 바꿉니다.
+    - 그 이전 봉: 링 버퍼의 종가와 같으면 무시하고, 다르거나 링 버퍼보다 오래된 봉이면 전체 재계산합니다.
+어느 경우든 재계산이 아니면 봉 하나당 상수 시간입니다.
+
+한 종목에 여러 소스의 봉이 있으면 load_daily_panel과 같이 봉마다(일봉은 날짜마다) SOURCE_PRIORITY에서 가장 앞선
+소스의 봉 하나를 사용합니다. 수집 배정에 따라 소스가 바뀌어도 우선 소스에 없는 봉은 다른 소스로 채워 계속 갱신됩니다.
+
+봉별 지표는 candle_features 테이블(us_stock_candles와 같은 (symbol, interval, candle_time) 키)에 함께 저장해
+읽는 쪽이 이동 윈도우 계산 없이 인덱스 조회로 쓰게 합니다.
+    - 새 봉/마지막 봉 갱신: 그 봉의 행 하나만 UPSERT
+    - 전체 재계산: 바뀐 봉 중 가장 이른 시각 이후 행만 지우고 다시 계산 (그 이전 봉의 지표는 영향을 받지 않음)
+    - 마지막 봉이 더 우선하는 소스의 (시각이 다른) 봉으로 바뀌면 이전 시각의 행은 지움
+"""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from psycopg2.extras import execute_values
+
+from .daily_panel import SOURCE_PRIORITY
+from .db import add_upsert_listener, get_connection
+from .metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+MA_SHORT = 20
+MA_LONG = 60
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BB_PERIOD = MA_SHORT
+BB_STDDEV = 2.0
+VOLUME_SHORT = 5
+VOLUME_LONG = 20
+
+# 링 버퍼 크기. MA60 계산에 필요한 60봉보다 크게 잡아
+# 재수집 구간(일봉 30일, 60분봉 최대 5일 × 16봉)의 변경 여부를 DB 조회 없이 판단합니다.
+RING_SIZE = 128
+
+_K_FAST = 2.0 / (MACD_FAST + 1)
+_K_SLOW = 2.0 / (MACD_SLOW + 1)
+_K_SIGNAL = 2.0 / (MACD_SIGNAL + 1)
+
+INDICATOR_UPDATES = counter(
+    "stock_crawler_indicator_updates_total",
+    "보조지표 상태 갱신 수 (mode: incremental/rebuild)",
+    ("interval", "mode"),
+)
+INDICATOR_UPDATE_SECONDS = histogram(
+    "stock_crawler_indicator_update_seconds",
+    "UPSERT 한 번에 대한 보조지표 상태 갱신 시간 (초)",
+)
+
+
+@dataclass
+class IndicatorValues:
+    """마지막 봉 기준 보조지표 값. 봉이 모자라 계산할 수 없는 값은 None."""
+
+    ma20: Optional[float] = None
+    ma60: Optional[float] = None
+    rsi14: Optional[float] = None
+    macd: Optional[float] = None
+    macd_signal: Optional[float] = None
+    macd_hist: Optional[float] = None
+    bb_upper: Optional[float] = None
+    bb_middle: Optional[float] = None
+    bb_lower: Optional[float] = None
+    volume_ratio: Optional[float] = None  # 5봉 평균 거래량 / 20봉 평균 거래량 (20봉 평균이 0이면 0)
+
+
+@dataclass
+class IndicatorState:
+    """(종목, 주기)의 보조지표 누적 상태.
+
+    누적값(sum_*, ema_*, signal_ema, avg_*)은 마지막 봉 직전까지 반영한 값이고,
+    마지막 봉은 링 버퍼(times/closes/volumes/sources)의 마지막 원소입니다.
+    같은 봉(일봉은 같은 날짜)에 여러 소스가 있으면 우선순위가 높은 소스의 봉만 남깁니다.
+    """
+
+    symbol: str
+    interval: str
+    source: str  # 마지막 봉의 소스
+    bars: int = 0  # 마지막 봉을 포함한 전체 봉 수
+    times: List[datetime] = field(default_factory=list)
+    closes: List[float] = field(default_factory=list)
+    volumes: List[float] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    sum_short: float = 0.0  # 직전 19봉 종가 합
+    sumsq_short: float = 0.0  # 직전 19봉 종가 제곱 합
+    sum_long: float = 0.0  # 직전 59봉 종가 합
+    ema_fast: Optional[float] = None
+    ema_slow: Optional[float] = None
+    signal_ema: Optional[float] = None
+    macd_count: int = 0  # 직전까지 계산된 MACD 값 수 (시그널 워밍업)
+    avg_gain: float = 0.0  # 가격 변화가 14개 미만이면 합계, 이후 Wilder 평균
+    avg_loss: float = 0.0
+
+    @property
+    def last_time(self) -> Optional[datetime]:
+        return self.times[-1] if self.times else None
+
+    def bucket(self, candle_time: datetime):
+        """소스 병합 단위. 일봉은 날짜, 그 외 주기는 봉 시각."""
+        return candle_time.date() if self.interval == "daily" else candle_time
+
+    def update(self, candle_time: datetime, close: float, volume: float, source: str, rank: Callable[[str], int]) -> bool:
+        """봉 하나를 반영합니다.
+
+        Args:
+            rank: 소스 우선순위 (작을수록 우선). 같은 봉에 더 앞선 소스의 봉이 있으면 무시합니다
+
+        Returns:
+            반영했거나 바뀐 것이 없으면 True, 마지막 봉 이전 이력이 바뀌어 전체 재계산이 필요하면 False
+        """
+        if len(self.volumes) != len(self.closes) or len(self.sources) != len(self.closes):
+            return False  # 거래량/소스 링 버퍼가 없던 이전 형식의 상태
+        bucket = self.bucket(candle_time)
+        if not self.times or bucket > self.bucket(self.times[-1]):
+            self._push(candle_time, close, volume, source)
+            return True
+        if bucket == self.bucket(self.times[-1]):
+            if rank(source) <= rank(self.sources[-1]):
+                self.times[-1] = candle_time
+                self.closes[-1] = close
+                self.volumes[-1] = volume
+                self.sources[-1] = source
+                self.source = source
+            return True
+        if bucket < self.bucket(self.times[0]):
+            return False
+        # 링 버퍼 안의 이전 봉: 뒤처진 소스의 봉이면 무시하고, 종가와 거래량이 같으면 재수집으로 다시 저장된 것
+        for i in range(len(self.times) - 2, -1, -1):
+            if self.bucket(self.times[i]) == bucket:
+                if rank(source) > rank(self.sources[i]):
+                    return True
+                if self.closes[i] == close and self.volumes[i] == volume:
+                    self.sources[i] = source
+                    return True
+                return False
+            if self.bucket(self.times[i]) < bucket:
+                break
+        return False  # 링 버퍼 구간 사이에 새로 끼어든 봉
+
+    def _push(self, candle_time: datetime, close: float, volume: float, source: str) -> None:
+        if self.closes:
+            self._commit_last()
+        self.times.append(candle_time)
+        self.closes.append(close)
+        self.volumes.append(volume)
+        self.sources.append(source)
+        self.source = source
+        self.bars += 1
+        if len(self.closes) > RING_SIZE:
+            del self.times[0]
+            del self.closes[0]
+            del self.volumes[0]
+            del self.sources[0]
+
+    def _commit_last(self) -> None:
+        """마지막 봉을 누적값에 반영합니다."""
+        close = self.closes[-1]
+        committed = self.bars - 1  # 반영 전 누적된 봉 수
+
+        self.sum_short += close
+        self.sumsq_short += close * close
+        if committed >= MA_SHORT - 1:
+            dropped = self.closes[-MA_SHORT]
+            self.sum_short -= dropped
+            self.sumsq_short -= dropped * dropped
+        self.sum_long += close
+        if committed >= MA_LONG - 1:
+            self.sum_long -= self.closes[-MA_LONG]
+
+        self.ema_fast = close if self.ema_fast is None else self.ema_fast + _K_FAST * (close - self.ema_fast)
+        self.ema_slow = close if self.ema_slow is None else self.ema_slow + _K_SLOW * (close - self.ema_slow)
+        if committed + 1 >= MACD_SLOW:
+            macd = self.ema_fast - self.ema_slow
+            self.signal_ema = macd if self.macd_count == 0 else self.signal_ema + _K_SIGNAL * (macd - self.signal_ema)
+            self.macd_count += 1
+
+        if committed >= 1:
+            change = close - self.closes[-2]
+            self.avg_gain, self.avg_loss = _wilder(self.avg_gain, self.avg_loss, change, committed)
+
+    def values(self) -> IndicatorValues:
+        """마지막 봉 기준 보조지표 값을 계산합니다."""
+        result = IndicatorValues()
+        if not self.closes:
+            return result
+        close = self.closes[-1]
+
+        if self.bars >= MA_SHORT:
+            middle = (self.sum_short + close) / MA_SHORT
+            variance = max((self.sumsq_short + close * close) / MA_SHORT - middle * middle, 0.0)
+            deviation = BB_STDDEV * math.sqrt(variance)
+            result.ma20 = result.bb_middle = middle
+            result.bb_upper = middle + deviation
+            result.bb_lower = middle - deviation
+        if self.bars >= MA_LONG:
+            result.ma60 = (self.sum_long + close) / MA_LONG
+
+        if self.bars >= MACD_SLOW:
+            ema_fast = self.ema_fast + _K_FAST * (close - self.ema_fast)
+            ema_slow = self.ema_slow + _K_SLOW * (close - self.ema_slow)
+            result.macd = ema_fast - ema_slow
+            if self.macd_count + 1 >= MACD_SIGNAL:
+                result.macd_signal = self.signal_ema + _K_SIGNAL * (result.macd - self.signal_ema)
+                result.macd_hist = result.macd - result.macd_signal
+
+        changes = self.bars - 1
+        if changes >= RSI_PERIOD:
+            avg_gain, avg_loss = _wilder(self.avg_gain, self.avg_loss, close - self.closes[-2], changes)
+            result.rsi14 = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        if self.bars >= VOLUME_LONG:
+            avg_long = sum(self.volumes[-VOLUME_LONG:]) / VOLUME_LONG
+            avg_short = sum(self.volumes[-VOLUME_SHORT:]) / VOLUME_SHORT
+            result.volume_ratio = avg_short / avg_long if avg_long > 0 else 0.0
+        return result
+
+
+def _wilder(avg_gain: float, avg_loss: float, change: float, changes: int) -> Tuple[float, float]:
+    """RSI 평균 이득/손실에 가격 변화 하나를 반영합니다.
+
+    Args:
+        changes: 이 변화를 포함한 가격 변화 수. RSI_PERIOD까지는 합계를 쌓고, RSI_PERIOD에서 단순 평균으로 바꿉니다.
+    """
+    gain = max(change, 0.0)
+    loss = max(-change, 0.0)
+    if changes < RSI_PERIOD:
+        return avg_gain + gain, avg_loss + loss
+    if changes == RSI_PERIOD:
+        return (avg_gain + gain) / RSI_PERIOD, (avg_loss + loss) / RSI_PERIOD
+    return (avg_gain * (RSI_PERIOD - 1) + gain) / RSI_PERIOD, (avg_loss * (RSI_PERIOD - 1) + loss) / RSI_PERIOD
+
+
+def build_state(
+    symbol: str,
+    interval: str,
+    sources: Sequence[str],
+    times: Sequence[datetime],
+    closes: Sequence[float],
+    volumes: Sequence[float],
+    on_bar: Optional[Callable[[IndicatorState], None]] = None,
+) -> IndicatorState:
+    """소스를 병합한 전체 시계열(시각 오름차순)로 상태를 새로 만듭니다.
+
+    Args:
+        sources: 봉마다 사용한 소스
+        on_bar: 봉을 하나 반영할 때마다 상태를 받는 함수 (봉별 지표 저장용)
+    """
+    state = IndicatorState(symbol=symbol, interval=interval, source=sources[-1] if sources else "")
+    for candle_time, close, volume, source in zip(times, closes, volumes, sources):
+        state._push(candle_time, close, volume, source)
+        if on_bar is not None:
+            on_bar(state)
+    return state
+
+
+def ensure_indicator_state_table() -> None:
+    """indicator_state 테이블이 없으면 생성합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS indicator_state (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    bars INTEGER NOT NULL,
+                    times TIMESTAMPTZ[] NOT NULL,
+                    closes DOUBLE PRECISION[] NOT NULL,
+                    volumes DOUBLE PRECISION[] NOT NULL DEFAULT '{}',
+                    sources TEXT[] NOT NULL DEFAULT '{}',
+                    sum_short DOUBLE PRECISION NOT NULL,
+                    sumsq_short DOUBLE PRECISION NOT NULL,
+                    sum_long DOUBLE PRECISION NOT NULL,
+                    ema_fast DOUBLE PRECISION,
+                    ema_slow DOUBLE PRECISION,
+                    signal_ema DOUBLE PRECISION,
+                    macd_count INTEGER NOT NULL,
+                    avg_gain DOUBLE PRECISION NOT NULL,
+                    avg_loss DOUBLE PRECISION NOT NULL,
+                    last_time TIMESTAMPTZ NOT NULL,
+                    last_close DOUBLE PRECISION NOT NULL,
+                    ma20 DOUBLE PRECISION,
+                    ma60 DOUBLE PRECISION,
+                    rsi14 DOUBLE PRECISION,
+                    macd DOUBLE PRECISION,
+                    macd_signal DOUBLE PRECISION,
+                    macd_hist DOUBLE PRECISION,
+                    bb_upper DOUBLE PRECISION,
+                    bb_middle DOUBLE PRECISION,
+                    bb_lower DOUBLE PRECISION,
+                    volume_ratio DOUBLE PRECISION,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (symbol, interval)
+                );
+
+                -- 거래량 비율 추가 이전에 만든 테이블 (기존 상태는 다음 갱신 때 재계산됨)
+                ALTER TABLE indicator_state ADD COLUMN IF NOT EXISTS volumes DOUBLE PRECISION[] NOT NULL DEFAULT '{}';
+                ALTER TABLE indicator_state ADD COLUMN IF NOT EXISTS volume_ratio DOUBLE PRECISION;
+                -- 봉별 소스 추가 이전에 만든 테이블 (기존 상태는 모든 봉이 행의 소스인 것으로 읽음)
+                ALTER TABLE indicator_state ADD COLUMN IF NOT EXISTS sources TEXT[] NOT NULL DEFAULT '{}';
+                """
+            )
+            conn.commit()
+    logger.info("indicator_state 테이블을 확인했습니다.")
+
+
+def ensure_candle_features_table() -> None:
+    """candle_features 테이블이 없으면 생성합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS candle_features (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    candle_time TIMESTAMPTZ NOT NULL,
+                    source TEXT NOT NULL,
+                    close DOUBLE PRECISION NOT NULL,
+                    volume DOUBLE PRECISION NOT NULL,
+                    ma20 DOUBLE PRECISION,
+                    ma60 DOUBLE PRECISION,
+                    rsi14 DOUBLE PRECISION,
+                    macd DOUBLE PRECISION,
+                    macd_signal DOUBLE PRECISION,
+                    macd_hist DOUBLE PRECISION,
+                    bb_upper DOUBLE PRECISION,
+                    bb_middle DOUBLE PRECISION,
+                    bb_lower DOUBLE PRECISION,
+                    volume_ratio DOUBLE PRECISION,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (symbol, interval, candle_time)
+                );
+                """
+            )
+            conn.commit()
+    logger.info("candle_features 테이블을 확인했습니다.")
+
+
+# 누적 상태 컬럼 (IndicatorState 필드와 같은 순서)
+_STATE_COLUMNS = (
+    "symbol", "interval", "source", "bars", "times", "closes", "volumes", "sources", "sum_short", "sumsq_short", "sum_long",
+    "ema_fast", "ema_slow", "signal_ema", "macd_count", "avg_gain", "avg_loss",
+)
+_VALUE_COLUMNS = (
+    "ma20", "ma60", "rsi14", "macd", "macd_signal", "macd_hist", "bb_upper", "bb_middle", "bb_lower", "volume_ratio",
+)
+_ALL_COLUMNS = _STATE_COLUMNS + ("last_time", "last_close") + _VALUE_COLUMNS
+_FEATURE_COLUMNS = ("symbol", "interval", "candle_time", "source", "close", "volume") + _VALUE_COLUMNS
+
+
+def _state_row(state: IndicatorState) -> tuple:
+    values = state.values()
+    return (
+        tuple(getattr(state, name) for name in _STATE_COLUMNS)
+        + (state.times[-1], state.closes[-1])
+        + tuple(getattr(values, name) for name in _VALUE_COLUMNS)
+    )
+
+
+def _feature_row(state: IndicatorState) -> tuple:
+    """마지막 봉의 candle_features 행."""
+    values = state.values()
+    return (
+        (state.symbol, state.interval, state.times[-1], state.source, state.closes[-1], state.volumes[-1])
+        + tuple(getattr(values, name) for name in _VALUE_COLUMNS)
+    )
+
+
+def _source_rank(source: str, priority: Sequence[str]) -> int:
+    return priority.index(source) if source in priority else len(priority)
+
+
+# 갱신 대상 봉: (시각, 종가, 거래량, 소스)
+_Bar = Tuple[datetime, float, float, str]
+
+
+@dataclass
+class _Update:
+    """(종목, 주기) 하나의 갱신 결과."""
+
+    state: Optional[IndicatorState]  # 저장할 상태 (None이면 저장하지 않음)
+    mode: str  # incremental / rebuild
+    features: List[tuple] = field(default_factory=list)  # 저장할 candle_features 행
+    stale_times: List[datetime] = field(default_factory=list)  # 다른 소스의 봉으로 바뀌어 지울 candle_features 시각
+    invalidate: bool = False  # features를 쓰기 전에 기존 행을 지울지 여부
+    invalidate_from: Optional[datetime] = None  # 지울 첫 시각 (None이면 전체)
+
+
+class IndicatorEngine:
+    """캔들 UPSERT 결과로 indicator_state와 candle_features를 갱신합니다.
+
+    db.add_upsert_listener(engine.on_upsert)로 등록하면 수집기가 캔들을 저장할 때마다 호출됩니다.
+    """
+
+    def __init__(self, source_priority: Sequence[str] = SOURCE_PRIORITY, store_features: bool = True):
+        self.source_priority = tuple(source_priority)
+        self.store_features = store_features
+
+    def on_upsert(self, rows: Iterable[tuple]) -> None:
+        """UPSERT된 행으로 상태를 갱신합니다.
+
+        Args:
+            rows: (symbol, interval, candle_time, high, low, close, volume, source, inserted) 행 목록 (db.UPSERT_CANDLES_SQL의 RETURNING)
+        """
+        bars: Dict[Tuple[str, str], List[_Bar]] = {}
+        for symbol, interval, candle_time, _high, _low, close, volume, source, _inserted in rows:
+            bars.setdefault((symbol, interval), []).append((candle_time, close, volume, source))
+        if not bars:
+            return
+
+        with INDICATOR_UPDATE_SECONDS.time():
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    keys = sorted(bars)
+                    states = self._load_for_update(cursor, keys)
+                    updates = []
+                    for key in keys:
+                        update = self._apply(cursor, key, states.get(key), bars[key])
+                        INDICATOR_UPDATES.labels(interval=key[1], mode=update.mode).inc()
+                        updates.append(update)
+                    self._save(cursor, [u.state for u in updates if u.state is not None])
+                    self._save_features(cursor, updates)
+                    conn.commit()
+
+    def _rank(self, source: str) -> int:
+        return _source_rank(source, self.source_priority)
+
+    def _apply(self, cursor, key: Tuple[str, str], state: Optional[IndicatorState], updates: List[_Bar]) -> _Update:
+        """한 (종목, 주기)에 새 봉을 봉별 소스 병합 규칙으로 반영합니다."""
+        symbol, interval = key
+        if state is None or len(state.volumes) != len(state.closes):
+            # 상태가 없거나 거래량 링 버퍼가 없던 이전 형식: 봉별 지표도 전체 다시 계산
+            return self._rebuild_update(cursor, symbol, interval, None)
+        updates = sorted(updates, key=lambda bar: (bar[0], self._rank(bar[3])))
+        features = []
+        stale_times = []
+        for candle_time, close, volume, source in updates:
+            last_time = state.last_time
+            if not state.update(candle_time, close, volume, source, self._rank):
+                logger.info("[%s %s] %s 이전 봉이 바뀌어 보조지표를 전체 재계산합니다.", symbol, interval, candle_time)
+                # 바뀐 봉 중 가장 이른 봉 이후의 봉별 지표만 다시 계산 (일봉은 그날 다른 소스 봉의 행도 포함하도록 날짜 시작부터)
+                features_from = updates[0][0]
+                if interval == "daily":
+                    features_from = features_from.replace(hour=0, minute=0, second=0, microsecond=0)
+                return self._rebuild_update(cursor, symbol, interval, features_from)
+            if not self.store_features or state.last_time != candle_time or state.sources[-1] != source:
+                continue  # 이전 봉이거나 뒤처진 소스라 마지막 봉이 바뀌지 않음
+            if last_time is not None and last_time != candle_time and state.bucket(last_time) == state.bucket(candle_time):
+                stale_times.append(last_time)
+            features.append(_feature_row(state))
+        return _Update(state, "incremental", features, stale_times)
+
+    def _rebuild_update(self, cursor, symbol: str, interval: str, features_from: Optional[datetime]) -> _Update:
+        state, features = self.rebuild_one(cursor, symbol, interval, features_from)
+        return _Update(state, "rebuild", features, invalidate=self.store_features, invalidate_from=features_from)
+
+    def rebuild_one(
+        self, cursor, symbol: str, interval: str, features_from: Optional[datetime] = None
+    ) -> Tuple[Optional[IndicatorState], List[tuple]]:
+        """DB의 전체 시계열을 봉별(일봉은 날짜별)로 소스 병합해 상태를 다시 만듭니다.
+
+        Args:
+            features_from: 이 시각 이후 봉의 candle_features 행을 함께 계산 (None이면 전체)
+
+        Returns:
+            (상태, candle_features 행). 캔들이 없으면 (None, [])
+        """
+        cursor.execute(
+            """
+            WITH merged AS (
+                SELECT DISTINCT ON (bucket) candle_time, close, volume, source
+                FROM (
+                    SELECT candle_time, close_price::float8 AS close, volume::float8 AS volume, source,
+                           CASE WHEN interval = 'daily' THEN date_trunc('day', candle_time) ELSE candle_time END AS bucket
+                    FROM us_stock_candles
+                    WHERE symbol = %(symbol)s AND interval = %(interval)s
+                ) c
+                ORDER BY bucket, array_position(%(priority)s::text[], source), candle_time DESC
+            )
+            SELECT array_agg(source ORDER BY candle_time), array_agg(candle_time ORDER BY candle_time),
+                   array_agg(close ORDER BY candle_time), array_agg(volume ORDER BY candle_time)
+            FROM merged
+            """,
+            {"symbol": symbol, "interval": interval, "priority": list(self.source_priority)},
+        )
+        series = cursor.fetchone()
+        if not series[0]:
+            return None, []
+        features: List[tuple] = []
+
+        def collect(state: IndicatorState) -> None:
+            if features_from is None or state.times[-1] >= features_from:
+                features.append(_feature_row(state))
+
+        state = build_state(symbol, interval, *series, on_bar=collect if self.store_features else None)
+        return state, features
+
+    def rebuild(self, symbols: Sequence[str], interval: str) -> int:
+        """종목들의 상태와 봉별 지표를 전체 재계산해 저장하고 저장한 종목 수를 반환합니다."""
+        return self.recompute({(symbol.upper(), interval): None for symbol in symbols})
+
+    def recompute(self, ranges: Dict[Tuple[str, str], Optional[datetime]]) -> int:
+        """(종목, 주기)별로 상태를 다시 만들고 지정한 시각 이후의 봉별 지표를 다시 저장합니다.
+
+        Args:
+            ranges: {(symbol, interval): 봉별 지표를 다시 계산할 첫 봉 시각 (None이면 전체)}
+
+        Returns:
+            저장한 (종목, 주기) 수
+        """
+        saved = 0
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                for (symbol, interval), features_from in ranges.items():
+                    update = self._rebuild_update(cursor, symbol, interval, features_from)
+                    if update.state is None:
+                        continue
+                    self._save(cursor, [update.state])
+                    self._save_features(cursor, [update])
+                    conn.commit()
+                    INDICATOR_UPDATES.labels(interval=interval, mode="rebuild").inc()
+                    saved += 1
+        return saved
+
+    def apply_ranges(self, ranges: Dict[Tuple[str, str], datetime]) -> int:
+        """(종목, 주기)별로 지정한 시각 이후의 캔들을 저장된 상태에 증분 반영합니다.
+
+        수집기가 보조지표를 갱신하지 않은 candles.updated 이벤트용입니다. 저장된 상태에 이벤트 구간의 봉만
+        반영하고, 상태가 없거나 이전 봉이 바뀌어 update()가 False를 반환할 때만 전체 재계산합니다.
+
+        Args:
+            ranges: {(symbol, interval): 바뀐 첫 봉 시각}
+
+        Returns:
+            저장한 (종목, 주기) 수
+        """
+        saved = 0
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                for key, start in ranges.items():
+                    states = self._load_for_update(cursor, [key])
+                    bars = self._load_bars(cursor, key, start)
+                    if not bars and key in states:
+                        conn.rollback()
+                        continue
+                    update = self._apply(cursor, key, states.get(key), bars)
+                    if update.state is None:
+                        conn.rollback()
+                        continue
+                    self._save(cursor, [update.state])
+                    self._save_features(cursor, [update])
+                    conn.commit()
+                    INDICATOR_UPDATES.labels(interval=key[1], mode=update.mode).inc()
+                    saved += 1
+        return saved
+
+    @staticmethod
+    def _load_bars(cursor, key: Tuple[str, str], start: datetime) -> List[_Bar]:
+        """start 이후 모든 소스의 봉 (일봉은 그날 다른 소스의 봉도 포함하도록 날짜 시작부터)."""
+        symbol, interval = key
+        if interval == "daily":
+            start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        cursor.execute(
+            """
+            SELECT candle_time, close_price::float8, volume::float8, source
+            FROM us_stock_candles
+            WHERE symbol = %s AND interval = %s AND candle_time >= %s
+            """,
+            (symbol, interval, start),
+        )
+        return list(cursor.fetchall())
+
+    @staticmethod
+    def _load_for_update(cursor, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], IndicatorState]:
+        # 여러 수집 스레드가 같은 종목을 동시에 갱신하지 않도록 행을 잠금 (키 순서대로 잠가 교착 방지)
+        cursor.execute(
+            f"""
+            SELECT {", ".join(_STATE_COLUMNS)}
+            FROM indicator_state
+            WHERE (symbol, interval) IN (SELECT * FROM unnest(%s::text[], %s::text[]))
+            ORDER BY symbol, interval
+            FOR UPDATE
+            """,
+            ([k[0] for k in keys], [k[1] for k in keys]),
+        )
+        states = {}
+        for row in cursor.fetchall():
+            state = IndicatorState(**dict(zip(_STATE_COLUMNS, row)))
+            if not state.sources:
+                # 봉별 소스를 저장하기 전의 행은 모든 봉이 행의 소스
+                state.sources = [state.source] * len(state.times)
+            states[(state.symbol, state.interval)] = state
+        return states
+
+    @staticmethod
+    def _save(cursor, states: List[IndicatorState]) -> None:
+        if not states:
+            return
+        updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in _ALL_COLUMNS[2:])
+        execute_values(
+            cursor,
+            f"""
+            INSERT INTO indicator_state ({", ".join(_ALL_COLUMNS)})
+            VALUES %s
+            ON CONFLICT (symbol, interval) DO UPDATE SET {updates}, updated_at = NOW()
+            """,
+            [_state_row(state) for state in states],
+            page_size=500,
+        )
+
+    @staticmethod
+    def _save_features(cursor, updates: List[_Update]) -> None:
+        """재계산 구간의 기존 행과 다른 소스 봉으로 바뀐 행을 지우고 봉별 지표를 UPSERT합니다."""
+        for update in updates:
+            if update.stale_times and update.state is not None:
+                cursor.execute(
+                    "DELETE FROM candle_features WHERE symbol = %s AND interval = %s AND candle_time = ANY(%s)",
+                    (update.state.symbol, update.state.interval, update.stale_times),
+                )
+            if not update.invalidate or update.state is None:
+                continue
+            state = update.state
+            if update.invalidate_from is None:
+                cursor.execute(
+                    "DELETE FROM candle_features WHERE symbol = %s AND interval = %s", (state.symbol, state.interval)
+                )
+            else:
+                cursor.execute(
+                    "DELETE FROM candle_features WHERE symbol = %s AND interval = %s AND candle_time >= %s",
+                    (state.symbol, state.interval, update.invalidate_from),
+                )
+        rows = [row for update in updates for row in update.features]
+        if not rows:
+            return
+        updates_sql = ", ".join(f"{name} = EXCLUDED.{name}" for name in _FEATURE_COLUMNS[3:])
+        execute_values(
+            cursor,
+            f"""
+            INSERT INTO candle_features ({", ".join(_FEATURE_COLUMNS)})
+            VALUES %s
+            ON CONFLICT (symbol, interval, candle_time) DO UPDATE SET {updates_sql}, updated_at = NOW()
+            """,
+            rows,
+            page_size=1000,
+        )
+
+
+def enable_indicator_updates(engine: Optional[IndicatorEngine]) -> None:
+    """indicator_state/candle_features 테이블을 확인하고 캔들 UPSERT마다 엔진이 상태를 갱신하도록 등록합니다.
+
+    Args:
+        engine: 보조지표 엔진 (None이면 아무것도 하지 않음, Settings.indicator_engine() 참고)
+    """
+    if engine is None:
+        return
+    ensure_indicator_state_table()
+    if engine.store_features:
+        ensure_candle_features_table()
+    add_upsert_listener(engine.on_upsert)
+
+
+def get_indicator_values(symbol: str, interval: str = "daily") -> Optional[dict]:
+    """저장된 마지막 봉 기준 보조지표 값을 조회합니다. 상태가 없으면 None."""
+    columns = ("symbol", "interval", "source", "bars", "last_time", "last_close") + _VALUE_COLUMNS + ("updated_at",)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(columns)} FROM indicator_state WHERE symbol = %s AND interval = %s",
+                (symbol.upper(), interval),
+            )
+            row = cursor.fetchone()
+    return dict(zip(columns, row)) if row else None
+
+
+def get_candle_features(
+    symbol: str,
+    interval: str = "daily",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    """저장된 봉별 보조지표를 시각 오름차순으로 조회합니다.
+
+    Args:
+        start: 첫 봉 시각 (포함)
+        end: 마지막 봉 시각 (포함)
+        limit: 최근 봉부터 최대 개수
+    """
+    columns = _FEATURE_COLUMNS + ("updated_at",)
+    conditions = ["symbol = %s", "interval = %s"]
+    params: list = [symbol.upper(), interval]
+    if start is not None:
+        conditions.append("candle_time >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append("candle_time <= %s")
+        params.append(end)
+    query = f"SELECT {', '.join(columns)} FROM candle_features WHERE {' AND '.join(conditions)} ORDER BY candle_time DESC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+    return [dict(zip(columns, row)) for row in reversed(rows)]
@@ -4,25 +4,68 @@ from __future__ import annotations
 import json
 import logging
 import os
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
 
+from .api_errors import AuthError, ProviderError, RateLimitedError, TokenExpiredError, parse_retry_after
+from .deadline import request_timeout
+from .http_transport import http
+
 logger = logging.getLogger(__name__)
 
 TOKEN_FILE = ".access_token.json"
 
+# 요청 한도 초과 응답 코드 (초당 거래건수 초과)
+KIS_RATE_LIMIT_CODES = {"EGW00201"}
+# 토큰 만료/무효 응답 코드 (재발급 후 재시도 가능)
+KIS_TOKEN_EXPIRED_CODES = {"EGW00121", "EGW00123"}
+
+# 해외주식 분봉 API 1회 조회 최대 건수
+MAX_60M_RECORDS_PER_PAGE = 120
+
+
+def _parse_kis_candle_time(item: dict) -> Optional[datetime]:
+    """KIS 캔들의 현지 일자/시각(xymd, xhms)을 datetime으로 변환합니다."""
+    date_str = item.get("xymd", "")
+    if not date_str:
+        return None
+    try:
+        return datetime.strptime(f"{date_str} {item.get('xhms', '000000')}", "%Y%m%d %H%M%S")
+    except ValueError:
+        return None
+
+
+def _next_60m_keyb(output2: List[dict]) -> str:
+    """연속 조회 KEYB를 만듭니다.
+
+    KIS 분봉 API는 별도 키 대신 "직전 응답의 마지막 분봉보다 1분 앞선 시각"을 KEYB로
+    받으므로, 응답 순서상 마지막 봉의 현지 일시를 기준으로 계산합니다.
+    """
+    for item in reversed(output2):
+        candle_time = _parse_kis_candle_time(item)
+        if candle_time is not None:
+            return (candle_time - timedelta(minutes=1)).strftime("%Y%m%d%H%M%S")
+    return ""
+
 
 class KisApi:
     """한국투자증권 API 클라이언트."""
 
-    def __init__(self, base_url: str, app_key: str, app_secret: str):
+    def __init__(self, base_url: str, app_key: str, app_secret: str, token_file: str = TOKEN_FILE):
         self.base_url = base_url
         self.app_key = app_key
         self.app_secret = app_secret
+        self.token_file = token_file
         self._access_token: Optional[str] = None
 
+    @property
+    def key_id(self) -> str:
+        """로그와 쿼터 장부에 쓰는 키 식별자 (앱키 끝 4자리)."""
+        return f"...{self.app_key[-4:]}"
+
     @classmethod
     def from_env(cls) -> "KisApi":
         """환경변수에서 설정을 읽어 인스턴스를 생성합니다."""
@@ -38,13 +81,45 @@ class KisApi:
 
         return cls(base_url, app_key, app_secret)
 
+    @classmethod
+    def from_env_all(cls) -> List["KisApi"]:
+        """환경변수의 모든 자격 증명으로 인스턴스 목록을 생성합니다.
+
+        KIS_CREDENTIALS="앱키1:시크릿1,앱키2:시크릿2"가 있으면 키마다 인스턴스를 만들고
+        (토큰 파일은 키별로 분리), 없으면 KIS_APP_KEY/KIS_APP_SECRET 하나를 사용합니다.
+        """
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        credentials = [c.strip() for c in os.getenv("KIS_CREDENTIALS", "").split(",") if c.strip()]
+        if not credentials:
+            return [cls.from_env()]
+
+        base_url = os.getenv("KIS_BASE_URL", "https://openapi.koreainvestment.com:9443")
+        apis = []
+        for credential in credentials:
+            app_key, _, app_secret = credential.partition(":")
+            if not app_key or not app_secret:
+                raise ValueError("KIS_CREDENTIALS는 '앱키:시크릿' 쌍을 쉼표로 구분해 설정하세요.")
+            apis.append(cls(base_url, app_key, app_secret, token_file=f".access_token.{app_key[-6:]}.json"))
+        return apis
+
     # =========================================================================
     # Token Management
     # =========================================================================
 
     def _get_token_path(self) -> str:
-        """토큰 파일 경로를 반환합니다."""
-        return os.path.join(os.path.dirname(__file__), "..", TOKEN_FILE)
+        """토큰 파일 경로를 반환합니다.
+
+        KIS가 아닌 호스트(로컬 대역 서버 등)의 토큰은 호스트별 파일에 저장해
+        실제 토큰 캐시를 덮어쓰지 않습니다.
+        """
+        token_file = self.token_file
+        host = urlsplit(self.base_url).hostname or ""
+        if host and not host.endswith("koreainvestment.com"):
+            directory, name = os.path.split(token_file)
+            token_file = os.path.join(directory, f".{host}{name}")
+        return os.path.join(os.path.dirname(__file__), "..", token_file)
 
     def _load_cached_token(self) -> Tuple[Optional[str], Optional[datetime]]:
         """저장된 토큰과 만료시간을 로드합니다."""
@@ -101,10 +176,12 @@ class KisApi:
         logger.info("Access Token 발급 요청...")
 
         try:
-            response = requests.post(url, json=body, timeout=10)
+            response = http().post(url, json=body, timeout=request_timeout(10))
         except requests.RequestException as e:
             raise RuntimeError(f"토큰 발급 요청 실패: {e}")
 
+        if response.status_code in (401, 403):
+            raise AuthError(f"토큰 발급 실패 ({self.key_id}) - body={response.text}", response.status_code)
         if not response.ok:
             raise RuntimeError(f"토큰 발급 실패 - status={response.status_code}, body={response.text}")
 
@@ -136,6 +213,50 @@ class KisApi:
             "custtype": "P",
         }
 
+    def _raise_for_credential_error(self, response: requests.Response) -> None:
+        """요청 한도 초과/인증 실패 응답이면 예외를 발생시킵니다."""
+        if response.ok:
+            return
+
+        try:
+            msg_cd = response.json().get("msg_cd", "")
+        except ValueError:
+            msg_cd = ""
+
+        if response.status_code == 429 or msg_cd in KIS_RATE_LIMIT_CODES:
+            raise RateLimitedError(
+                f"KIS 요청 한도 초과 ({self.key_id}, {msg_cd or response.status_code})",
+                response.status_code,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+        if msg_cd in KIS_TOKEN_EXPIRED_CODES:
+            # 다음 요청에서 새 토큰을 발급받도록 캐시를 버림
+            self._access_token = None
+            self.get_access_token(force_new=True)
+            raise TokenExpiredError(f"KIS 접근 토큰 만료 ({self.key_id}, {msg_cd})", response.status_code)
+        if response.status_code in (401, 403):
+            raise AuthError(f"KIS 인증 실패 ({self.key_id}, {msg_cd or response.status_code})", response.status_code)
+
+    def _payload(self, response: requests.Response, what: str) -> dict:
+        """성공 응답(2xx, rt_cd="0")의 본문을 반환합니다.
+
+        Raises:
+            ProviderError: HTTP 오류나 rt_cd가 "0"이 아닌 응답 (빈 결과와 구분해 조회 실패로 처리)
+        """
+        if not response.ok:
+            raise ProviderError(
+                f"KIS {what} 호출 실패 - status={response.status_code}, body={response.text[:200]}",
+                response.status_code,
+            )
+        payload = response.json()
+        if payload.get("rt_cd") != "0":
+            raise ProviderError(
+                f"KIS {what} 오류 응답 - rt_cd={payload.get('rt_cd')}, "
+                f"msg_cd={payload.get('msg_cd')}, msg={payload.get('msg1')}",
+                response.status_code,
+            )
+        return payload
+
     # =========================================================================
     # US Stock API
     # =========================================================================
@@ -151,6 +272,128 @@ class KisApi:
         Returns:
             캔들 데이터 리스트
         """
+        logger.info("[미국주식] %s 60분봉 조회 요청...", symbol)
+
+        _, output2 = self._request_us_candles_60m(symbol, exchange, count)
+        if not output2:
+            logger.warning("시세 데이터가 없습니다.")
+            return []
+
+        logger.info("=== %s 60분봉 데이터 (%d건) ===", symbol, len(output2))
+        return output2
+
+    def fetch_us_stock_candles_60m_history(
+        self,
+        symbol: str,
+        exchange: str = "NAS",
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        max_pages: int = 30,
+        page_size: int = MAX_60M_RECORDS_PER_PAGE,
+        request_delay: float = 0.5,
+    ) -> List[dict]:
+        """미국 주식 60분봉을 연속 조회(NEXT/KEYB)로 과거까지 페이징 조회합니다.
+
+        첫 요청은 NEXT="", KEYB=""로 최신 구간을 받고(end_time 지정 시 해당 시각부터),
+        이후에는 API 명세대로 직전 응답의 마지막(가장 오래된) 봉보다 1분 앞선 시각을
+        KEYB로 넘겨 이어 조회합니다. 이어 조회 여부는 output1의 next/more 플래그로
+        판단하므로 세션 사이 공백에서도 봉을 건너뛰거나 반복하지 않습니다.
+
+        Args:
+            symbol: 종목 코드 (예: AAPL, TSLA)
+            exchange: 거래소 코드 (NAS: 나스닥, NYS: 뉴욕, AMS: 아멕스)
+            start_time: 이 시각(현지 거래소 시간)까지 거슬러 조회. None이면 max_pages까지 조회
+            end_time: 이 시각(현지 거래소 시간)부터 과거로 조회. None이면 최신 봉부터 조회
+            max_pages: 최대 페이지 수 (무한 루프 방지)
+            page_size: 페이지당 조회 건수 (최대 120)
+            request_delay: 페이지 간 대기 시간 (초)
+
+        Returns:
+            캔들 데이터 리스트 (최신순, 중복 제거)
+
+        Raises:
+            ProviderError: 중간 페이지 호출 실패 (부분 이력을 조용히 반환하지 않음)
+        """
+        import time
+
+        page_size = min(page_size, MAX_60M_RECORDS_PER_PAGE)
+        all_candles: List[dict] = []
+        seen = set()
+        keyb = end_time.strftime("%Y%m%d%H%M%S") if end_time else ""
+
+        logger.info(
+            "[미국주식] %s 60분봉 연속 조회 시작 (start=%s, max_pages=%d)",
+            symbol,
+            start_time,
+            max_pages,
+        )
+
+        for i in range(max_pages):
+            output1, output2 = self._request_us_candles_60m(
+                symbol,
+                exchange,
+                page_size,
+                next_flag="1" if keyb else "",
+                keyb=keyb,
+            )
+            # 실패한 페이지는 위에서 ProviderError로 올라오므로, 여기서 비어 있으면 정말 끝난 것
+            if not output2:
+                break
+
+            oldest: Optional[datetime] = None
+            new_count = 0
+            for item in output2:
+                candle_time = _parse_kis_candle_time(item)
+                if candle_time is None:
+                    continue
+                if oldest is None or candle_time < oldest:
+                    oldest = candle_time
+                if start_time is not None and candle_time < start_time:
+                    continue
+                if end_time is not None and candle_time > end_time:
+                    continue
+                key = (item.get("xymd"), item.get("xhms"))
+                if key in seen:
+                    continue
+                seen.add(key)
+                all_candles.append(item)
+                new_count += 1
+
+            logger.info("  %d차 조회: %d건 (신규: %d건, 누적: %d건)", i + 1, len(output2), new_count, len(all_candles))
+
+            if (output1.get("next") or "0") != "1" and (output1.get("more") or "0") != "1":
+                break
+            if oldest is None or new_count == 0:
+                break
+            if start_time is not None and oldest <= start_time:
+                break
+
+            next_keyb = _next_60m_keyb(output2)
+            if not next_keyb or next_keyb == keyb:
+                break
+            keyb = next_keyb
+
+            time.sleep(request_delay)
+
+        logger.info("=== %s 60분봉 연속 조회 완료 (%d건) ===", symbol, len(all_candles))
+        return all_candles
+
+    def _request_us_candles_60m(
+        self,
+        symbol: str,
+        exchange: str,
+        count: int,
+        next_flag: str = "",
+        keyb: str = "",
+    ) -> Tuple[dict, List[dict]]:
+        """해외주식 분봉 API를 1회 호출합니다.
+
+        Returns:
+            (output1, output2) - output1은 연속 조회 플래그(next/more), output2는 캔들 목록
+
+        Raises:
+            ProviderError: 호출 실패 (빈 목록은 정상 응답에 데이터가 없을 때만 반환)
+        """
         url = f"{self.base_url}/uapi/overseas-price/v1/quotations/inquire-time-itemchartprice"
         headers = self._get_headers("HHDFS76950200")
         params = {
@@ -159,30 +402,18 @@ class KisApi:
             "SYMB": symbol.upper(),
             "NMIN": "60",
             "PINC": "1",
-            "NEXT": "",
+            "NEXT": next_flag,
             "NREC": str(count),
             "FILL": "",
-            "KEYB": "",
+            "KEYB": keyb,
         }
 
-        logger.info("[미국주식] %s 60분봉 조회 요청...", symbol)
-
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-
-        if not response.ok:
-            logger.error("API 호출 실패 - status=%s, body=%s", response.status_code, response.text)
-            return []
-
-        payload = response.json()
+        response = http().get(url, headers=headers, params=params, timeout=request_timeout(10))
+        self._raise_for_credential_error(response)
+        payload = self._payload(response, f"{symbol} 60분봉")
         logger.info("응답 코드: %s, 메시지: %s", payload.get("rt_cd"), payload.get("msg1"))
 
-        output2 = payload.get("output2") or []
-        if not output2:
-            logger.warning("시세 데이터가 없습니다.")
-            return []
-
-        logger.info("=== %s 60분봉 데이터 (%d건) ===", symbol, len(output2))
-        return output2
+        return payload.get("output1") or {}, payload.get("output2") or []
 
     def fetch_us_stock_candles_daily(self, symbol: str, exchange: str = "NAS", count: int = 30) -> List[dict]:
         """미국 주식 일봉 데이터를 조회합니다.
@@ -208,7 +439,8 @@ class KisApi:
 
         logger.info("[미국주식] %s 일봉 조회 요청...", symbol)
 
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = http().get(url, headers=headers, params=params, timeout=request_timeout(10))
+        self._raise_for_credential_error(response)
 
         if not response.ok:
             logger.error("API 호출 실패 - status=%s, body=%s", response.status_code, response.text)
@@ -258,7 +490,8 @@ class KisApi:
                 "MODP": "1",
             }
 
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = http().get(url, headers=headers, params=params, timeout=request_timeout(10))
+            self._raise_for_credential_error(response)
 
             if not response.ok:
                 logger.error("API 호출 실패 - status=%s, body=%s", response.status_code, response.text)
@@ -291,6 +524,77 @@ class KisApi:
         logger.info("=== %s 1년치 일봉 조회 완료 (%d건) ===", symbol, len(all_candles))
         return all_candles
 
+    def fetch_us_stock_candles_daily_range(
+        self,
+        symbol: str,
+        exchange: str = "NAS",
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        max_iterations: int = 10,
+        request_delay: float = 0.5,
+    ) -> List[dict]:
+        """미국 주식 일봉을 기간 지정으로 조회합니다 (BYMD 기준 페이징).
+
+        누락 구간 복구용으로, end_date부터 과거로 필요한 페이지만 조회합니다.
+
+        Args:
+            symbol: 종목 코드 (예: AAPL, TSLA)
+            exchange: 거래소 코드 (NAS: 나스닥, NYS: 뉴욕, AMS: 아멕스)
+            start_date: 시작일 (포함). None이면 max_iterations까지 조회
+            end_date: 종료일 (포함). None이면 최신 일자부터 조회
+            max_iterations: 최대 페이지 수
+            request_delay: 페이지 간 대기 시간 (초)
+
+        Returns:
+            기간 내 캔들 데이터 리스트
+
+        Raises:
+            ProviderError: 페이지 조회 실패 (일부만 받은 결과를 반환하지 않음)
+        """
+        import time
+
+        start_ymd = start_date.strftime("%Y%m%d") if start_date else ""
+        end_ymd = end_date.strftime("%Y%m%d") if end_date else ""
+        bymd = end_ymd
+        all_candles: List[dict] = []
+
+        logger.info("[미국주식] %s 일봉 기간 조회 (%s ~ %s)", symbol, start_date, end_date)
+
+        for i in range(max_iterations):
+            url = f"{self.base_url}/uapi/overseas-price/v1/quotations/dailyprice"
+            headers = self._get_headers("HHDFS76240000")
+            params = {
+                "AUTH": "",
+                "EXCD": exchange,
+                "SYMB": symbol.upper(),
+                "GUBN": "0",  # 0: 일봉
+                "BYMD": bymd,
+                "MODP": "1",
+            }
+
+            response = http().get(url, headers=headers, params=params, timeout=request_timeout(10))
+            self._raise_for_credential_error(response)
+            # 중간 페이지 실패를 조회 끝으로 보면 일부 기간만 성공으로 저장되므로 예외로 올림
+            output2 = self._payload(response, f"{symbol} 일봉 {i + 1}차").get("output2") or []
+            if not output2:
+                break
+
+            all_candles.extend(
+                item for item in output2
+                if (not start_ymd or item.get("xymd", "") >= start_ymd)
+                and (not end_ymd or item.get("xymd", "") <= end_ymd)
+            )
+
+            last_date = output2[-1].get("xymd")
+            if not last_date or last_date == bymd or (start_ymd and last_date <= start_ymd):
+                break
+            bymd = last_date
+
+            time.sleep(request_delay)
+
+        logger.info("=== %s 일봉 기간 조회 완료 (%d건) ===", symbol, len(all_candles))
+        return all_candles
+
     def fetch_us_stock_price(self, symbol: str, exchange: str = "NAS") -> Optional[dict]:
         """미국 주식 현재가를 조회합니다.
 
@@ -311,7 +615,8 @@ class KisApi:
 
         logger.info("[미국주식] %s 현재가 조회 요청...", symbol)
 
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = http().get(url, headers=headers, params=params, timeout=request_timeout(10))
+        self._raise_for_credential_error(response)
 
         if not response.ok:
             logger.error("API 호출 실패 - status=%s, body=%s", response.status_code, response.text)
@@ -349,7 +654,8 @@ class KisApi:
 
         logger.info("[국내주식] %s 1시간봉 조회 요청...", symbol)
 
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = http().get(url, headers=headers, params=params, timeout=request_timeout(10))
+        self._raise_for_credential_error(response)
 
         if not response.ok:
             logger.error("API 호출 실패 - status=%s, body=%s", response.status_code, response.text)
@@ -384,7 +690,8 @@ class KisApi:
 
         logger.info("[국내주식] %s 현재가 조회 요청...", symbol)
 
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = http().get(url, headers=headers, params=params, timeout=request_timeout(10))
+        self._raise_for_credential_error(response)
 
         if not response.ok:
             logger.error("API 호출 실패 - status=%s, body=%s", response.status_code, response.text)
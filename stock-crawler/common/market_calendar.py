@@ -0,0 +1,109 @@
+"""미국 증시 거래일 캘린더.
+
+NYSE/NASDAQ 정규 휴장일 규칙으로 거래일 그리드를 생성합니다.
+임시 휴장(국장일, 기상 악화 등)은 포함하지 않습니다.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import List
+
+import numpy as np
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """해당 월의 n번째 요일을 반환합니다. (weekday: 월=0 ~ 일=6)"""
+    first = date(year, month, 1)
+    offset = (weekday - first.weekday()) % 7
+    return first + timedelta(days=offset + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    """해당 월의 마지막 요일을 반환합니다."""
+    if month == 12:
+        last = date(year, 12, 31)
+    else:
+        last = date(year, month + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """부활절 일자를 계산합니다. (그레고리력, Anonymous 알고리즘)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date) -> date:
+    """주말 휴일의 대체 휴장일을 반환합니다. (토→금, 일→월)"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def us_market_holidays(start_year: int, end_year: int) -> List[date]:
+    """기간 내 미국 증시 정규 휴장일 목록을 반환합니다.
+
+    Args:
+        start_year: 시작 연도
+        end_year: 종료 연도 (포함)
+
+    Returns:
+        휴장일 리스트 (정렬됨)
+    """
+    holidays = []
+    for year in range(start_year, end_year + 1):
+        new_year = date(year, 1, 1)
+        # 1/1이 토요일이면 전년도 12/31은 휴장하지 않음 (NYSE 규칙)
+        if new_year.weekday() != 5:
+            holidays.append(_observed(new_year))
+        holidays.append(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+        holidays.append(_nth_weekday(year, 2, 0, 3))  # Presidents' Day
+        holidays.append(_easter(year) - timedelta(days=2))  # Good Friday
+        holidays.append(_last_weekday(year, 5, 0))  # Memorial Day
+        if year >= 2022:
+            holidays.append(_observed(date(year, 6, 19)))  # Juneteenth
+        holidays.append(_observed(date(year, 7, 4)))  # Independence Day
+        holidays.append(_nth_weekday(year, 9, 0, 1))  # Labor Day
+        holidays.append(_nth_weekday(year, 11, 3, 4))  # Thanksgiving
+        holidays.append(_observed(date(year, 12, 25)))  # Christmas
+    return sorted(holidays)
+
+
+def trading_days(start: date, end: date) -> np.ndarray:
+    """기간 내 거래일 그리드를 반환합니다.
+
+    Args:
+        start: 시작일 (포함)
+        end: 종료일 (포함)
+
+    Returns:
+        datetime64[D] 배열 (오름차순)
+    """
+    if end < start:
+        return np.array([], dtype="datetime64[D]")
+
+    holidays = np.array(us_market_holidays(start.year, end.year), dtype="datetime64[D]")
+    days = np.arange(
+        np.datetime64(start, "D"),
+        np.datetime64(end, "D") + 1,
+        dtype="datetime64[D]",
+    )
+    return days[np.is_busday(days, holidays=holidays)]
+
+
+def previous_trading_day(day: date) -> date:
+    """주어진 날짜 이전(미포함)의 가장 최근 거래일을 반환합니다."""
+    holidays = np.array(us_market_holidays(day.year - 1, day.year + 1), dtype="datetime64[D]")
+    prev = np.busday_offset(np.datetime64(day, "D"), -1, roll="forward", holidays=holidays)
+    return prev.astype(date)
@@ -0,0 +1,311 @@
+"""프로세스 내 메트릭 레지스트리와 Prometheus 텍스트 형식 HTTP 엔드포인트.
+
+카운터, 게이지, 히스토그램을 모듈 전역 레지스트리(REGISTRY)에 등록하고
+start_metrics_server()로 띄운 HTTP 서버의 /metrics 경로에서 Prometheus 텍스트 형식으로 내보냅니다.
+외부 의존성 없이 표준 라이브러리만 사용합니다.
+
+    REQUESTS = counter("stock_crawler_requests_total", "요청 수", ("provider",))
+    REQUESTS.labels(provider="kis").inc()
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 기본 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+class _Metric:
+    """레이블별 값을 보관하는 메트릭의 공통 부분."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 레이블이 맞지 않습니다 (필요: {self.labelnames}, 입력: {tuple(labels)})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def labels(self, **labels) -> "_Child":
+        """레이블 값을 고정한 자식 메트릭을 반환합니다."""
+        return _Child(self, self._key(labels))
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(이름 접미사, 레이블 문자열, 값) 목록."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class _Child:
+    """레이블 값이 고정된 메트릭."""
+
+    def __init__(self, metric: _Metric, key: LabelValues):
+        self._metric = metric
+        self._key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._metric._inc(self._key, amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._metric._inc(self._key, -amount)
+
+    def set(self, value: float) -> None:
+        self._metric._set(self._key, value)
+
+    def observe(self, value: float) -> None:
+        self._metric._observe(self._key, value)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Counter(_Metric):
+    """단조 증가 카운터."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0) -> None:
+        """레이블이 없는 카운터를 증가시킵니다."""
+        self._inc(self._key({}), amount)
+
+    def _inc(self, key: LabelValues, amount: float) -> None:
+        if amount < 0:
+            raise ValueError(f"{self.name}: 카운터는 감소할 수 없습니다.")
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    """임의로 오르내리는 값. set_function으로 수집 시점에 값을 계산할 수도 있습니다."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], Union[float, Dict[LabelValues, float]]]] = None
+
+    def set(self, value: float) -> None:
+        self._set(self._key({}), value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._inc(self._key({}), amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._inc(self._key({}), -amount)
+
+    def set_function(self, function: Callable[[], Union[float, Dict[LabelValues, float]]]) -> None:
+        """수집할 때마다 호출할 함수를 지정합니다.
+
+        Args:
+            function: 레이블이 없으면 값, 있으면 {레이블 값 튜플: 값}을 반환하는 함수
+        """
+        self._function = function
+
+    def _set(self, key: LabelValues, value: float) -> None:
+        with self._lock:
+            self._values[key] = float(value)
+
+    def _inc(self, key: LabelValues, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception as e:
+                logger.warning("%s: 게이지 값 계산 실패 - %s", self.name, e)
+                return []
+            items = sorted(value.items()) if isinstance(value, dict) else [((), value)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [("", _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    """구간별 누적 관측 수와 합계."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블별 [구간별 관측 수..., +Inf 관측 수], 합계
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float) -> None:
+        self._observe(self._key({}), value)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        with _Child(self, self._key({})).time():
+            yield
+
+    def _observe(self, key: LabelValues, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        samples = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                samples.append(("_bucket", _format_labels(self.labelnames, key, le), cumulative))
+            samples.append(("_sum", _format_labels(self.labelnames, key), total))
+            samples.append(("_count", _format_labels(self.labelnames, key), cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """이름별 메트릭 모음. 같은 이름으로 다시 등록하면 기존 메트릭을 반환합니다."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, help_text: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"{name}: 다른 형식/레이블로 이미 등록된 메트릭입니다.")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """모든 메트릭을 Prometheus 텍스트 형식으로 반환합니다."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        # 수집기 스크레이프마다 접근 로그를 남기지 않음
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY) -> Optional[ThreadingHTTPServer]:
+    """백그라운드 스레드에서 /metrics 엔드포인트를 엽니다.
+
+    Args:
+        port: 포트 (0 이하이면 열지 않음)
+        host: 바인드 주소
+        registry: 내보낼 레지스트리
+
+    Returns:
+        HTTP 서버. 열지 않았거나 포트를 사용할 수 없으면 None (수집은 계속 진행)
+    """
+    if port <= 0:
+        return None
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        logger.error("메트릭 엔드포인트를 열 수 없습니다 (%s:%d) - %s", host, port, e)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("메트릭 엔드포인트: http://%s:%d/metrics", host, server.server_address[1])
+    return server
@@ -0,0 +1,137 @@
+"""일봉 패널 디스크 캐시 (메모리 매핑).
+
+백테스트처럼 같은 기간의 패널을 반복해서 읽는 작업을 위해 패널을 필드별 .npy 파일로 저장하고,
+다시 읽을 때는 np.load(mmap_mode="r")로 매핑만 합니다. 여러 프로세스가 같은 캐시를 열면
+운영체제 페이지 캐시를 공유하므로 종목 묶음(행 범위)을 나눠 읽어도 DB 조회와 복사가 없습니다.
+
+캐시 키는 (종목 목록, 시작일, 종료일, 소스 우선순위)의 해시입니다.
+종료일이 최근(STABLE_AFTER_DAYS 이내)이면 재수집으로 값이 바뀔 수 있으므로 max_age_hours가 지나면 다시 읽습니다.
+
+    panel_cache/<키>/
+        meta.json       # 종목 목록, 기간, 생성 시각
+        days.npy        # datetime64[D]
+        open.npy ... volume.npy   # float64 (종목 × 거래일), C 연속 배열
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import date, timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .daily_panel import SOURCE_PRIORITY, DailyPanel, load_daily_panel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PANEL_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "panel_cache")
+
+# 종료일이 오늘보다 이만큼 이전이면 재수집 영향이 없다고 보고 캐시를 만료하지 않음
+STABLE_AFTER_DAYS = 7
+
+_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def panel_cache_key(
+    symbols: Optional[Sequence[str]],
+    start: date,
+    end: date,
+    source_priority: Sequence[str] = SOURCE_PRIORITY,
+) -> str:
+    """캐시 디렉토리 이름. symbols가 None이면 '활성 티커 전체'로 구분합니다."""
+    payload = json.dumps(
+        {
+            "symbols": None if symbols is None else sorted(s.upper() for s in symbols),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "source_priority": list(source_priority),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def save_panel(panel: DailyPanel, path: str, meta: Optional[dict] = None) -> None:
+    """패널을 디렉토리에 저장합니다. 임시 디렉토리에 쓴 뒤 이름을 바꾸므로 읽는 쪽이 반쯤 쓴 캐시를 보지 않습니다."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "days.npy"), np.ascontiguousarray(panel.days))
+    for field in _FIELDS:
+        np.save(os.path.join(tmp, f"{field}.npy"), np.ascontiguousarray(getattr(panel, field), dtype=np.float64))
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(dict(meta or {}, symbols=list(panel.symbols), created_at=time.time()), f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+
+def open_panel(path: str, rows: Optional[slice] = None) -> DailyPanel:
+    """저장된 패널을 메모리 매핑으로 엽니다.
+
+    Args:
+        path: save_panel로 저장한 디렉토리
+        rows: 일부 종목만 쓸 때의 행 범위 (매핑된 배열의 뷰라 복사하지 않음)
+    """
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    rows = rows or slice(None)
+    fields = {field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode="r")[rows] for field in _FIELDS}
+    return DailyPanel(
+        symbols=meta["symbols"][rows],
+        days=np.load(os.path.join(path, "days.npy")),
+        **fields,
+    )
+
+
+def _is_fresh(path: str, end: date, max_age_hours: float) -> bool:
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    if end < date.today() - timedelta(days=STABLE_AFTER_DAYS):
+        return True
+    return time.time() - os.path.getmtime(meta_path) < max_age_hours * 3600
+
+
+def cached_panel_path(
+    start: date,
+    end: Optional[date] = None,
+    symbols: Optional[Sequence[str]] = None,
+    source_priority: Sequence[str] = SOURCE_PRIORITY,
+    cache_dir: Optional[str] = None,
+    max_age_hours: float = 12.0,
+    refresh: bool = False,
+) -> str:
+    """기간의 패널 캐시 경로를 반환합니다. 캐시가 없거나 만료되었으면 DB에서 읽어 새로 만듭니다.
+
+    Args:
+        start: 시작 날짜
+        end: 마지막 날짜 (None이면 오늘)
+        symbols: 종목 목록 (None이면 활성 티커 전체)
+        source_priority: 같은 날짜에 여러 소스가 있을 때 우선순위
+        cache_dir: 캐시 루트 디렉토리 (None이면 PANEL_CACHE_DIR 또는 panel_cache)
+        max_age_hours: 최근 기간 캐시의 유효 시간
+        refresh: 캐시를 무시하고 다시 읽을지 여부
+    """
+    end = end or date.today()
+    cache_dir = cache_dir or os.getenv("PANEL_CACHE_DIR", DEFAULT_PANEL_CACHE_DIR)
+    path = os.path.join(cache_dir, panel_cache_key(symbols, start, end, source_priority))
+    if not refresh and _is_fresh(path, end, max_age_hours):
+        logger.info("일봉 패널 캐시 사용: %s", path)
+        return path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    started = time.perf_counter()
+    panel = load_daily_panel(symbols=symbols, start=start, end=end, source_priority=source_priority)
+    save_panel(panel, path, {"start": start.isoformat(), "end": end.isoformat(), "source_priority": list(source_priority)})
+    logger.info("일봉 패널 캐시 저장: %s (%d종목 × %d거래일, %.1fs)", path, panel.shape[0], panel.shape[1], time.perf_counter() - started)
+    return path
+
+
+def load_daily_panel_cached(start: date, end: Optional[date] = None, **kwargs) -> DailyPanel:
+    """캐시를 거쳐 일봉 패널을 읽습니다. 인자는 cached_panel_path와 같습니다."""
+    return open_panel(cached_panel_path(start, end, **kwargs))
@@ -0,0 +1,307 @@
+"""눌림목/시그널 조건 파라미터 탐색.
+
+docs/pullback-screening-design.md와 stock-dashboard/docs/SIGNAL_ANALYSIS.md의 조건 기준값
+(눌림 5~15% / 15~30%, 거래량 비율 < 1.0, 고점 이후 2~10일, 5일 횡보 4% 이내)을
+격자 또는 무작위 표본으로 바꿔 가며 백테스트하고 성과 순으로 정렬합니다.
+
+    - 지표(daily_features)와 기준 고점 구간별 눌림 비율/고점 이후 경과 일수는 부모 프로세스가 한 번만 계산해
+      공유 메모리(multiprocessing.shared_memory)에 둡니다.
+    - 작업 프로세스는 공유 메모리를 복사 없이 NumPy 배열로 붙여 쓰고, 파라미터 묶음마다 진입 신호 행렬을 만들어
+      backtest.simulate로 거래를 시뮬레이션합니다. 파라미터 하나당 비용은 행렬 비교 몇 번과 시뮬레이션 한 번입니다.
+
+진입 조건 (모두 충족, min_conditions를 지정하면 그 개수 이상):
+    - 상승 추세: MA20 > MA60 (require_uptrend)
+    - 눌림 비율: 최근 high_window봉 고점 대비 하락률이 [pullback_min_pct, pullback_max_pct]
+    - 거래량 비율: 5일 평균 / 20일 평균 < max_volume_ratio
+    - 조정 기간: 고점 이후 달력 일수가 [duration_min_days, duration_max_days] (같은 고점이 여러 번이면 최근 봉 기준)
+    - 횡보: 최근 5봉 (최고가 - 최저가) / 최저가 × 100 <= max_consolidation_pct
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields
+from datetime import date, timedelta
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .backtest import BacktestStats, ExitRule, simulate, summarize
+from .daily_features import WINDOW_BARS, DailyFeatures, compute_daily_features, rolling_high, value_back
+from .panel_cache import cached_panel_path, open_panel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SweepParams:
+    """탐색할 조건 기준값 한 조합. None인 조건은 평가하지 않습니다."""
+
+    high_window: int = 14
+    pullback_min_pct: float = 15.0
+    pullback_max_pct: float = 30.0
+    max_volume_ratio: Optional[float] = 1.0
+    duration_min_days: int = 2
+    duration_max_days: int = 10
+    max_consolidation_pct: Optional[float] = 4.0
+    require_uptrend: bool = True
+    min_conditions: Optional[int] = None  # None이면 모든 조건 충족
+
+    def label(self) -> str:
+        volume = "-" if self.max_volume_ratio is None else f"{self.max_volume_ratio:g}"
+        consolidation = "-" if self.max_consolidation_pct is None else f"{self.max_consolidation_pct:g}"
+        return (
+            f"H{self.high_window} PB{self.pullback_min_pct:g}-{self.pullback_max_pct:g} V<{volume} "
+            f"D{self.duration_min_days}-{self.duration_max_days} C<={consolidation}"
+        )
+
+
+# 기본 탐색 공간: 두 문서의 기준값과 그 주변
+DEFAULT_SPACE: Dict[str, Sequence] = {
+    "high_window": (14, 60, 252),
+    "pullback_min_pct": (5.0, 10.0, 15.0),
+    "pullback_max_pct": (15.0, 20.0, 30.0),
+    "max_volume_ratio": (0.8, 1.0, 1.2),
+    "duration_min_days": (2, 5),
+    "duration_max_days": (10, 15),
+    "max_consolidation_pct": (4.0, 6.0, None),
+}
+
+# 정렬 기준: 이름 → BacktestStats 필드
+RANK_KEYS = {
+    "avg_return": "avg_return_pct",
+    "hit_rate": "hit_rate",
+    "profit_factor": "profit_factor",
+    "total_return": "total_return_pct",
+    "drawdown": "max_drawdown_pct",
+}
+
+
+@dataclass
+class SweepResult:
+    rank: int
+    params: SweepParams
+    stats: BacktestStats
+
+
+def _valid(params: SweepParams) -> bool:
+    return params.pullback_min_pct < params.pullback_max_pct and params.duration_min_days <= params.duration_max_days
+
+
+def parameter_grid(space: Dict[str, Sequence]) -> List[SweepParams]:
+    """탐색 공간의 모든 조합 (최솟값 > 최댓값인 조합 제외)."""
+    names = list(space)
+    combos = (SweepParams(**dict(zip(names, values))) for values in itertools.product(*(space[n] for n in names)))
+    return [params for params in combos if _valid(params)]
+
+
+def parameter_sample(space: Dict[str, Sequence], samples: int, seed: Optional[int] = None) -> List[SweepParams]:
+    """탐색 공간에서 중복 없이 무작위로 고른 조합."""
+    grid = parameter_grid(space)
+    if samples >= len(grid):
+        return grid
+    return random.Random(seed).sample(grid, samples)
+
+
+def sweep_signals(f: DailyFeatures, pullback_pct: np.ndarray, days_since_high: np.ndarray, params: SweepParams) -> np.ndarray:
+    """조합 하나의 (종목, 봉) 진입 신호.
+
+    Args:
+        f: 지표 행렬
+        pullback_pct: params.high_window 고점 대비 눌림 비율 행렬
+        days_since_high: params.high_window 고점 이후 달력 일수 행렬
+        params: 조건 기준값
+    """
+    conditions = [
+        (pullback_pct >= params.pullback_min_pct) & (pullback_pct <= params.pullback_max_pct),
+        (days_since_high >= params.duration_min_days) & (days_since_high <= params.duration_max_days),
+    ]
+    if params.require_uptrend:
+        conditions.append(f.ma20 > f.ma60)
+    if params.max_volume_ratio is not None:
+        conditions.append(f.volume_ratio < params.max_volume_ratio)
+    if params.max_consolidation_pct is not None:
+        conditions.append((f.low_5d > 0) & (f.consolidation_rate <= params.max_consolidation_pct))
+    required = len(conditions) if params.min_conditions is None else min(params.min_conditions, len(conditions))
+    return (np.sum(conditions, axis=0) >= required) & (f.position >= 59)
+
+
+# 작업 프로세스에 붙인 공유 메모리와 배열
+_shared: Dict[str, object] = {}
+
+
+def _attach(spec: Dict[str, tuple]) -> Tuple[List[SharedMemory], Dict[str, np.ndarray]]:
+    blocks = []
+    arrays = {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    return blocks, arrays
+
+
+_FEATURE_FIELDS = tuple(field.name for field in fields(DailyFeatures) if field.name != "symbols")
+
+
+def _init_worker(spec: Dict[str, tuple], symbols: List[str], start_day: int) -> None:
+    logging.basicConfig(level=logging.WARNING)
+    blocks, arrays = _attach(spec)
+    features = DailyFeatures(symbols=symbols, **{name: arrays[name] for name in _FEATURE_FIELDS})
+    _shared.update(blocks=blocks, arrays=arrays, features=features, start_day=start_day)
+
+
+def _evaluate(batch: Sequence[SweepParams], exit_rule: ExitRule) -> List[Tuple[SweepParams, BacktestStats]]:
+    """파라미터 묶음을 평가합니다. (작업 프로세스에서 실행)"""
+    f: DailyFeatures = _shared["features"]
+    arrays: Dict[str, np.ndarray] = _shared["arrays"]
+    in_range = f.day >= _shared["start_day"]
+    results = []
+    for params in batch:
+        entries = sweep_signals(f, arrays[f"pullback_{params.high_window}"], arrays[f"since_high_{params.high_window}"], params)
+        results.append((params, summarize(params.label(), simulate(f, entries & in_range, exit_rule))))
+    return results
+
+
+def _compute_shared_features(
+    path: str, start: date, high_windows: Sequence[int], shard_size: int, blocks: List[SharedMemory]
+) -> Tuple[Dict[str, tuple], List[str]]:
+    """캐시된 패널을 종목 묶음별로 계산해 신호 구간(start 이후) 열만 공유 메모리에 씁니다.
+
+    Args:
+        blocks: 만든 공유 메모리 블록을 추가할 목록 (호출한 쪽이 해제)
+
+    Returns:
+        (이름 → (블록 이름, shape, dtype), 종목 목록)
+    """
+    panel = open_panel(path)
+    # 오른쪽 정렬 기준으로 start 이후 봉이 가장 많은 종목까지 덮는 열만 남김 (앞 구간은 지표 계산에만 사용)
+    width = int(((panel.days >= np.datetime64(start, "D")) & ~np.isnan(panel.close)).sum(axis=1).max(initial=0))
+    width = max(width, 1)
+
+    spec: Dict[str, tuple] = {}
+    arrays: Dict[str, np.ndarray] = {}
+    for begin in range(0, panel.shape[0], shard_size):
+        rows = slice(begin, min(begin + shard_size, panel.shape[0]))
+        f = compute_daily_features(open_panel(path, rows))
+        columns = slice(f.shape[1] - width, None)
+        parts = {name: getattr(f, name)[:, columns] for name in _FEATURE_FIELDS}
+        for window in high_windows:
+            high, back = rolling_high(f.high, window, latest=True)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                parts[f"pullback_{window}"] = ((high - f.close) / high * 100.0)[:, columns]
+            parts[f"since_high_{window}"] = (f.day - value_back(f.day, back))[:, columns]
+        for name, values in parts.items():
+            if name not in arrays:
+                shape = (panel.shape[0], width)
+                block = SharedMemory(create=True, size=max(int(np.prod(shape)) * values.dtype.itemsize, 1))
+                blocks.append(block)
+                arrays[name] = np.ndarray(shape, values.dtype, buffer=block.buf)
+                spec[name] = (block.name, shape, values.dtype.str)
+            arrays[name][rows] = values
+    logger.info(
+        "파라미터 탐색 지표: %d종목 × %d봉 (%d개 배열, %.0fMB 공유), 신호 시작 %s",
+        panel.shape[0],
+        width,
+        len(arrays),
+        sum(a.nbytes for a in arrays.values()) / 1e6,
+        start,
+    )
+    return spec, list(panel.symbols)
+
+
+def run_sweep(
+    params: Sequence[SweepParams],
+    exit_rule: ExitRule = ExitRule(),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    symbols: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 8,
+    rank_by: str = "avg_return",
+    min_trades: int = 30,
+    shard_size: int = 250,
+    cache_dir: Optional[str] = None,
+    refresh: bool = False,
+) -> List[SweepResult]:
+    """조합들을 백테스트하고 순위를 매깁니다.
+
+    Args:
+        params: 탐색할 조합 (parameter_grid / parameter_sample)
+        exit_rule: 모든 조합에 공통으로 쓰는 청산 규칙
+        start: 첫 신호일 (None이면 3년 전)
+        end: 마지막 거래일 (None이면 오늘)
+        symbols: 종목 목록 (None이면 활성 티커 전체)
+        workers: 프로세스 수 (None이면 CPU 수)
+        batch_size: 작업 하나에 담을 조합 수
+        rank_by: 정렬 기준 (RANK_KEYS)
+        min_trades: 거래 수가 이보다 적은 조합은 순위 뒤로
+        shard_size: 지표를 계산할 때 한 번에 처리할 종목 수
+        cache_dir: 패널 캐시 디렉토리
+        refresh: 패널 캐시를 무시하고 DB에서 다시 읽을지 여부
+
+    Returns:
+        순위 순서의 결과
+    """
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f"알 수 없는 정렬 기준: {rank_by} (사용 가능: {', '.join(RANK_KEYS)})")
+    params = [p for p in params if _valid(p)]
+    if not params:
+        return []
+    end = end or date.today()
+    start = start or end - timedelta(days=365 * 3)
+    load_start = start - timedelta(days=WINDOW_BARS * 2)
+
+    started = time.perf_counter()
+    path = cached_panel_path(load_start, end, symbols=symbols, cache_dir=cache_dir, refresh=refresh)
+    start_day = int((np.datetime64(start, "D") - np.datetime64("1970-01-01", "D")).astype(np.int64))
+    batches = [list(params[i:i + batch_size]) for i in range(0, len(params), batch_size)]
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    blocks: List[SharedMemory] = []
+    evaluated: List[Tuple[SweepParams, BacktestStats]] = []
+    try:
+        spec, names = _compute_shared_features(path, start, sorted({p.high_window for p in params}), shard_size, blocks)
+        prepared = time.perf_counter()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(spec, names, start_day)
+        ) as pool:
+            futures = [pool.submit(_evaluate, batch, exit_rule) for batch in batches]
+            for future in as_completed(futures):
+                evaluated.extend(future.result())
+                logger.info("파라미터 탐색: %d/%d", len(evaluated), len(params))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    key = RANK_KEYS[rank_by]
+
+    def sort_key(item: Tuple[SweepParams, BacktestStats]):
+        value = getattr(item[1], key)
+        return (item[1].trades < min_trades, value is None, -(value if value is not None else 0.0), -item[1].trades)
+
+    evaluated.sort(key=sort_key)
+    logger.info(
+        "파라미터 탐색 완료: %d개 조합 - 지표 %.1fs, 평가 %.1fs (프로세스 %d개)",
+        len(evaluated),
+        prepared - started,
+        time.perf_counter() - prepared,
+        workers,
+    )
+    return [SweepResult(rank=i, params=p, stats=s) for i, (p, s) in enumerate(evaluated, start=1)]
+
+
+def sweep_rows(results: Sequence[SweepResult]) -> List[dict]:
+    """CSV 저장용 행 (순위, 파라미터, 성과)."""
+    rows = []
+    for result in results:
+        stats = asdict(result.stats)
+        stats.pop("rule_set")
+        rows.append({"rank": result.rank, **asdict(result.params), **stats})
+    return rows
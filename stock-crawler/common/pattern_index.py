@@ -0,0 +1,350 @@
+"""차트 모양 유사도 검색 (정규화한 N봉 수익률·거래량 윈도우 인덱스).
+
+활성 티커 전체의 일봉 이력에서 종목마다 STRIDE봉 간격으로 N봉 윈도우를 잘라 벡터로 만들고,
+float32 행렬 하나(윈도우 × 2N)로 디스크에 저장합니다. 검색은 이 행렬을 메모리 매핑한 뒤
+질의 벡터와의 내적(BLAS 행렬-벡터 곱) 한 번으로 모든 윈도우의 코사인 유사도를 구하는 전수 검색이라,
+수천 종목 × 수년치(백만 개 이상의 윈도우)도 수십 밀리초 안에 끝납니다.
+
+윈도우 벡터:
+    - 가격: 윈도우 시작 대비 누적 로그 수익률 경로를 평균 0, 표준편차 1로 정규화 (가격 수준·변동성 무관)
+    - 거래량: log(1 + 거래량)을 같은 방식으로 정규화하고 VOLUME_WEIGHT를 곱함
+    - 두 부분을 이어 붙여 길이 1로 정규화하므로 내적이 곧 코사인 유사도
+
+method="dtw"이면 코사인 상위 후보를 가격 경로의 DTW(Sakoe-Chiba 밴드) 거리로 다시 정렬합니다.
+시간 축이 며칠 밀리거나 늘어난 비슷한 모양을 더 잘 잡고, 후보 전체에 대해 벡터 연산으로 계산합니다.
+
+인덱스는 하루 한 번(장 마감 후) 다시 만들며 PATTERN_INDEX_DIR(기본 pattern_index/)에 저장합니다.
+
+    pattern_index/
+        meta.json        # 윈도우 길이, 간격, 종목 목록, 생성 시각
+        vectors.npy      # float32 (윈도우 수 × 2N), 종목 순서로 정렬
+        symbols.npy      # int32 윈도우별 종목 번호
+        days.npy         # datetime64[D] 윈도우 마지막 봉 날짜
+        forward.npy      # float32 윈도우 이후 FORWARD_BARS봉 수익률 (%), 아직 없으면 NaN
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .daily_panel import DailyPanel
+from .panel_cache import cached_panel_path, open_panel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERN_INDEX_DIR = os.path.join(os.path.dirname(__file__), "..", "pattern_index")
+
+# 윈도우 길이 (봉)와 윈도우를 자르는 간격 (봉). 종목별 최신 봉에서 끝나는 윈도우는 항상 포함
+WINDOW_BARS = 20
+STRIDE = 5
+# 인덱스에 넣는 이력 기간 (년)
+HISTORY_YEARS = 5
+# 거래량 부분의 가중치 (가격 경로 대비)
+VOLUME_WEIGHT = 0.5
+# 매칭된 윈도우 이후 수익률을 함께 저장하는 구간 (봉)
+FORWARD_BARS = (5, 20)
+# DTW 재정렬 밴드 폭 (봉)과 후보 수 (top_k 배수)
+DTW_BAND = 2
+DTW_CANDIDATES = 20
+# 한 번에 벡터로 만드는 종목 수
+BUILD_CHUNK = 500
+
+
+@dataclass
+class PatternMatch:
+    """검색 결과 윈도우 하나."""
+
+    symbol: str
+    end_day: date  # 윈도우 마지막 봉 날짜
+    similarity: float  # 코사인 유사도 (-1~1)
+    distance: Optional[float]  # DTW 거리 (method="dtw"일 때만)
+    forward: List[Optional[float]]  # FORWARD_BARS봉 이후 수익률 (%)
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    """마지막 축 기준 평균 0, 표준편차 1. 변화가 없는 윈도우는 0."""
+    centered = values - values.mean(axis=-1, keepdims=True)
+    std = centered.std(axis=-1, keepdims=True)
+    return np.divide(centered, std, out=np.zeros_like(centered), where=std > 1e-12)
+
+
+def window_vectors(close: np.ndarray, volume: np.ndarray, volume_weight: float = VOLUME_WEIGHT) -> np.ndarray:
+    """N+1개 종가와 N개 거래량 윈도우를 길이 1인 float32 벡터(2N)로 만듭니다.
+
+    Args:
+        close: (..., N+1) 종가 (첫 값은 윈도우 직전 봉)
+        volume: (..., N) 거래량
+
+    Returns:
+        (..., 2N) 벡터. 값이 없거나(NaN) 가격이 움직이지 않은 윈도우는 0 벡터
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        path = np.log(close[..., 1:] / close[..., :1])
+    vectors = np.concatenate([_zscore(path), volume_weight * _zscore(np.log1p(volume))], axis=-1)
+    vectors[~np.isfinite(vectors).all(axis=-1)] = 0.0
+    norm = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norm, out=np.zeros_like(vectors), where=norm > 0).astype(np.float32)
+
+
+def panel_windows(panel: DailyPanel, window: int = WINDOW_BARS, stride: int = STRIDE):
+    """패널의 모든 종목에서 stride봉 간격으로 윈도우 벡터를 만듭니다.
+
+    Returns:
+        (벡터 float32, 종목 번호 int32, 마지막 봉 날짜 datetime64[D], 이후 수익률 float32 (윈도우 × len(FORWARD_BARS)))
+        종목 번호 순, 같은 종목 안에서는 날짜 순
+    """
+    bars = panel.shape[1]
+    if bars < window + 1:
+        return (
+            np.empty((0, 2 * window), np.float32),
+            np.empty(0, np.int32),
+            np.empty(0, "datetime64[D]"),
+            np.empty((0, len(FORWARD_BARS)), np.float32),
+        )
+    day_index = np.broadcast_to(np.arange(bars, dtype=np.float64), panel.shape)
+    close, volume, days = panel.right_aligned("close", "volume", day_index)
+    # 오른쪽 정렬이므로 모든 종목의 최신 봉이 마지막 열: 마지막 열부터 stride 간격으로 윈도우 끝을 잡음
+    ends = np.arange(bars - 1, window - 1, -stride)[::-1]
+
+    close_windows = sliding_window_view(close, window + 1, axis=1)[:, ends - window]
+    volume_windows = sliding_window_view(volume, window, axis=1)[:, ends - window + 1]
+    vectors = window_vectors(close_windows, volume_windows)
+    valid = np.isfinite(close_windows).all(axis=2) & np.isfinite(volume_windows).all(axis=2) & vectors.any(axis=2)
+
+    forward = np.full(valid.shape + (len(FORWARD_BARS),), np.nan, dtype=np.float32)
+    for column, ahead in enumerate(FORWARD_BARS):
+        later = ends + ahead < bars
+        with np.errstate(divide="ignore", invalid="ignore"):
+            forward[:, later, column] = (close[:, ends[later] + ahead] / close[:, ends[later]] - 1) * 100
+
+    rows, columns = np.nonzero(valid)
+    end_days = panel.days[days[rows, ends[columns]].astype(np.int64)]
+    return vectors[rows, columns], rows.astype(np.int32), end_days, forward[rows, columns]
+
+
+def _dtw_distances(query: np.ndarray, candidates: np.ndarray, band: int = DTW_BAND) -> np.ndarray:
+    """질의 경로와 후보 경로들의 DTW 거리 (Sakoe-Chiba 밴드). 후보 축은 벡터 연산, 경로 축만 반복합니다.
+
+    Args:
+        query: (N,) 정규화된 가격 경로
+        candidates: (C, N) 정규화된 가격 경로
+        band: |i - j| <= band인 칸만 계산
+    """
+    length = len(query)
+    cost = np.full((candidates.shape[0], length + 1, length + 1), np.inf, dtype=np.float32)
+    cost[:, 0, 0] = 0.0
+    for i in range(1, length + 1):
+        lo, hi = max(1, i - band), min(length, i + band)
+        for j in range(lo, hi + 1):
+            step = (query[i - 1] - candidates[:, j - 1]) ** 2
+            cost[:, i, j] = step + np.minimum(np.minimum(cost[:, i - 1, j], cost[:, i, j - 1]), cost[:, i - 1, j - 1])
+    return np.sqrt(cost[:, length, length])
+
+
+class PatternIndex:
+    """저장된 윈도우 인덱스 (메모리 매핑)."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.path = path
+        self.window: int = meta["window"]
+        self.stride: int = meta["stride"]
+        self.end: date = date.fromisoformat(meta["end"])
+        self.created_at: float = meta["created_at"]
+        self.symbols: List[str] = meta["symbols"]
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.row_symbols = np.load(os.path.join(path, "symbols.npy"))
+        self.row_days = np.load(os.path.join(path, "days.npy"))
+        self.forward = np.load(os.path.join(path, "forward.npy"), mmap_mode="r")
+        # 종목별 행 범위 (행은 종목 번호 순으로 정렬되어 있음)
+        self._offsets = np.searchsorted(self.row_symbols, np.arange(len(self.symbols) + 1))
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def __len__(self) -> int:
+        return len(self.row_symbols)
+
+    def row_of(self, symbol: str, day: Optional[date] = None) -> Optional[int]:
+        """종목의 day 이전(포함) 마지막 윈도우 행 번호. day가 None이면 최신 윈도우."""
+        index = self._symbol_index.get(symbol.upper())
+        if index is None:
+            return None
+        start, stop = self._offsets[index], self._offsets[index + 1]
+        if day is not None:
+            stop = start + np.searchsorted(self.row_days[start:stop], np.datetime64(day, "D"), side="right")
+        return int(stop - 1) if stop > start else None
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 10,
+        method: str = "cosine",
+        exclude_symbol: Optional[str] = None,
+        per_symbol: bool = True,
+    ) -> List[PatternMatch]:
+        """질의 벡터와 가장 비슷한 윈도우를 찾습니다.
+
+        Args:
+            query: window_vectors로 만든 길이 2N 벡터
+            top_k: 결과 수
+            method: "cosine" 또는 "dtw" (코사인 상위 후보를 DTW 거리로 재정렬)
+            exclude_symbol: 결과에서 뺄 종목 (보통 질의 종목 자신)
+            per_symbol: 종목당 가장 비슷한 윈도우 하나만 반환 (간격이 겹치는 같은 종목 윈도우 중복 방지)
+
+        Returns:
+            유사도(DTW면 거리) 순서의 결과 목록
+        """
+        if method not in ("cosine", "dtw"):
+            raise ValueError(f"지원하지 않는 검색 방식: {method}")
+        if len(self) == 0 or top_k <= 0:
+            return []
+        scores = self.vectors @ np.asarray(query, dtype=np.float32)
+        if exclude_symbol is not None and exclude_symbol.upper() in self._symbol_index:
+            index = self._symbol_index[exclude_symbol.upper()]
+            scores[self._offsets[index]:self._offsets[index + 1]] = -np.inf
+
+        wanted = top_k * DTW_CANDIDATES if method == "dtw" else top_k
+        candidates = self._top_rows(scores, wanted, per_symbol)
+        distances = None
+        if method == "dtw" and len(candidates):
+            # 거래량 부분은 제외하고 가격 경로(앞 N개)만 비교. 길이 1 정규화 전 스케일로 되돌림
+            half = self.window
+            query_path = np.asarray(query[:half], dtype=np.float32)
+            paths = np.asarray(self.vectors[candidates, :half])
+            query_path = query_path / (np.linalg.norm(query_path) or 1.0)
+            paths = paths / np.maximum(np.linalg.norm(paths, axis=1, keepdims=True), 1e-12)
+            distances = _dtw_distances(query_path * np.sqrt(half), paths * np.sqrt(half))
+            order = np.argsort(distances, kind="stable")[:top_k]
+            candidates, distances = candidates[order], distances[order]
+
+        forward = np.asarray(self.forward[candidates])
+        return [
+            PatternMatch(
+                symbol=self.symbols[self.row_symbols[row]],
+                end_day=self.row_days[row].astype(object),
+                similarity=float(scores[row]),
+                distance=None if distances is None else float(distances[i]),
+                forward=[None if np.isnan(value) else float(value) for value in forward[i]],
+            )
+            for i, row in enumerate(candidates)
+        ]
+
+    def search_like(self, symbol: str, day: Optional[date] = None, **kwargs) -> List[PatternMatch]:
+        """종목의 (day 이전 마지막) 윈도우와 비슷한 다른 종목의 윈도우를 찾습니다. 종목이 없으면 빈 목록."""
+        row = self.row_of(symbol, day)
+        if row is None:
+            return []
+        kwargs.setdefault("exclude_symbol", symbol)
+        return self.search(np.asarray(self.vectors[row]), **kwargs)
+
+    def _top_rows(self, scores: np.ndarray, count: int, per_symbol: bool) -> np.ndarray:
+        """점수 상위 행 번호 (내림차순). per_symbol이면 종목별 최고 점수 행만 후보로 봅니다."""
+        if per_symbol:
+            starts = self._offsets[:-1][self._offsets[:-1] < self._offsets[1:]]
+            best = np.maximum.reduceat(scores, starts)
+            top = self._top(best, count)
+            # 상위 종목 안에서만 최고 점수 행을 찾음
+            ends = np.append(starts[1:], len(scores))
+            rows = np.array([start + int(np.argmax(scores[start:ends[i]])) for i, start in zip(top, starts[top])], dtype=np.int64)
+            return rows
+        return self._top(scores, count)
+
+    @staticmethod
+    def _top(scores: np.ndarray, count: int) -> np.ndarray:
+        finite = np.isfinite(scores)
+        count = min(count, int(finite.sum()))
+        if count == 0:
+            return np.empty(0, np.int64)
+        top = np.argpartition(-np.where(finite, scores, -np.inf), count - 1)[:count]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+
+def pattern_index_dir(index_dir: Optional[str] = None) -> str:
+    return index_dir or os.getenv("PATTERN_INDEX_DIR", DEFAULT_PATTERN_INDEX_DIR)
+
+
+def build_pattern_index(
+    end: Optional[date] = None,
+    years: int = HISTORY_YEARS,
+    window: int = WINDOW_BARS,
+    stride: int = STRIDE,
+    index_dir: Optional[str] = None,
+) -> PatternIndex:
+    """활성 티커 전체의 일봉으로 인덱스를 만들어 저장합니다.
+
+    일봉 패널은 panel_cache의 메모리 매핑 캐시로 읽고 BUILD_CHUNK 종목씩 벡터로 만듭니다.
+    임시 디렉토리에 쓴 뒤 이름을 바꾸므로 검색 중인 프로세스는 이전 인덱스를 그대로 읽습니다.
+
+    Args:
+        end: 마지막 날짜 (None이면 오늘)
+        years: 이력 기간 (년)
+        window: 윈도우 길이 (봉)
+        stride: 윈도우 간격 (봉)
+        index_dir: 저장 디렉토리 (None이면 PATTERN_INDEX_DIR 또는 pattern_index)
+    """
+    end = end or date.today()
+    path = pattern_index_dir(index_dir)
+    started = time.perf_counter()
+    panel_path = cached_panel_path(end - timedelta(days=365 * years), end)
+    panel = open_panel(panel_path)
+
+    parts = []
+    for offset in range(0, panel.shape[0], BUILD_CHUNK):
+        chunk = open_panel(panel_path, rows=slice(offset, offset + BUILD_CHUNK))
+        vectors, rows, days, forward = panel_windows(chunk, window, stride)
+        parts.append((vectors, rows + offset, days, forward))
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    if parts:
+        np.save(os.path.join(tmp, "vectors.npy"), np.concatenate([p[0] for p in parts]))
+        np.save(os.path.join(tmp, "symbols.npy"), np.concatenate([p[1] for p in parts]).astype(np.int32))
+        np.save(os.path.join(tmp, "days.npy"), np.concatenate([p[2] for p in parts]))
+        np.save(os.path.join(tmp, "forward.npy"), np.concatenate([p[3] for p in parts]))
+    else:
+        empty = panel_windows(panel, window, stride)
+        for name, values in zip(("vectors", "symbols", "days", "forward"), empty):
+            np.save(os.path.join(tmp, f"{name}.npy"), values)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "window": window,
+                "stride": stride,
+                "end": end.isoformat(),
+                "symbols": list(panel.symbols),
+                "created_at": time.time(),
+            },
+            f,
+        )
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+    index = PatternIndex(path)
+    logger.info(
+        "패턴 인덱스 저장: %s (%d종목, 윈도우 %d개 × %d, %.1fs)",
+        path,
+        len(index.symbols),
+        len(index),
+        index.vectors.shape[1],
+        time.perf_counter() - started,
+    )
+    return index
+
+
+def load_pattern_index(index_dir: Optional[str] = None, max_age_hours: float = 24.0, rebuild: bool = False) -> PatternIndex:
+    """저장된 인덱스를 엽니다. 없거나 max_age_hours보다 오래되었거나 rebuild면 새로 만듭니다."""
+    path = pattern_index_dir(index_dir)
+    meta_path = os.path.join(path, "meta.json")
+    if not rebuild and os.path.exists(meta_path) and time.time() - os.path.getmtime(meta_path) < max_age_hours * 3600:
+        return PatternIndex(path)
+    return build_pattern_index(index_dir=path)
@@ -0,0 +1,378 @@
+"""종목 간 상관관계와 상대 강도 (peer_context).
+
+활성 티커 전체의 일봉 패널에서 거래일이 맞춰진 로그 수익률 행렬(종목 × 거래일)을 만들고,
+최근 CORRELATION_WINDOW 거래일의 상관계수 행렬과 상대 강도 순위를 한 번에 계산합니다.
+
+    - 상관계수: 수익률 행렬과 유효 여부 마스크의 행렬 곱(BLAS)으로 종목 쌍마다 겹치는 거래일만의
+      합계/제곱합/곱의 합을 구해 피어슨 상관계수를 계산합니다. 5,000 × 5,000 행렬을 한 번에 만들지 않도록
+      BLOCK_ROWS 종목씩 나눠 계산하고, 묶음마다 상위 k개 이웃만 남깁니다.
+    - 상대 강도: 3/6/9/12개월 누적 수익률을 최근 분기에 두 배 가중한 점수를 전 종목 백분위(1~99)로 바꿉니다.
+    - 이웃 상대 강도: 상관계수 상위 이웃들의 평균 상대 강도 (업종·동조 종목 대비 강세 판단용)
+
+결과는 peer_context 테이블에 (기준일, 종목) 한 행으로 저장하고 이웃은 배열 컬럼에 담으므로,
+스크리닝과 봇은 종목 하나당 한 행만 조회합니다.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from .daily_panel import DailyPanel, load_daily_panel
+from .db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# 상관계수 계산 구간 (거래일)
+CORRELATION_WINDOW = 60
+# 두 종목이 구간 안에서 겹쳐야 하는 최소 수익률 비율
+MIN_OVERLAP_RATIO = 0.8
+# 종목별로 저장하는 상관계수 상위 이웃 수
+TOP_K = 10
+# 상관계수를 한 번에 계산하는 종목 수 (BLOCK_ROWS × 종목 수 행렬 6개를 만듦)
+BLOCK_ROWS = 512
+
+# 상대 강도: 누적 수익률 구간(거래일)과 가중치 (최근 분기 2배)
+RS_HORIZONS = (63, 126, 189, 252)
+RS_WEIGHTS = (2.0, 1.0, 1.0, 1.0)
+# 상대 강도를 매기는 최소 봉 수 (첫 구간 + 1)
+MIN_RS_BARS = RS_HORIZONS[0] + 1
+
+# 마지막 봉이 기준일보다 이만큼(달력 일) 오래된 종목은 제외
+MAX_STALE_DAYS = 7
+
+
+@dataclass
+class PeerContext:
+    """종목 하나의 상대 강도와 상관계수 상위 이웃."""
+
+    symbol: str
+    as_of: date
+    last_day: date
+    returns: Dict[int, Optional[float]]  # 구간(거래일) → 누적 수익률 (%)
+    rs_score: float
+    rs_rating: int  # 1~99 백분위
+    rs_rank: int  # 1이 가장 강함
+    neighbors: List[str]  # 상관계수 내림차순
+    correlations: List[float]
+    peer_rs_rating: Optional[float]  # 이웃 평균 상대 강도
+
+
+def returns_matrix(panel: DailyPanel, window: int) -> np.ndarray:
+    """패널 마지막 window 거래일의 일간 로그 수익률 (종목 × window). 전일 또는 당일 봉이 없으면 NaN.
+
+    상관계수는 같은 날짜끼리 비교해야 하므로 right_aligned가 아닌 패널의 거래일 축을 그대로 씁니다.
+    """
+    close = panel.close[:, -(window + 1):]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.log(close[:, 1:] / close[:, :-1])
+    returns[~np.isfinite(returns)] = np.nan
+    if returns.shape[1] < window:
+        returns = np.hstack([np.full((returns.shape[0], window - returns.shape[1]), np.nan), returns])
+    return returns
+
+
+def correlation_neighbors(
+    returns: np.ndarray,
+    top_k: int = TOP_K,
+    min_overlap: int = 2,
+    block_rows: int = BLOCK_ROWS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """종목별 상관계수 상위 top_k 이웃을 구합니다.
+
+    종목 i, j가 모두 수익률이 있는 거래일만으로 피어슨 상관계수를 계산합니다.
+    X(결측 0), M(유효 여부)으로 n = M·Mᵀ, Σx = X·Mᵀ, Σy = M·Xᵀ, Σx² = X²·Mᵀ, Σy² = M·(X²)ᵀ, Σxy = X·Xᵀ를
+    행 묶음마다 행렬 곱으로 구하므로 종목 쌍 반복이 없습니다.
+
+    Args:
+        returns: 종목 × 거래일 수익률 (결측은 NaN)
+        top_k: 종목별 이웃 수
+        min_overlap: 상관계수를 계산하는 최소 겹치는 거래일 수 (미만이면 이웃에서 제외)
+        block_rows: 한 번에 계산하는 종목 수
+
+    Returns:
+        (이웃 행 번호 (종목 × top_k, 없으면 -1), 상관계수 (종목 × top_k, 없으면 NaN))
+    """
+    count = returns.shape[0]
+    k = min(top_k, max(count - 1, 0))
+    indices = np.full((count, top_k), -1, dtype=np.int64)
+    values = np.full((count, top_k), np.nan)
+    if k == 0:
+        return indices, values
+
+    valid = ~np.isnan(returns)
+    x = np.where(valid, returns, 0.0)
+    m = valid.astype(np.float64)
+    x2 = x * x
+    # 오른쪽 피연산자는 전치를 한 번만 만들어 두고 묶음마다 재사용
+    x_t, m_t, x2_t = np.ascontiguousarray(x.T), np.ascontiguousarray(m.T), np.ascontiguousarray(x2.T)
+
+    for start in range(0, count, block_rows):
+        rows = slice(start, min(start + block_rows, count))
+        xb, mb, x2b = x[rows], m[rows], x2[rows]
+        n = mb @ m_t
+        sx = xb @ m_t
+        sy = mb @ x_t
+        cov = n * (xb @ x_t) - sx * sy
+        var = (n * (x2b @ m_t) - sx * sx) * (n * (mb @ x2_t) - sy * sy)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.sqrt(var)
+        corr[(n < min_overlap) | ~(var > 0)] = -np.inf
+        corr[np.arange(corr.shape[0]), np.arange(start, rows.stop)] = -np.inf  # 자기 자신 제외
+
+        top = np.argpartition(-corr, k - 1, axis=1)[:, :k]
+        top_corr = np.take_along_axis(corr, top, axis=1)
+        order = np.argsort(-top_corr, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_corr = np.take_along_axis(top_corr, order, axis=1)
+        found = np.isfinite(top_corr)
+        indices[rows, :k] = np.where(found, top, -1)
+        values[rows, :k] = np.where(found, np.clip(top_corr, -1.0, 1.0), np.nan)
+    return indices, values
+
+
+def relative_strength(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """종목별 RS_HORIZONS 누적 수익률과 상대 강도 점수.
+
+    Args:
+        close: right_aligned 종가 (마지막 열이 종목별 최신 봉)
+
+    Returns:
+        (구간별 누적 수익률 (종목 × 구간 수, %), 점수 (봉이 부족하면 NaN))
+    """
+    bars = close.shape[1]
+    last = close[:, -1]
+    returns = np.full((close.shape[0], len(RS_HORIZONS)), np.nan)
+    for column, horizon in enumerate(RS_HORIZONS):
+        if horizon < bars:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns[:, column] = (last / close[:, -1 - horizon] - 1) * 100
+    # 상장 기간이 짧아 긴 구간이 없으면 있는 구간의 가중치만으로 평균
+    weights = np.where(np.isnan(returns), 0.0, np.asarray(RS_WEIGHTS))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.nansum(returns * weights, axis=1) / weights.sum(axis=1)
+    score[np.isnan(returns[:, 0])] = np.nan
+    return returns, score
+
+
+def percentile_ratings(score: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """점수를 1~99 백분위 등급과 순위(1이 가장 높음)로 바꿉니다. NaN은 등급 0, 순위 0."""
+    ratings = np.zeros(len(score), dtype=np.int64)
+    ranks = np.zeros(len(score), dtype=np.int64)
+    scored = np.flatnonzero(~np.isnan(score))
+    if len(scored) == 0:
+        return ratings, ranks
+    order = scored[np.argsort(-score[scored], kind="stable")]
+    ranks[order] = np.arange(1, len(order) + 1)
+    position = len(order) - ranks[order]  # 0이 가장 낮음
+    ratings[order] = 1 + np.floor(position * 98 / max(len(order) - 1, 1)).astype(np.int64)
+    return ratings, ranks
+
+
+def compute_peer_context(
+    panel: DailyPanel,
+    as_of: date,
+    window: int = CORRELATION_WINDOW,
+    top_k: int = TOP_K,
+) -> List[PeerContext]:
+    """패널의 모든 종목에 대해 상대 강도와 상관계수 상위 이웃을 계산합니다.
+
+    Args:
+        panel: 일봉 패널 (상대 강도에 최근 252봉 이상 필요)
+        as_of: 기준일 (마지막 봉이 MAX_STALE_DAYS보다 오래된 종목 제외)
+        window: 상관계수 구간 (거래일)
+        top_k: 종목별 이웃 수
+
+    Returns:
+        상대 강도 순위 순서의 결과 목록
+    """
+    if panel.shape[0] == 0 or panel.shape[1] == 0:
+        return []
+    last_days = panel.last_days()
+    with np.errstate(invalid="ignore"):
+        fresh = (np.datetime64(as_of, "D") - last_days) <= np.timedelta64(MAX_STALE_DAYS, "D")
+    (aligned_close,) = panel.right_aligned("close")
+    bars = (~np.isnan(panel.close)).sum(axis=1)
+    keep = np.flatnonzero(fresh & (bars >= MIN_RS_BARS))
+    if len(keep) == 0:
+        return []
+
+    horizon_returns, score = relative_strength(aligned_close[keep])
+    ratings, ranks = percentile_ratings(score)
+    returns = returns_matrix(panel, window)[keep]
+    neighbors, correlations = correlation_neighbors(
+        returns, top_k=top_k, min_overlap=max(2, int(window * MIN_OVERLAP_RATIO))
+    )
+
+    results = []
+    for row, panel_row in enumerate(keep):
+        found = neighbors[row] >= 0
+        peers = neighbors[row][found]
+        results.append(
+            PeerContext(
+                symbol=panel.symbols[panel_row],
+                as_of=as_of,
+                last_day=last_days[panel_row].astype(date),
+                returns={
+                    horizon: None if np.isnan(value) else float(value)
+                    for horizon, value in zip(RS_HORIZONS, horizon_returns[row])
+                },
+                rs_score=float(score[row]),
+                rs_rating=int(ratings[row]),
+                rs_rank=int(ranks[row]),
+                neighbors=[panel.symbols[keep[peer]] for peer in peers],
+                correlations=[float(value) for value in correlations[row][found]],
+                peer_rs_rating=float(ratings[peers].mean()) if len(peers) else None,
+            )
+        )
+    results.sort(key=lambda r: r.rs_rank)
+    return results
+
+
+def ensure_peer_context_table() -> None:
+    """peer_context 테이블이 없으면 생성합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS peer_context (
+                    as_of DATE NOT NULL,
+                    symbol TEXT NOT NULL,
+                    last_day DATE NOT NULL,
+                    return_3m DOUBLE PRECISION,
+                    return_6m DOUBLE PRECISION,
+                    return_9m DOUBLE PRECISION,
+                    return_12m DOUBLE PRECISION,
+                    rs_score DOUBLE PRECISION NOT NULL,
+                    rs_rating SMALLINT NOT NULL,
+                    rs_rank INTEGER NOT NULL,
+                    neighbors TEXT[] NOT NULL,
+                    correlations REAL[] NOT NULL,
+                    peer_rs_rating REAL,
+                    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (as_of, symbol)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_peer_context_symbol
+                ON peer_context (symbol, as_of DESC);
+                """
+            )
+            conn.commit()
+    logger.info("peer_context 테이블을 확인했습니다.")
+
+
+def save_peer_context(as_of: date, results: List[PeerContext]) -> int:
+    """기준일의 기존 결과를 지우고 새 결과로 교체합니다. 한 트랜잭션에서 처리합니다."""
+    computed_at = datetime.now().astimezone()
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM peer_context WHERE as_of = %s", (as_of,))
+            execute_values(
+                cursor,
+                """
+                INSERT INTO peer_context (
+                    as_of, symbol, last_day, return_3m, return_6m, return_9m, return_12m, rs_score,
+                    rs_rating, rs_rank, neighbors, correlations, peer_rs_rating, computed_at
+                )
+                VALUES %s
+                """,
+                [
+                    (
+                        as_of, r.symbol, r.last_day, *(r.returns[h] for h in RS_HORIZONS), r.rs_score,
+                        r.rs_rating, r.rs_rank, r.neighbors, r.correlations, r.peer_rs_rating, computed_at,
+                    )
+                    for r in results
+                ],
+                page_size=1000,
+            )
+            conn.commit()
+    return len(results)
+
+
+def get_peer_context(symbols: Optional[Sequence[str]] = None, as_of: Optional[date] = None) -> Dict[str, PeerContext]:
+    """기준일(없으면 가장 최근 계산일) 이전의 가장 최근 결과를 종목별로 조회합니다. 테이블이 없으면 빈 dict.
+
+    Args:
+        symbols: 종목 목록 (None이면 전체)
+        as_of: 기준일 (None이면 가장 최근 계산일)
+    """
+    query = """
+        SELECT symbol, as_of, last_day, return_3m, return_6m, return_9m, return_12m, rs_score,
+               rs_rating, rs_rank, neighbors, correlations, peer_rs_rating
+        FROM peer_context
+        WHERE as_of = (SELECT MAX(as_of) FROM peer_context WHERE as_of <= %s)
+    """
+    params: tuple = (as_of or date.max,)
+    if symbols is not None:
+        query += " AND symbol = ANY(%s)"
+        params += ([s.upper() for s in symbols],)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('peer_context') IS NOT NULL")
+            if not cursor.fetchone()[0]:
+                return {}
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+    return {
+        row[0]: PeerContext(
+            symbol=row[0],
+            as_of=row[1],
+            last_day=row[2],
+            returns=dict(zip(RS_HORIZONS, row[3:7])),
+            rs_score=row[7],
+            rs_rating=row[8],
+            rs_rank=row[9],
+            neighbors=list(row[10]),
+            correlations=list(row[11]),
+            peer_rs_rating=row[12],
+        )
+        for row in rows
+    }
+
+
+def run_peer_context(
+    as_of: Optional[date] = None,
+    window: int = CORRELATION_WINDOW,
+    top_k: int = TOP_K,
+    save: bool = True,
+) -> List[PeerContext]:
+    """활성 티커 전체의 상대 강도와 상관계수 이웃을 계산하고 저장합니다.
+
+    Args:
+        as_of: 기준일 (None이면 오늘)
+        window: 상관계수 구간 (거래일)
+        top_k: 종목별 이웃 수
+        save: peer_context 테이블에 저장할지 여부
+
+    Returns:
+        상대 강도 순위 순서의 결과 목록
+    """
+    as_of = as_of or date.today()
+
+    started = time.perf_counter()
+    # 12개월 수익률과 상관계수 구간을 덮도록 달력 일수로 환산해 여유 있게 조회
+    lookback_days = int((max(RS_HORIZONS[-1], window) + 1) * 365 / 252) + 14
+    panel = load_daily_panel(lookback_days=lookback_days, end=as_of)
+    loaded = time.perf_counter()
+    results = compute_peer_context(panel, as_of, window=window, top_k=top_k)
+    computed = time.perf_counter()
+
+    if save:
+        save_peer_context(as_of, results)
+    logger.info(
+        "상관계수/상대 강도 계산 완료 (%s, 구간 %d거래일, 이웃 %d): %d종목 - 조회 %.2fs, 계산 %.2fs, 저장 %.2fs",
+        as_of,
+        window,
+        top_k,
+        len(results),
+        loaded - started,
+        computed - loaded,
+        time.perf_counter() - computed,
+    )
+    return results
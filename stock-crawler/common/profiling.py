@@ -0,0 +1,313 @@
+"""수집 실행 프로파일링 (샘플링 프로파일러와 tracemalloc 피크 스냅샷).
+
+프로파일링 중에는 백그라운드 스레드가 일정 간격으로 모든 스레드의 호출 스택을 샘플링합니다.
+결과는 flamegraph.pl, speedscope, inferno 등에서 바로 읽을 수 있는 collapsed stack 형식
+(`스레드;함수;함수 샘플수`)으로 저장하고, common/* 함수 중 가장 오래 걸린 함수 요약을 함께 남깁니다.
+
+대기 중인 유휴 스레드(스레드 풀 작업 대기, 소켓 서버 select 등)는 샘플에서 제외합니다.
+네트워크 응답 대기나 속도 제한 대기처럼 수집 작업 안에서 기다리는 시간은 그대로 포함되므로
+CPU 시간이 아니라 실제 경과 시간(wall clock) 기준 프로파일입니다.
+
+memory=True이면 tracemalloc으로 할당을 추적하고, 추적 중 메모리가 가장 컸던 시점의 스냅샷을
+할당 크기 기준 collapsed stack으로 저장합니다. tracemalloc은 할당마다 비용이 커서 기본으로 끕니다.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(__file__), "..", "profiles")
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_COMMON_DIR = os.path.join(_PROJECT_ROOT, "common") + os.sep
+
+# 이 함수에서 멈춰 있는 스레드는 유휴 상태로 보고 샘플에서 제외 (파일 이름, 함수)
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socketserver.py", "serve_forever"),
+    ("futures/thread.py", "_worker"),
+}
+
+# tracemalloc을 여러 프로파일이 함께 쓸 수 있도록 사용 수를 셈
+_tracemalloc_users = 0
+_tracemalloc_lock = threading.Lock()
+
+
+def _short_path(filename: str) -> str:
+    """프로젝트 파일은 프로젝트 기준 경로, 그 외는 site-packages/표준 라이브러리 이후 경로."""
+    path = os.path.abspath(filename)
+    if path.startswith(_PROJECT_ROOT + os.sep):
+        return os.path.relpath(path, _PROJECT_ROOT).replace(os.sep, "/")
+    parts = path.replace(os.sep, "/").split("/")
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            return "/".join(parts[parts.index(marker) + 1:])
+    return "/".join(parts[-2:]) if parts[-2:-1] == ["futures"] else parts[-1]
+
+
+def _thread_label(name: str) -> str:
+    """스레드 풀 번호를 떼어 같은 풀의 스레드를 하나로 묶습니다 (collector-kis_0 → collector-kis)."""
+    return re.sub(r"_\d+$", "", name)
+
+
+@dataclass
+class ProfileReport:
+    """프로파일 결과 파일과 요약."""
+
+    label: str
+    wall_seconds: float
+    samples: int
+    stacks_path: Optional[str] = None
+    alloc_path: Optional[str] = None
+    summary_path: Optional[str] = None
+    summary: str = ""
+    peak_memory_bytes: Optional[int] = None
+
+
+@dataclass
+class _Hotspot:
+    own: int = 0  # 가장 깊은 common/* 프레임으로 잡힌 샘플 (라이브러리 호출 시간 포함)
+    total: int = 0  # 스택에 포함된 샘플
+
+
+class SamplingProfiler:
+    """모든 스레드의 호출 스택을 주기적으로 샘플링합니다."""
+
+    def __init__(self, interval: float = 0.005, memory: bool = False, memory_frames: int = 25):
+        """
+        Args:
+            interval: 샘플링 간격 (초)
+            memory: tracemalloc 피크 스냅샷 사용 여부
+            memory_frames: tracemalloc이 할당마다 저장할 스택 깊이
+        """
+        self.interval = interval
+        self.memory = memory
+        self.memory_frames = memory_frames
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.peak_snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_memory: Optional[int] = None
+        self._peak_snapshot_size = 0
+        self._code_labels: Dict[object, Tuple[str, str]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.wall_seconds = 0.0
+        self.report: Optional[ProfileReport] = None
+
+    def start(self) -> None:
+        global _tracemalloc_users
+        if self.memory:
+            with _tracemalloc_lock:
+                if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start(self.memory_frames)
+                _tracemalloc_users += 1
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        global _tracemalloc_users
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.wall_seconds = time.perf_counter() - self._started
+        if self.memory:
+            self._snapshot_if_peak(force=self.peak_snapshot is None)
+            self.peak_memory = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+            with _tracemalloc_lock:
+                _tracemalloc_users -= 1
+                if _tracemalloc_users == 0:
+                    tracemalloc.stop()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        next_memory_check = 0.0
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = self._stack(frame)
+                if stack is None:
+                    continue
+                self.stacks[(_thread_label(names.get(ident, str(ident))),) + stack] += 1
+            self.samples += 1
+            if self.memory and time.monotonic() >= next_memory_check:
+                self._snapshot_if_peak()
+                next_memory_check = time.monotonic() + 0.25
+
+    def _label(self, code) -> Tuple[str, str]:
+        label = self._code_labels.get(code)
+        if label is None:
+            label = self._code_labels[code] = (_short_path(code.co_filename), code.co_name)
+        return label
+
+    def _stack(self, frame) -> Optional[Tuple[Tuple[str, str], ...]]:
+        """프레임을 바깥쪽부터의 (파일, 함수) 튜플로 바꿉니다. 유휴 스레드면 None."""
+        if self._label(frame.f_code) in _IDLE_LEAVES:
+            return None
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _snapshot_if_peak(self, force: bool = False) -> None:
+        """추적 중인 메모리가 직전 스냅샷보다 10% 이상 크면 새 피크 스냅샷을 찍습니다."""
+        if not tracemalloc.is_tracing():
+            return
+        current, _ = tracemalloc.get_traced_memory()
+        if force or current > self._peak_snapshot_size * 1.1:
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            )
+            self.peak_snapshot = snapshot
+            self._peak_snapshot_size = current
+
+    def collapsed_stacks(self) -> List[str]:
+        """collapsed stack 형식 줄 목록 (flamegraph 입력)."""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            thread, frames = stack[0], stack[1:]
+            names = [thread] + [f"{func} ({path})" for path, func in frames]
+            lines.append(f"{';'.join(n.replace(';', ':') for n in names)} {count}")
+        return lines
+
+    def collapsed_allocations(self) -> List[str]:
+        """피크 스냅샷의 할당 크기(바이트) 기준 collapsed stack 줄 목록."""
+        if self.peak_snapshot is None:
+            return []
+        lines = []
+        for stat in self.peak_snapshot.statistics("traceback"):
+            names = [
+                f"{_short_path(f.filename)}:{f.lineno}".replace(";", ":")
+                for f in stat.traceback
+            ]
+            lines.append(f"{';'.join(names)} {stat.size}")
+        return lines
+
+    def hotspots(self, prefix: str = _COMMON_DIR) -> Dict[Tuple[str, str], _Hotspot]:
+        """prefix 아래 파일의 함수별 샘플 수."""
+        rel_prefix = os.path.relpath(prefix, _PROJECT_ROOT).replace(os.sep, "/") + "/"
+        hotspots: Dict[Tuple[str, str], _Hotspot] = {}
+        for stack, count in self.stacks.items():
+            frames = [f for f in stack[1:] if f[0].startswith(rel_prefix)]
+            if not frames:
+                continue
+            hotspots.setdefault(frames[-1], _Hotspot()).own += count
+            for f in set(frames):
+                hotspots.setdefault(f, _Hotspot()).total += count
+        return hotspots
+
+    def summary(self, label: str, top: int = 20) -> str:
+        """common/* 함수 중 샘플이 많은 상위 top개 요약."""
+        sampled = sum(self.stacks.values()) or 1
+        lines = [
+            f"프로파일: {label} ({self.wall_seconds:.1f}초, 샘플링 {self.samples}회, 스택 샘플 {sum(self.stacks.values())}개)",
+            "",
+            f"=== common/* 상위 {top}개 함수 (own: 가장 깊은 common 프레임, total: 스택 포함) ===",
+            f"{'own%':>6} {'total%':>7} {'own':>7} {'total':>7}  함수",
+        ]
+        ranked = sorted(self.hotspots().items(), key=lambda item: (item[1].own, item[1].total), reverse=True)
+        for (path, func), spot in ranked[:top]:
+            lines.append(
+                f"{spot.own / sampled * 100:>5.1f}% {spot.total / sampled * 100:>6.1f}% "
+                f"{spot.own:>7} {spot.total:>7}  {func} ({path})"
+            )
+        if not ranked:
+            lines.append("  (common/* 함수가 샘플에 없습니다)")
+
+        if self.memory:
+            lines += ["", "=== 메모리 (tracemalloc) ==="]
+            if self.peak_memory is not None:
+                lines.append(f"최대 추적 메모리: {self.peak_memory / 1_000_000:.1f} MB")
+            if self.peak_snapshot is not None:
+                lines.append(f"피크 스냅샷 상위 {min(top, 10)}개 할당 위치:")
+                for stat in self.peak_snapshot.statistics("lineno")[: min(top, 10)]:
+                    frame = stat.traceback[0]
+                    lines.append(
+                        f"  {stat.size / 1_000_000:>8.2f} MB {stat.count:>8}개  {_short_path(frame.filename)}:{frame.lineno}"
+                    )
+        return "\n".join(lines)
+
+
+def write_report(profiler: SamplingProfiler, label: str, output_dir: str = DEFAULT_PROFILE_DIR, top: int = 20) -> ProfileReport:
+    """프로파일 결과를 파일로 저장합니다.
+
+    Returns:
+        저장한 파일 경로와 요약
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    safe_label = re.sub(r"[^\w.-]+", "-", label).strip("-") or "profile"
+    base = os.path.join(output_dir, f"{safe_label}-{datetime.now():%Y%m%d-%H%M%S}")
+    report = ProfileReport(
+        label=label,
+        wall_seconds=profiler.wall_seconds,
+        samples=profiler.samples,
+        summary=profiler.summary(label, top),
+        peak_memory_bytes=profiler.peak_memory,
+    )
+
+    report.stacks_path = f"{base}.folded"
+    with open(report.stacks_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(profiler.collapsed_stacks()) + "\n")
+    allocations = profiler.collapsed_allocations()
+    if allocations:
+        report.alloc_path = f"{base}.alloc.folded"
+        with open(report.alloc_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(allocations) + "\n")
+    report.summary_path = f"{base}.txt"
+    with open(report.summary_path, "w", encoding="utf-8") as f:
+        f.write(report.summary + "\n")
+    return report
+
+
+@contextmanager
+def profile_run(
+    label: str,
+    output_dir: str = DEFAULT_PROFILE_DIR,
+    interval: float = 0.005,
+    memory: bool = False,
+    top: int = 20,
+    log_summary: bool = True,
+) -> Iterator[SamplingProfiler]:
+    """블록 실행을 프로파일링하고 결과를 output_dir에 저장합니다.
+
+    저장한 결과는 블록이 끝난 뒤 profiler.report로 볼 수 있습니다.
+
+    Args:
+        label: 파일 이름과 요약에 쓸 이름
+        output_dir: 결과 디렉토리
+        interval: 샘플링 간격 (초)
+        memory: tracemalloc 피크 스냅샷 사용 여부
+        top: 요약에 보여줄 함수 수
+        log_summary: 요약을 로그로 남길지 여부
+    """
+    profiler = SamplingProfiler(interval=interval, memory=memory)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        try:
+            profiler.report = write_report(profiler, label, output_dir, top)
+            if log_summary:
+                logger.info("프로파일 저장: %s\n%s", profiler.report.stacks_path, profiler.report.summary)
+        except Exception as e:
+            logger.error("[%s] 프로파일 저장 실패 - %s", label, e)
@@ -0,0 +1,51 @@
+"""제공자/자격 증명의 최근 요청 상태."""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Deque
+
+
+class ProviderHealth:
+    """제공자의 최근 요청 지연 시간과 성공/실패 이력."""
+
+    def __init__(self, window: int = 50, latency_alpha: float = 0.2, default_latency: float = 1.0):
+        """
+        Args:
+            window: 오류율 계산에 쓰는 최근 요청 수
+            latency_alpha: 지연 시간 지수 이동 평균 계수
+            default_latency: 이력이 없을 때 가정하는 지연 시간 (초)
+        """
+        self.latency_alpha = latency_alpha
+        self._latency = default_latency
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, success: bool) -> None:
+        """요청 결과를 기록합니다."""
+        with self._lock:
+            self._outcomes.append(success)
+            if success:
+                self._consecutive_failures = 0
+                self._latency += self.latency_alpha * (latency - self._latency)
+            else:
+                self._consecutive_failures += 1
+
+    @property
+    def latency(self) -> float:
+        """지연 시간 이동 평균 (초)."""
+        return self._latency
+
+    @property
+    def error_rate(self) -> float:
+        """최근 요청의 실패 비율."""
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return 1.0 - sum(self._outcomes) / len(self._outcomes)
+
+    @property
+    def consecutive_failures(self) -> int:
+        """연속 실패 횟수."""
+        return self._consecutive_failures
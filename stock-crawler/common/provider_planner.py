@@ -0,0 +1,184 @@
+"""비용 기반 제공자 라우팅.
+
+(종목, 주기)별 수집 요청을 남은 쿼터, 최근 지연 시간과 오류율, 신선도 요구를
+기준으로 가장 비용이 낮은 제공자 하나에 배정합니다. 배정된 제공자가 실패하면
+해당 제공자를 제외하고 다시 배정합니다.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from .provider_health import ProviderHealth
+from .providers import ProviderCapabilities
+from .ticker_repository import ManagedTicker
+
+logger = logging.getLogger(__name__)
+
+# 주기별 봉 길이 (신선도 계산용)
+INTERVAL_PERIODS = {
+    "60m": timedelta(hours=1),
+    "daily": timedelta(days=1),
+}
+
+# 저장된 캔들이 없을 때 조회할 기간 (일)
+DEFAULT_LOOKBACK_DAYS = {
+    "60m": 5,
+    "daily": 30,
+}
+
+
+@dataclass
+class ProviderState:
+    """라우팅 시점의 제공자 상태."""
+
+    capabilities: ProviderCapabilities
+    health: ProviderHealth
+    remaining_quota: Optional[int] = None  # 시간당 남은 요청 수 (None이면 제한 없음)
+
+
+@dataclass
+class FetchTask:
+    """(종목, 주기) 단위 수집 요청."""
+
+    ticker: ManagedTicker
+    interval: str
+    last_candle_time: Optional[datetime] = None
+
+    @property
+    def symbol(self) -> str:
+        return self.ticker.symbol
+
+    def need_start(self, now: datetime) -> datetime:
+        """조회가 거슬러 올라가야 하는 시각 (마지막 저장 봉 직후)."""
+        if self.last_candle_time is None:
+            return now - timedelta(days=DEFAULT_LOOKBACK_DAYS.get(self.interval, 5))
+        return self.last_candle_time.astimezone(timezone.utc).replace(tzinfo=None)
+
+    def window_days(self, caps: ProviderCapabilities, now: datetime) -> int:
+        """신선도 요구를 채우는 조회 기간 (일). 정기 수집 기간보다 짧지 않습니다."""
+        gap_days = math.ceil((now - self.need_start(now)).total_seconds() / 86400)
+        return max(caps.default_window_days.get(self.interval, 1), gap_days)
+
+    def staleness(self, now: datetime) -> float:
+        """마지막 봉 이후 지난 봉 개수."""
+        period = INTERVAL_PERIODS.get(self.interval, timedelta(hours=1))
+        return (now - self.need_start(now)) / period
+
+    def sla_slack(self, now: datetime) -> float:
+        """티커의 신선도 SLA 위반까지 남은 시간 (초). 작을수록 먼저 배정됩니다."""
+        period = INTERVAL_PERIODS.get(self.interval, timedelta(hours=1))
+        return self.ticker.freshness_slack(period.total_seconds(), now)
+
+
+@dataclass
+class RoutingPlan:
+    """제공자별 배정 결과."""
+
+    assignments: Dict[str, List[FetchTask]] = field(default_factory=dict)
+    unassigned: List[FetchTask] = field(default_factory=list)
+
+    def request_counts(self, states: Dict[str, ProviderState]) -> Dict[str, int]:
+        """제공자별 예상 요청 수."""
+        return {
+            name: states[name].capabilities.requests_needed(len(tasks))
+            for name, tasks in self.assignments.items()
+        }
+
+
+class ProviderPlanner:
+    """제공자 비용 모델과 배정기.
+
+    종목당 비용 = 요청 1건의 예상 소요 시간 / 배치 크기 / 동시성
+                 × 예상 재시도 배수 (1 / (1 - 오류율))
+                 × 쿼터 희소성 배수 (1 + 이미 배정한 요청 수 / 남은 쿼터)
+
+    신선도 요구(마지막 저장 봉 시각)를 최대 조회 기간 안에서 채울 수 없는 제공자,
+    쿼터가 남지 않은 제공자, 연속 실패 중인 제공자는 후보에서 제외합니다.
+    """
+
+    def __init__(self, max_consecutive_failures: int = 3, max_error_rate: float = 0.95):
+        """
+        Args:
+            max_consecutive_failures: 이 횟수 이상 연속 실패한 제공자는 후보에서 제외
+            max_error_rate: 재시도 배수 계산 시 오류율 상한
+        """
+        self.max_consecutive_failures = max_consecutive_failures
+        self.max_error_rate = max_error_rate
+
+    def request_cost(self, state: ProviderState) -> float:
+        """요청 1건의 예상 소요 시간 (초, 재시도 포함)."""
+        caps = state.capabilities
+        pacing = 1.0 / caps.requests_per_second if caps.requests_per_second else 0.0
+        seconds = max(state.health.latency, pacing) / max(1, caps.max_concurrency)
+        error_rate = min(state.health.error_rate, self.max_error_rate)
+        return seconds / (1.0 - error_rate)
+
+    def is_candidate(self, state: ProviderState, task: FetchTask, now: datetime) -> bool:
+        """제공자가 요청을 처리할 수 있는지 반환합니다."""
+        caps = state.capabilities
+        if not caps.supports(task.interval):
+            return False
+        if state.health.consecutive_failures >= self.max_consecutive_failures:
+            return False
+        need_start = task.need_start(now)
+        return now - need_start <= timedelta(days=caps.max_history_days[task.interval])
+
+    def plan(
+        self,
+        tasks: List[FetchTask],
+        states: Dict[str, ProviderState],
+        exclude: Optional[Dict[str, Set[str]]] = None,
+        now: Optional[datetime] = None,
+    ) -> RoutingPlan:
+        """요청을 제공자에 배정합니다.
+
+        신선도 SLA 위반이 가까운 요청부터(같으면 마지막 봉이 오래된 요청부터) 배정하므로
+        쿼터가 부족하면 우선순위가 높거나 오래 갱신되지 않은 종목이 먼저 배정됩니다.
+
+        Args:
+            tasks: 수집 요청 목록
+            states: 제공자 이름별 상태
+            exclude: 종목별로 제외할 제공자 이름 (이전에 실패한 제공자)
+            now: 기준 시각 (UTC, timezone 없음). None이면 현재
+
+        Returns:
+            배정 결과
+        """
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        exclude = exclude or {}
+        plan = RoutingPlan()
+        assigned_counts = {name: 0 for name in states}
+
+        for task in sorted(tasks, key=lambda t: (t.sla_slack(now), -t.staleness(now))):
+            best_name = None
+            best_cost = math.inf
+            for name, state in states.items():
+                if name in exclude.get(task.symbol, ()):
+                    continue
+                if not self.is_candidate(state, task, now):
+                    continue
+
+                caps = state.capabilities
+                planned_requests = caps.requests_needed(assigned_counts[name] + 1)
+                if state.remaining_quota is not None:
+                    if planned_requests > state.remaining_quota:
+                        continue
+                    scarcity = 1.0 + planned_requests / max(1, state.remaining_quota)
+                else:
+                    scarcity = 1.0
+
+                cost = self.request_cost(state) / max(1, caps.batch_size) * scarcity
+                if cost < best_cost:
+                    best_name, best_cost = name, cost
+
+            if best_name is None:
+                plan.unassigned.append(task)
+                continue
+            plan.assignments.setdefault(best_name, []).append(task)
+            assigned_counts[best_name] += 1
+
+        return plan
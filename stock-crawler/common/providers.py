@@ -0,0 +1,403 @@
+"""캔들 데이터 제공자(provider) 인터페이스.
+
+KIS, yfinance, Tiingo 클라이언트를 같은 형태의 조회 인터페이스로 감싸고,
+각 제공자가 지원하는 기능(조회 가능 기간, 일괄 조회, 요청 제한, 시간외 데이터,
+시각 기준)을 ProviderCapabilities로 선언합니다. 수집 오케스트레이터는 이 선언을
+보고 배치 크기, 조회 기간, 동시성, 요청 간격을 결정합니다.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .api_errors import ProviderError
+from .credential_pool import CredentialPool
+from .db import kis_candles_to_records
+from .run_metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# 시각 기준
+TIMESTAMP_EXCHANGE_LOCAL = "exchange_local"  # 거래소 현지 시각 (timezone 없음)
+TIMESTAMP_TZ_AWARE = "tz_aware"  # 거래소 timezone 포함
+TIMESTAMP_UTC = "utc"  # UTC 기준
+
+
+@dataclass
+class ProviderCapabilities:
+    """제공자가 선언하는 기능과 제한."""
+
+    name: str  # us_stock_candles.source 값
+    max_history_days: Dict[str, int]  # 주기별 최대 조회 가능 기간 (일)
+    default_window_days: Dict[str, int]  # 주기별 정기 수집 조회 기간 (일)
+    batch_size: int = 1  # 한 번의 요청으로 조회할 수 있는 종목 수
+    requests_per_second: Optional[float] = None
+    requests_per_hour: Optional[int] = None
+    max_concurrency: int = 1
+    extended_hours: bool = False  # 프리마켓/애프터마켓 데이터 제공 여부
+    timestamp_semantics: str = TIMESTAMP_EXCHANGE_LOCAL
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def intervals(self) -> Tuple[str, ...]:
+        """지원하는 주기 목록."""
+        return tuple(self.max_history_days)
+
+    def supports(self, interval: str) -> bool:
+        """주기 지원 여부를 반환합니다."""
+        return interval in self.max_history_days
+
+    def window(
+        self,
+        interval: str,
+        days: Optional[int] = None,
+        end: Optional[datetime] = None,
+    ) -> Tuple[datetime, datetime]:
+        """조회 기간을 최대 조회 가능 기간 안으로 제한하여 반환합니다.
+
+        Args:
+            interval: 주기
+            days: 조회 기간 (일). None이면 정기 수집 기간
+            end: 조회 종료 시각. None이면 현재
+
+        Returns:
+            (시작 시각, 종료 시각)
+        """
+        end = end or datetime.now()
+        days = self.default_window_days.get(interval, 1) if days is None else days
+        days = min(days, self.max_history_days[interval])
+        return end - timedelta(days=days), end
+
+    def can_reach(self, interval: str, start: datetime) -> bool:
+        """start 시각까지 거슬러 조회할 수 있는지 반환합니다."""
+        if not self.supports(interval):
+            return False
+        return datetime.now() - start <= timedelta(days=self.max_history_days[interval])
+
+    def plan_concurrency(self, request_count: int) -> int:
+        """요청 수에 맞는 동시 실행 수를 반환합니다."""
+        return max(1, min(self.max_concurrency, request_count))
+
+    def plan_batches(self, symbols: Sequence) -> List[List]:
+        """종목 목록을 일괄 조회 단위로 나눕니다."""
+        size = max(1, self.batch_size)
+        items = list(symbols)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def requests_needed(self, symbol_count: int) -> int:
+        """종목 수에 필요한 요청 수를 반환합니다."""
+        return math.ceil(symbol_count / max(1, self.batch_size))
+
+    def fits_hourly_budget(self, symbol_count: int) -> bool:
+        """한 주기의 요청 수가 시간당 제한 안에 들어오는지 반환합니다."""
+        if not self.requests_per_hour:
+            return True
+        return self.requests_needed(symbol_count) <= self.requests_per_hour
+
+    def scaled(self, credential_count: int) -> "ProviderCapabilities":
+        """자격 증명 수만큼 요청 한도와 동시성을 늘린 capabilities를 반환합니다."""
+        if credential_count <= 1:
+            return self
+        return replace(
+            self,
+            requests_per_second=self.requests_per_second and self.requests_per_second * credential_count,
+            requests_per_hour=self.requests_per_hour and self.requests_per_hour * credential_count,
+            max_concurrency=self.max_concurrency * credential_count,
+        )
+
+
+class CandleProvider:
+    """캔들 데이터 제공자의 기본 클래스.
+
+    fetch_candles는 저장용 레코드
+    (symbol, interval, candle_time, open, high, low, close, volume, source) 리스트를 반환합니다.
+    빈 리스트는 제공자가 정상 응답했지만 데이터가 없을 때만 반환하고(서킷 브레이커에 '데이터 없음'으로 기록),
+    네트워크 오류/5xx/API 오류 응답은 ProviderError 등 예외로 알립니다.
+    """
+
+    capabilities: ProviderCapabilities
+
+    @property
+    def name(self) -> str:
+        """제공자 이름 (source 값)."""
+        return self.capabilities.name
+
+    def fetch_candles(
+        self,
+        symbol: str,
+        exchange: str,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        extended_hours: bool = False,
+    ) -> List[tuple]:
+        """단일 종목의 캔들을 조회합니다."""
+        raise NotImplementedError
+
+    def fetch_batch(
+        self,
+        symbols: List[Tuple[str, str]],
+        interval: str,
+        start: datetime,
+        end: datetime,
+        extended_hours: bool = False,
+    ) -> Dict[str, List[tuple]]:
+        """여러 종목의 캔들을 조회합니다. 일괄 조회를 지원하지 않으면 종목별로 조회합니다.
+
+        Args:
+            symbols: (종목 코드, 거래소 코드) 리스트
+
+        Returns:
+            종목별 레코드. 데이터가 없는 종목은 빈 리스트, 일괄 응답 중 오류가 난 종목은 결과에서 빠집니다.
+        """
+        return {
+            symbol: self.fetch_candles(symbol, exchange, interval, start, end, extended_hours)
+            for symbol, exchange in symbols
+        }
+
+    def use_ledger(self, ledger) -> bool:
+        """자격 증명별 전역 쿼터 장부를 설정합니다.
+
+        Returns:
+            자격 증명 풀이 HTTP 요청마다 장부를 차감하면 True. 풀이 없는 제공자는 False (호출한 쪽이 제공자 단위로 차감)
+        """
+        pool = getattr(self, "pool", None)
+        if pool is None:
+            return False
+        pool.ledger = ledger
+        return True
+
+    def remaining_this_hour(self) -> Optional[int]:
+        """자격 증명 풀의 이번 시간 남은 요청 수. 풀이 없으면 None (호출한 쪽의 제한기 사용)."""
+        pool = getattr(self, "pool", None)
+        return pool.remaining_this_hour() if pool is not None else None
+
+
+def _is_open_ended(end: datetime) -> bool:
+    """종료 시각이 오늘 이후이면 최신 데이터부터 조회하면 되므로 True를 반환합니다."""
+    return end.date() >= date.today()
+
+
+# KIS 60분봉 한 페이지 최대 건수 (kis_api.MAX_60M_RECORDS_PER_PAGE)
+KIS_60M_PAGE_SIZE = 120
+
+
+def _kis_60m_page_size(start: datetime, end: datetime) -> int:
+    """조회 기간의 시간 수만큼만 요청합니다. 짧은 기간(최신 봉 갱신)은 페이지 최대 건수를 받지 않습니다."""
+    hours = math.ceil((end - start).total_seconds() / 3600)
+    return max(1, min(KIS_60M_PAGE_SIZE, hours))
+
+
+@timed("parse")
+def candle_data_to_records(symbol: str, interval: str, candles, source: str) -> List[tuple]:
+    """CandleData/TiingoCandleData 리스트를 저장용 레코드로 변환합니다."""
+    return [
+        (
+            symbol,
+            interval,
+            candle.candle_time,
+            candle.open_price,
+            candle.high_price,
+            candle.low_price,
+            candle.close_price,
+            candle.volume,
+            source,
+        )
+        for candle in candles
+    ]
+
+
+class KisProvider(CandleProvider):
+    """한국투자증권 API 제공자."""
+
+    capabilities = ProviderCapabilities(
+        name="kis",
+        max_history_days={"60m": 30, "daily": 3650},
+        default_window_days={"60m": 2, "daily": 30},
+        batch_size=1,
+        requests_per_second=15,  # 실전계좌 제한(초당 20건)에서 여유를 둔 값
+        max_concurrency=4,
+        extended_hours=False,
+        timestamp_semantics=TIMESTAMP_EXCHANGE_LOCAL,
+        notes=["60분봉은 NEXT/KEYB 연속 조회(페이지당 120건)", "일봉은 BYMD 페이징(페이지당 100건)"],
+    )
+
+    def __init__(self, kis_api=None, pool: Optional[CredentialPool] = None):
+        """
+        Args:
+            kis_api: KisApi 클라이언트 (단일 키)
+            pool: KisApi 자격 증명 풀 (지정 시 kis_api 무시)
+        """
+        if pool is None:
+            pool = CredentialPool("kis", [kis_api], type(self).capabilities)
+        self.pool = pool
+        self.api = pool.credentials[0].client
+        self.capabilities = type(self).capabilities.scaled(len(pool))
+
+    def fetch_candles(self, symbol, exchange, interval, start, end, extended_hours=False):
+        # 페이지 간격은 키 하나의 초당 한도 기준
+        page_delay = 1.0 / type(self).capabilities.requests_per_second
+
+        def fetch(api):
+            if interval == "60m":
+                return api.fetch_us_stock_candles_60m_history(
+                    symbol=symbol,
+                    exchange=exchange,
+                    start_time=start,
+                    end_time=None if _is_open_ended(end) else end,
+                    page_size=_kis_60m_page_size(start, end),
+                    request_delay=page_delay,
+                )
+            return api.fetch_us_stock_candles_daily_range(
+                symbol=symbol,
+                exchange=exchange,
+                start_date=start.date(),
+                end_date=None if _is_open_ended(end) else end.date(),
+                request_delay=page_delay,
+            )
+
+        return kis_candles_to_records(symbol, interval, self.pool.run(fetch), self.name)
+
+
+class YFinanceProvider(CandleProvider):
+    """yfinance 제공자. 여러 종목을 한 번에 조회합니다."""
+
+    capabilities = ProviderCapabilities(
+        name="yf",
+        max_history_days={"60m": 729, "daily": 36500},
+        default_window_days={"60m": 5, "daily": 30},
+        batch_size=50,
+        requests_per_second=0.5,  # Yahoo 소프트 차단 방지
+        max_concurrency=1,
+        extended_hours=True,
+        timestamp_semantics=TIMESTAMP_TZ_AWARE,
+        notes=["인증 불필요", "과도한 요청 시 일시 차단"],
+    )
+
+    def __init__(self, api=None):
+        """
+        Args:
+            api: YFinanceApi 클라이언트 (None이면 새로 생성)
+        """
+        if api is None:
+            from .yfinance_api import YFinanceApi
+
+            api = YFinanceApi()
+        self.api = api
+
+    def fetch_candles(self, symbol, exchange, interval, start, end, extended_hours=False):
+        records = self.fetch_batch([(symbol, exchange)], interval, start, end, extended_hours).get(symbol)
+        if records is None:
+            raise ProviderError(f"[yfinance] {symbol} 조회 실패")
+        return records
+
+    def fetch_batch(self, symbols, interval, start, end, extended_hours=False):
+        # yfinance의 end는 미포함이므로 하루를 더함
+        by_symbol = self.api.fetch_candles_batch(
+            [symbol for symbol, _ in symbols],
+            interval=interval,
+            start=start.strftime("%Y-%m-%d"),
+            end=(end + timedelta(days=1)).strftime("%Y-%m-%d"),
+            include_extended_hours=extended_hours,
+        )
+        return {
+            symbol: candle_data_to_records(symbol, interval, candles, self.name)
+            for symbol, candles in by_symbol.items()
+        }
+
+
+class TiingoProvider(CandleProvider):
+    """Tiingo 제공자 (무료 티어)."""
+
+    capabilities = ProviderCapabilities(
+        name="tiingo",
+        max_history_days={"60m": 5, "daily": 36500},
+        default_window_days={"60m": 5, "daily": 30},
+        batch_size=1,
+        requests_per_hour=50,
+        max_concurrency=1,
+        extended_hours=True,
+        timestamp_semantics=TIMESTAMP_UTC,
+        notes=["일일 500 unique symbols", "IEX 분봉은 거래량 미제공(0)"],
+    )
+
+    def __init__(self, api=None, pool: Optional[CredentialPool] = None):
+        """
+        Args:
+            api: TiingoApi 클라이언트 (None이면 환경변수의 모든 키로 풀 생성)
+            pool: TiingoApi 자격 증명 풀 (지정 시 api 무시)
+        """
+        if pool is None:
+            from .tiingo_api import TiingoApi
+
+            clients = [api] if api is not None else TiingoApi.from_env_all()
+            pool = CredentialPool("tiingo", clients, type(self).capabilities)
+        self.pool = pool
+        self.api = pool.credentials[0].client
+        self.capabilities = type(self).capabilities.scaled(len(pool))
+
+    def fetch_candles(self, symbol, exchange, interval, start, end, extended_hours=False):
+        start_date = start.strftime("%Y-%m-%d")
+        end_date = end.strftime("%Y-%m-%d")
+
+        def fetch(api):
+            if interval == "60m":
+                return api.fetch_iex_candles(
+                    symbol=symbol,
+                    start_date=start_date,
+                    end_date=end_date,
+                    resample_freq="1hour",
+                    after_hours=extended_hours,
+                )
+            return api.fetch_candles_daily(symbol=symbol, start_date=start_date, end_date=end_date)
+
+        return candle_data_to_records(symbol, interval, self.pool.run(fetch), self.name)
+
+
+# 이름별 제공자 capabilities (자격 증명 없이 계획 수립에 사용)
+PROVIDER_CAPABILITIES: Dict[str, ProviderCapabilities] = {
+    provider.capabilities.name: provider.capabilities
+    for provider in (KisProvider, YFinanceProvider, TiingoProvider)
+}
+
+
+def credential_count(name: str) -> int:
+    """환경변수에 설정된 제공자의 자격 증명 수. 자격 증명 풀이 없거나 설정이 없으면 1."""
+    try:
+        if name == "kis":
+            from .kis_api import KisApi
+
+            return len(KisApi.from_env_all())
+        if name == "tiingo":
+            from .tiingo_api import TiingoApi
+
+            return len(TiingoApi.from_env_all())
+    except ValueError:
+        pass
+    return 1
+
+
+def create_provider(name: str, **kwargs) -> CandleProvider:
+    """이름으로 제공자를 생성합니다.
+
+    Args:
+        name: 'kis', 'yf', 'tiingo'
+        kwargs: 제공자 생성자 인자 (kis/tiingo는 클라이언트 미지정 시 환경변수의 모든 자격 증명으로 풀 생성)
+
+    Raises:
+        ValueError: 알 수 없는 제공자이거나 자격 증명이 없을 때
+    """
+    if name == "kis":
+        if "kis_api" not in kwargs and "pool" not in kwargs:
+            from .kis_api import KisApi
+
+            kwargs["pool"] = CredentialPool("kis", KisApi.from_env_all(), KisProvider.capabilities)
+        return KisProvider(**kwargs)
+    if name == "yf":
+        return YFinanceProvider(**kwargs)
+    if name == "tiingo":
+        return TiingoProvider(**kwargs)
+    raise ValueError(f"알 수 없는 제공자입니다: {name}")
@@ -0,0 +1,157 @@
+"""여러 수집 노드가 공유하는 제공자 요청 쿼터 장부.
+
+고정 윈도우(window_seconds)마다 제공자별 사용 건수를 PostgreSQL에 기록하고,
+한도 안에서만 원자적으로 증가시켜 노드 수와 관계없이 전체 요청 수를 제한합니다.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional
+
+from .db import get_connection
+from .deadline import DeadlineExceededError, current_deadline
+
+if TYPE_CHECKING:
+    from .providers import ProviderCapabilities
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QuotaLimit:
+    """윈도우당 요청 한도."""
+
+    window_seconds: int
+    limit: int
+
+
+def quota_limits(caps: ProviderCapabilities) -> List[QuotaLimit]:
+    """제공자 capabilities를 장부 한도로 변환합니다.
+
+    초당 제한이 1 미만이면(예: 0.5 req/s) 한도 1건이 되도록 윈도우를 늘립니다.
+    """
+    limits = []
+    if caps.requests_per_hour:
+        limits.append(QuotaLimit(window_seconds=3600, limit=caps.requests_per_hour))
+    if caps.requests_per_second:
+        window = max(1, math.ceil(1.0 / caps.requests_per_second))
+        limits.append(QuotaLimit(window_seconds=window, limit=max(1, int(caps.requests_per_second * window))))
+    return limits
+
+
+def ensure_provider_quota_ledger_table() -> None:
+    """provider_quota_ledger 테이블이 없으면 생성합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS provider_quota_ledger (
+                    provider TEXT NOT NULL,
+                    window_seconds INTEGER NOT NULL,
+                    window_start BIGINT NOT NULL,
+                    used INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (provider, window_seconds, window_start)
+                );
+                """
+            )
+            conn.commit()
+    logger.info("provider_quota_ledger 테이블을 확인했습니다.")
+
+
+class QuotaLedger:
+    """DB 기반 전역 쿼터 장부."""
+
+    def __init__(self, key_prefix: str = ""):
+        """
+        Args:
+            key_prefix: 장부 키 접두사 (같은 제공자를 다른 자격 증명으로 나눌 때 사용)
+        """
+        self.key_prefix = key_prefix
+
+    def _key(self, provider: str) -> str:
+        return f"{self.key_prefix}{provider}"
+
+    def try_acquire(self, provider: str, quota: QuotaLimit, now: Optional[float] = None) -> bool:
+        """현재 윈도우에 요청 1건을 기록합니다. 한도를 넘으면 False를 반환합니다."""
+        now = time.time() if now is None else now
+        window_start = int(now // quota.window_seconds) * quota.window_seconds
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO provider_quota_ledger (provider, window_seconds, window_start, used)
+                    VALUES (%s, %s, %s, 1)
+                    ON CONFLICT (provider, window_seconds, window_start) DO UPDATE SET
+                        used = provider_quota_ledger.used + 1
+                    WHERE provider_quota_ledger.used < %s
+                    RETURNING used
+                    """,
+                    (self._key(provider), quota.window_seconds, window_start, quota.limit),
+                )
+                row = cursor.fetchone()
+                conn.commit()
+        return row is not None
+
+    def acquire(self, provider: str, limits: List[QuotaLimit]) -> float:
+        """모든 한도에서 요청 1건을 얻을 때까지 대기하고 대기한 시간(초)을 반환합니다.
+
+        한도는 순서대로 확보하므로 시간당 한도처럼 희소한 한도를 앞에 둡니다.
+
+        Raises:
+            DeadlineExceededError: 현재 컨텍스트의 마감 시간 안에 쿼터를 얻을 수 없을 때
+        """
+        deadline = current_deadline()
+        waited = 0.0
+        for quota in limits:
+            while not self.try_acquire(provider, quota):
+                now = time.time()
+                wait = quota.window_seconds - (now % quota.window_seconds) + 0.01
+                if deadline is not None and wait >= deadline.remaining():
+                    raise DeadlineExceededError(f"[{provider}] 다음 쿼터 윈도우가 작업 마감 시간 이후입니다.")
+                logger.debug("[%s] 전역 쿼터 소진 - %.1f초 대기", provider, wait)
+                time.sleep(wait)
+                waited += wait
+        return waited
+
+    def remaining(
+        self, provider: str, quota: QuotaLimit, key_count: int = 1, now: Optional[float] = None
+    ) -> int:
+        """현재 윈도우에서 남은 요청 수를 반환합니다.
+
+        자격 증명 풀을 쓰는 제공자는 키별로('<제공자>:<키>') 차감하므로 모든 키의 사용량을 합산하고,
+        한도도 키 수만큼 늘려 비교합니다 (ProviderCapabilities.scaled와 같은 기준).
+
+        Args:
+            provider: 제공자 이름
+            quota: 키 하나의 한도
+            key_count: 설정된 자격 증명 수. 장부에 기록된 키가 더 많으면 그 수를 사용
+            now: 기준 시각 (None이면 현재)
+        """
+        now = time.time() if now is None else now
+        window_start = int(now // quota.window_seconds) * quota.window_seconds
+        key = self._key(provider)
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT COALESCE(SUM(used), 0), COUNT(*) FILTER (WHERE provider LIKE %s)
+                    FROM provider_quota_ledger
+                    WHERE (provider = %s OR provider LIKE %s) AND window_seconds = %s AND window_start = %s
+                    """,
+                    (f"{key}:%", key, f"{key}:%", quota.window_seconds, window_start),
+                )
+                used, seen_keys = cursor.fetchone()
+        return quota.limit * max(1, key_count, seen_keys) - used
+
+    def prune(self, older_than_seconds: int = 86400) -> int:
+        """지난 윈도우 기록을 삭제하고 삭제 건수를 반환합니다."""
+        cutoff = int(time.time()) - older_than_seconds
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM provider_quota_ledger WHERE window_start < %s", (cutoff,))
+                deleted = cursor.rowcount
+                conn.commit()
+        return deleted
@@ -0,0 +1,79 @@
+"""요청 속도 제한기.
+
+초당 요청 수와 시간당 요청 수 제한을 함께 지키도록 요청 시점을 조절합니다.
+여러 스레드가 하나의 제한기를 공유할 수 있습니다.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from .deadline import DeadlineExceededError, current_deadline
+
+
+class RateLimiter:
+    """초당/시간당 요청 수 제한기."""
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        requests_per_hour: Optional[int] = None,
+        min_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            requests_per_second: 초당 최대 요청 수
+            requests_per_hour: 시간당 최대 요청 수 (1시간 슬라이딩 윈도우)
+            min_interval: 요청 간 최소 간격 (초). 지정 시 requests_per_second보다 우선
+        """
+        if min_interval is None and requests_per_second:
+            min_interval = 1.0 / requests_per_second
+        self.min_interval = min_interval or 0.0
+        self.requests_per_hour = requests_per_hour
+        self._last_request = 0.0
+        self._hourly: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """요청 가능 시점까지 대기하고 대기한 시간(초)을 반환합니다.
+
+        Raises:
+            DeadlineExceededError: 현재 컨텍스트의 마감 시간 안에 요청할 수 없을 때 (대기하지 않음)
+        """
+        deadline = current_deadline()
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._wait_time(now)
+                if wait <= 0:
+                    self._last_request = now
+                    if self.requests_per_hour:
+                        self._hourly.append(now)
+                    return waited
+            if deadline is not None and wait >= deadline.remaining():
+                raise DeadlineExceededError(f"요청 가능 시점({wait:.1f}초 후)이 작업 마감 시간을 넘습니다.")
+            time.sleep(wait)
+            waited += wait
+
+    def remaining_this_hour(self) -> Optional[int]:
+        """현재 1시간 윈도우에서 남은 요청 수를 반환합니다. 제한이 없으면 None."""
+        if not self.requests_per_hour:
+            return None
+        with self._lock:
+            self._expire(time.monotonic())
+            return self.requests_per_hour - len(self._hourly)
+
+    def _wait_time(self, now: float) -> float:
+        wait = self._last_request + self.min_interval - now
+        if self.requests_per_hour:
+            self._expire(now)
+            if len(self._hourly) >= self.requests_per_hour:
+                wait = max(wait, self._hourly[0] + 3600 - now)
+        return wait
+
+    def _expire(self, now: float) -> None:
+        while self._hourly and self._hourly[0] <= now - 3600:
+            self._hourly.popleft()
@@ -0,0 +1,486 @@
+"""일봉 고점/저점 이동 극값 증분 갱신 (rolling_extremes).
+
+눌림 비율의 기준 고점(최근 N봉 또는 52주 고점)을 스크리닝마다 1년치 일봉을 읽어 구하지 않도록,
+종목별로 2주(14봉), 20봉, 52주(252봉) 구간의 고점과 저점을 단조 덱(monotonic deque)으로 유지합니다.
+
+    - 구간마다 고점용/저점용 덱에 '뒤에 더 큰(작은) 값이 오지 않은' 봉 위치만 남기므로 맨 앞 원소가 구간 극값입니다.
+      새 봉 하나의 반영은 분할 상환 O(1), 조회는 O(1)입니다.
+    - 마지막 봉은 덱에 넣지 않고 따로 두므로 장중 재수집으로 마지막 봉이 바뀌어도 값만 바꿉니다. (IndicatorState와 같은 방식)
+    - 덱에는 봉 위치만 저장하고, 값은 최근 252봉의 시각/고가/저가 링 버퍼에서 찾습니다.
+    - 같은 극값이 여러 번이면 가장 이른 봉을 극값 봉으로 봅니다. (screening과 같음)
+
+종목마다 한 행을 rolling_extremes 테이블에 저장하며, 상태(링 버퍼, 덱)와 함께 구간별 극값·도달 시각·경과 봉 수를
+컬럼으로 두어 조회는 상태를 풀지 않고 한 행만 읽습니다. 한 종목에 여러 소스가 있으면 load_daily_panel과 같이
+날짜마다 kis → tiingo → yf 순서로 가장 앞선 소스의 봉 하나를 사용합니다. 그래서 수집 배정에 따라 소스가 바뀌어도
+우선 소스에 없는 날짜는 다른 소스의 봉으로 채워 상태가 계속 갱신됩니다.
+"""
+from __future__ import annotations
+
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from psycopg2.extras import execute_values
+
+from .daily_features import HIGH_2W_BARS
+from .daily_panel import SOURCE_PRIORITY
+from .db import add_upsert_listener, get_connection
+from .metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+# 52주 고점/저점 계산에 쓰는 거래일 수
+BARS_52W = 252
+
+# 구간 이름 → 거래일 수
+EXTREME_WINDOWS: Dict[str, int] = {"2w": HIGH_2W_BARS, "20d": 20, "52w": BARS_52W}
+
+# 링 버퍼 크기: 가장 긴 구간
+RING_SIZE = max(EXTREME_WINDOWS.values())
+
+EXTREMES_UPDATES = counter(
+    "stock_crawler_extremes_updates_total",
+    "이동 극값 상태 갱신 수 (mode: incremental/rebuild)",
+    ("mode",),
+)
+EXTREMES_UPDATE_SECONDS = histogram(
+    "stock_crawler_extremes_update_seconds",
+    "캔들 UPSERT 한 번에 대한 이동 극값 갱신 시간 (초)",
+)
+
+
+@dataclass
+class Extreme:
+    """구간 하나의 고점 또는 저점."""
+
+    value: float
+    time: datetime  # 극값 봉 시각
+    back: int  # 극값 봉 이후 지난 봉 수 (마지막 봉이면 0)
+
+
+@dataclass
+class ExtremeValues:
+    """종목의 구간별 고점/저점."""
+
+    symbol: str
+    source: str
+    bars: int  # 전체 봉 수
+    last_time: datetime
+    highs: Dict[str, Extreme]  # 구간 이름 → 고점
+    lows: Dict[str, Extreme]  # 구간 이름 → 저점
+
+    def high(self, bars: int) -> Optional[Extreme]:
+        """bars봉 구간의 고점 (유지하지 않는 구간이면 None)."""
+        return next((self.highs[name] for name, size in EXTREME_WINDOWS.items() if size == bars), None)
+
+    def low(self, bars: int) -> Optional[Extreme]:
+        """bars봉 구간의 저점 (유지하지 않는 구간이면 None)."""
+        return next((self.lows[name] for name, size in EXTREME_WINDOWS.items() if size == bars), None)
+
+
+def _empty_deques() -> Dict[str, Deque[int]]:
+    return {name: deque() for name in EXTREME_WINDOWS}
+
+
+@dataclass
+class ExtremesState:
+    """종목의 이동 극값 상태.
+
+    덱은 마지막 봉 직전까지 반영한 봉 위치(0부터 센 전체 봉 순번)이고,
+    마지막 봉은 링 버퍼(times/highs/lows/sources)의 마지막 원소입니다.
+    봉 하나는 거래일 하나이며, 같은 날짜의 봉은 우선순위가 높은 소스의 것만 남깁니다.
+    """
+
+    symbol: str
+    source: str  # 마지막 봉의 소스
+    bars: int = 0  # 마지막 봉을 포함한 전체 봉 수
+    times: List[datetime] = field(default_factory=list)
+    highs: List[float] = field(default_factory=list)
+    lows: List[float] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    max_deques: Dict[str, Deque[int]] = field(default_factory=_empty_deques)
+    min_deques: Dict[str, Deque[int]] = field(default_factory=_empty_deques)
+
+    @property
+    def last_time(self) -> Optional[datetime]:
+        return self.times[-1] if self.times else None
+
+    def update(self, candle_time: datetime, high: float, low: float, source: str, rank: Callable[[str], int]) -> bool:
+        """봉 하나를 반영합니다.
+
+        Args:
+            rank: 소스 우선순위 (작을수록 우선). 같은 날짜에 더 앞선 소스의 봉이 있으면 무시합니다
+
+        Returns:
+            반영했거나 바뀐 것이 없으면 True, 마지막 봉 이전 이력이 바뀌어 전체 재계산이 필요하면 False
+        """
+        day = candle_time.date()
+        if not self.times or day > self.times[-1].date():
+            self._push(candle_time, high, low, source)
+            return True
+        if day == self.times[-1].date():
+            if rank(source) <= rank(self.sources[-1]):
+                self.times[-1] = candle_time
+                self.highs[-1] = high
+                self.lows[-1] = low
+                self.sources[-1] = source
+                self.source = source
+            return True
+        if day < self.times[0].date():
+            return False
+        # 링 버퍼 안의 이전 봉: 뒤처진 소스의 봉이면 무시하고, 고가와 저가가 같으면 재수집으로 다시 저장된 것
+        for i in range(len(self.times) - 2, -1, -1):
+            if self.times[i].date() == day:
+                if rank(source) > rank(self.sources[i]):
+                    return True
+                if self.highs[i] == high and self.lows[i] == low:
+                    self.sources[i] = source
+                    return True
+                return False
+            if self.times[i].date() < day:
+                break
+        return False  # 링 버퍼 구간 사이에 새로 끼어든 날짜
+
+    def _index(self, position: int) -> int:
+        """봉 위치의 링 버퍼 인덱스."""
+        return position - (self.bars - len(self.times))
+
+    def _push(self, candle_time: datetime, high: float, low: float, source: str) -> None:
+        if self.times:
+            self._commit_last()
+        self.times.append(candle_time)
+        self.highs.append(high)
+        self.lows.append(low)
+        self.sources.append(source)
+        self.source = source
+        self.bars += 1
+        if len(self.times) > RING_SIZE:
+            del self.times[0]
+            del self.highs[0]
+            del self.lows[0]
+            del self.sources[0]
+        # 덱에는 마지막 봉을 뺀 구간 [bars - 크기, bars - 2]의 위치만 남김
+        for name, size in EXTREME_WINDOWS.items():
+            for positions in (self.max_deques[name], self.min_deques[name]):
+                while positions and positions[0] < self.bars - size:
+                    positions.popleft()
+
+    def _commit_last(self) -> None:
+        """마지막 봉을 덱에 반영합니다."""
+        position = self.bars - 1
+        high = self.highs[-1]
+        low = self.lows[-1]
+        for name in EXTREME_WINDOWS:
+            # 같은 값은 앞의 봉을 남겨 가장 이른 극값 봉을 유지
+            positions = self.max_deques[name]
+            while positions and self.highs[self._index(positions[-1])] < high:
+                positions.pop()
+            positions.append(position)
+            positions = self.min_deques[name]
+            while positions and self.lows[self._index(positions[-1])] > low:
+                positions.pop()
+            positions.append(position)
+
+    def _extreme(self, positions: Deque[int], values: List[float], lowest: bool) -> Extreme:
+        last = self.bars - 1
+        position = last
+        if positions:
+            front = values[self._index(positions[0])]
+            if (front <= values[-1]) if lowest else (front >= values[-1]):
+                position = positions[0]
+        index = self._index(position)
+        return Extreme(value=values[index], time=self.times[index], back=last - position)
+
+    def values(self) -> ExtremeValues:
+        """마지막 봉 기준 구간별 고점/저점을 계산합니다. (봉이 구간보다 적으면 전체 봉 기준)"""
+        return ExtremeValues(
+            symbol=self.symbol,
+            source=self.source,
+            bars=self.bars,
+            last_time=self.times[-1],
+            highs={name: self._extreme(self.max_deques[name], self.highs, lowest=False) for name in EXTREME_WINDOWS},
+            lows={name: self._extreme(self.min_deques[name], self.lows, lowest=True) for name in EXTREME_WINDOWS},
+        )
+
+
+def build_extremes(
+    symbol: str,
+    sources: Sequence[str],
+    times: Sequence[datetime],
+    highs: Sequence[float],
+    lows: Sequence[float],
+    skipped: int = 0,
+) -> ExtremesState:
+    """날짜별로 병합한 시계열(시각 오름차순)로 상태를 새로 만듭니다.
+
+    Args:
+        sources: 봉마다 사용한 소스
+        skipped: times 앞에 있지만 읽지 않은 봉 수 (극값은 최근 RING_SIZE봉만 쓰므로 전체를 읽을 필요가 없음)
+    """
+    state = ExtremesState(symbol=symbol, source=sources[-1] if sources else "", bars=skipped)
+    for candle_time, high, low, source in zip(times, highs, lows, sources):
+        state._push(candle_time, high, low, source)
+    return state
+
+
+# 덱 컬럼: max_2w, min_2w, max_20d, ...
+_DEQUE_COLUMNS = tuple(f"{kind}_{name}" for name in EXTREME_WINDOWS for kind in ("max", "min"))
+# 조회용 컬럼: high_2w, high_2w_time, high_2w_back, low_2w, ...
+_VALUE_COLUMNS = tuple(
+    f"{side}_{name}{suffix}" for name in EXTREME_WINDOWS for side in ("high", "low") for suffix in ("", "_time", "_back")
+)
+_STATE_COLUMNS = ("symbol", "source", "bars", "times", "highs", "lows", "sources") + _DEQUE_COLUMNS
+_ALL_COLUMNS = _STATE_COLUMNS + ("last_time",) + _VALUE_COLUMNS
+
+
+def ensure_rolling_extremes_table() -> None:
+    """rolling_extremes 테이블이 없으면 생성합니다."""
+    deque_columns = "\n".join(f"{name} INTEGER[] NOT NULL," for name in _DEQUE_COLUMNS)
+    value_columns = "\n".join(
+        f"{name} {'TIMESTAMPTZ' if name.endswith('_time') else 'INTEGER' if name.endswith('_back') else 'DOUBLE PRECISION'} NOT NULL,"
+        for name in _VALUE_COLUMNS
+    )
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS rolling_extremes (
+                    symbol TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    bars INTEGER NOT NULL,
+                    times TIMESTAMPTZ[] NOT NULL,
+                    highs DOUBLE PRECISION[] NOT NULL,
+                    lows DOUBLE PRECISION[] NOT NULL,
+                    sources TEXT[] NOT NULL DEFAULT '{{}}',
+                    {deque_columns}
+                    last_time TIMESTAMPTZ NOT NULL,
+                    {value_columns}
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                );
+                ALTER TABLE rolling_extremes ADD COLUMN IF NOT EXISTS sources TEXT[] NOT NULL DEFAULT '{{}}';
+                """
+            )
+            conn.commit()
+    logger.info("rolling_extremes 테이블을 확인했습니다.")
+
+
+def _state_row(state: ExtremesState) -> tuple:
+    values = state.values()
+    extremes = []
+    for name in EXTREME_WINDOWS:
+        for extreme in (values.highs[name], values.lows[name]):
+            extremes.extend((extreme.value, extreme.time, extreme.back))
+    deques = []
+    for name in EXTREME_WINDOWS:
+        deques.extend((list(state.max_deques[name]), list(state.min_deques[name])))
+    return (
+        (state.symbol, state.source, state.bars, state.times, state.highs, state.lows, state.sources)
+        + tuple(deques)
+        + (values.last_time,)
+        + tuple(extremes)
+    )
+
+
+def _state_from_row(row: tuple) -> ExtremesState:
+    record = dict(zip(_STATE_COLUMNS, row))
+    return ExtremesState(
+        symbol=record["symbol"],
+        source=record["source"],
+        bars=record["bars"],
+        times=list(record["times"]),
+        highs=list(record["highs"]),
+        lows=list(record["lows"]),
+        # 봉별 소스를 저장하기 전의 행은 모든 봉이 행의 소스
+        sources=list(record["sources"]) or [record["source"]] * len(record["times"]),
+        max_deques={name: deque(record[f"max_{name}"]) for name in EXTREME_WINDOWS},
+        min_deques={name: deque(record[f"min_{name}"]) for name in EXTREME_WINDOWS},
+    )
+
+
+def _source_rank(source: str, priority: Sequence[str]) -> int:
+    return priority.index(source) if source in priority else len(priority)
+
+
+# 갱신 대상 봉: (시각, 고가, 저가, 소스)
+_Bar = Tuple[datetime, float, float, str]
+
+
+class ExtremesEngine:
+    """일봉 UPSERT 결과로 rolling_extremes를 갱신합니다.
+
+    db.add_upsert_listener(engine.on_upsert)로 등록하면 수집기가 캔들을 저장할 때마다 호출됩니다.
+    """
+
+    def __init__(self, source_priority: Sequence[str] = SOURCE_PRIORITY):
+        self.source_priority = tuple(source_priority)
+
+    def on_upsert(self, rows: Iterable[tuple]) -> None:
+        """UPSERT된 일봉으로 상태를 갱신합니다.
+
+        Args:
+            rows: (symbol, interval, candle_time, high, low, close, volume, source, inserted) 행 목록 (db.UPSERT_CANDLES_SQL의 RETURNING)
+        """
+        bars: Dict[str, List[_Bar]] = {}
+        for symbol, interval, candle_time, high, low, _close, _volume, source, _inserted in rows:
+            if interval == "daily":
+                bars.setdefault(symbol, []).append((candle_time, high, low, source))
+        if not bars:
+            return
+
+        with EXTREMES_UPDATE_SECONDS.time():
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    symbols = sorted(bars)
+                    states = self._load_for_update(cursor, symbols)
+                    changed = []
+                    for symbol in symbols:
+                        state, mode = self._apply(cursor, symbol, states.get(symbol), bars[symbol])
+                        EXTREMES_UPDATES.labels(mode=mode).inc()
+                        if state is not None:
+                            changed.append(state)
+                    self._save(cursor, changed)
+                    conn.commit()
+
+    def _rank(self, source: str) -> int:
+        return _source_rank(source, self.source_priority)
+
+    def _apply(
+        self, cursor, symbol: str, state: Optional[ExtremesState], updates: List[_Bar]
+    ) -> Tuple[Optional[ExtremesState], str]:
+        """한 종목에 새 봉을 날짜별 소스 병합 규칙으로 반영하고 (저장할 상태, 갱신 방식)을 반환합니다."""
+        if state is None:
+            return self.rebuild_one(cursor, symbol), "rebuild"
+        for candle_time, high, low, source in sorted(updates, key=lambda bar: (bar[0], self._rank(bar[3]))):
+            if not state.update(candle_time, high, low, source, self._rank):
+                logger.info("[%s] %s 이전 봉이 바뀌어 이동 극값을 다시 계산합니다.", symbol, candle_time)
+                return self.rebuild_one(cursor, symbol), "rebuild"
+        return state, "incremental"
+
+    def rebuild_one(self, cursor, symbol: str) -> Optional[ExtremesState]:
+        """DB의 날짜별 병합 일봉(load_daily_panel과 같은 규칙) 중 최근 RING_SIZE봉으로 상태를 다시 만듭니다.
+
+        일봉이 없으면 None.
+        """
+        cursor.execute(
+            """
+            WITH daily AS (
+                SELECT DISTINCT ON (candle_time::date)
+                    candle_time, high_price::float8 AS high, low_price::float8 AS low, source
+                FROM us_stock_candles
+                WHERE symbol = %(symbol)s AND interval = 'daily'
+                ORDER BY candle_time::date, array_position(%(priority)s::text[], source), candle_time DESC
+            )
+            SELECT COUNT(*),
+                   (array_agg(candle_time ORDER BY candle_time DESC))[1:%(ring)s],
+                   (array_agg(high ORDER BY candle_time DESC))[1:%(ring)s],
+                   (array_agg(low ORDER BY candle_time DESC))[1:%(ring)s],
+                   (array_agg(source ORDER BY candle_time DESC))[1:%(ring)s]
+            FROM daily
+            """,
+            {"symbol": symbol, "ring": RING_SIZE, "priority": list(self.source_priority)},
+        )
+        count, times, highs, lows, sources = cursor.fetchone()
+        if not count:
+            return None
+        return build_extremes(
+            symbol, sources[::-1], times[::-1], highs[::-1], lows[::-1], skipped=count - len(times)
+        )
+
+    def rebuild(self, symbols: Sequence[str]) -> int:
+        """종목들의 상태를 다시 계산해 저장하고 저장한 종목 수를 반환합니다."""
+        saved = 0
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                for symbol in symbols:
+                    state = self.rebuild_one(cursor, symbol.upper())
+                    if state is None:
+                        continue
+                    self._save(cursor, [state])
+                    conn.commit()
+                    saved += 1
+        EXTREMES_UPDATES.labels(mode="rebuild").inc(saved)
+        return saved
+
+    @staticmethod
+    def _load_for_update(cursor, symbols: List[str]) -> Dict[str, ExtremesState]:
+        # 여러 수집 스레드가 같은 종목을 동시에 갱신하지 않도록 행을 잠금 (종목 순서대로 잠가 교착 방지)
+        cursor.execute(
+            f"""
+            SELECT {", ".join(_STATE_COLUMNS)}
+            FROM rolling_extremes
+            WHERE symbol = ANY(%s)
+            ORDER BY symbol
+            FOR UPDATE
+            """,
+            (symbols,),
+        )
+        return {row[0]: _state_from_row(row) for row in cursor.fetchall()}
+
+    @staticmethod
+    def _save(cursor, states: List[ExtremesState]) -> None:
+        if not states:
+            return
+        updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in _ALL_COLUMNS[1:])
+        execute_values(
+            cursor,
+            f"""
+            INSERT INTO rolling_extremes ({", ".join(_ALL_COLUMNS)})
+            VALUES %s
+            ON CONFLICT (symbol) DO UPDATE SET {updates}, updated_at = NOW()
+            """,
+            [_state_row(state) for state in states],
+            page_size=500,
+        )
+
+
+def enable_extremes_updates(engine: Optional[ExtremesEngine]) -> None:
+    """rolling_extremes 테이블을 확인하고 일봉 UPSERT마다 엔진이 상태를 갱신하도록 등록합니다.
+
+    Args:
+        engine: 이동 극값 엔진 (None이면 아무것도 하지 않음, Settings.extremes_engine() 참고)
+    """
+    if engine is None:
+        return
+    ensure_rolling_extremes_table()
+    add_upsert_listener(engine.on_upsert)
+
+
+def get_rolling_extremes(symbols: Optional[Sequence[str]] = None) -> Dict[str, ExtremeValues]:
+    """저장된 구간별 고점/저점을 종목별로 조회합니다. 테이블이 없으면 빈 dict.
+
+    Args:
+        symbols: 종목 목록 (None이면 전체)
+    """
+    columns = ("symbol", "source", "bars", "last_time") + _VALUE_COLUMNS
+    query = f"SELECT {', '.join(columns)} FROM rolling_extremes"
+    params: tuple = ()
+    if symbols is not None:
+        query += " WHERE symbol = ANY(%s)"
+        params = ([s.upper() for s in symbols],)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('rolling_extremes') IS NOT NULL")
+            if not cursor.fetchone()[0]:
+                return {}
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+    result = {}
+    for row in rows:
+        record = dict(zip(columns, row))
+
+        def extreme(side: str, name: str) -> Extreme:
+            prefix = f"{side}_{name}"
+            return Extreme(value=record[prefix], time=record[f"{prefix}_time"], back=record[f"{prefix}_back"])
+
+        result[record["symbol"]] = ExtremeValues(
+            symbol=record["symbol"],
+            source=record["source"],
+            bars=record["bars"],
+            last_time=record["last_time"],
+            highs={name: extreme("high", name) for name in EXTREME_WINDOWS},
+            lows={name: extreme("low", name) for name in EXTREME_WINDOWS},
+        )
+    return result
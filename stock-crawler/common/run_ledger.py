@@ -0,0 +1,293 @@
+"""수집 실행 기록 (collection_runs / collection_run_items).
+
+오케스트레이터의 수집 실행마다 제공자, 주기, 소요 시간과 단계별 시간(fetch/parse/write/wait),
+응답 크기, UPSERT 결과를 저장하고 종목별 결과를 함께 남깁니다.
+집계 뷰(collection_run_daily, collection_run_weekly)는 실행 단위 테이블만 읽으므로
+종목별 기록이 쌓여도 가볍게 조회할 수 있습니다. 그래서 뷰의 fetch_p50_ms/fetch_p95_ms는
+개별 요청의 백분위가 아니라 실행별 p50/p95 값들의 백분위입니다(실행마다 종목 수가 달라도
+같은 가중치). 요청 단위 분포는 stock_crawler_provider_call_seconds 히스토그램을 사용하세요.
+"""
+from __future__ import annotations
+
+import logging
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from .db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# 집계 뷰 (기간 단위별로 같은 정의를 사용)
+_RUN_SUMMARY_VIEW_SQL = """
+    CREATE OR REPLACE VIEW {name} AS
+    SELECT
+        provider,
+        interval,
+        date_trunc('{unit}', started_at) AS period,
+        COUNT(*) AS runs,
+        SUM(tickers) AS tickers,
+        SUM(succeeded) AS succeeded,
+        SUM(failed) AS failed,
+        SUM(records_saved) AS records_saved,
+        SUM(rows_inserted) AS rows_inserted,
+        SUM(rows_updated) AS rows_updated,
+        SUM(payload_bytes) AS payload_bytes,
+        SUM(wall_seconds) AS wall_seconds,
+        SUM(fetch_seconds) AS fetch_seconds,
+        SUM(parse_seconds) AS parse_seconds,
+        SUM(write_seconds) AS write_seconds,
+        SUM(wait_seconds) AS wait_seconds,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY wall_seconds) AS wall_p50_seconds,
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY wall_seconds) AS wall_p95_seconds,
+        -- 실행별 p50/p95의 백분위 (개별 요청 시간의 백분위가 아님)
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY fetch_p50_ms) AS fetch_p50_ms,
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY fetch_p95_ms) AS fetch_p95_ms,
+        SUM(records_buffered) AS records_buffered
+    FROM collection_runs
+    GROUP BY provider, interval, date_trunc('{unit}', started_at)
+"""
+
+
+def ensure_collection_runs_table() -> None:
+    """collection_runs/collection_run_items 테이블과 집계 뷰가 없으면 생성합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS collection_runs (
+                    id BIGSERIAL PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    host TEXT,
+                    started_at TIMESTAMPTZ NOT NULL,
+                    finished_at TIMESTAMPTZ NOT NULL,
+                    wall_seconds DOUBLE PRECISION NOT NULL,
+                    tickers INTEGER NOT NULL,
+                    succeeded INTEGER NOT NULL,
+                    failed INTEGER NOT NULL,
+                    records_saved BIGINT NOT NULL,
+                    rows_inserted BIGINT,
+                    rows_updated BIGINT,
+                    payload_bytes BIGINT NOT NULL,
+                    fetch_seconds DOUBLE PRECISION NOT NULL,
+                    parse_seconds DOUBLE PRECISION NOT NULL,
+                    write_seconds DOUBLE PRECISION NOT NULL,
+                    wait_seconds DOUBLE PRECISION NOT NULL,
+                    fetch_p50_ms DOUBLE PRECISION,
+                    fetch_p95_ms DOUBLE PRECISION,
+                    deadline_expired BOOLEAN NOT NULL DEFAULT FALSE
+                );
+                ALTER TABLE collection_runs ADD COLUMN IF NOT EXISTS records_buffered BIGINT NOT NULL DEFAULT 0;
+
+                CREATE INDEX IF NOT EXISTS idx_collection_runs_provider_started
+                ON collection_runs (provider, started_at);
+
+                CREATE TABLE IF NOT EXISTS collection_run_items (
+                    run_id BIGINT NOT NULL REFERENCES collection_runs (id) ON DELETE CASCADE,
+                    symbol TEXT NOT NULL,
+                    success BOOLEAN NOT NULL,
+                    error_message TEXT,
+                    records_saved INTEGER NOT NULL,
+                    rows_inserted INTEGER,
+                    rows_updated INTEGER,
+                    payload_bytes INTEGER NOT NULL,
+                    fetch_seconds DOUBLE PRECISION NOT NULL,
+                    parse_seconds DOUBLE PRECISION NOT NULL,
+                    write_seconds DOUBLE PRECISION NOT NULL,
+                    wait_seconds DOUBLE PRECISION NOT NULL,
+                    PRIMARY KEY (run_id, symbol)
+                );
+                """
+            )
+            cursor.execute(_RUN_SUMMARY_VIEW_SQL.format(name="collection_run_daily", unit="day"))
+            cursor.execute(_RUN_SUMMARY_VIEW_SQL.format(name="collection_run_weekly", unit="week"))
+            conn.commit()
+    logger.info("collection_runs 테이블을 확인했습니다.")
+
+
+@dataclass
+class CollectionRun:
+    """한 번의 수집 실행 요약."""
+
+    provider: str
+    interval: str
+    started_at: datetime
+    finished_at: datetime
+    results: Sequence = field(default_factory=list)  # orchestrator.CollectionResult 리스트
+    rows_inserted: Optional[int] = None  # 종목별 결과가 없을 때 쓰는 실행 단위 UPSERT 결과
+    rows_updated: Optional[int] = None
+    deadline_expired: bool = False
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.finished_at - self.started_at).total_seconds()
+
+    def total(self, attr: str) -> float:
+        """종목별 결과 값의 합."""
+        return sum(getattr(r, attr) or 0 for r in self.results)
+
+    def fetch_percentiles_ms(self) -> tuple:
+        """조회한 종목의 fetch 시간 p50/p95 (ms). 조회하지 않은 종목(보류 등)은 제외합니다."""
+        samples = [r.fetch_seconds for r in self.results if r.fetch_seconds > 0]
+        if not samples:
+            return None, None
+        p50, p95 = np.percentile(np.asarray(samples) * 1000.0, [50, 95])
+        return float(p50), float(p95)
+
+
+class RunLedger:
+    """수집 실행 기록을 DB에 저장합니다."""
+
+    PRUNE_INTERVAL_SECONDS = 86400.0
+
+    def __init__(self, retention_days: int = 90):
+        """
+        Args:
+            retention_days: 기록 보관 기간 (일). 하루에 한 번 지난 기록을 삭제합니다. 0이면 삭제하지 않음
+        """
+        self.retention_days = retention_days
+        self.host = socket.gethostname()
+        self._last_pruned = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, run: CollectionRun) -> int:
+        """실행 기록과 종목별 결과를 저장하고 실행 ID를 반환합니다."""
+        succeeded = sum(1 for r in run.results if r.success)
+        # 즉시 저장한 경우는 종목별 합, 쓰기 버퍼를 거친 경우는 NULL (flush 시점에만 알 수 있음)
+        item_inserted = [r.rows_inserted for r in run.results if r.rows_inserted is not None]
+        rows_inserted = sum(item_inserted) if item_inserted else run.rows_inserted
+        item_updated = [r.rows_updated for r in run.results if r.rows_updated is not None]
+        rows_updated = sum(item_updated) if item_updated else run.rows_updated
+        fetch_p50_ms, fetch_p95_ms = run.fetch_percentiles_ms()
+
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO collection_runs (
+                        provider, interval, host, started_at, finished_at, wall_seconds,
+                        tickers, succeeded, failed, records_saved, rows_inserted, rows_updated,
+                        payload_bytes, fetch_seconds, parse_seconds, write_seconds, wait_seconds,
+                        fetch_p50_ms, fetch_p95_ms, deadline_expired, records_buffered
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                    """,
+                    (
+                        run.provider,
+                        run.interval,
+                        self.host,
+                        run.started_at,
+                        run.finished_at,
+                        run.wall_seconds,
+                        len(run.results),
+                        succeeded,
+                        len(run.results) - succeeded,
+                        int(run.total("records_saved")),
+                        rows_inserted,
+                        rows_updated,
+                        int(run.total("payload_bytes")),
+                        run.total("fetch_seconds"),
+                        run.total("parse_seconds"),
+                        run.total("write_seconds"),
+                        run.total("wait_seconds"),
+                        fetch_p50_ms,
+                        fetch_p95_ms,
+                        run.deadline_expired,
+                        int(run.total("records_buffered")),
+                    ),
+                )
+                run_id = cursor.fetchone()[0]
+                # 재배정 등으로 같은 종목 결과가 중복되면 마지막 결과만 저장
+                items = {r.symbol: r for r in run.results}
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO collection_run_items (
+                        run_id, symbol, success, error_message, records_saved, rows_inserted, rows_updated,
+                        payload_bytes, fetch_seconds, parse_seconds, write_seconds, wait_seconds
+                    )
+                    VALUES %s
+                    """,
+                    [
+                        (
+                            run_id,
+                            r.symbol,
+                            r.success,
+                            r.error_message,
+                            r.records_saved,
+                            r.rows_inserted,
+                            r.rows_updated,
+                            r.payload_bytes,
+                            r.fetch_seconds,
+                            r.parse_seconds,
+                            r.write_seconds,
+                            r.wait_seconds,
+                        )
+                        for r in items.values()
+                    ],
+                    page_size=1000,
+                )
+                conn.commit()
+
+        self._prune_if_due()
+        return run_id
+
+    def _prune_if_due(self) -> None:
+        if self.retention_days <= 0:
+            return
+        with self._lock:
+            if self._last_pruned and time.monotonic() - self._last_pruned < self.PRUNE_INTERVAL_SECONDS:
+                return
+            self._last_pruned = time.monotonic()
+        deleted = prune_collection_runs(self.retention_days)
+        if deleted:
+            logger.info("보관 기간(%d일)이 지난 수집 실행 기록 %d건 삭제", self.retention_days, deleted)
+
+
+def prune_collection_runs(retention_days: int) -> int:
+    """보관 기간이 지난 실행 기록을 삭제합니다. (종목별 결과는 함께 삭제)"""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM collection_runs WHERE started_at < NOW() - make_interval(days => %s)",
+                (retention_days,),
+            )
+            deleted = cursor.rowcount
+            conn.commit()
+    return deleted
+
+
+def get_run_summary(unit: str = "day", provider: Optional[str] = None, limit: int = 30) -> List[dict]:
+    """기간별 실행 요약을 조회합니다.
+
+    Args:
+        unit: 'day' 또는 'week'
+        provider: 제공자 이름 (None이면 전체)
+        limit: 최대 행 수 (최신순)
+    """
+    view = {"day": "collection_run_daily", "week": "collection_run_weekly"}[unit]
+    query = f"""
+        SELECT provider, interval, period, runs, tickers, succeeded, failed, records_saved, records_buffered,
+               rows_inserted, rows_updated, payload_bytes, wall_seconds, fetch_seconds, parse_seconds,
+               write_seconds, wait_seconds, wall_p50_seconds, wall_p95_seconds, fetch_p50_ms, fetch_p95_ms
+        FROM {view}
+    """
+    params: tuple = ()
+    if provider is not None:
+        query += " WHERE provider = %s"
+        params = (provider,)
+    query += " ORDER BY period DESC, provider, interval LIMIT %s"
+    params += (limit,)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,113 @@
+"""수집 단계별 소요 시간과 데이터량 측정.
+
+오케스트레이터가 요청(배치)마다 StageMetrics를 현재 컨텍스트에 설정하면,
+HTTP 전송 계층과 파서, 저장 함수가 같은 컨텍스트의 측정값에 더합니다.
+측정 대상이 없는 컨텍스트(CLI 단건 조회, 쓰기 버퍼 flush 스레드 등)에서는 아무것도 하지 않습니다.
+
+- fetch: 제공자 호출 시간에서 파싱 시간을 뺀 값 (네트워크, 응답 JSON 디코딩, 페이지 간 대기)
+- parse: 제공자 응답을 캔들/저장용 레코드로 변환한 시간
+- write: 레코드 저장(또는 쓰기 버퍼 적재) 시간
+- wait: 요청 속도 제한기/쿼터 장부에서 대기한 시간
+"""
+from __future__ import annotations
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+STAGES = ("fetch", "parse", "write", "wait")
+
+_current: ContextVar[Optional["StageMetrics"]] = ContextVar("collection_stage_metrics", default=None)
+
+
+@dataclass
+class StageMetrics:
+    """한 종목(또는 한 요청) 수집의 단계별 측정값."""
+
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    write_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    payload_bytes: int = 0
+    rows_inserted: Optional[int] = None  # 즉시 저장한 경우만 (쓰기 버퍼 적재 시 None)
+    rows_updated: Optional[int] = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        """단계 소요 시간을 더합니다."""
+        attr = f"{stage}_seconds"
+        setattr(self, attr, getattr(self, attr) + seconds)
+
+    def add_upserts(self, inserted: int, updated: int) -> None:
+        """UPSERT 결과(신규/갱신 건수)를 더합니다."""
+        self.rows_inserted = (self.rows_inserted or 0) + inserted
+        self.rows_updated = (self.rows_updated or 0) + updated
+
+    def share(self, count: int) -> "StageMetrics":
+        """여러 종목을 한 번에 조회한 요청의 측정값을 종목 수로 나눈 몫을 반환합니다."""
+        count = max(1, count)
+        return StageMetrics(
+            fetch_seconds=self.fetch_seconds / count,
+            parse_seconds=self.parse_seconds / count,
+            wait_seconds=self.wait_seconds / count,
+            payload_bytes=self.payload_bytes // count,
+        )
+
+
+def current_metrics() -> Optional[StageMetrics]:
+    """현재 컨텍스트의 측정값 (없으면 None)."""
+    return _current.get()
+
+
+@contextmanager
+def metrics_scope(metrics: Optional[StageMetrics]) -> Iterator[Optional[StageMetrics]]:
+    """블록 안의 측정값을 metrics에 기록합니다. None이면 측정하지 않습니다."""
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """블록 실행 시간을 현재 측정값의 stage 단계에 더합니다."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(stage, time.perf_counter() - started)
+
+
+def timed(stage: str):
+    """함수 실행 시간을 현재 측정값의 stage 단계에 더하는 데코레이터."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_stage(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_payload(nbytes: int) -> None:
+    """응답 본문 크기를 현재 측정값에 더합니다."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.payload_bytes += nbytes
+
+
+def record_upserts(inserted: int, updated: int) -> None:
+    """UPSERT 결과를 현재 측정값에 더합니다."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_upserts(inserted, updated)
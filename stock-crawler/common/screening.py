@@ -0,0 +1,453 @@
+"""눌림목 스크리닝 (docs/pullback-screening-design.md).
+
+일봉 패널(종목 × 거래일)을 한 번에 읽고 모든 조건을 NumPy 배열 연산으로 전 종목에 대해 동시에 계산합니다.
+종목별 반복문이 없으므로 5,000종목 × 1년치도 계산 자체는 1초 안쪽이고, 대부분의 시간은 패널 조회입니다.
+
+조건 (프리셋별 기준은 PRESETS 참고):
+    - 상승 추세: MA20 > MA60
+    - 눌림 비율: (기준 고점 - 종가) / 기준 고점 × 100 (기준 고점은 N봉 또는 52주 고점)
+    - 거래량 비율: 최근 5일 평균 거래량 / 20일 평균 거래량
+    - 지지선 근처: 종가와 MA20의 거리(%)
+    - 조정 기간: 기준 고점 이후 지난 거래일 수
+    - 꾸준한 상승 (강화 조건): 고점까지 20거래일 상승률
+
+기준 고점 구간이 rolling_extremes에서 유지하는 구간(14/20/252봉)이면 고점, 고점 이후 봉 수, 52주 고점/저점을
+종목별 한 행으로 읽고 패널은 MA60에 필요한 최근 구간만 읽습니다. (20일 상승률 조건은 고점 이전 봉이 필요해 전체 구간을 읽음)
+
+결과는 순위와 함께 screening_results 테이블에 (기준일, 프리셋) 단위로 저장합니다.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from .daily_features import DailyFeatures, rolling_high, rolling_mean, value_back
+from .daily_panel import DailyPanel, load_daily_panel
+from .db import get_connection
+from .rolling_extremes import BARS_52W, EXTREME_WINDOWS, ExtremeValues, get_rolling_extremes
+
+logger = logging.getLogger(__name__)
+
+# 스크리닝 대상 최소 봉 수 (MA60)
+MIN_BARS = 60
+
+
+@dataclass(frozen=True)
+class ScreeningCriteria:
+    """스크리닝 조건. None인 조건은 평가하지 않습니다."""
+
+    name: str
+    high_window: int = BARS_52W  # 눌림 비율의 기준 고점 구간 (거래일). 252 = 52주 고점
+    pullback_min_pct: float = 5.0
+    pullback_max_pct: float = 15.0
+    max_volume_ratio: Optional[float] = 1.0
+    max_ma20_distance_pct: Optional[float] = 3.0  # |종가 - MA20| / MA20 × 100 이하
+    correction_min_days: int = 5
+    correction_max_days: int = 15
+    min_rise_20d_pct: Optional[float] = None
+    require_uptrend: bool = True
+    max_stale_days: int = 7  # 마지막 봉이 기준일보다 이만큼(달력 일) 오래된 종목은 제외
+
+    @property
+    def condition_count(self) -> int:
+        return (
+            2  # 눌림 비율, 조정 기간
+            + int(self.require_uptrend)
+            + int(self.max_volume_ratio is not None)
+            + int(self.max_ma20_distance_pct is not None)
+            + int(self.min_rise_20d_pct is not None)
+        )
+
+
+PRESETS: Dict[str, ScreeningCriteria] = {
+    # 기본 눌림목 조건: 눌림 5~15%, 거래량 감소, 종가 ≈ MA20, 조정 1~3주
+    "basic": ScreeningCriteria(name="basic"),
+    # 강화된 조건 (중장기 추세 매매): 20일 상승률 > 30%, 눌림 10~20%, 조정 3~7일
+    "trend": ScreeningCriteria(
+        name="trend",
+        pullback_min_pct=10.0,
+        pullback_max_pct=20.0,
+        max_ma20_distance_pct=None,
+        correction_min_days=3,
+        correction_max_days=7,
+        min_rise_20d_pct=30.0,
+    ),
+}
+
+
+def get_criteria(preset: str = "basic", high_window: Optional[int] = None) -> ScreeningCriteria:
+    """프리셋 조건을 반환합니다.
+
+    Args:
+        preset: 프리셋 이름 ("basic", "trend")
+        high_window: 기준 고점 구간을 바꿀 때 거래일 수 (None이면 프리셋 값)
+    """
+    if preset not in PRESETS:
+        raise ValueError(f"알 수 없는 스크리닝 프리셋: {preset} (가능: {', '.join(PRESETS)})")
+    criteria = PRESETS[preset]
+    if high_window is not None:
+        criteria = replace(criteria, high_window=high_window)
+    return criteria
+
+
+@dataclass
+class ScreeningResult:
+    """종목 하나의 스크리닝 결과."""
+
+    symbol: str
+    rank: int
+    passed: bool
+    conditions_met: int
+    last_day: date
+    close: float
+    ma20: float
+    ma60: float
+    high_ref: float  # 눌림 비율 기준 고점
+    high_date: date  # 기준 고점 도달일
+    high_52w: float
+    low_52w: float
+    pullback_pct: float
+    volume_ratio: Optional[float]
+    ma20_distance_pct: float
+    correction_days: int
+    rise_20d_pct: Optional[float]
+
+
+def _tail_mean(values: np.ndarray, bars: int) -> np.ndarray:
+    """마지막 bars개 열의 평균. 봉이 모자라면 NaN."""
+    if values.shape[1] < bars:
+        return np.full(values.shape[0], np.nan)
+    return values[:, -bars:].mean(axis=1)
+
+
+def _tail_extreme(values: np.ndarray, bars: int, lowest: bool = False):
+    """마지막 bars개 열의 최고(최저)값과 그 열 위치. 모든 값이 NaN인 행은 값이 NaN."""
+    window = values[:, -bars:]
+    filled = np.where(np.isnan(window), np.inf if lowest else -np.inf, window)
+    position = filled.argmin(axis=1) if lowest else filled.argmax(axis=1)
+    extreme = np.take_along_axis(window, position[:, None], axis=1)[:, 0]
+    return extreme, position + (values.shape[1] - window.shape[1])
+
+
+def _extreme_columns(symbols: List[str], extremes: Dict[str, ExtremeValues], high_window: int):
+    """rolling_extremes 값으로 (기준 고점, 고점 이후 봉 수, 고점일, 52주 고점, 52주 저점) 배열을 만듭니다."""
+    count = len(symbols)
+    high_ref = np.full(count, np.nan)
+    high_52w = np.full(count, np.nan)
+    low_52w = np.full(count, np.nan)
+    correction_days = np.zeros(count, dtype=np.int64)
+    high_day = np.full(count, np.datetime64("NaT"), dtype="datetime64[D]")
+    for i, symbol in enumerate(symbols):
+        values = extremes.get(symbol)
+        if values is None:
+            continue
+        peak = values.high(high_window)
+        high_ref[i] = peak.value
+        correction_days[i] = peak.back
+        high_day[i] = np.datetime64(peak.time.date(), "D")
+        high_52w[i] = values.high(BARS_52W).value
+        low_52w[i] = values.low(BARS_52W).value
+    return high_ref, correction_days, high_day, high_52w, low_52w
+
+
+def screen_panel(
+    panel: DailyPanel,
+    criteria: ScreeningCriteria,
+    as_of: Optional[date] = None,
+    extremes: Optional[Dict[str, ExtremeValues]] = None,
+) -> List[ScreeningResult]:
+    """패널 전체에 조건을 적용하고 순위를 매긴 결과를 반환합니다.
+
+    MA60을 계산할 수 없는(60봉 미만) 종목과 마지막 봉이 오래된 종목은 결과에서 제외합니다.
+    순위는 통과 여부, 충족 조건 수, MA20과의 거리(가까운 순), 거래량 비율(낮은 순)로 정합니다.
+
+    Args:
+        panel: 일봉 패널
+        criteria: 스크리닝 조건
+        as_of: 기준일 (None이면 패널의 마지막 거래일)
+        extremes: 종목별 이동 극값 (주면 기준 고점과 52주 고점/저점을 패널 대신 이 값으로 사용,
+            종목마다 마지막 봉이 패널과 같아야 하며 criteria.high_window가 EXTREME_WINDOWS의 구간이어야 함)
+
+    Returns:
+        순위 순서의 결과 목록
+    """
+    if panel.shape[0] == 0 or panel.shape[1] == 0:
+        return []
+    as_of = as_of or panel.days[-1].astype(date)
+
+    day_index = np.broadcast_to(np.arange(panel.shape[1], dtype=float), panel.shape)
+    high, low, close, volume, day_col = panel.right_aligned("high", "low", "close", "volume", day_index)
+    bars = (~np.isnan(close)).sum(axis=1)
+    width = close.shape[1]
+    rows = np.arange(close.shape[0])
+
+    last_close = close[:, -1]
+    ma20 = _tail_mean(close, 20)
+    ma60 = _tail_mean(close, 60)
+    volume_ratio = _tail_mean(volume, 5) / _tail_mean(volume, 20)
+    volume_ratio = np.where(np.isfinite(volume_ratio), volume_ratio, np.nan)  # 20일 거래량 0 → NaN
+    ma20_distance_pct = (last_close - ma20) / ma20 * 100.0
+
+    if extremes is None:
+        high_ref, peak_col = _tail_extreme(high, min(criteria.high_window, width))
+        high_52w, _ = _tail_extreme(high, min(BARS_52W, width))
+        low_52w, _ = _tail_extreme(low, min(BARS_52W, width), lowest=True)
+        correction_days = (width - 1) - peak_col
+        high_day = panel.days[np.nan_to_num(day_col[rows, peak_col]).astype(np.int64)]
+    else:
+        high_ref, correction_days, high_day, high_52w, low_52w = _extreme_columns(
+            panel.symbols, extremes, criteria.high_window
+        )
+    pullback_pct = (high_ref - last_close) / high_ref * 100.0
+
+    # 고점까지 20거래일 상승률: 고점 / 고점 20봉 전 종가 (패널에 없으면 NaN)
+    base_col = (width - 1) - correction_days - 20
+    base_close = np.where(base_col >= 0, close[rows, np.maximum(base_col, 0)], np.nan)
+    rise_20d_pct = (high_ref / base_close - 1.0) * 100.0
+
+    conditions = [
+        (pullback_pct >= criteria.pullback_min_pct) & (pullback_pct <= criteria.pullback_max_pct),
+        (correction_days >= criteria.correction_min_days) & (correction_days <= criteria.correction_max_days),
+    ]
+    if criteria.require_uptrend:
+        conditions.append(ma20 > ma60)
+    if criteria.max_volume_ratio is not None:
+        conditions.append(volume_ratio < criteria.max_volume_ratio)
+    if criteria.max_ma20_distance_pct is not None:
+        conditions.append(np.abs(ma20_distance_pct) <= criteria.max_ma20_distance_pct)
+    if criteria.min_rise_20d_pct is not None:
+        conditions.append(rise_20d_pct > criteria.min_rise_20d_pct)
+    met = np.sum(conditions, axis=0)  # NaN 비교는 False이므로 값이 없는 조건은 미충족
+    passed = met == criteria.condition_count
+
+    last_day = panel.days[np.nan_to_num(day_col[:, -1]).astype(np.int64)]
+    stale = (np.datetime64(as_of, "D") - last_day).astype(int) > criteria.max_stale_days
+    eligible = (bars >= MIN_BARS) & ~stale & ~np.isnan(last_close)
+
+    # np.lexsort는 마지막 키가 1순위
+    order = np.lexsort((
+        np.nan_to_num(volume_ratio, nan=np.inf),
+        np.abs(ma20_distance_pct),
+        -met,
+        ~passed,
+        ~eligible,
+    ))
+    order = order[: int(eligible.sum())]
+
+    def optional(value: float) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
+
+    results = []
+    for rank, i in enumerate(order, start=1):
+        results.append(
+            ScreeningResult(
+                symbol=panel.symbols[i],
+                rank=rank,
+                passed=bool(passed[i]),
+                conditions_met=int(met[i]),
+                last_day=last_day[i].astype(date),
+                close=float(last_close[i]),
+                ma20=float(ma20[i]),
+                ma60=float(ma60[i]),
+                high_ref=float(high_ref[i]),
+                high_date=high_day[i].astype(date),
+                high_52w=float(high_52w[i]),
+                low_52w=float(low_52w[i]),
+                pullback_pct=float(pullback_pct[i]),
+                volume_ratio=optional(volume_ratio[i]),
+                ma20_distance_pct=float(ma20_distance_pct[i]),
+                correction_days=int(correction_days[i]),
+                rise_20d_pct=optional(rise_20d_pct[i]),
+            )
+        )
+    skipped = panel.shape[0] - len(results)
+    if skipped:
+        logger.info("스크리닝 제외 %d종목 (60봉 미만 또는 %d일 이상 봉 없음)", skipped, criteria.max_stale_days)
+    return results
+
+
+def pullback_signals(f: DailyFeatures, criteria: ScreeningCriteria) -> np.ndarray:
+    """모든 (종목, 봉)에서 조건을 모두 충족했는지 여부 (백테스트 진입 신호).
+
+    screen_panel이 마지막 봉에 적용하는 조건을 각 봉 시점에 그대로 적용합니다. 60봉 미만인 칸은 False입니다.
+    """
+    high_ref, correction_days = rolling_high(f.high, criteria.high_window)
+    base_close = value_back(f.close, correction_days + 20)
+    avg_volume20 = rolling_mean(f.volume, 20)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pullback_pct = (high_ref - f.close) / high_ref * 100.0
+        volume_ratio = np.where(avg_volume20 > 0, f.volume_ratio, np.nan)  # 20일 거래량 0 → 미충족
+        ma20_distance_pct = (f.close - f.ma20) / f.ma20 * 100.0
+        rise_20d_pct = (high_ref / base_close - 1.0) * 100.0
+
+    passed = (
+        (f.position >= 59)
+        & (pullback_pct >= criteria.pullback_min_pct) & (pullback_pct <= criteria.pullback_max_pct)
+        & (correction_days >= criteria.correction_min_days) & (correction_days <= criteria.correction_max_days)
+    )
+    if criteria.require_uptrend:
+        passed &= f.ma20 > f.ma60
+    if criteria.max_volume_ratio is not None:
+        passed &= volume_ratio < criteria.max_volume_ratio
+    if criteria.max_ma20_distance_pct is not None:
+        passed &= np.abs(ma20_distance_pct) <= criteria.max_ma20_distance_pct
+    if criteria.min_rise_20d_pct is not None:
+        passed &= rise_20d_pct > criteria.min_rise_20d_pct
+    return passed
+
+
+def ensure_screening_results_table() -> None:
+    """screening_results 테이블이 없으면 생성합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS screening_results (
+                    as_of DATE NOT NULL,
+                    preset TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    passed BOOLEAN NOT NULL,
+                    conditions_met SMALLINT NOT NULL,
+                    last_day DATE NOT NULL,
+                    close_price DOUBLE PRECISION NOT NULL,
+                    ma20 DOUBLE PRECISION NOT NULL,
+                    ma60 DOUBLE PRECISION NOT NULL,
+                    high_ref DOUBLE PRECISION NOT NULL,
+                    high_date DATE NOT NULL,
+                    high_52w DOUBLE PRECISION NOT NULL,
+                    low_52w DOUBLE PRECISION NOT NULL,
+                    pullback_pct DOUBLE PRECISION NOT NULL,
+                    volume_ratio DOUBLE PRECISION,
+                    ma20_distance_pct DOUBLE PRECISION NOT NULL,
+                    correction_days INTEGER NOT NULL,
+                    rise_20d_pct DOUBLE PRECISION,
+                    screened_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (as_of, preset, symbol)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_screening_results_rank
+                ON screening_results (as_of, preset, rank);
+                """
+            )
+            conn.commit()
+    logger.info("screening_results 테이블을 확인했습니다.")
+
+
+def save_screening_results(as_of: date, preset: str, results: List[ScreeningResult]) -> int:
+    """(기준일, 프리셋)의 기존 결과를 지우고 새 결과로 교체합니다. 한 트랜잭션에서 처리합니다."""
+    screened_at = datetime.now().astimezone()
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM screening_results WHERE as_of = %s AND preset = %s", (as_of, preset))
+            execute_values(
+                cursor,
+                """
+                INSERT INTO screening_results (
+                    as_of, preset, symbol, rank, passed, conditions_met, last_day, close_price, ma20, ma60,
+                    high_ref, high_date, high_52w, low_52w, pullback_pct, volume_ratio, ma20_distance_pct,
+                    correction_days, rise_20d_pct, screened_at
+                )
+                VALUES %s
+                """,
+                [
+                    (
+                        as_of, preset, r.symbol, r.rank, r.passed, r.conditions_met, r.last_day, r.close,
+                        r.ma20, r.ma60, r.high_ref, r.high_date, r.high_52w, r.low_52w, r.pullback_pct,
+                        r.volume_ratio, r.ma20_distance_pct, r.correction_days, r.rise_20d_pct, screened_at,
+                    )
+                    for r in results
+                ],
+                page_size=1000,
+            )
+            conn.commit()
+    return len(results)
+
+
+def _stale_extremes(panel: DailyPanel, extremes: Dict[str, ExtremeValues]) -> List[str]:
+    """이동 극값이 없거나 마지막 봉이 패널의 마지막 봉과 다른 종목 (봉이 없는 종목은 제외)."""
+    valid = ~np.isnan(panel.close)
+    last_day = panel.days[panel.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)]
+    stale = []
+    for i, symbol in enumerate(panel.symbols):
+        if not valid[i].any():
+            continue
+        values = extremes.get(symbol)
+        if values is None or np.datetime64(values.last_time.date(), "D") != last_day[i]:
+            stale.append(symbol)
+    return stale
+
+
+def _load_screening_panel(criteria: ScreeningCriteria, as_of: date, use_extremes: bool):
+    """스크리닝에 쓸 패널과 이동 극값을 읽습니다.
+
+    이동 극값을 쓸 수 있으면 MA60에 필요한 최근 구간만 읽고, 극값이 없거나 오래된 종목이 있으면
+    52주 고점과 기준 고점 구간을 덮는 전체 구간을 다시 읽습니다.
+
+    Returns:
+        (패널, 이동 극값 또는 None)
+    """
+    if use_extremes and criteria.high_window in EXTREME_WINDOWS.values() and criteria.min_rise_20d_pct is None:
+        panel = load_daily_panel(lookback_days=int(MIN_BARS * 365 / 252) + 14, end=as_of)
+        extremes = get_rolling_extremes(panel.symbols)
+        stale = _stale_extremes(panel, extremes)
+        if not stale:
+            return panel, extremes
+        logger.info(
+            "rolling_extremes에 없거나 마지막 봉이 다른 종목 %d개 (%s 등) - 전체 구간 일봉으로 계산합니다.",
+            len(stale),
+            ", ".join(stale[:5]),
+        )
+    # 52주 고점과 기준 고점 구간, 그 앞 20봉을 덮도록 달력 일수로 환산해 여유 있게 조회
+    lookback_days = int(max(BARS_52W, criteria.high_window + 20) * 365 / 252) + 14
+    return load_daily_panel(lookback_days=lookback_days, end=as_of), None
+
+
+def run_screening(
+    preset: str = "basic",
+    high_window: Optional[int] = None,
+    as_of: Optional[date] = None,
+    save: bool = True,
+    use_extremes: bool = True,
+) -> List[ScreeningResult]:
+    """활성 티커 전체를 스크리닝하고 결과를 저장합니다.
+
+    Args:
+        preset: 프리셋 이름
+        high_window: 기준 고점 구간 (거래일, None이면 프리셋 값)
+        as_of: 기준일 (None이면 오늘)
+        save: screening_results 테이블에 저장할지 여부
+        use_extremes: 가능하면 rolling_extremes의 고점/저점을 사용할지 여부 (False면 항상 전체 구간 조회)
+
+    Returns:
+        순위 순서의 결과 목록
+    """
+    criteria = get_criteria(preset, high_window)
+    as_of = as_of or date.today()
+
+    started = time.perf_counter()
+    panel, extremes = _load_screening_panel(criteria, as_of, use_extremes)
+    loaded = time.perf_counter()
+    results = screen_panel(panel, criteria, as_of=as_of, extremes=extremes)
+    computed = time.perf_counter()
+
+    if save:
+        save_screening_results(as_of, criteria.name, results)
+    logger.info(
+        "스크리닝 완료 (%s, %s, %s): %d종목 중 통과 %d - 조회 %.2fs, 계산 %.2fs, 저장 %.2fs",
+        criteria.name,
+        as_of,
+        "이동 극값" if extremes is not None else "전체 구간",
+        len(results),
+        sum(1 for r in results if r.passed),
+        loaded - started,
+        computed - loaded,
+        time.perf_counter() - computed,
+    )
+    return results
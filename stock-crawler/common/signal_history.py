@@ -0,0 +1,405 @@
+"""시그널 레벨 이력 일괄 계산 (ticker_signal_history).
+
+stock-dashboard/docs/SIGNAL_ANALYSIS.md의 시그널 레벨(1~5)을 저장된 모든 (종목, 거래일)에 대해 계산합니다.
+대시보드(signal-analyzer.ts)는 매일 최신 1건만 계산하므로, 과거 시그널 이력은 이 배치로 채웁니다.
+
+    - 종목을 묶음 단위로 나눠 프로세스 풀에서 병렬 처리하고, 각 프로세스가 자기 묶음의 일봉을 한 번에 읽습니다.
+    - 묶음 안에서는 종목 × 거래일 배열에 이동 윈도우(누적합, sliding_window_view)를 적용해 모든 날짜를 한 번에 계산합니다.
+      EMA/RSI처럼 이전 값에 의존하는 지표만 거래일 축으로 반복하고 종목 축은 벡터 연산입니다.
+    - 결과는 COPY로 임시 테이블에 적재한 뒤 한 번의 INSERT ... ON CONFLICT로 반영합니다.
+
+대시보드와 같은 규칙을 따르되 날짜마다 '그날까지의 최근 365봉'을 분석 구간으로 봅니다.
+EMA/RSI는 구간 시작이 아닌 전체 이력의 첫 봉부터 누적하므로, 수렴 후에는 대시보드 값과 소수점 이하 미세한 차이만 납니다.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .daily_features import WINDOW_BARS, DailyFeatures, compute_daily_features
+from .daily_panel import DailyPanel, load_daily_panel
+from .db import get_connection, init_pool
+
+logger = logging.getLogger(__name__)
+
+# 대시보드 최소 봉 수 (분석 구간 WINDOW_BARS는 daily_features)
+MIN_BARS = 60
+
+# 시그널 규칙: 코드 → (레벨, 키워드, 메시지). 문구는 signal-analyzer.ts와 같습니다.
+SIGNAL_RULES: Dict[int, Tuple[int, str, str]] = {
+    0: (1, "매우 위험", "하락 추세입니다. 보유하고 있다면 매도를 고려하고, 신규 진입은 위험합니다."),
+    1: (2, "주의 (반등시도)", "하락 추세지만 반등 가능성이 있습니다. 섣불리 진입하지 말고 지켜보세요."),
+    2: (2, "주의 (과열)", "상승 추세지만 단기 과열(너무 비쌈) 상태입니다. 조정이 올 수 있으니 주의하세요."),
+    3: (5, "적극 매수", "상승 추세 속 확실한 저점 매수 기회입니다! (눌림목 + 모멘텀 살아있음)"),
+    4: (4, "매수", "상승 추세 중 가격이 매력적인 구간입니다. 분할 매수로 접근해보세요."),
+    5: (4, "매수", "상승 흐름이 견조하며 가격 부담이 적습니다. 매수하기 좋은 구간입니다."),
+    6: (3, "관망 (보유)", "상승세가 유지되고 있으나, 현재 진입하기엔 가격 메리트가 적습니다. 보유자는 홀딩하세요."),
+    7: (4, "매수", "기술적 지표들이 전반적으로 긍정적입니다. 매수를 고려해보세요."),
+}
+_RULE_LEVELS = np.array([SIGNAL_RULES[code][0] for code in range(len(SIGNAL_RULES))])
+
+_PULLBACK_STATUS = np.array(["fail", "warning", "pass"])
+_PASS_FAIL = np.array(["fail", "pass"])
+_RSI_STATUS = np.array(["NEUTRAL", "OVERSOLD", "OVERBOUGHT"])
+
+
+@dataclass
+class SignalHistory:
+    """(종목, 거래일)별 시그널. 모든 배열은 길이가 같고 같은 순서입니다."""
+
+    symbols: np.ndarray  # 종목 코드 (object)
+    days: np.ndarray  # datetime64[D]
+    rule: np.ndarray  # SIGNAL_RULES 코드
+    level: np.ndarray
+    trend_up: np.ndarray
+    rsi: np.ndarray
+    rsi_status: np.ndarray  # 0 중립, 1 과매도, 2 과매수
+    pullback_rate: np.ndarray
+    pullback_status: np.ndarray  # 0 fail, 1 warning, 2 pass
+    volume_ratio: np.ndarray
+    volume_pass: np.ndarray
+    days_since_high: np.ndarray
+    duration_pass: np.ndarray
+    consolidation_rate: np.ndarray
+    consolidation_pass: np.ndarray
+    score: np.ndarray
+    close: np.ndarray
+    ma20: np.ndarray
+    ma60: np.ndarray
+    high_2w: np.ndarray
+    high_52w: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def take(self, mask: np.ndarray) -> "SignalHistory":
+        """mask가 True인 행만 남긴 시그널을 반환합니다."""
+        return SignalHistory(**{f.name: getattr(self, f.name)[mask] for f in fields(self)})
+
+
+def _signal_matrices(f: DailyFeatures) -> Dict[str, np.ndarray]:
+    """signal-analyzer.ts의 조건과 5단계 시그널 규칙을 (종목, 봉) 행렬로 계산합니다."""
+    trend_up = f.ma20 > f.ma60
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pullback_rate = np.where(f.high_2w > 0, (f.high_2w - f.close) / f.high_2w * 100.0, 0.0)
+
+    pullback_status = np.where((pullback_rate >= 15) & (pullback_rate <= 30), 2, np.where(pullback_rate < 15, 1, 0))
+    volume_pass = f.volume_ratio < 1
+    duration_pass = (f.days_since_high_2w >= 2) & (f.days_since_high_2w <= 10)
+    consolidation_pass = (f.low_5d > 0) & (f.consolidation_rate <= 4)
+    score = (
+        trend_up.astype(int) + (pullback_status == 2) + volume_pass + duration_pass + consolidation_pass
+    )
+
+    rsi = f.rsi14
+    rsi_status = np.where(rsi <= 30, 1, np.where(rsi >= 70, 2, 0))
+    macd_bullish = f.macd_hist > 0
+    macd_turn = (np.nan_to_num(f.macd_hist_prev) <= 0) & (f.macd_hist > 0)
+
+    upper_touch = f.close >= f.bb_upper
+    lower_touch = ~upper_touch & (f.close <= f.bb_lower)
+    lower_half = ~upper_touch & ~lower_touch & (f.close <= f.ma20)
+
+    # signal-analyzer.ts의 5단계 시그널 로직
+    rule = np.select(
+        [
+            ~trend_up & (macd_turn | (rsi < 30)),
+            ~trend_up,
+            (rsi >= 70) | upper_touch,
+            ((rsi <= 40) | lower_touch | (pullback_status == 2)) & (macd_bullish | volume_pass),
+            (rsi <= 40) | lower_touch | (pullback_status == 2),
+            lower_half,
+        ],
+        [1, 0, 2, 3, 4, 5],
+        default=6,
+    )
+    rule = np.where((score >= 4) & (_RULE_LEVELS[rule] < 4), 7, rule)
+    return {
+        "rule": rule,
+        "trend_up": trend_up,
+        "rsi_status": rsi_status,
+        "pullback_rate": pullback_rate,
+        "pullback_status": pullback_status,
+        "volume_pass": volume_pass,
+        "duration_pass": duration_pass,
+        "consolidation_pass": consolidation_pass,
+        "score": score,
+    }
+
+
+def signal_levels(f: DailyFeatures) -> np.ndarray:
+    """(종목, 봉)별 시그널 레벨 (1~5). 최소 봉 수(60)를 채우지 못한 칸은 0."""
+    levels = _RULE_LEVELS[_signal_matrices(f)["rule"]]
+    return np.where(f.position >= MIN_BARS - 1, levels, 0)
+
+
+def compute_signal_history(panel: DailyPanel, start: Optional[date] = None, end: Optional[date] = None) -> SignalHistory:
+    """패널의 모든 (종목, 거래일)에 대해 시그널을 계산합니다.
+
+    Args:
+        panel: 일봉 패널 (분석 구간을 채우도록 start보다 365봉 이상 앞부터 읽은 것)
+        start: 결과에 포함할 첫 거래일 (None이면 처음부터)
+        end: 결과에 포함할 마지막 거래일 (None이면 끝까지)
+
+    Returns:
+        최소 봉 수(60)를 채운 (종목, 거래일)의 시그널
+    """
+    f = compute_daily_features(panel)
+    m = _signal_matrices(f)
+
+    keep = ~np.isnan(f.close) & (f.position >= MIN_BARS - 1)
+    if start is not None:
+        keep &= f.day >= (np.datetime64(start, "D") - np.datetime64("1970-01-01", "D")).astype(np.int64)
+    if end is not None:
+        keep &= f.day <= (np.datetime64(end, "D") - np.datetime64("1970-01-01", "D")).astype(np.int64)
+    rows, cols = np.nonzero(keep)
+
+    def pick(values: np.ndarray) -> np.ndarray:
+        return values[rows, cols]
+
+    return SignalHistory(
+        symbols=np.asarray(f.symbols, dtype=object)[rows],
+        days=f.dates(rows, cols),
+        rule=pick(m["rule"]),
+        level=_RULE_LEVELS[pick(m["rule"])],
+        trend_up=pick(m["trend_up"]),
+        rsi=pick(f.rsi14),
+        rsi_status=pick(m["rsi_status"]),
+        pullback_rate=pick(m["pullback_rate"]),
+        pullback_status=pick(m["pullback_status"]),
+        volume_ratio=pick(f.volume_ratio),
+        volume_pass=pick(m["volume_pass"]),
+        days_since_high=pick(f.days_since_high_2w).astype(np.int64),
+        duration_pass=pick(m["duration_pass"]),
+        consolidation_rate=pick(f.consolidation_rate),
+        consolidation_pass=pick(m["consolidation_pass"]),
+        score=pick(m["score"]),
+        close=pick(f.close),
+        ma20=pick(f.ma20),
+        ma60=pick(f.ma60),
+        high_2w=pick(f.high_2w),
+        high_52w=pick(f.high_52w),
+    )
+
+
+def ensure_signal_history_table() -> None:
+    """ticker_signal_history 테이블이 없으면 생성합니다.
+
+    컬럼은 대시보드의 ticker_signals와 같고, signal_date가 분석 실행일이 아니라 봉의 거래일입니다.
+    """
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ticker_signal_history (
+                    symbol VARCHAR(20) NOT NULL,
+                    signal_date DATE NOT NULL,
+                    signal_level INTEGER NOT NULL,
+                    signal_keyword VARCHAR(50) NOT NULL,
+                    signal_message TEXT,
+                    trend VARCHAR(10) NOT NULL,
+                    trend_status VARCHAR(10) NOT NULL,
+                    rsi NUMERIC(6,2) NOT NULL,
+                    rsi_status VARCHAR(20) NOT NULL,
+                    pullback_rate NUMERIC(6,2) NOT NULL,
+                    pullback_status VARCHAR(10) NOT NULL,
+                    volume_ratio NUMERIC(8,4) NOT NULL,
+                    volume_status VARCHAR(10) NOT NULL,
+                    days_since_high INTEGER NOT NULL,
+                    duration_status VARCHAR(10) NOT NULL,
+                    consolidation_rate NUMERIC(6,2) NOT NULL,
+                    consolidation_status VARCHAR(10) NOT NULL,
+                    score INTEGER NOT NULL,
+                    current_price NUMERIC(18,4) NOT NULL,
+                    ma20 NUMERIC(18,4),
+                    ma60 NUMERIC(18,4),
+                    high_2w NUMERIC(18,4) NOT NULL,
+                    high_52w NUMERIC(18,4) NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (symbol, signal_date)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_ticker_signal_history_date_level
+                ON ticker_signal_history (signal_date DESC, signal_level);
+                """
+            )
+            conn.commit()
+    logger.info("ticker_signal_history 테이블을 확인했습니다.")
+
+
+_COPY_COLUMNS = (
+    "symbol", "signal_date", "signal_level", "signal_keyword", "signal_message", "trend", "trend_status",
+    "rsi", "rsi_status", "pullback_rate", "pullback_status", "volume_ratio", "volume_status",
+    "days_since_high", "duration_status", "consolidation_rate", "consolidation_status", "score",
+    "current_price", "ma20", "ma60", "high_2w", "high_52w",
+)
+
+
+def _copy_buffer(history: SignalHistory) -> io.StringIO:
+    """COPY용 탭 구분 텍스트."""
+    keywords = np.array([SIGNAL_RULES[code][1] for code in range(len(SIGNAL_RULES))], dtype=object)
+    messages = np.array([SIGNAL_RULES[code][2] for code in range(len(SIGNAL_RULES))], dtype=object)
+    columns = [
+        history.symbols,
+        history.days.astype(str),
+        history.level,
+        keywords[history.rule],
+        messages[history.rule],
+        np.where(history.trend_up, "UP", "DOWN"),
+        _PASS_FAIL[history.trend_up.astype(int)],
+        np.round(history.rsi, 2),
+        _RSI_STATUS[history.rsi_status],
+        np.round(np.clip(history.pullback_rate, -9999.99, 9999.99), 2),
+        _PULLBACK_STATUS[history.pullback_status],
+        np.round(np.clip(history.volume_ratio, 0, 9999.9999), 4),
+        _PASS_FAIL[history.volume_pass.astype(int)],
+        history.days_since_high,
+        _PASS_FAIL[history.duration_pass.astype(int)],
+        np.round(np.clip(history.consolidation_rate, 0, 9999.99), 2),
+        _PASS_FAIL[history.consolidation_pass.astype(int)],
+        history.score,
+        np.round(history.close, 4),
+        np.round(history.ma20, 4),
+        np.round(history.ma60, 4),
+        np.round(history.high_2w, 4),
+        np.round(history.high_52w, 4),
+    ]
+    buffer = io.StringIO()
+    for row in zip(*(column.tolist() for column in columns)):
+        buffer.write("\t".join(map(str, row)))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def save_signal_history(history: SignalHistory, overwrite: bool = True) -> int:
+    """시그널 이력을 COPY로 일괄 저장하고 반영한 행 수를 반환합니다.
+
+    Args:
+        history: 저장할 시그널
+        overwrite: 같은 (종목, 거래일)이 있으면 덮어쓸지 여부 (False면 기존 행 유지)
+    """
+    if not len(history):
+        return 0
+    columns = ", ".join(_COPY_COLUMNS)
+    if overwrite:
+        conflict = "DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in _COPY_COLUMNS[2:]) + ", created_at = NOW()"
+    else:
+        conflict = "DO NOTHING"
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE TEMP TABLE signal_history_load (LIKE ticker_signal_history INCLUDING DEFAULTS) ON COMMIT DROP")
+            cursor.copy_expert(f"COPY signal_history_load ({columns}) FROM STDIN", _copy_buffer(history))
+            cursor.execute(
+                f"""
+                INSERT INTO ticker_signal_history ({columns})
+                SELECT {columns} FROM signal_history_load
+                ON CONFLICT (symbol, signal_date) {conflict}
+                """
+            )
+            saved = cursor.rowcount
+            conn.commit()
+    return saved
+
+
+def refresh_signal_history(starts: Dict[str, date], end: Optional[date] = None) -> int:
+    """캔들이 바뀐 종목의 시그널을 종목별 시작 거래일부터 다시 계산해 저장합니다. (분석 워커용)
+
+    종목들을 한 패널로 읽어 가장 이른 시작일부터 계산한 뒤, 종목마다 자기 시작일 이후 행만 저장합니다.
+
+    Args:
+        starts: {종목: 다시 계산할 첫 거래일}
+        end: 마지막 거래일 (None이면 오늘)
+
+    Returns:
+        저장한 행 수
+    """
+    if not starts:
+        return 0
+    end = end or date.today()
+    first = min(starts.values())
+    panel = load_daily_panel(symbols=list(starts), start=first - timedelta(days=WINDOW_BARS * 2), end=end)
+    history = compute_signal_history(panel, start=first, end=end)
+    symbol_starts = np.array([starts[symbol] for symbol in history.symbols], dtype="datetime64[D]")
+    return save_signal_history(history.take(history.days >= symbol_starts))
+
+
+def _init_worker(dsn: str) -> None:
+    logging.basicConfig(level=logging.WARNING)
+    init_pool(dsn, minconn=1, maxconn=1)
+
+
+def _backfill_chunk(symbols: List[str], start: Optional[date], end: date, overwrite: bool) -> Tuple[int, int, float]:
+    """종목 묶음 하나를 읽고 계산해 저장합니다. (작업 프로세스에서 실행)
+
+    Returns:
+        (종목 수, 저장한 행 수, 소요 시간)
+    """
+    started = time.perf_counter()
+    # 분석 구간(365봉)을 채우도록 start보다 넉넉히 앞부터 읽음
+    load_start = start - timedelta(days=WINDOW_BARS * 2) if start else date(1900, 1, 1)
+    panel = load_daily_panel(symbols=symbols, start=load_start, end=end)
+    history = compute_signal_history(panel, start=start, end=end)
+    saved = save_signal_history(history, overwrite=overwrite)
+    return len(symbols), saved, time.perf_counter() - started
+
+
+def backfill_signal_history(
+    dsn: str,
+    symbols: Sequence[str],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 100,
+    overwrite: bool = True,
+) -> int:
+    """종목들의 시그널 이력을 프로세스 풀로 계산해 저장합니다.
+
+    Args:
+        dsn: 작업 프로세스가 각자 커넥션 풀을 만들 때 쓰는 DB DSN
+        symbols: 대상 종목
+        start: 첫 거래일 (None이면 저장된 전체 이력)
+        end: 마지막 거래일 (None이면 오늘)
+        workers: 프로세스 수 (None이면 CPU 수)
+        chunk_size: 프로세스 하나가 한 번에 처리할 종목 수 (클수록 메모리 사용량 증가)
+        overwrite: 기존 (종목, 거래일) 행을 덮어쓸지 여부
+
+    Returns:
+        저장한 행 수
+    """
+    end = end or date.today()
+    chunks = [list(symbols[i:i + chunk_size]) for i in range(0, len(symbols), chunk_size)]
+    if not chunks:
+        return 0
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    total_rows = 0
+    done = 0
+    started = time.perf_counter()
+    # 부모의 DB 커넥션을 물려받지 않도록 spawn으로 새 프로세스를 띄움
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(dsn,)) as pool:
+        futures = [pool.submit(_backfill_chunk, chunk, start, end, overwrite) for chunk in chunks]
+        for future in as_completed(futures):
+            count, rows, seconds = future.result()
+            done += count
+            total_rows += rows
+            logger.info("시그널 이력: %d/%d종목 (묶음 %d종목, %d행, %.1fs)", done, len(symbols), count, rows, seconds)
+
+    logger.info(
+        "시그널 이력 저장 완료: %d종목, %d행, %.1fs (프로세스 %d개)",
+        len(symbols),
+        total_rows,
+        time.perf_counter() - started,
+        workers,
+    )
+    return total_rows
@@ -0,0 +1,184 @@
+"""(종목, 제공자)별 실패 추적과 서킷 브레이커.
+
+상장 폐지, 종목명 변경, 거래소 오지정 종목은 매 주기 같은 빈 응답
+(Tiingo 404, KIS output2 없음, yfinance no data)을 돌려주며 요청 한도만 소모합니다.
+실패할 때마다 다음 시도 시각을 지수적으로 미루고, 연속 실패가 기준을 넘으면
+격리(open)해 다음 시도 시각까지 건너뜁니다. 다음 시도 시각이 지나면 한 번 조회(probe)하고,
+성공하면 기록을 지워 정상 순환으로 되돌립니다. 상태는 DB에 저장되어 재시작과 노드 간에 공유됩니다.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from psycopg2.extras import execute_values
+
+from .db import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_symbol_failures_table() -> None:
+    """symbol_provider_failures 테이블이 없으면 생성합니다."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS symbol_provider_failures (
+                    symbol TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    first_failed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    last_failed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (symbol, provider)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_symbol_provider_failures_next
+                ON symbol_provider_failures (provider, next_attempt_at);
+                """
+            )
+            conn.commit()
+    logger.info("symbol_provider_failures 테이블을 확인했습니다.")
+
+
+@dataclass
+class SymbolFailure:
+    """(종목, 제공자) 실패 기록."""
+
+    symbol: str
+    provider: str
+    consecutive_failures: int
+    last_error: Optional[str]
+    first_failed_at: datetime
+    last_failed_at: datetime
+    next_attempt_at: datetime
+
+
+class SymbolBreaker:
+    """DB 기반 (종목, 제공자) 서킷 브레이커."""
+
+    def __init__(
+        self,
+        base_backoff_seconds: float = 900.0,
+        max_backoff_seconds: float = 7 * 86400.0,
+        open_after_failures: int = 3,
+    ):
+        """
+        Args:
+            base_backoff_seconds: 첫 실패 후 다음 시도까지 대기 시간 (초, 실패마다 2배)
+            max_backoff_seconds: 대기 시간 상한 (초)
+            open_after_failures: 이 횟수 이상 연속 실패하면 격리 상태로 봅니다
+        """
+        self.base_backoff_seconds = float(base_backoff_seconds)
+        self.max_backoff_seconds = float(max_backoff_seconds)
+        self.open_after_failures = open_after_failures
+
+    def blocked(self, provider: str) -> Set[str]:
+        """다음 시도 시각이 지나지 않아 건너뛸 종목 집합을 반환합니다."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT symbol FROM symbol_provider_failures
+                    WHERE provider = %s AND next_attempt_at > NOW()
+                    """,
+                    (provider,),
+                )
+                return {row[0] for row in cursor.fetchall()}
+
+    def blocked_pairs(self, providers: Optional[Iterable[str]] = None) -> Dict[str, Set[str]]:
+        """종목별로 건너뛸 제공자 이름을 반환합니다 (라우팅 제외 목록으로 사용)."""
+        query = "SELECT symbol, provider FROM symbol_provider_failures WHERE next_attempt_at > NOW()"
+        params: tuple = ()
+        if providers is not None:
+            query += " AND provider = ANY(%s)"
+            params = (list(providers),)
+        pairs: Dict[str, Set[str]] = {}
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                for symbol, provider in cursor.fetchall():
+                    pairs.setdefault(symbol, set()).add(provider)
+        return pairs
+
+    def record(self, provider: str, succeeded: Iterable[str], failed: Iterable[Tuple[str, str]]) -> None:
+        """수집 결과를 기록합니다.
+
+        Args:
+            provider: 제공자 이름
+            succeeded: 데이터를 돌려준 종목 (실패 기록 삭제)
+            failed: (종목, 오류 메시지) - 연속 실패 수를 늘리고 다음 시도 시각을 미룸
+        """
+        succeeded = list(succeeded)
+        failed = list(failed)
+        if not succeeded and not failed:
+            return
+
+        # 대기 시간 = min(상한, 기본 × 2^(연속 실패 - 1))
+        backoff = (
+            f"LEAST({self.max_backoff_seconds!r}, "
+            f"{self.base_backoff_seconds!r} * POWER(2, LEAST(symbol_provider_failures.consecutive_failures, 30)))"
+        )
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                if succeeded:
+                    cursor.execute(
+                        "DELETE FROM symbol_provider_failures WHERE provider = %s AND symbol = ANY(%s)",
+                        (provider, succeeded),
+                    )
+                    if cursor.rowcount:
+                        logger.info("[%s] 실패 기록 해제: %d종목", provider, cursor.rowcount)
+                if failed:
+                    execute_values(
+                        cursor,
+                        f"""
+                        INSERT INTO symbol_provider_failures (
+                            symbol, provider, consecutive_failures, last_error, next_attempt_at
+                        )
+                        VALUES %s
+                        ON CONFLICT (symbol, provider) DO UPDATE SET
+                            consecutive_failures = symbol_provider_failures.consecutive_failures + 1,
+                            last_error = EXCLUDED.last_error,
+                            last_failed_at = NOW(),
+                            next_attempt_at = NOW() + make_interval(secs => {backoff})
+                        """,
+                        [(symbol, provider, 1, error) for symbol, error in dict(failed).items()],
+                        template=f"(%s, %s, %s, %s, NOW() + make_interval(secs => {self.base_backoff_seconds!r}))",
+                    )
+                conn.commit()
+
+    def quarantined(self, provider: Optional[str] = None) -> List[SymbolFailure]:
+        """격리 상태(연속 실패가 기준 이상)인 기록을 반환합니다."""
+        query = """
+            SELECT symbol, provider, consecutive_failures, last_error,
+                   first_failed_at, last_failed_at, next_attempt_at
+            FROM symbol_provider_failures
+            WHERE consecutive_failures >= %s
+        """
+        params: list = [self.open_after_failures]
+        if provider:
+            query += " AND provider = %s"
+            params.append(provider)
+        query += " ORDER BY provider, consecutive_failures DESC, symbol"
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, tuple(params))
+                return [SymbolFailure(*row) for row in cursor.fetchall()]
+
+    def release(self, symbol: str, provider: Optional[str] = None) -> int:
+        """실패 기록을 지워 다음 주기에 바로 조회하도록 하고 삭제 건수를 반환합니다."""
+        query = "DELETE FROM symbol_provider_failures WHERE symbol = %s"
+        params: list = [symbol.upper()]
+        if provider:
+            query += " AND provider = %s"
+            params.append(provider)
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, tuple(params))
+                deleted = cursor.rowcount
+                conn.commit()
+        return deleted
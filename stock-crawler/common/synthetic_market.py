@@ -0,0 +1,390 @@
+"""결정적(deterministic) 합성 시세 생성기.
+
+벤치마크와 대역 서버(provider_stub_server)에서 사용합니다.
+같은 (종목, 시드)에는 항상 같은 캔들을 만들어 실행 간 결과를 비교할 수 있습니다.
+응답 페이로드는 KIS/Tiingo 실제 응답 형식을 따릅니다.
+"""
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .market_calendar import _nth_weekday, trading_days
+
+# 합성 일봉 시작일 (이전 날짜는 데이터 없음)
+SERIES_START = date(2015, 1, 2)
+
+# 정규장 60분봉 시작 시각 (미 동부 현지 시각, KIS 분봉 기준)
+REGULAR_HOURS = [dt_time(9, 30)] + [dt_time(h, 30) for h in range(10, 16)]
+# 시간외 포함 60분봉 시작 시각 (04:00~20:00 ET, Tiingo afterHours=true 기준)
+EXTENDED_HOURS = [dt_time(h, 30) for h in range(4, 9)] + REGULAR_HOURS + [dt_time(h, 30) for h in range(16, 20)]
+
+KST = timezone(timedelta(hours=9))
+
+
+@dataclass(frozen=True)
+class SyntheticBar:
+    """합성 캔들 1개."""
+
+    candle_time: datetime  # 일봉: 자정, 60분봉: 미 동부 현지 시각 (naive)
+    open_price: float
+    high_price: float
+    low_price: float
+    close_price: float
+    volume: int
+
+
+def symbol_seed(symbol: str, seed: int = 0) -> int:
+    """종목별 난수 시드."""
+    return zlib.crc32(f"{seed}:{symbol.upper()}".encode("utf-8"))
+
+
+def eastern_utc_offset(day: date) -> timedelta:
+    """미 동부 시간의 UTC 오프셋 (3월 둘째 일요일 ~ 11월 첫째 일요일 서머타임)."""
+    dst_start = _nth_weekday(day.year, 3, 6, 2)
+    dst_end = _nth_weekday(day.year, 11, 6, 1)
+    return timedelta(hours=-4) if dst_start <= day < dst_end else timedelta(hours=-5)
+
+
+def eastern_now(now: Optional[datetime] = None) -> datetime:
+    """현재 미 동부 현지 시각 (naive)."""
+    now_utc = now or datetime.now(timezone.utc)
+    return (now_utc + eastern_utc_offset(now_utc.date())).replace(tzinfo=None)
+
+
+@lru_cache(maxsize=512)
+def _daily_series(symbol: str, seed: int, through_year: int) -> Tuple[np.ndarray, np.ndarray]:
+    """SERIES_START부터 through_year 말까지의 일봉 배열 (거래일, [open, high, low, close, volume])."""
+    days = trading_days(SERIES_START, date(through_year, 12, 31))
+    rng = np.random.default_rng(symbol_seed(symbol, seed))
+    n = len(days)
+
+    base_price = 10.0 + rng.random() * 490.0
+    closes = base_price * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    prev_closes = np.concatenate(([base_price], closes[:-1]))
+    opens = prev_closes * (1.0 + rng.normal(0.0, 0.005, n))
+    highs = np.maximum(opens, closes) * (1.0 + np.abs(rng.normal(0.0, 0.01, n)))
+    lows = np.minimum(opens, closes) * (1.0 - np.abs(rng.normal(0.0, 0.01, n)))
+    volumes = np.round(rng.lognormal(14.0, 0.6, n))
+
+    values = np.round(np.column_stack([opens, highs, lows, closes, volumes]), 4)
+    return days, values
+
+
+def daily_bars(symbol: str, start: date, end: date, seed: int = 0) -> List[SyntheticBar]:
+    """기간 내 합성 일봉 (오름차순).
+
+    Args:
+        symbol: 종목 코드
+        start: 시작일 (포함)
+        end: 종료일 (포함)
+        seed: 전체 시드 (같은 값이면 같은 시세)
+
+    Returns:
+        SyntheticBar 리스트
+    """
+    if end < SERIES_START or end < start:
+        return []
+    days, values = _daily_series(symbol.upper(), seed, end.year)
+    lo = np.searchsorted(days, np.datetime64(start, "D"), side="left")
+    hi = np.searchsorted(days, np.datetime64(end, "D"), side="right")
+    return [
+        SyntheticBar(
+            candle_time=datetime.combine(day.astype(date), dt_time()),
+            open_price=float(o),
+            high_price=float(h),
+            low_price=float(l),
+            close_price=float(c),
+            volume=int(v),
+        )
+        for day, (o, h, l, c, v) in zip(days[lo:hi], values[lo:hi])
+    ]
+
+
+def intraday_bars(symbol: str, day: date, hours: List[dt_time] = REGULAR_HOURS, seed: int = 0) -> List[SyntheticBar]:
+    """하루치 합성 60분봉 (오름차순). 일봉 시가에서 종가로 이어지는 브라운 브리지입니다.
+
+    Args:
+        symbol: 종목 코드
+        day: 거래일 (휴장일이면 빈 리스트)
+        hours: 봉 시작 시각 목록 (미 동부 현지 시각)
+        seed: 전체 시드
+
+    Returns:
+        SyntheticBar 리스트
+    """
+    daily = daily_bars(symbol, day, day, seed)
+    if not daily:
+        return []
+    bar = daily[0]
+    rng = np.random.default_rng(symbol_seed(f"{symbol}@{day.isoformat()}", seed))
+    n = len(hours)
+
+    steps = rng.normal(0.0, 0.004, n)
+    walk = np.cumsum(steps)
+    bridge = walk - np.arange(1, n + 1) / n * walk[-1]
+    drift = np.log(bar.close_price / bar.open_price) * np.arange(1, n + 1) / n
+    closes = bar.open_price * np.exp(drift + bridge)
+    opens = np.concatenate(([bar.open_price], closes[:-1]))
+    highs = np.maximum(opens, closes) * (1.0 + np.abs(rng.normal(0.0, 0.002, n)))
+    lows = np.minimum(opens, closes) * (1.0 - np.abs(rng.normal(0.0, 0.002, n)))
+    weights = rng.dirichlet(np.ones(n))
+    volumes = np.round(weights * bar.volume)
+
+    return [
+        SyntheticBar(
+            candle_time=datetime.combine(day, hour),
+            open_price=round(float(o), 4),
+            high_price=round(float(h), 4),
+            low_price=round(float(l), 4),
+            close_price=round(float(c), 4),
+            volume=int(v),
+        )
+        for hour, o, h, l, c, v in zip(hours, opens, highs, lows, closes, volumes)
+    ]
+
+
+def _recent_intraday_bars(symbol: str, until: datetime, count: int, hours: List[dt_time], seed: int) -> List[SyntheticBar]:
+    """until(미 동부 현지 시각, 포함) 이전에 시작한 60분봉을 최신순으로 count개 반환합니다."""
+    bars: List[SyntheticBar] = []
+    day = until.date()
+    while len(bars) < count and day >= SERIES_START:
+        day_bars = [b for b in intraday_bars(symbol, day, hours, seed) if b.candle_time <= until]
+        bars.extend(reversed(day_bars))
+        day -= timedelta(days=1)
+    return bars[:count]
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.4f}"
+
+
+# =============================================================================
+# KIS 응답
+# =============================================================================
+
+def kis_envelope(output2: list, output1: Optional[dict] = None) -> dict:
+    """KIS 정상 응답 형식."""
+    return {
+        "rt_cd": "0",
+        "msg_cd": "MCA00000",
+        "msg1": "정상처리 되었습니다.",
+        "output1": output1 or {},
+        "output2": output2,
+    }
+
+
+def kis_error(msg_cd: str, msg1: str) -> dict:
+    """KIS 오류 응답 형식."""
+    return {"rt_cd": "1", "msg_cd": msg_cd, "msg1": msg1}
+
+
+def kis_token_payload(app_key: str, now: Optional[datetime] = None) -> dict:
+    """/oauth2/tokenP 응답."""
+    now = now or datetime.now()
+    return {
+        "access_token": f"stub-{symbol_seed(app_key):08x}-{int(now.timestamp())}",
+        "access_token_token_expired": (now + timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S"),
+        "token_type": "Bearer",
+        "expires_in": 86400,
+    }
+
+
+def kis_daily_payload(
+    symbol: str,
+    exchange: str = "NAS",
+    bymd: str = "",
+    count: int = 100,
+    seed: int = 0,
+    now: Optional[datetime] = None,
+) -> dict:
+    """해외주식 기간별시세(dailyprice) 응답. BYMD(포함)부터 과거로 count건, 최신순."""
+    today = eastern_now(now).date()
+    end = min(datetime.strptime(bymd, "%Y%m%d").date(), today) if bymd else today
+    # 거래일 count개를 덮도록 넉넉하게 조회
+    bars = daily_bars(symbol, end - timedelta(days=count * 2 + 10), end, seed)[-count:]
+    output2 = []
+    for bar, prev in zip(reversed(bars), reversed([None] + bars[:-1])):
+        diff = bar.close_price - prev.close_price if prev else 0.0
+        output2.append({
+            "xymd": bar.candle_time.strftime("%Y%m%d"),
+            "clos": _fmt(bar.close_price),
+            "sign": "2" if diff > 0 else ("5" if diff < 0 else "3"),
+            "diff": _fmt(abs(diff)),
+            "rate": f"{diff / prev.close_price * 100:.2f}" if prev else "0.00",
+            "open": _fmt(bar.open_price),
+            "high": _fmt(bar.high_price),
+            "low": _fmt(bar.low_price),
+            "tvol": str(bar.volume),
+            "tamt": str(int(bar.volume * bar.close_price)),
+        })
+    output1 = {"rsym": f"D{exchange}{symbol.upper()}", "zdiv": "4", "nrec": str(len(output2))}
+    return kis_envelope(output2, output1)
+
+
+def kis_60m_payload(
+    symbol: str,
+    exchange: str = "NAS",
+    keyb: str = "",
+    count: int = 120,
+    seed: int = 0,
+    now: Optional[datetime] = None,
+) -> dict:
+    """해외주식 분봉(inquire-time-itemchartprice) 응답. KEYB(포함)부터 과거로 count건, 최신순."""
+    current = eastern_now(now)
+    until = min(datetime.strptime(keyb, "%Y%m%d%H%M%S"), current) if keyb else current
+    bars = _recent_intraday_bars(symbol, until, count, REGULAR_HOURS, seed)
+    output2 = []
+    for bar in bars:
+        local = bar.candle_time
+        korea = (local - eastern_utc_offset(local.date())).replace(tzinfo=timezone.utc).astimezone(KST)
+        output2.append({
+            "tymd": local.strftime("%Y%m%d"),
+            "xymd": local.strftime("%Y%m%d"),
+            "xhms": local.strftime("%H%M%S"),
+            "kymd": korea.strftime("%Y%m%d"),
+            "khms": korea.strftime("%H%M%S"),
+            "open": _fmt(bar.open_price),
+            "high": _fmt(bar.high_price),
+            "low": _fmt(bar.low_price),
+            "last": _fmt(bar.close_price),
+            "evol": str(bar.volume),
+            "eamt": str(int(bar.volume * bar.close_price)),
+        })
+    output1 = {
+        "rsym": f"D{exchange}{symbol.upper()}",
+        "zdiv": "4",
+        "next": "1" if len(output2) == count else "0",
+        "more": "1" if len(output2) == count else "0",
+        "nrec": str(len(output2)),
+    }
+    return kis_envelope(output2, output1)
+
+
+def kis_price_payload(symbol: str, exchange: str = "NAS", seed: int = 0, now: Optional[datetime] = None) -> dict:
+    """해외주식 현재체결가(price) 응답. 마지막 60분봉 종가를 현재가로 사용합니다."""
+    current = eastern_now(now)
+    bars = _recent_intraday_bars(symbol, current, 1, REGULAR_HOURS, seed)
+    if not bars:
+        return kis_envelope([], {})
+    bar = bars[0]
+    previous = daily_bars(symbol, bar.candle_time.date() - timedelta(days=10), bar.candle_time.date() - timedelta(days=1), seed)
+    base = previous[-1].close_price if previous else bar.open_price
+    diff = bar.close_price - base
+    output = {
+        "rsym": f"D{exchange}{symbol.upper()}",
+        "zdiv": "4",
+        "base": _fmt(base),
+        "last": _fmt(bar.close_price),
+        "sign": "2" if diff > 0 else ("5" if diff < 0 else "3"),
+        "diff": _fmt(abs(diff)),
+        "rate": f"{diff / base * 100:.2f}",
+        "tvol": str(bar.volume),
+        "tamt": str(int(bar.volume * bar.close_price)),
+        "ordy": "매도불가",
+    }
+    return {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", "output": output}
+
+
+# =============================================================================
+# Tiingo 응답
+# =============================================================================
+
+def _utc_iso(local: datetime) -> str:
+    """미 동부 현지 시각(naive)을 Tiingo 형식의 UTC ISO 문자열로 변환합니다."""
+    utc = local - eastern_utc_offset(local.date())
+    return utc.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _parse_date(value: Optional[str], default: date) -> date:
+    return datetime.strptime(value[:10], "%Y-%m-%d").date() if value else default
+
+
+def tiingo_iex_prices(
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    after_hours: bool = False,
+    seed: int = 0,
+    now: Optional[datetime] = None,
+) -> List[Dict]:
+    """/iex/{ticker}/prices (resampleFreq=1hour) 응답. 오름차순."""
+    current = eastern_now(now)
+    start = _parse_date(start_date, current.date())
+    end = min(_parse_date(end_date, current.date()), current.date())
+    hours = EXTENDED_HOURS if after_hours else REGULAR_HOURS
+    rows = []
+    day = start
+    while day <= end:
+        for bar in intraday_bars(symbol, day, hours, seed):
+            if bar.candle_time > current:
+                break
+            rows.append({
+                "date": _utc_iso(bar.candle_time),
+                "open": bar.open_price,
+                "high": bar.high_price,
+                "low": bar.low_price,
+                "close": bar.close_price,
+            })
+        day += timedelta(days=1)
+    return rows
+
+
+def tiingo_daily_prices(
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    seed: int = 0,
+    now: Optional[datetime] = None,
+) -> List[Dict]:
+    """/tiingo/daily/{ticker}/prices 응답. startDate가 없으면 최근 1건. 오름차순."""
+    today = eastern_now(now).date()
+    end = min(_parse_date(end_date, today), today)
+    if start_date:
+        bars = daily_bars(symbol, _parse_date(start_date, today), end, seed)
+    else:
+        bars = daily_bars(symbol, end - timedelta(days=10), end, seed)[-1:]
+    return [
+        {
+            "date": bar.candle_time.strftime("%Y-%m-%dT00:00:00.000Z"),
+            "open": bar.open_price,
+            "high": bar.high_price,
+            "low": bar.low_price,
+            "close": bar.close_price,
+            "volume": bar.volume,
+            "adjOpen": bar.open_price,
+            "adjHigh": bar.high_price,
+            "adjLow": bar.low_price,
+            "adjClose": bar.close_price,
+            "adjVolume": bar.volume,
+            "divCash": 0.0,
+            "splitFactor": 1.0,
+        }
+        for bar in bars
+    ]
+
+
+def tiingo_top_of_book(symbol: str, seed: int = 0, now: Optional[datetime] = None) -> List[Dict]:
+    """/iex/{ticker} 현재가 응답."""
+    current = eastern_now(now)
+    bars = _recent_intraday_bars(symbol, current, 1, EXTENDED_HOURS, seed)
+    if not bars:
+        return []
+    bar = bars[0]
+    previous = daily_bars(symbol, bar.candle_time.date() - timedelta(days=10), bar.candle_time.date() - timedelta(days=1), seed)
+    return [{
+        "ticker": symbol.upper(),
+        "timestamp": _utc_iso(bar.candle_time),
+        "last": bar.close_price,
+        "tngoLast": bar.close_price,
+        "prevClose": previous[-1].close_price if previous else None,
+        "open": bar.open_price,
+        "high": bar.high_price,
+        "low": bar.low_price,
+        "volume": bar.volume,
+    }]
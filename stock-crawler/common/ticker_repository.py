@@ -2,14 +2,42 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 
 from .db import get_connection
 
 logger = logging.getLogger(__name__)
 
+# 수집 우선순위 (클수록 신선도 요구가 엄격함)
+PRIORITY_NORMAL = 0
+PRIORITY_WATCHED = 1  # 관심 종목
+PRIORITY_HELD = 2  # 보유 종목
+PRIORITY_ALERTING = 3  # 알림 조건 감시 중
+
+PRIORITY_NAMES = {
+    "normal": PRIORITY_NORMAL,
+    "watched": PRIORITY_WATCHED,
+    "held": PRIORITY_HELD,
+    "alerting": PRIORITY_ALERTING,
+}
+
+# 우선순위별 기본 신선도 SLA (초). 일반 종목은 수집기의 정기 주기를 따름
+DEFAULT_FRESHNESS_SLA_SECONDS = {
+    PRIORITY_WATCHED: 60,
+    PRIORITY_HELD: 45,
+    PRIORITY_ALERTING: 30,
+}
+
+_TICKER_COLUMNS = """
+    id, symbol, name, exchange, is_active,
+    created_at, updated_at, last_collected_at,
+    priority, freshness_sla_seconds
+"""
+
 
 @dataclass
 class ManagedTicker:
@@ -23,6 +51,64 @@ class ManagedTicker:
     created_at: datetime
     updated_at: datetime
     last_collected_at: Optional[datetime]
+    priority: int = PRIORITY_NORMAL
+    freshness_sla_seconds: Optional[int] = None  # None이면 우선순위별 기본값
+
+    def sla_seconds(self, default: float) -> float:
+        """신선도 SLA (초).
+
+        Args:
+            default: 우선순위별 기본값도 없을 때 사용할 값 (정기 수집 주기)
+        """
+        if self.freshness_sla_seconds:
+            return float(self.freshness_sla_seconds)
+        return float(DEFAULT_FRESHNESS_SLA_SECONDS.get(self.priority, default))
+
+    def freshness_slack(self, default_sla: float, now: Optional[datetime] = None) -> float:
+        """SLA 위반까지 남은 시간 (초). 음수면 이미 위반, 수집 이력이 없으면 -inf."""
+        if self.last_collected_at is None:
+            return float("-inf")
+        now = now or datetime.now(timezone.utc)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        last = self.last_collected_at
+        if last.tzinfo is None:
+            last = last.replace(tzinfo=timezone.utc)
+        return self.sla_seconds(default_sla) - (now - last).total_seconds()
+
+
+def _row_to_ticker(row: tuple) -> ManagedTicker:
+    return ManagedTicker(
+        id=row[0],
+        symbol=row[1],
+        name=row[2],
+        exchange=row[3],
+        is_active=row[4],
+        created_at=row[5],
+        updated_at=row[6],
+        last_collected_at=row[7],
+        priority=row[8],
+        freshness_sla_seconds=row[9],
+    )
+
+
+def order_by_freshness(
+    tickers: List[ManagedTicker],
+    default_sla: float = 3600.0,
+    now: Optional[datetime] = None,
+) -> List[ManagedTicker]:
+    """SLA 위반이 가까운 티커부터 정렬합니다. 수집이 중간에 끊겨도 급한 종목이 먼저 채워집니다.
+
+    Args:
+        tickers: 티커 목록
+        default_sla: 우선순위별 기본값이 없는 티커의 SLA (초)
+        now: 기준 시각 (None이면 현재)
+
+    Returns:
+        (SLA 여유 오름차순, 우선순위 내림차순, 심볼) 순으로 정렬된 목록
+    """
+    now = now or datetime.now(timezone.utc)
+    return sorted(tickers, key=lambda t: (t.freshness_slack(default_sla, now), -t.priority, t.symbol))
 
 
 def ensure_managed_tickers_table() -> None:
@@ -40,9 +126,14 @@ def ensure_managed_tickers_table() -> None:
                     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
                     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
                     last_collected_at TIMESTAMPTZ,
+                    priority SMALLINT NOT NULL DEFAULT 0,
+                    freshness_sla_seconds INTEGER,
                     CONSTRAINT uq_managed_tickers_symbol UNIQUE(symbol)
                 );
 
+                ALTER TABLE managed_tickers ADD COLUMN IF NOT EXISTS priority SMALLINT NOT NULL DEFAULT 0;
+                ALTER TABLE managed_tickers ADD COLUMN IF NOT EXISTS freshness_sla_seconds INTEGER;
+
                 CREATE INDEX IF NOT EXISTS idx_managed_tickers_active
                     ON managed_tickers(is_active) WHERE is_active = TRUE;
                 """
@@ -52,33 +143,46 @@ def ensure_managed_tickers_table() -> None:
 
 
 def get_active_tickers() -> List[ManagedTicker]:
-    """활성화된 모든 티커 목록을 조회합니다."""
+    """활성화된 모든 티커 목록을 SLA 위반이 가까운 순서로 조회합니다."""
     with get_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute(
-                """
-                SELECT id, symbol, name, exchange, is_active,
-                       created_at, updated_at, last_collected_at
+                f"""
+                SELECT {_TICKER_COLUMNS}
                 FROM managed_tickers
                 WHERE is_active = TRUE
-                ORDER BY symbol
                 """
             )
             rows = cursor.fetchall()
 
-    return [
-        ManagedTicker(
-            id=row[0],
-            symbol=row[1],
-            name=row[2],
-            exchange=row[3],
-            is_active=row[4],
-            created_at=row[5],
-            updated_at=row[6],
-            last_collected_at=row[7],
-        )
-        for row in rows
-    ]
+    return order_by_freshness([_row_to_ticker(row) for row in rows])
+
+
+class TickerRegistry:
+    """활성 티커 목록을 여러 수집기가 공유하도록 캐시합니다."""
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        """
+        Args:
+            ttl_seconds: 캐시 유지 시간 (초)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._tickers: Optional[List[ManagedTicker]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_active(self) -> List[ManagedTicker]:
+        """활성 티커 목록을 반환합니다. 캐시가 만료되었으면 DB에서 다시 조회합니다."""
+        with self._lock:
+            if self._tickers is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+                self._tickers = get_active_tickers()
+                self._loaded_at = time.monotonic()
+            return list(self._tickers)
+
+    def invalidate(self) -> None:
+        """캐시를 비웁니다."""
+        with self._lock:
+            self._tickers = None
 
 
 def add_ticker(symbol: str, exchange: str = "NAS", name: Optional[str] = None) -> int:
@@ -162,9 +266,8 @@ def get_ticker(symbol: str) -> Optional[ManagedTicker]:
     with get_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute(
-                """
-                SELECT id, symbol, name, exchange, is_active,
-                       created_at, updated_at, last_collected_at
+                f"""
+                SELECT {_TICKER_COLUMNS}
                 FROM managed_tickers
                 WHERE symbol = %s
                 """,
@@ -175,24 +278,25 @@ def get_ticker(symbol: str) -> Optional[ManagedTicker]:
     if row is None:
         return None
 
-    return ManagedTicker(
-        id=row[0],
-        symbol=row[1],
-        name=row[2],
-        exchange=row[3],
-        is_active=row[4],
-        created_at=row[5],
-        updated_at=row[6],
-        last_collected_at=row[7],
-    )
+    return _row_to_ticker(row)
 
 
 def update_ticker(
     symbol: str,
     exchange: Optional[str] = None,
     name: Optional[str] = None,
+    priority: Optional[int] = None,
+    freshness_sla_seconds: Optional[int] = None,
 ) -> bool:
-    """티커 정보를 수정합니다."""
+    """티커 정보를 수정합니다.
+
+    Args:
+        symbol: 종목 코드
+        exchange: 거래소 코드
+        name: 종목명
+        priority: 수집 우선순위 (PRIORITY_*)
+        freshness_sla_seconds: 신선도 SLA (초). 0이면 우선순위별 기본값으로 되돌림
+    """
     updates = []
     params = []
 
@@ -204,6 +308,14 @@ def update_ticker(
         updates.append("name = %s")
         params.append(name)
 
+    if priority is not None:
+        updates.append("priority = %s")
+        params.append(priority)
+
+    if freshness_sla_seconds is not None:
+        updates.append("freshness_sla_seconds = %s")
+        params.append(freshness_sla_seconds or None)
+
     if not updates:
         return False
 
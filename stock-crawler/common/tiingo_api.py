@@ -20,6 +20,11 @@ from typing import List, Optional
 
 import requests
 
+from .api_errors import AuthError, ProviderError, RateLimitedError, parse_retry_after
+from .deadline import request_timeout
+from .http_transport import http
+from .run_metrics import timed
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,6 +71,40 @@ class TiingoApi:
 
         return cls(api_key=api_key, base_url=base_url)
 
+    @classmethod
+    def from_env_all(cls) -> List["TiingoApi"]:
+        """환경변수의 모든 API 키로 인스턴스 목록을 생성합니다.
+
+        Tiingo_API_KEYS="키1,키2"가 있으면 키마다 인스턴스를 만들고,
+        없으면 Tiingo_API_KEY 하나를 사용합니다.
+        """
+        from dotenv import load_dotenv
+
+        load_dotenv()
+
+        api_keys = [k.strip() for k in os.getenv("Tiingo_API_KEYS", "").split(",") if k.strip()]
+        if not api_keys:
+            return [cls.from_env()]
+
+        base_url = os.getenv("Tiingo_BASE_URL", "https://api.tiingo.com")
+        return [cls(api_key=api_key, base_url=base_url) for api_key in api_keys]
+
+    @property
+    def key_id(self) -> str:
+        """로그와 쿼터 장부에 쓰는 키 식별자 (API 키 끝 4자리)."""
+        return f"...{self.api_key[-4:]}"
+
+    def _raise_for_credential_error(self, response: requests.Response) -> None:
+        """요청 한도 초과/인증 실패 응답이면 예외를 발생시킵니다."""
+        if response.status_code == 429:
+            raise RateLimitedError(
+                f"Tiingo 요청 한도 초과 ({self.key_id})",
+                response.status_code,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+        if response.status_code in (401, 403):
+            raise AuthError(f"Tiingo 인증 실패 ({self.key_id})", response.status_code)
+
     def _get_headers(self) -> dict:
         """API 요청에 필요한 헤더를 반환합니다."""
         return {
@@ -93,7 +132,10 @@ class TiingoApi:
             after_hours: 프리마켓/애프터마켓 데이터 포함 여부
 
         Returns:
-            캔들 데이터 리스트
+            캔들 데이터 리스트 (종목이 없거나(404) 기간에 데이터가 없으면 빈 리스트)
+
+        Raises:
+            ProviderError: 네트워크 오류나 5xx 등 호출 실패
 
         Note:
             - IEX 데이터는 과거 최대 5영업일까지만 분봉 조회 가능
@@ -119,24 +161,23 @@ class TiingoApi:
             params["endDate"] = end_date
 
         try:
-            response = requests.get(
+            response = http().get(
                 url,
                 headers=self._get_headers(),
                 params=params,
-                timeout=30,
+                timeout=request_timeout(30),
             )
+            self._raise_for_credential_error(response)
 
             if response.status_code == 404:
                 self.logger.warning("[tiingo] %s: 종목을 찾을 수 없습니다.", symbol)
                 return []
 
             if not response.ok:
-                self.logger.error(
-                    "[tiingo] API 호출 실패 - status=%s, body=%s",
+                raise ProviderError(
+                    f"[tiingo] {symbol} API 호출 실패 - status={response.status_code}, body={response.text[:200]}",
                     response.status_code,
-                    response.text,
                 )
-                return []
 
             data = response.json()
 
@@ -149,8 +190,7 @@ class TiingoApi:
             return candles
 
         except requests.RequestException as e:
-            self.logger.error("[tiingo] %s 조회 실패: %s", symbol, e)
-            return []
+            raise ProviderError(f"[tiingo] {symbol} 조회 실패: {e}") from e
 
     def fetch_candles_60m(
         self,
@@ -201,7 +241,10 @@ class TiingoApi:
             end_date: 종료일 (YYYY-MM-DD 형식)
 
         Returns:
-            캔들 데이터 리스트
+            캔들 데이터 리스트 (종목이 없거나(404) 기간에 데이터가 없으면 빈 리스트)
+
+        Raises:
+            ProviderError: 네트워크 오류나 5xx 등 호출 실패
 
         Note:
             - 일봉 데이터는 End-of-Day API 사용
@@ -223,24 +266,23 @@ class TiingoApi:
             params["endDate"] = end_date
 
         try:
-            response = requests.get(
+            response = http().get(
                 url,
                 headers=self._get_headers(),
                 params=params,
-                timeout=30,
+                timeout=request_timeout(30),
             )
+            self._raise_for_credential_error(response)
 
             if response.status_code == 404:
                 self.logger.warning("[tiingo] %s: 종목을 찾을 수 없습니다.", symbol)
                 return []
 
             if not response.ok:
-                self.logger.error(
-                    "[tiingo] API 호출 실패 - status=%s, body=%s",
+                raise ProviderError(
+                    f"[tiingo] {symbol} API 호출 실패 - status={response.status_code}, body={response.text[:200]}",
                     response.status_code,
-                    response.text,
                 )
-                return []
 
             data = response.json()
 
@@ -253,9 +295,9 @@ class TiingoApi:
             return candles
 
         except requests.RequestException as e:
-            self.logger.error("[tiingo] %s 일봉 조회 실패: %s", symbol, e)
-            return []
+            raise ProviderError(f"[tiingo] {symbol} 일봉 조회 실패: {e}") from e
 
+    @timed("parse")
     def _parse_iex_response(self, data: list) -> List[TiingoCandleData]:
         """IEX API 응답을 캔들 데이터로 변환합니다."""
         candles = []
@@ -287,6 +329,7 @@ class TiingoApi:
 
         return candles
 
+    @timed("parse")
     def _parse_daily_response(self, data: list) -> List[TiingoCandleData]:
         """End-of-Day API 응답을 캔들 데이터로 변환합니다."""
         candles = []
@@ -327,11 +370,12 @@ class TiingoApi:
         url = f"{self.base_url}/iex"
 
         try:
-            response = requests.get(
+            response = http().get(
                 url,
                 headers=self._get_headers(),
-                timeout=30,
+                timeout=request_timeout(30),
             )
+            self._raise_for_credential_error(response)
 
             if not response.ok:
                 self.logger.error(
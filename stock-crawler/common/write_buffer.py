@@ -0,0 +1,119 @@
+"""캔들 쓰기 버퍼 (write-behind).
+
+여러 수집기가 저장하는 캔들 레코드를 메모리에 모았다가
+일정 건수 또는 일정 시간마다 한 번에 UPSERT합니다.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .db import upsert_candle_records_counted
+
+logger = logging.getLogger(__name__)
+
+
+class CandleWriteBuffer:
+    """스레드 안전한 캔들 쓰기 버퍼.
+
+    같은 키(symbol, interval, candle_time, source)의 레코드는 마지막 값으로 병합되며,
+    저장 실패 시 레코드는 버퍼에 남아 다음 flush에서 재시도됩니다.
+    적재 시 넘긴 후속 처리(on_flushed)는 해당 레코드가 실제로 저장된 flush 뒤에 호출됩니다.
+    """
+
+    def __init__(self, max_rows: int = 2000, flush_interval: float = 5.0, max_pending_rows: int = 200000):
+        """
+        Args:
+            max_rows: 이 건수 이상 쌓이면 즉시 flush
+            flush_interval: 백그라운드 flush 주기 (초)
+            max_pending_rows: 저장 실패가 이어질 때 보관할 최대 레코드 수
+        """
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.max_pending_rows = max_pending_rows
+        self._rows: Dict[Tuple, tuple] = {}
+        self._on_flushed: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, records: List[tuple], on_flushed: Optional[Callable[[], None]] = None) -> int:
+        """레코드를 버퍼에 적재하고 적재 건수를 반환합니다.
+
+        Args:
+            records: 저장할 캔들 레코드
+            on_flushed: 레코드가 저장된 뒤 호출할 함수 (수집 시각 갱신 등)
+        """
+        with self._lock:
+            for record in records:
+                self._rows[(record[0], record[1], record[2], record[8])] = record
+            if on_flushed is not None:
+                self._on_flushed.append(on_flushed)
+            pending = len(self._rows)
+
+        if pending >= self.max_rows:
+            self.flush()
+        return len(records)
+
+    def flush(self) -> int:
+        """버퍼의 레코드를 DB에 저장하고 저장 건수를 반환합니다."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._rows:
+                    return 0
+                rows = list(self._rows.values())
+                callbacks = self._on_flushed
+                self._rows = {}
+                self._on_flushed = []
+
+            try:
+                counts = upsert_candle_records_counted(rows)
+            except Exception as e:
+                logger.error("쓰기 버퍼 flush 실패 (%d건 보관): %s", len(rows), e)
+                with self._lock:
+                    for record in rows:
+                        self._rows.setdefault((record[0], record[1], record[2], record[8]), record)
+                    self._on_flushed = callbacks + self._on_flushed
+                    if len(self._rows) > self.max_pending_rows:
+                        logger.error("쓰기 버퍼 한도 초과 - %d건 폐기", len(self._rows) - self.max_pending_rows)
+                        self._rows = dict(list(self._rows.items())[-self.max_pending_rows:])
+                return 0
+
+            saved = sum(inserted + updated for inserted, updated in counts.values())
+
+            for callback in callbacks:
+                # 후속 처리 실패가 다른 레코드의 후속 처리를 막지 않도록 함
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("쓰기 버퍼 flush 후속 처리 실패")
+
+        logger.info("쓰기 버퍼 flush 완료 (%d건)", saved)
+        return saved
+
+    def pending_count(self) -> int:
+        """버퍼에 대기 중인 레코드 수를 반환합니다."""
+        with self._lock:
+            return len(self._rows)
+
+    def start(self) -> None:
+        """백그라운드 flush 스레드를 시작합니다."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="candle-write-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """백그라운드 flush 스레드를 종료하고 남은 레코드를 저장합니다."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
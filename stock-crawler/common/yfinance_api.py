@@ -4,12 +4,21 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import yfinance as yf
+from yfinance import shared as yf_shared
+
+from .api_errors import ProviderError
+from .deadline import request_timeout
+from .http_transport import yfinance_session
+from .run_metrics import timed
 
 logger = logging.getLogger(__name__)
 
+# yf.download가 종목별로 기록하는 오류 중 '종목/가격 데이터 없음'으로 보는 예외 (그 밖의 오류는 조회 실패)
+NO_DATA_ERRORS = ("YFTickerMissingError", "YFPricesMissingError", "YFTzMissingError", "possibly delisted")
+
 
 @dataclass
 class CandleData:
@@ -39,6 +48,8 @@ class YFinanceApi:
         symbol: str,
         period: str = "5d",
         include_extended_hours: bool = True,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
     ) -> List[CandleData]:
         """60분봉 데이터를 조회합니다.
 
@@ -46,6 +57,8 @@ class YFinanceApi:
             symbol: 종목 코드 (예: AAPL, TSLA)
             period: 조회 기간 (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
             include_extended_hours: 프리마켓/애프터마켓 포함 여부
+            start: 시작일 (YYYY-MM-DD 형식)
+            end: 종료일 (YYYY-MM-DD 형식, 미포함)
 
         Returns:
             캔들 데이터 리스트
@@ -53,16 +66,27 @@ class YFinanceApi:
         Note:
             - 60분봉은 최대 730일(약 2년)까지 조회 가능
             - include_extended_hours=True 시 정규장 외 데이터 포함
+            - start/end 지정 시 period는 무시됨
         """
         self.logger.info("[yfinance] %s 60분봉 조회 (period=%s, extended=%s)", symbol, period, include_extended_hours)
 
         try:
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(
-                period=period,
-                interval="60m",
-                prepost=include_extended_hours,
-            )
+            ticker = yf.Ticker(symbol, session=yfinance_session())
+            if start and end:
+                df = ticker.history(
+                    start=start,
+                    end=end,
+                    interval="60m",
+                    prepost=include_extended_hours,
+                    timeout=request_timeout(10),
+                )
+            else:
+                df = ticker.history(
+                    period=period,
+                    interval="60m",
+                    prepost=include_extended_hours,
+                    timeout=request_timeout(10),
+                )
 
             if df.empty:
                 self.logger.warning("[yfinance] %s: 데이터 없음", symbol)
@@ -101,12 +125,12 @@ class YFinanceApi:
         self.logger.info("[yfinance] %s 일봉 조회 (period=%s, start=%s, end=%s)", symbol, period, start, end)
 
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=yfinance_session())
 
             if start and end:
-                df = ticker.history(start=start, end=end, interval="1d")
+                df = ticker.history(start=start, end=end, interval="1d", timeout=request_timeout(10))
             else:
-                df = ticker.history(period=period, interval="1d")
+                df = ticker.history(period=period, interval="1d", timeout=request_timeout(10))
 
             if df.empty:
                 self.logger.warning("[yfinance] %s: 데이터 없음", symbol)
@@ -120,6 +144,97 @@ class YFinanceApi:
             self.logger.error("[yfinance] %s 일봉 조회 실패: %s", symbol, e)
             return []
 
+    def fetch_candles_batch(
+        self,
+        symbols: List[str],
+        interval: str = "60m",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        period: str = "5d",
+        include_extended_hours: bool = False,
+    ) -> Dict[str, List[CandleData]]:
+        """여러 종목의 캔들을 한 번의 요청으로 조회합니다.
+
+        Args:
+            symbols: 종목 코드 리스트
+            interval: 주기 ('60m' 또는 'daily')
+            start: 시작일 (YYYY-MM-DD 형식)
+            end: 종료일 (YYYY-MM-DD 형식, 미포함)
+            period: 조회 기간 (start/end 미지정 시 사용)
+            include_extended_hours: 프리마켓/애프터마켓 포함 여부 (60분봉만 적용)
+
+        Returns:
+            종목별 캔들 데이터 딕셔너리. Yahoo가 데이터 없음(상장 폐지 추정)으로 응답한 종목은 빈 리스트이고,
+            그 밖의 오류로 조회하지 못한 종목은 딕셔너리에 넣지 않습니다.
+
+        Raises:
+            ProviderError: 요청 자체가 실패했거나 두 종목 이상을 요청해 모든 종목이 오류로 끝났을 때
+                (소프트 차단 중에는 종목마다 '데이터 없음' 오류가 나므로 전체 실패로 처리)
+        """
+        if not symbols:
+            return {}
+
+        yf_interval = "1d" if interval == "daily" else interval
+        extended = include_extended_hours and interval != "daily"
+        self.logger.info(
+            "[yfinance] %d개 종목 일괄 조회 (interval=%s, start=%s, end=%s, extended=%s)",
+            len(symbols),
+            yf_interval,
+            start,
+            end,
+            extended,
+        )
+
+        try:
+            kwargs = {"start": start, "end": end} if start and end else {"period": period}
+            df = yf.download(
+                tickers=symbols,
+                interval=yf_interval,
+                prepost=extended,
+                group_by="ticker",
+                auto_adjust=True,
+                threads=False,
+                progress=False,
+                timeout=request_timeout(30),
+                session=yfinance_session(),
+                **kwargs,
+            )
+        except Exception as e:
+            raise ProviderError(f"[yfinance] 일괄 조회 실패: {e}") from e
+
+        # yf.download는 종목별 예외를 삼키고 shared._ERRORS에 repr을 남김 (동시 실행 1 기준)
+        shared_errors = dict(yf_shared._ERRORS)
+        errors = {symbol: shared_errors[symbol.upper()] for symbol in symbols if symbol.upper() in shared_errors}
+        if len(symbols) > 1 and len(errors) == len(symbols):
+            raise ProviderError(f"[yfinance] 일괄 조회 전체 실패 ({len(symbols)}종목): {next(iter(errors.values()))}")
+
+        result: Dict[str, List[CandleData]] = {}
+        for symbol in symbols:
+            error = errors.get(symbol)
+            if error is not None:
+                if any(marker in error for marker in NO_DATA_ERRORS):
+                    result[symbol] = []
+                else:
+                    self.logger.warning("[yfinance] %s 조회 실패: %s", symbol, error)
+                continue
+            try:
+                if df.empty:
+                    sub = df
+                elif getattr(df.columns, "nlevels", 1) > 1:
+                    sub = df[symbol] if symbol in df.columns.get_level_values(0) else df.iloc[0:0]
+                else:
+                    sub = df
+                sub = sub.dropna(how="all")
+                result[symbol] = self._dataframe_to_candles(sub, extended) if not sub.empty else []
+            except Exception as e:
+                self.logger.warning("[yfinance] %s 일괄 조회 결과 변환 실패: %s", symbol, e)
+
+        self.logger.info(
+            "[yfinance] 일괄 조회 완료 (%d건)",
+            sum(len(candles) for candles in result.values()),
+        )
+        return result
+
     def fetch_current_price(self, symbol: str) -> Optional[dict]:
         """현재가를 조회합니다.
 
@@ -132,7 +247,7 @@ class YFinanceApi:
         self.logger.info("[yfinance] %s 현재가 조회", symbol)
 
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=yfinance_session())
             info = ticker.info
 
             return {
@@ -152,6 +267,7 @@ class YFinanceApi:
             self.logger.error("[yfinance] %s 현재가 조회 실패: %s", symbol, e)
             return None
 
+    @timed("parse")
     def _dataframe_to_candles(self, df, extended_hours: bool = False) -> List[CandleData]:
         """pandas DataFrame을 CandleData 리스트로 변환합니다."""
         candles = []
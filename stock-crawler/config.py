@@ -26,8 +26,36 @@ class Settings:
     nats_url: str
     # 캔들 수집 설정
     candle_60m_interval_minutes: int
+    freshness_tick_seconds: float
     daily_candle_collect_time: str
+    daily_job_budget_seconds: float
     api_request_delay: float
+    # 통합 수집 데몬 설정
+    collector_sources: List[str]
+    collector_routing: str
+    # 분산 수집 설정
+    task_ack_timeout_seconds: float
+    task_max_attempts: int
+    # 종목별 서킷 브레이커 설정
+    symbol_backoff_base_seconds: float
+    symbol_backoff_max_seconds: float
+    symbol_breaker_threshold: int
+    db_pool_max_connections: int
+    write_buffer_max_rows: int
+    write_buffer_flush_seconds: float
+    collection_run_retention_days: int
+    metrics_port: int
+    indicator_state_enabled: bool
+    candle_features_enabled: bool
+    rolling_extremes_enabled: bool
+    # 캔들 저장 이벤트/분석 워커 설정
+    candle_events_enabled: bool
+    analytics_debounce_seconds: float
+    # 프로파일링 설정
+    profile_collection: bool
+    profile_memory: bool
+    profile_dir: str
+    profile_interval_ms: float
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -38,6 +66,9 @@ class Settings:
 
         fetch_interval_minutes = int(os.getenv("FETCH_INTERVAL_MINUTES", "60"))
 
+        sources_env = os.getenv("COLLECTOR_SOURCES", "kis,yf,tiingo")
+        collector_sources = [source.strip() for source in sources_env.split(",") if source.strip()]
+
         return cls(
             base_url=os.getenv("KIS_BASE_URL", "https://openapi.koreainvestment.com:9443"),
             app_key=os.getenv("KIS_APP_KEY", ""),
@@ -55,10 +86,78 @@ class Settings:
             nats_url=os.getenv("NATS", "nats://nats:4222"),
             # 캔들 수집 설정
             candle_60m_interval_minutes=int(os.getenv("CANDLE_60M_INTERVAL_MINUTES", "60")),
+            freshness_tick_seconds=float(os.getenv("FRESHNESS_TICK_SECONDS", "15")),
             daily_candle_collect_time=os.getenv("DAILY_CANDLE_COLLECT_TIME", "07:00"),
+            daily_job_budget_seconds=float(os.getenv("DAILY_JOB_BUDGET_SECONDS", "82800")),
             api_request_delay=float(os.getenv("API_REQUEST_DELAY", "0.5")),
+            # 통합 수집 데몬 설정
+            collector_sources=collector_sources,
+            collector_routing=os.getenv("COLLECTOR_ROUTING", "planner"),
+            # 분산 수집 설정
+            task_ack_timeout_seconds=float(os.getenv("TASK_ACK_TIMEOUT_SECONDS", "300")),
+            task_max_attempts=int(os.getenv("TASK_MAX_ATTEMPTS", "3")),
+            # 종목별 서킷 브레이커 설정
+            symbol_backoff_base_seconds=float(os.getenv("SYMBOL_BACKOFF_BASE_SECONDS", "900")),
+            symbol_backoff_max_seconds=float(os.getenv("SYMBOL_BACKOFF_MAX_SECONDS", "604800")),
+            symbol_breaker_threshold=int(os.getenv("SYMBOL_BREAKER_THRESHOLD", "3")),
+            db_pool_max_connections=int(os.getenv("DB_POOL_MAX_CONNECTIONS", "10")),
+            write_buffer_max_rows=int(os.getenv("WRITE_BUFFER_MAX_ROWS", "2000")),
+            write_buffer_flush_seconds=float(os.getenv("WRITE_BUFFER_FLUSH_SECONDS", "5")),
+            collection_run_retention_days=int(os.getenv("COLLECTION_RUN_RETENTION_DAYS", "90")),
+            metrics_port=int(os.getenv("METRICS_PORT", "9108")),
+            indicator_state_enabled=os.getenv("INDICATOR_STATE_ENABLED", "true").lower() in ("1", "true", "yes"),
+            candle_features_enabled=os.getenv("CANDLE_FEATURES_ENABLED", "true").lower() in ("1", "true", "yes"),
+            rolling_extremes_enabled=os.getenv("ROLLING_EXTREMES_ENABLED", "true").lower() in ("1", "true", "yes"),
+            # 캔들 저장 이벤트/분석 워커 설정
+            candle_events_enabled=os.getenv("CANDLE_EVENTS_ENABLED", "false").lower() in ("1", "true", "yes"),
+            analytics_debounce_seconds=float(os.getenv("ANALYTICS_DEBOUNCE_SECONDS", "2")),
+            # 프로파일링 설정
+            profile_collection=os.getenv("PROFILE_COLLECTION", "false").lower() in ("1", "true", "yes"),
+            profile_memory=os.getenv("PROFILE_MEMORY", "false").lower() in ("1", "true", "yes"),
+            profile_dir=os.getenv("PROFILE_DIR", "profiles"),
+            profile_interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+        )
+
+    def symbol_breaker(self):
+        """설정값으로 (종목, 제공자) 서킷 브레이커를 생성합니다."""
+        from common.symbol_breaker import SymbolBreaker
+
+        return SymbolBreaker(
+            base_backoff_seconds=self.symbol_backoff_base_seconds,
+            max_backoff_seconds=self.symbol_backoff_max_seconds,
+            open_after_failures=self.symbol_breaker_threshold,
         )
 
+    def run_ledger(self):
+        """설정값으로 수집 실행 기록기를 생성합니다."""
+        from common.run_ledger import RunLedger
+
+        return RunLedger(retention_days=self.collection_run_retention_days)
+
+    def indicator_engine(self):
+        """캔들 저장 시 보조지표 상태(와 봉별 지표)를 갱신할 엔진을 생성합니다. 비활성화되어 있으면 None."""
+        if not self.indicator_state_enabled:
+            return None
+        from common.indicator_state import IndicatorEngine
+
+        return IndicatorEngine(store_features=self.candle_features_enabled)
+
+    def extremes_engine(self):
+        """일봉 저장 시 구간별 고점/저점(rolling_extremes)을 갱신할 엔진을 생성합니다. 비활성화되어 있으면 None."""
+        if not self.rolling_extremes_enabled:
+            return None
+        from common.rolling_extremes import ExtremesEngine
+
+        return ExtremesEngine()
+
+    def candle_event_publisher(self):
+        """캔들 저장 시 candles.updated 이벤트를 발행할 발행기를 생성합니다. 비활성화되어 있으면 None."""
+        if not self.candle_events_enabled:
+            return None
+        from common.candle_events import CandleEventPublisher
+
+        return CandleEventPublisher(self.nats_url, indicators=self.indicator_state_enabled)
+
     @property
     def db_dsn(self) -> str:
         """PostgreSQL 접속 DSN을 반환합니다."""
@@ -0,0 +1,501 @@
+"""NATS 작업 큐 기반 분산 캔들 수집.
+
+코디네이터는 활성 티커마다 비용 기반 라우팅으로 소스를 정해
+(종목, 주기, 소스) 작업을 collector.tasks.<source>에 발행합니다.
+워커는 여러 호스트에서 큐 그룹으로 작업을 나눠 받고, 제공자 요청 한도는
+DB의 공유 쿼터 장부로 전체 노드에 걸쳐 지킵니다. 워커는 결과를
+collector.results로 보고하며, 코디네이터는 제한 시간 안에 결과가 오지 않은
+작업을 다시 발행하고 실패한 작업은 다른 소스로 넘깁니다.
+
+사용법:
+    python distributed_collector.py coordinator
+    python distributed_collector.py worker
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+import schedule
+from nats.aio.client import Client as NATS
+
+from common import (
+    close_pool,
+    enable_candle_events,
+    enable_extremes_updates,
+    enable_indicator_updates,
+    ensure_collection_runs_table,
+    ensure_managed_tickers_table,
+    ensure_symbol_failures_table,
+    ensure_us_stock_candles_table,
+    get_active_tickers,
+    init_pool,
+    update_last_collected,
+)
+from common.collection_tasks import (
+    RESULT_SUBJECT,
+    WORKER_QUEUE_GROUP,
+    CollectionTask,
+    TaskResult,
+    task_subject,
+)
+from common.db import get_latest_candle_times
+from common.deadline import Deadline, deadline_scope
+from common.metrics import counter, gauge, histogram, start_metrics_server
+from common.provider_health import ProviderHealth
+from common.provider_planner import FetchTask, ProviderPlanner, ProviderState
+from common.providers import PROVIDER_CAPABILITIES, create_provider, credential_count
+from common.quota_ledger import QuotaLedger, ensure_provider_quota_ledger_table, quota_limits
+from orchestrator import CandleOrchestrator
+
+logger = logging.getLogger(__name__)
+
+TASK_HANDLE_SECONDS = histogram(
+    "stock_crawler_nats_task_handle_seconds",
+    "워커가 작업 메시지를 받아 결과를 발행하기까지 걸린 시간 (초)",
+    ("source",),
+)
+TASK_RESULT_SECONDS = histogram(
+    "stock_crawler_nats_task_roundtrip_seconds",
+    "코디네이터가 작업을 발행하고 결과를 받기까지 걸린 시간 (초)",
+    ("source",),
+)
+TASK_RESULTS = counter("stock_crawler_nats_task_results_total", "처리한 작업 결과 수", ("source", "outcome"))
+QUEUE_DEPTH = gauge(
+    "stock_crawler_nats_queue_depth",
+    "처리 대기 중인 작업 수 (coordinator: 결과 대기, worker: 처리 중, subscription: 미전달 메시지)",
+    ("role", "kind"),
+)
+
+
+@dataclass
+class PendingTask:
+    """결과를 기다리는 발행 작업."""
+
+    task: CollectionTask
+    dispatched_at: float
+
+
+@dataclass
+class CycleProgress:
+    """한 번의 발행 주기 진행 상황."""
+
+    interval: str
+    total: int
+    started_at: float = field(default_factory=time.monotonic)
+    succeeded: int = 0
+    failed: int = 0
+    records_saved: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.succeeded + self.failed >= self.total
+
+
+class CollectionCoordinator:
+    """수집 작업을 발행하고 완료를 추적하는 코디네이터."""
+
+    def __init__(
+        self,
+        settings,
+        sources: List[str],
+        ledger: QuotaLedger,
+        planner: Optional[ProviderPlanner] = None,
+        ack_timeout: float = 300.0,
+        max_attempts: int = 3,
+    ):
+        """
+        Args:
+            settings: 설정
+            sources: 라우팅 대상 소스 이름
+            ledger: 공유 쿼터 장부 (남은 쿼터를 라우팅 비용에 반영)
+            planner: 배정기 (None이면 기본 설정)
+            ack_timeout: 결과를 기다리는 최대 시간 (초). 지나면 같은 소스로 다시 발행
+            max_attempts: 같은 소스로 발행하는 최대 횟수
+        """
+        self.settings = settings
+        self.sources = [s for s in sources if s in PROVIDER_CAPABILITIES]
+        self.ledger = ledger
+        # 워커의 자격 증명 풀과 같은 키 수 (장부는 키별로 차감하므로 한도도 키 수만큼 늘려 비교)
+        self.credential_counts = {s: credential_count(s) for s in self.sources}
+        self.planner = planner or ProviderPlanner()
+        self.breaker = settings.symbol_breaker()
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max_attempts
+        self.nc = NATS()
+        self.health: Dict[str, ProviderHealth] = {s: ProviderHealth() for s in self.sources}
+        self._pending: Dict[str, PendingTask] = {}
+        self._cycles: Dict[str, CycleProgress] = {}
+        self._failed_sources: Dict[tuple, Set[str]] = {}
+        self._tickers: Dict[tuple, FetchTask] = {}
+        self.logger = logging.getLogger(__name__)
+
+    async def connect(self) -> None:
+        """NATS에 연결하고 결과 subject를 구독합니다."""
+        await self.nc.connect(self.settings.nats_url, name=f"collector-coordinator-{socket.gethostname()}")
+        await self.nc.subscribe(RESULT_SUBJECT, cb=self._on_result)
+        self.logger.info("코디네이터 NATS 연결 완료 (%s)", self.settings.nats_url)
+
+    def _states(self) -> Dict[str, ProviderState]:
+        states = {}
+        for name in self.sources:
+            caps = PROVIDER_CAPABILITIES[name]
+            keys = self.credential_counts[name]
+            remaining = None
+            if caps.requests_per_hour:
+                hourly = next(q for q in quota_limits(caps) if q.window_seconds == 3600)
+                remaining = self.ledger.remaining(name, hourly, key_count=keys)
+            states[name] = ProviderState(
+                capabilities=caps.scaled(keys), health=self.health[name], remaining_quota=remaining
+            )
+        return states
+
+    def _plan(self, tasks: List[FetchTask], exclude: Optional[Dict[str, Set[str]]] = None):
+        """DB 조회가 포함된 동기 계획 수립 (스레드에서 실행)."""
+        return self.planner.plan(tasks, self._states(), exclude=exclude)
+
+    async def dispatch(self, interval: str) -> Optional[str]:
+        """활성 티커의 수집 작업을 발행하고 주기 ID를 반환합니다."""
+        def build_tasks() -> List[FetchTask]:
+            latest = get_latest_candle_times(interval)
+            return [FetchTask(t, interval, latest.get(t.symbol)) for t in get_active_tickers()]
+
+        fetch_tasks = await asyncio.to_thread(build_tasks)
+        if not fetch_tasks:
+            return None
+
+        cycle_id = uuid.uuid4().hex[:12]
+        # 실패 누적으로 조회 보류 중인 (종목, 소스)는 배정하지 않음
+        blocked = await asyncio.to_thread(self.breaker.blocked_pairs, self.sources)
+        plan = await asyncio.to_thread(self._plan, fetch_tasks, blocked)
+        progress = CycleProgress(interval=interval, total=len(fetch_tasks))
+        progress.failed = len(plan.unassigned)
+        self._cycles[cycle_id] = progress
+        for symbol, sources in blocked.items():
+            self._failed_sources[(cycle_id, symbol)] = set(sources)
+        for task in plan.unassigned:
+            self.logger.warning("[%s] %s: 수집 가능한 소스가 없습니다.", cycle_id, task.symbol)
+
+        for source, tasks in plan.assignments.items():
+            for fetch_task in tasks:
+                self._tickers[(cycle_id, fetch_task.symbol)] = fetch_task
+                await self._publish(self._make_task(cycle_id, source, fetch_task))
+
+        self.logger.info(
+            "[%s] %s 작업 발행 (%s)",
+            cycle_id,
+            interval,
+            ", ".join(f"{name}: {len(tasks)}종목" for name, tasks in plan.assignments.items()) or "없음",
+        )
+        if progress.done:
+            self._finish_cycle(cycle_id)
+        return cycle_id
+
+    def _make_task(self, cycle_id: str, source: str, fetch_task: FetchTask) -> CollectionTask:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return CollectionTask(
+            task_id=uuid.uuid4().hex,
+            cycle_id=cycle_id,
+            ticker_id=fetch_task.ticker.id,
+            symbol=fetch_task.symbol,
+            exchange=fetch_task.ticker.exchange,
+            interval=fetch_task.interval,
+            source=source,
+            days=fetch_task.window_days(PROVIDER_CAPABILITIES[source], now),
+        )
+
+    def queue_depth(self) -> Dict[tuple, float]:
+        """결과를 기다리는 작업 수 (메트릭)."""
+        return {("coordinator", "pending"): len(self._pending)}
+
+    async def _publish(self, task: CollectionTask) -> None:
+        self._pending[task.task_id] = PendingTask(task=task, dispatched_at=time.monotonic())
+        await self.nc.publish(task_subject(task.source), task.to_bytes())
+
+    async def _on_result(self, msg) -> None:
+        result = TaskResult.from_bytes(msg.data)
+        pending = self._pending.pop(result.task_id, None)
+        if pending is None:
+            # 이미 처리된 작업 (재발행된 작업의 중복 결과)
+            return
+        TASK_RESULT_SECONDS.labels(source=result.source).observe(time.monotonic() - pending.dispatched_at)
+        TASK_RESULTS.labels(source=result.source, outcome="success" if result.success else "failure").inc()
+
+        if result.source in self.health:
+            self.health[result.source].record(result.latency, result.success)
+
+        progress = self._cycles.get(result.cycle_id)
+        if result.success:
+            self._tickers.pop((result.cycle_id, result.symbol), None)
+            if progress:
+                progress.succeeded += 1
+                progress.records_saved += result.records_saved
+        else:
+            self.logger.warning(
+                "[%s] %s/%s 실패 (%s, %s) - %s",
+                result.cycle_id,
+                result.symbol,
+                result.interval,
+                result.source,
+                result.worker,
+                result.error_message,
+            )
+            await self._fallback(pending.task, progress)
+
+        if progress and progress.done:
+            self._finish_cycle(result.cycle_id)
+
+    async def _fallback(self, task: CollectionTask, progress: Optional[CycleProgress]) -> None:
+        """실패한 작업을 다른 소스로 다시 배정합니다."""
+        key = (task.cycle_id, task.symbol)
+        failed = self._failed_sources.setdefault(key, set())
+        failed.add(task.source)
+
+        fetch_task = self._tickers.get(key)
+        plan = None
+        if fetch_task is not None:
+            plan = await asyncio.to_thread(self._plan, [fetch_task], {task.symbol: failed})
+
+        if plan is None or not plan.assignments:
+            self._tickers.pop(key, None)
+            self._failed_sources.pop(key, None)
+            if progress:
+                progress.failed += 1
+            return
+
+        source = next(iter(plan.assignments))
+        self.logger.info("[%s] %s: %s → %s 소스로 재배정", task.cycle_id, task.symbol, task.source, source)
+        await self._publish(self._make_task(task.cycle_id, source, fetch_task))
+
+    def _finish_cycle(self, cycle_id: str) -> None:
+        progress = self._cycles.pop(cycle_id)
+        for state in (self._failed_sources, self._tickers):
+            for key in [k for k in state if k[0] == cycle_id]:
+                state.pop(key)
+        self.logger.info(
+            "[%s] %s 수집 완료 (성공: %d, 실패: %d, 저장: %d건, %.1f초)",
+            cycle_id,
+            progress.interval,
+            progress.succeeded,
+            progress.failed,
+            progress.records_saved,
+            time.monotonic() - progress.started_at,
+        )
+
+    async def redispatch_lost(self) -> None:
+        """제한 시간이 지나도 결과가 없는 작업을 다시 발행합니다."""
+        now = time.monotonic()
+        lost = [p for p in self._pending.values() if now - p.dispatched_at > self.ack_timeout]
+        for pending in lost:
+            task = pending.task
+            if task.attempt >= self.max_attempts:
+                self._pending.pop(task.task_id, None)
+                self.logger.warning("[%s] %s: %s 소스 응답 없음 (%d회)", task.cycle_id, task.symbol, task.source, task.attempt)
+                self.health[task.source].record(self.ack_timeout, success=False)
+                progress = self._cycles.get(task.cycle_id)
+                await self._fallback(task, progress)
+                if progress and progress.done:
+                    self._finish_cycle(task.cycle_id)
+                continue
+
+            task.attempt += 1
+            self.logger.info("[%s] %s: 응답 없음 - 재발행 (%d회차)", task.cycle_id, task.symbol, task.attempt)
+            await self._publish(task)
+
+    async def run(self) -> None:
+        """스케줄에 따라 작업을 발행하고 유실 작업을 감시합니다."""
+        await self.connect()
+        loop = asyncio.get_running_loop()
+        scheduler = schedule.Scheduler()
+
+        def trigger(interval: str):
+            loop.create_task(self.dispatch(interval))
+
+        scheduler.every(self.settings.candle_60m_interval_minutes).minutes.do(trigger, "60m")
+        scheduler.every().day.at(self.settings.daily_candle_collect_time).do(trigger, "daily")
+        trigger("60m")
+        trigger("daily")
+
+        self.logger.info("분산 수집 코디네이터 시작 (소스: %s)", ", ".join(self.sources))
+        last_prune = time.monotonic()
+        try:
+            while True:
+                scheduler.run_pending()
+                await self.redispatch_lost()
+                if time.monotonic() - last_prune > 3600:
+                    await asyncio.to_thread(self.ledger.prune)
+                    last_prune = time.monotonic()
+                await asyncio.sleep(1)
+        finally:
+            await self.nc.drain()
+
+
+class CollectionWorker:
+    """큐 그룹으로 작업을 받아 수집하는 워커."""
+
+    def __init__(self, settings, sources: List[str], ledger: QuotaLedger):
+        """
+        Args:
+            settings: 설정
+            sources: 이 워커가 처리할 소스 (자격 증명이 없는 소스는 제외됨)
+            ledger: 공유 쿼터 장부
+        """
+        self.settings = settings
+        self.nc = NATS()
+        self.name = f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.orchestrators: Dict[str, CandleOrchestrator] = {}
+        for source in sources:
+            try:
+                self.orchestrators[source] = CandleOrchestrator(
+                    create_provider(source),
+                    ledger=ledger,
+                    breaker=settings.symbol_breaker(),
+                    run_ledger=settings.run_ledger(),
+                )
+            except ValueError as e:
+                logger.error("[%s] 소스 초기화 실패 - %s", source, e)
+        # 소스별 스레드 풀: 제공자가 선언한 동시성만큼 병렬 처리
+        self._executors = {
+            source: ThreadPoolExecutor(
+                max_workers=o.provider.capabilities.max_concurrency,
+                thread_name_prefix=f"worker-{source}",
+            )
+            for source, o in self.orchestrators.items()
+        }
+        self._inflight: Set[asyncio.Task] = set()
+        self._subscriptions = []
+        self.logger = logging.getLogger(__name__)
+
+    def queue_depth(self) -> Dict[tuple, float]:
+        """처리 중인 작업 수와 구독에 쌓인 미전달 메시지 수 (메트릭)."""
+        return {
+            ("worker", "inflight"): len(self._inflight),
+            ("worker", "subscription"): sum(sub.pending_msgs for sub in self._subscriptions),
+        }
+
+    async def run(self) -> None:
+        """작업 subject를 구독하고 종료될 때까지 처리합니다."""
+        if not self.orchestrators:
+            raise SystemExit("처리할 수 있는 소스가 없습니다. COLLECTOR_SOURCES와 자격 증명을 확인하세요.")
+
+        await self.nc.connect(self.settings.nats_url, name=f"collector-worker-{self.name}")
+        for source in self.orchestrators:
+            self._subscriptions.append(
+                await self.nc.subscribe(task_subject(source), queue=WORKER_QUEUE_GROUP, cb=self._on_task)
+            )
+        self.logger.info("분산 수집 워커 시작 (%s, 소스: %s)", self.name, ", ".join(self.orchestrators))
+
+        try:
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            await self.nc.drain()
+            for executor in self._executors.values():
+                executor.shutdown(wait=True)
+
+    async def _on_task(self, msg) -> None:
+        task = CollectionTask.from_bytes(msg.data)
+        # 구독 콜백은 순차 실행되므로 처리는 별도 태스크로 넘김
+        handle = asyncio.get_running_loop().create_task(self._handle(task, time.monotonic()))
+        self._inflight.add(handle)
+        handle.add_done_callback(self._inflight.discard)
+
+    async def _handle(self, task: CollectionTask, received_at: float) -> None:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executors[task.source], self._collect, task)
+        await self.nc.publish(RESULT_SUBJECT, result.to_bytes())
+        TASK_HANDLE_SECONDS.labels(source=task.source).observe(time.monotonic() - received_at)
+
+    def _collect(self, task: CollectionTask) -> TaskResult:
+        orchestrator = self.orchestrators[task.source]
+        started = time.monotonic()
+        # 코디네이터가 재발행하기 전에 끝나도록 결과 대기 시간을 작업 예산으로 사용
+        with deadline_scope(Deadline(self.settings.task_ack_timeout_seconds)):
+            collected = orchestrator.collect_symbol(
+                task.symbol,
+                task.interval,
+                exchange=task.exchange,
+                days=task.days,
+            )
+        if collected.success and collected.records_saved:
+            update_last_collected(task.ticker_id)
+        return TaskResult(
+            task_id=task.task_id,
+            cycle_id=task.cycle_id,
+            symbol=task.symbol,
+            interval=task.interval,
+            source=task.source,
+            attempt=task.attempt,
+            success=collected.success,
+            records_saved=collected.records_saved,
+            latency=time.monotonic() - started,
+            error_message=collected.error_message,
+            worker=self.name,
+        )
+
+
+def main() -> None:
+    """메인 함수."""
+    from dotenv import load_dotenv
+    from config import Settings
+
+    load_dotenv()
+
+    # 로깅 설정
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(threadName)s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    role = sys.argv[1] if len(sys.argv) > 1 else "worker"
+    if role not in ("coordinator", "worker"):
+        raise SystemExit("사용법: python distributed_collector.py [coordinator|worker]")
+
+    # 설정 로드
+    settings = Settings.from_env()
+
+    # DB 초기화
+    init_pool(settings.db_dsn, maxconn=settings.db_pool_max_connections)
+    ensure_managed_tickers_table()
+    ensure_us_stock_candles_table()
+    ensure_provider_quota_ledger_table()
+    ensure_symbol_failures_table()
+    ensure_collection_runs_table()
+    if role == "worker":
+        enable_indicator_updates(settings.indicator_engine())
+        enable_extremes_updates(settings.extremes_engine())
+        enable_candle_events(settings.candle_event_publisher())
+
+    ledger = QuotaLedger()
+    if role == "coordinator":
+        node = CollectionCoordinator(
+            settings,
+            settings.collector_sources,
+            ledger,
+            ack_timeout=settings.task_ack_timeout_seconds,
+            max_attempts=settings.task_max_attempts,
+        )
+    else:
+        node = CollectionWorker(settings, settings.collector_sources, ledger)
+    QUEUE_DEPTH.set_function(node.queue_depth)
+    start_metrics_server(settings.metrics_port)
+
+    try:
+        asyncio.run(node.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""캔들 누락 구간 탐지 및 복구 작업 모듈.
+
+수집 실패(API 오류, rate limit, 데몬 재시작 등)로 생긴 us_stock_candles의
+빈 구간을 거래일 그리드와 비교해 찾아내고, 해당 구간만 다시 조회합니다.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, List, Optional
+
+from common import (
+    KisApi,
+    get_active_tickers,
+    write_candle_records,
+)
+from common.gap_scanner import (
+    GapRange,
+    RepairTask,
+    enqueue_gaps,
+    get_pending_repairs,
+    mark_repair_done,
+    mark_repair_failed,
+    scan_symbol_gaps,
+)
+from common.market_calendar import previous_trading_day
+from common.providers import CandleProvider, create_provider
+
+logger = logging.getLogger(__name__)
+
+NO_DATA_MESSAGE = "복구 구간에 제공자 데이터 없음"
+
+
+class GapRepairJob:
+    """누락 구간 탐지 및 복구 작업."""
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, kis_api: Optional[KisApi] = None, request_delay: float = 0.5):
+        """
+        Args:
+            kis_api: KIS API 클라이언트 (source=kis 복구 시 필요)
+            request_delay: 복구 요청 간 대기 시간 (초)
+        """
+        self.kis_api = kis_api
+        self.request_delay = request_delay
+        self.logger = logging.getLogger(__name__)
+        self._providers: Dict[str, CandleProvider] = {}
+
+    def scan(
+        self,
+        interval: str = "daily",
+        source: str = "kis",
+        lookback_days: int = 365,
+        min_bars_per_day: int = 1,
+        enqueue: bool = True,
+    ) -> List[GapRange]:
+        """모든 활성 티커의 누락 구간을 탐지하고 복구 큐에 등록합니다.
+
+        Args:
+            interval: 주기 ('daily' 또는 '60m')
+            source: 데이터 소스 ('kis', 'yf', 'tiingo')
+            lookback_days: 탐지 기간 (일)
+            min_bars_per_day: 거래일당 최소 봉 개수 (미만이면 누락)
+            enqueue: 탐지된 구간을 복구 큐에 등록할지 여부
+
+        Returns:
+            탐지된 누락 구간 리스트
+        """
+        end_date = previous_trading_day(date.today())
+        start_date = end_date - timedelta(days=lookback_days)
+
+        tickers = get_active_tickers()
+        self.logger.info(
+            "누락 구간 탐지 시작 (티커: %d개, %s/%s, %s ~ %s)",
+            len(tickers),
+            source,
+            interval,
+            start_date,
+            end_date,
+        )
+
+        gaps: List[GapRange] = []
+        for ticker in tickers:
+            ticker_gaps = scan_symbol_gaps(
+                ticker.symbol,
+                interval,
+                source,
+                start_date,
+                end_date,
+                min_bars_per_day,
+            )
+            for gap in ticker_gaps:
+                self.logger.info(
+                    "%s: 누락 구간 %s ~ %s (%d거래일)",
+                    gap.symbol,
+                    gap.start_date,
+                    gap.end_date,
+                    gap.missing_days,
+                )
+            gaps.extend(ticker_gaps)
+
+        if enqueue:
+            enqueue_gaps(gaps)
+
+        self.logger.info(
+            "누락 구간 탐지 완료 (구간: %d개, 누락 거래일: %d일)",
+            len(gaps),
+            sum(g.missing_days for g in gaps),
+        )
+        return gaps
+
+    def repair(self, limit: int = 100) -> List[RepairTask]:
+        """복구 큐의 대기 작업을 처리합니다.
+
+        Args:
+            limit: 한 번에 처리할 최대 작업 수
+
+        Returns:
+            처리한 작업 리스트
+        """
+        tasks = get_pending_repairs(limit=limit, max_attempts=self.MAX_ATTEMPTS)
+        self.logger.info("누락 구간 복구 시작 (대기 작업: %d개)", len(tasks))
+
+        exchanges = {t.symbol: t.exchange for t in get_active_tickers()}
+        success_count = 0
+        for task in tasks:
+            try:
+                saved_count = self._repair_task(task, exchanges.get(task.symbol, "NAS"))
+                mark_repair_done(task.id)
+                success_count += 1
+                self.logger.info(
+                    "%s: %s/%s %s ~ %s 복구 완료 (%d건)",
+                    task.symbol,
+                    task.source,
+                    task.interval,
+                    task.start_date,
+                    task.end_date,
+                    saved_count,
+                )
+            except Exception as e:
+                self.logger.error("%s: 복구 실패 - %s", task.symbol, e)
+                mark_repair_failed(task.id, str(e), self.MAX_ATTEMPTS)
+
+            if task != tasks[-1]:
+                time.sleep(self.request_delay)
+
+        self.logger.info("누락 구간 복구 완료 (성공: %d, 실패: %d)", success_count, len(tasks) - success_count)
+        return tasks
+
+    def _provider(self, source: str) -> CandleProvider:
+        """source에 해당하는 제공자를 반환합니다 (처음 사용할 때 생성)."""
+        if source not in self._providers:
+            if source == "kis":
+                if self.kis_api is None:
+                    raise ValueError("KIS 복구에는 KisApi 클라이언트가 필요합니다.")
+                self._providers[source] = create_provider(source, kis_api=self.kis_api)
+            else:
+                self._providers[source] = create_provider(source)
+        return self._providers[source]
+
+    def _repair_task(self, task: RepairTask, exchange: str) -> int:
+        """단일 복구 작업을 수행하고 저장 건수를 반환합니다.
+
+        Raises:
+            ValueError: 지원하지 않거나 조회할 수 없는 구간, 또는 제공자 응답이 비어 있을 때
+        """
+        provider = self._provider(task.source)
+        caps = provider.capabilities
+        start = datetime.combine(task.start_date, dt_time.min)
+        end = datetime.combine(task.end_date, dt_time.max.replace(microsecond=0))
+
+        if not caps.supports(task.interval):
+            raise ValueError(f"지원하지 않는 복구 대상입니다: {task.source}/{task.interval}")
+        if not caps.can_reach(task.interval, start):
+            raise ValueError(
+                f"{task.source}/{task.interval}는 최근 {caps.max_history_days[task.interval]}일까지만 조회할 수 있습니다."
+            )
+
+        records = provider.fetch_candles(
+            task.symbol,
+            exchange,
+            task.interval,
+            start,
+            end,
+            extended_hours=caps.extended_hours,
+        )
+        if not records:
+            # 빈 응답은 복구 성공이 아니라 시도 1회 (최대 시도 횟수를 넘기면 failed)
+            raise ValueError(NO_DATA_MESSAGE)
+        return write_candle_records(records)
@@ -0,0 +1,511 @@
+"""수집 파이프라인 처리량 벤치마크.
+
+합성 데이터(common.synthetic_market)와 로컬 PostgreSQL로 단계별 처리량(rows/sec)과
+호출 지연 시간 백분위를 측정하고 결과를 JSON으로 저장합니다.
+
+측정 단계:
+- 파싱: KIS 응답 변환(save_us_stock_candles의 kis_candles_to_records),
+  YFinanceApi._dataframe_to_candles, TiingoApi._parse_iex_response
+- 저장: save_us_stock_candles, save_yfinance_candles, save_tiingo_candles, upsert_candle_records
+- 조회: get_active_tickers (티커 수별)
+- 전 구간: 대역 서버(provider_stub_server)에 붙인 KIS 수집 (티커 수별)
+
+DB 단계는 전용 스키마(기본: ingest_bench)에서 실행하고 끝나면 스키마를 삭제하므로
+운영 테이블을 건드리지 않습니다. --baseline으로 이전 결과와 비교해 처리량이
+기준 이상 떨어진 단계가 있으면 종료 코드 1을 반환합니다.
+
+    python ingestion_benchmark.py --scales 1000,5000,10000 --output bench.json
+    python ingestion_benchmark.py --no-db --baseline bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from common import synthetic_market as market
+from common.providers import CandleProvider, KisProvider
+
+logger = logging.getLogger(__name__)
+
+BENCH_SCHEMA = "ingest_bench"
+DEFAULT_SCALES = (1000, 5000, 10000)
+WARMUP_CALLS = 3  # 측정에서 제외하는 앞쪽 호출 수
+
+
+@dataclass
+class StageResult:
+    """단계별 측정 결과."""
+
+    stage: str
+    calls: int
+    rows: int
+    seconds: float
+    rows_per_sec: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    params: Dict[str, object] = field(default_factory=dict)
+
+
+def summarize(stage: str, latencies: Sequence[float], rows: int, seconds: float, **params) -> StageResult:
+    """호출별 지연 시간(초)과 처리 건수로 StageResult를 만듭니다."""
+    values = np.asarray(latencies, dtype=float) * 1000.0 if len(latencies) else np.zeros(1)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return StageResult(
+        stage=stage,
+        calls=len(latencies),
+        rows=rows,
+        seconds=round(seconds, 6),
+        rows_per_sec=round(rows / seconds, 1) if seconds > 0 else 0.0,
+        p50_ms=round(float(p50), 3),
+        p95_ms=round(float(p95), 3),
+        p99_ms=round(float(p99), 3),
+        params=params,
+    )
+
+
+def measure(stage: str, calls: Sequence[Callable[[], int]], warmup: int = WARMUP_CALLS, **params) -> StageResult:
+    """각 호출(처리 건수 반환)을 순서대로 실행하며 지연 시간을 측정합니다.
+
+    앞쪽 warmup개 호출은 측정에서 제외합니다. 저장 단계는 호출마다 다른 종목을 쓰므로
+    warmup 호출을 다시 실행하지 않고 나머지 호출만 측정합니다.
+
+    Raises:
+        ValueError: 측정할 호출이 남지 않는 경우 (호출 수 <= warmup)
+    """
+    if len(calls) <= warmup:
+        raise ValueError(f"{stage}: 호출 {len(calls)}회가 warmup {warmup}회 이하라 측정할 호출이 없습니다.")
+    for call in calls[:warmup]:
+        call()
+    latencies = []
+    rows = 0
+    started = time.perf_counter()
+    for call in calls[warmup:]:
+        t0 = time.perf_counter()
+        rows += call()
+        latencies.append(time.perf_counter() - t0)
+    result = summarize(stage, latencies, rows, time.perf_counter() - started, **params)
+    logger.info(
+        "%-32s %10.0f rows/s  p50=%.2fms p95=%.2fms p99=%.2fms",
+        stage,
+        result.rows_per_sec,
+        result.p50_ms,
+        result.p95_ms,
+        result.p99_ms,
+    )
+    return result
+
+
+def synthetic_symbols(count: int, offset: int = 0) -> List[str]:
+    """합성 종목 코드 목록 (SYN00000 형식)."""
+    return [f"SYN{i:05d}" for i in range(offset, offset + count)]
+
+
+# =============================================================================
+# 합성 입력
+# =============================================================================
+
+def kis_daily_items(symbol: str, seed: int) -> List[dict]:
+    return market.kis_daily_payload(symbol, bymd="20240628", seed=seed)["output2"]
+
+
+def tiingo_iex_items(symbol: str, seed: int) -> List[dict]:
+    return market.tiingo_iex_prices(symbol, "2024-06-24", "2024-06-28", after_hours=True, seed=seed)
+
+
+def yfinance_frame(symbol: str, seed: int):
+    """yfinance history()와 같은 형태의 DataFrame (UTC 인덱스, Open/High/Low/Close/Volume)."""
+    import pandas as pd
+
+    bars = []
+    day = date(2024, 6, 3)
+    while day <= date(2024, 6, 28):
+        bars.extend(market.intraday_bars(symbol, day, market.EXTENDED_HOURS, seed))
+        day += timedelta(days=1)
+    index = pd.DatetimeIndex(
+        [b.candle_time - market.eastern_utc_offset(b.candle_time.date()) for b in bars], tz="UTC"
+    )
+    return pd.DataFrame(
+        {
+            "Open": [b.open_price for b in bars],
+            "High": [b.high_price for b in bars],
+            "Low": [b.low_price for b in bars],
+            "Close": [b.close_price for b in bars],
+            "Volume": [b.volume for b in bars],
+        },
+        index=index,
+    )
+
+
+# =============================================================================
+# 파싱 단계 (DB 불필요)
+# =============================================================================
+
+def bench_parsers(iterations: int, seed: int) -> List[StageResult]:
+    from common.db import kis_candles_to_records
+    from common.tiingo_api import TiingoApi
+    from common.yfinance_api import YFinanceApi
+
+    symbols = synthetic_symbols(min(iterations, 50))
+    results = []
+
+    kis_inputs = [kis_daily_items(s, seed) for s in symbols]
+    results.append(measure(
+        "parse.kis_records",
+        [lambda i=i: len(kis_candles_to_records(symbols[i % len(symbols)], "daily", kis_inputs[i % len(symbols)]))
+         for i in range(iterations)],
+        rows_per_call=len(kis_inputs[0]),
+    ))
+
+    yf_api = YFinanceApi()
+    frames = [yfinance_frame(s, seed) for s in symbols[:10]]
+    results.append(measure(
+        "parse.yfinance_dataframe",
+        [lambda i=i: len(yf_api._dataframe_to_candles(frames[i % len(frames)], extended_hours=True))
+         for i in range(iterations)],
+        rows_per_call=len(frames[0]),
+    ))
+
+    tiingo_api = TiingoApi(api_key="bench")
+    tiingo_inputs = [tiingo_iex_items(s, seed) for s in symbols]
+    results.append(measure(
+        "parse.tiingo_iex",
+        [lambda i=i: len(tiingo_api._parse_iex_response(tiingo_inputs[i % len(symbols)])) for i in range(iterations)],
+        rows_per_call=len(tiingo_inputs[0]),
+    ))
+    return results
+
+
+# =============================================================================
+# DB 단계
+# =============================================================================
+
+def prepare_schema(dsn: str, schema: str) -> str:
+    """벤치마크 전용 스키마를 만들고 그 스키마를 기본으로 쓰는 DSN을 반환합니다."""
+    import psycopg2
+
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {schema}")
+        conn.commit()
+    finally:
+        conn.close()
+    return f"{dsn} options='-c search_path={schema}'"
+
+
+def drop_schema(dsn: str, schema: str) -> None:
+    import psycopg2
+
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def bench_saves(iterations: int, seed: int) -> List[StageResult]:
+    from common import save_us_stock_candles, upsert_candle_records
+    from common.tiingo_api import TiingoApi
+    from common.yfinance_api import YFinanceApi
+    from tiingo_collector import save_tiingo_candles
+    from yfinance_collector import save_yfinance_candles
+
+    results = []
+    # 호출마다 다른 종목을 써서 UPDATE가 아닌 INSERT 경로를 측정
+    symbols = synthetic_symbols(iterations, offset=90000)
+
+    kis_inputs = {s: kis_daily_items(s, seed) for s in symbols}
+    results.append(measure(
+        "save.save_us_stock_candles",
+        [lambda s=s: save_us_stock_candles(s, "daily", kis_inputs[s]) for s in symbols],
+    ))
+
+    yf_api = YFinanceApi()
+    frame = yfinance_frame("SYNYF", seed)
+    yf_candles = yf_api._dataframe_to_candles(frame, extended_hours=True)
+    results.append(measure(
+        "save.save_yfinance_candles",
+        [lambda s=s: save_yfinance_candles(s, "60m", yf_candles) for s in symbols],
+    ))
+
+    tiingo_api = TiingoApi(api_key="bench")
+    tiingo_candles = tiingo_api._parse_iex_response(tiingo_iex_items("SYNTI", seed))
+    results.append(measure(
+        "save.save_tiingo_candles",
+        [lambda s=s: save_tiingo_candles(s, "60m", tiingo_candles) for s in symbols],
+    ))
+
+    # 쓰기 버퍼 flush 크기(1000건) 단위의 다중 종목 UPSERT
+    from common.db import kis_candles_to_records
+
+    records = [r for s in symbols for r in kis_candles_to_records(s, "daily", kis_inputs[s], "bench")]
+    chunks = [records[i:i + 1000] for i in range(0, len(records), 1000)]
+    results.append(measure(
+        "save.upsert_candle_records",
+        [lambda c=c: upsert_candle_records(c) for c in chunks],
+        warmup=min(WARMUP_CALLS, max(0, len(chunks) - 1)),
+        batch_rows=1000,
+    ))
+    return results
+
+
+def seed_tickers(count: int) -> None:
+    """managed_tickers에 합성 티커를 count개까지 채웁니다."""
+    from psycopg2.extras import execute_values
+
+    from common import get_connection
+
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            execute_values(
+                cursor,
+                "INSERT INTO managed_tickers (symbol, name, exchange) VALUES %s ON CONFLICT (symbol) DO NOTHING",
+                [(s, f"Synthetic {s}", "NAS") for s in synthetic_symbols(count)],
+                page_size=1000,
+            )
+            conn.commit()
+
+
+def truncate_candles() -> None:
+    from common import execute_command
+
+    execute_command("TRUNCATE us_stock_candles")
+
+
+class TimedProvider(CandleProvider):
+    """요청(배치)별 지연 시간을 기록하는 제공자 래퍼."""
+
+    def __init__(self, inner: CandleProvider):
+        self.inner = inner
+        self.capabilities = inner.capabilities
+        self.latencies: List[float] = []
+
+    def fetch_batch(self, symbols, interval, start, end, extended_hours=False):
+        started = time.perf_counter()
+        try:
+            return self.inner.fetch_batch(symbols, interval, start, end, extended_hours)
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+
+    def use_ledger(self, ledger) -> bool:
+        return self.inner.use_ledger(ledger)
+
+    def remaining_this_hour(self):
+        return self.inner.remaining_this_hour()
+
+
+def kis_stub_provider(base_url: str, credentials: int, token_dir: str) -> KisProvider:
+    """대역 서버에 붙은 KIS 제공자. 자격 증명 수만큼 요청 한도와 동시성이 늘어납니다."""
+    from common import CredentialPool, KisApi
+
+    clients = [
+        KisApi(base_url, f"bench-appkey-{i:04d}", "bench-secret", token_file=os.path.join(token_dir, f".access_token.{i}.json"))
+        for i in range(credentials)
+    ]
+    return KisProvider(pool=CredentialPool("kis", clients, KisProvider.capabilities))
+
+
+def bench_scales(
+    scales: Sequence[int],
+    interval: str,
+    credentials: int,
+    stub_args: Dict[str, object],
+    buffer_rows: int = 2000,
+    buffer_flush_seconds: float = 5.0,
+) -> List[StageResult]:
+    from common import CandleWriteBuffer, get_active_tickers, set_write_buffer
+    from orchestrator import CandleOrchestrator
+    from provider_stub_server import StubConfig, start_in_thread
+
+    results = []
+    server = start_in_thread(StubConfig(**stub_args))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-tokens-") as token_dir:
+            for scale in scales:
+                seed_tickers(scale)
+                results.append(measure(
+                    f"query.get_active_tickers.{scale}",
+                    [lambda: len(get_active_tickers()) for _ in range(13)],
+                    tickers=scale,
+                ))
+
+                truncate_candles()
+                provider = TimedProvider(kis_stub_provider(base_url, credentials, token_dir))
+                orchestrator = CandleOrchestrator(provider)
+                # 수집 데몬과 같이 쓰기 버퍼를 거쳐 저장하며, 마지막 flush까지 측정
+                write_buffer = CandleWriteBuffer(max_rows=buffer_rows, flush_interval=buffer_flush_seconds)
+                set_write_buffer(write_buffer)
+                write_buffer.start()
+                started = time.perf_counter()
+                try:
+                    collected = orchestrator.collect(interval)
+                finally:
+                    write_buffer.stop()
+                    set_write_buffer(None)
+                elapsed = time.perf_counter() - started
+                result = summarize(
+                    f"e2e.kis.{interval}.{scale}",
+                    provider.latencies,
+                    sum(r.records_saved + r.records_buffered for r in collected),
+                    elapsed,
+                    tickers=scale,
+                    failed=sum(1 for r in collected if not r.success),
+                    credentials=credentials,
+                    tickers_per_sec=round(len(collected) / elapsed, 1) if elapsed > 0 else 0.0,
+                )
+                logger.info(
+                    "%-32s %10.0f rows/s  %.1f tickers/s  p95=%.1fms (실패 %s)",
+                    result.stage,
+                    result.rows_per_sec,
+                    result.params["tickers_per_sec"],
+                    result.p95_ms,
+                    result.params["failed"],
+                )
+                results.append(result)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+# =============================================================================
+# 결과 저장/비교
+# =============================================================================
+
+def environment() -> Dict[str, object]:
+    """비교에 필요한 실행 환경 정보."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results: List[StageResult], baseline_path: str, threshold: float) -> List[str]:
+    """기준 결과 대비 처리량이 threshold 비율 이상 떨어진 단계를 반환합니다."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {s["stage"]: s for s in json.load(f)["stages"]}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.stage)
+        if not previous or not previous["rows_per_sec"]:
+            continue
+        change = result.rows_per_sec / previous["rows_per_sec"] - 1.0
+        logger.info("%-32s %+6.1f%% (기준 %.0f rows/s)", result.stage, change * 100, previous["rows_per_sec"])
+        if change < -threshold:
+            regressions.append(f"{result.stage}: {previous['rows_per_sec']:.0f} → {result.rows_per_sec:.0f} rows/s ({change:+.1%})")
+    return regressions
+
+
+def main() -> None:
+    """메인 함수."""
+    parser = argparse.ArgumentParser(description="수집 파이프라인 처리량 벤치마크")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES), help="전 구간 측정 티커 수 (쉼표 구분)")
+    parser.add_argument("--interval", choices=["daily", "60m"], default="daily", help="전 구간 측정 주기")
+    parser.add_argument(
+        "--iterations", type=int, default=200, help=f"파싱/저장 단계 호출 횟수 (앞쪽 {WARMUP_CALLS}회는 측정 제외)"
+    )
+    parser.add_argument("--credentials", type=int, default=16, help="대역 서버용 KIS 자격 증명 수 (요청 한도/동시성 배수)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="대역 서버 지연 시간 중앙값 (ms)")
+    parser.add_argument("--latency-p99-ms", type=float, default=0.0, help="대역 서버 지연 시간 99백분위 (ms)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터 시드")
+    parser.add_argument("--no-db", action="store_true", help="DB가 필요 없는 파싱 단계만 측정")
+    parser.add_argument("--schema", default=BENCH_SCHEMA, help="DB 단계에서 사용할 전용 스키마")
+    parser.add_argument("--keep-schema", action="store_true", help="측정 후 전용 스키마를 삭제하지 않음")
+    parser.add_argument("--output", "-o", default="bench_output.json", help="결과 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="회귀로 판단할 처리량 감소 비율 (기본: 0.15)")
+    args = parser.parse_args()
+    if args.iterations <= WARMUP_CALLS:
+        parser.error(f"--iterations는 warmup 호출 수({WARMUP_CALLS})보다 커야 합니다.")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    # 측정 대상 함수의 종목별 INFO 로그는 처리량을 왜곡하므로 끔
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    results = bench_parsers(args.iterations, args.seed)
+
+    if not args.no_db:
+        from dotenv import load_dotenv
+
+        from common import (
+            close_pool,
+            ensure_managed_tickers_table,
+            ensure_us_stock_candles_table,
+            init_pool,
+        )
+        from config import Settings
+
+        load_dotenv()
+        settings = Settings.from_env()
+        dsn = prepare_schema(settings.db_dsn, args.schema)
+        # 요청 스레드마다 티커 갱신용 커넥션이 필요하므로 동시성만큼 풀을 늘림
+        concurrency = KisProvider.capabilities.scaled(args.credentials).max_concurrency
+        init_pool(dsn, maxconn=max(settings.db_pool_max_connections, concurrency + 2))
+        try:
+            ensure_managed_tickers_table()
+            ensure_us_stock_candles_table()
+            results.extend(bench_saves(args.iterations, args.seed))
+            results.extend(bench_scales(
+                scales,
+                args.interval,
+                args.credentials,
+                {"seed": args.seed, "latency_ms": args.latency_ms, "latency_p99_ms": args.latency_p99_ms},
+                settings.write_buffer_max_rows,
+                settings.write_buffer_flush_seconds,
+            ))
+        finally:
+            close_pool()
+            if not args.keep_schema:
+                drop_schema(settings.db_dsn, args.schema)
+
+    report = {"environment": environment(), "args": vars(args), "stages": [asdict(r) for r in results]}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info("결과 저장: %s (%d단계)", args.output, len(results))
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        if regressions:
+            logger.error("처리량 회귀 %d건:\n  %s", len(regressions), "\n  ".join(regressions))
+            sys.exit(1)
+        logger.info("처리량 회귀 없음 (기준: %s, 허용 감소율: %.0f%%)", args.baseline, args.threshold * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,604 @@
+"""제공자 공통 캔들 수집 오케스트레이터.
+
+제공자가 선언한 ProviderCapabilities를 바탕으로 배치 크기, 조회 기간,
+동시성, 요청 간격을 정하고 활성 티커의 캔들을 수집합니다.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from common import (
+    ManagedTicker,
+    get_active_tickers,
+    update_last_collected,
+    write_candle_records,
+)
+from common.db import get_latest_candle_times
+from common.deadline import current_deadline, deadline_scope, submit_in_context
+from common.ticker_repository import order_by_freshness
+from common.market_calendar import trading_days
+from common.metrics import gauge, histogram
+from common.provider_health import ProviderHealth
+from common.provider_planner import INTERVAL_PERIODS, FetchTask, ProviderPlanner, ProviderState
+from common.providers import CandleProvider
+from common.quota_ledger import QuotaLedger, quota_limits
+from common.rate_limiter import RateLimiter
+from common.run_ledger import CollectionRun, RunLedger
+from common.run_metrics import StageMetrics, current_metrics, metrics_scope, timed_stage
+from common.symbol_breaker import SymbolBreaker
+
+logger = logging.getLogger(__name__)
+
+NO_DATA_MESSAGE = "데이터 없음"
+FETCH_FAILED_MESSAGE = "조회 실패"
+DEADLINE_MESSAGE = "작업 마감 시간 초과"
+
+# 최신 봉 갱신(latest_only): 정기 수집 사이에 짧은 SLA로 다시 조회하는 티커는 조회 기간을 줄이고
+# 진행 중인 봉과 직전 봉만 저장 (나머지 봉은 정기 수집이 채움)
+LATEST_WINDOW_DAYS = 1
+LATEST_BARS = 2
+
+PROVIDER_CALL_SECONDS = histogram(
+    "stock_crawler_provider_call_seconds",
+    "제공자 조회 한 번의 소요 시간 (초, 페이지 연속 조회와 파싱 포함)",
+    ("provider", "call", "outcome"),
+)
+RATE_LIMIT_WAIT_SECONDS = histogram(
+    "stock_crawler_rate_limit_wait_seconds",
+    "요청 속도 제한기/쿼터 장부에서 대기한 시간 (초)",
+    ("provider",),
+    buckets=(0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+SYMBOL_SINCE_SUCCESS = gauge(
+    "stock_crawler_symbol_seconds_since_success",
+    "종목/주기별 마지막 수집 성공 이후 지난 시간 (초, 이 프로세스가 성공한 종목만)",
+    ("symbol", "interval"),
+)
+
+# (종목, 주기)별 마지막 수집 성공 시각 (time.time())
+_last_success: Dict[tuple, float] = {}
+
+
+def _mark_collected(symbols: List[str], interval: str) -> None:
+    now = time.time()
+    for symbol in symbols:
+        _last_success[(symbol, interval)] = now
+
+
+def _on_saved(ticker: ManagedTicker, interval: str):
+    """레코드 저장 후 티커의 마지막 수집 시각과 수집 성공 시각을 갱신하는 함수를 만듭니다."""
+
+    def mark() -> None:
+        update_last_collected(ticker.id)
+        _mark_collected([ticker.symbol], interval)
+
+    return mark
+
+
+def _buffered_count(records: List[tuple], saved_count: int) -> int:
+    """쓰기 버퍼에 적재된 건수. 즉시 저장하면 항상 1건 이상 저장되므로 0건 저장은 버퍼 적재입니다."""
+    return len(records) if records and not saved_count else 0
+
+
+def _latest_bars(records: List[tuple]) -> List[tuple]:
+    """레코드 중 가장 최근 LATEST_BARS개 봉만 반환합니다."""
+    return sorted(records, key=lambda r: r[2])[-LATEST_BARS:]
+
+
+SYMBOL_SINCE_SUCCESS.set_function(lambda: {key: time.time() - at for key, at in list(_last_success.items())})
+
+
+@dataclass
+class CollectionResult:
+    """수집 결과."""
+
+    symbol: str
+    success: bool
+    records_saved: int = 0
+    error_message: Optional[str] = None
+    # 단계별 소요 시간 (초). 여러 종목을 한 번에 조회한 요청은 종목 수로 나눈 값
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    write_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    payload_bytes: int = 0
+    # 쓰기 버퍼에 적재되어 아직 저장되지 않은 건수 (저장 여부는 records_saved가 아닌 flush가 결정)
+    records_buffered: int = 0
+    # UPSERT 결과 (즉시 저장한 경우만, 쓰기 버퍼 적재 시 None)
+    rows_inserted: Optional[int] = None
+    rows_updated: Optional[int] = None
+
+
+def _expects_data(start: datetime, end: datetime) -> bool:
+    """조회 기간에 마감된 거래일이 있는지 반환합니다. 없으면 빈 응답을 실패로 보지 않습니다.
+
+    마감 시간이 지나 중단된 조회의 빈 결과도 데이터 없음으로 보지 않습니다.
+    """
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        return False
+    return len(trading_days(start.date(), (end - timedelta(days=1)).date())) > 0
+
+
+class CandleOrchestrator:
+    """단일 제공자의 캔들 수집을 조율합니다."""
+
+    def __init__(
+        self,
+        provider: CandleProvider,
+        min_request_interval: Optional[float] = None,
+        ledger: Optional[QuotaLedger] = None,
+        breaker: Optional[SymbolBreaker] = None,
+        run_ledger: Optional[RunLedger] = None,
+    ):
+        """
+        Args:
+            provider: 캔들 제공자
+            min_request_interval: 요청 간 최소 간격 (초). None이면 제공자 선언값으로 계산
+            ledger: 여러 노드가 공유하는 쿼터 장부 (None이면 프로세스 내 제한만 적용)
+            breaker: (종목, 제공자) 서킷 브레이커 (None이면 실패 종목도 매 주기 조회)
+            run_ledger: 수집 실행 기록 저장소 (None이면 실행 요약을 로그로만 남김)
+        """
+        caps = provider.capabilities
+        self.provider = provider
+        self.limiter = RateLimiter(
+            requests_per_second=caps.requests_per_second,
+            requests_per_hour=caps.requests_per_hour,
+            min_interval=min_request_interval,
+        )
+        self.ledger = ledger
+        # 자격 증명 풀이 있는 제공자는 풀이 HTTP 요청마다 키별 장부를 차감하므로 제공자 단위로는 차감하지 않음
+        self._provider_ledger = ledger if ledger is not None and not provider.use_ledger(ledger) else None
+        self._quota_limits = quota_limits(caps)
+        self.breaker = breaker
+        self.run_ledger = run_ledger
+        self.health = ProviderHealth()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def name(self) -> str:
+        """제공자 이름."""
+        return self.provider.name
+
+    def remaining_this_hour(self) -> Optional[int]:
+        """이번 시간 남은 요청 수. 자격 증명 풀이 있으면 키별 실제 요청 기준, 없으면 제공자 제한기 기준."""
+        remaining = self.provider.remaining_this_hour()
+        return remaining if remaining is not None else self.limiter.remaining_this_hour()
+
+    def collect(
+        self,
+        interval: str,
+        tickers: Optional[List[ManagedTicker]] = None,
+        days: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        extended_hours: Optional[bool] = None,
+        latest_only: bool = False,
+    ) -> List[CollectionResult]:
+        """티커 목록의 캔들을 수집합니다.
+
+        Args:
+            interval: 주기 ('60m' 또는 'daily')
+            tickers: 수집할 티커 목록 (None이면 DB의 활성 티커)
+            days: 조회 기간 (일). None이면 제공자의 정기 수집 기간
+            start: 조회 시작 시각 (지정 시 days 무시)
+            end: 조회 종료 시각 (None이면 현재)
+            extended_hours: 시간외 데이터 포함 여부 (None이면 제공자 지원 여부)
+            latest_only: 최신 봉만 갱신 (days 미지정 시 LATEST_WINDOW_DAYS만 조회하고 최근 LATEST_BARS개 봉만 저장,
+                빈 응답은 데이터 없음으로 보지 않음)
+
+        Returns:
+            각 티커별 수집 결과 리스트
+        """
+        caps = self.provider.capabilities
+        started_at = datetime.now(timezone.utc)
+        if tickers is None:
+            tickers = get_active_tickers()
+        if not caps.supports(interval):
+            self.logger.warning("[%s] %s 주기를 지원하지 않습니다.", self.name, interval)
+            return []
+        skipped: List[CollectionResult] = []
+        if self.breaker is not None and tickers:
+            blocked = self.breaker.blocked(self.name)
+            if blocked:
+                skipped = [
+                    CollectionResult(symbol=t.symbol, success=False, error_message="실패 누적으로 조회 보류")
+                    for t in tickers
+                    if t.symbol in blocked
+                ]
+                tickers = [t for t in tickers if t.symbol not in blocked]
+                self.logger.info("[%s] 실패 누적 종목 %d개 건너뜀", self.name, len(skipped))
+        if not tickers:
+            return self._finish_run(interval, started_at, skipped)
+
+        if latest_only and days is None:
+            days = LATEST_WINDOW_DAYS
+        window_start, window_end = caps.window(interval, days, end)
+        if start is not None:
+            window_start = max(start, window_start)
+        if extended_hours is None:
+            extended_hours = caps.extended_hours
+
+        # SLA 위반이 가까운 티커부터 요청하므로 수집이 중간에 끊겨도 급한 종목이 먼저 채워짐
+        tickers = order_by_freshness(tickers, INTERVAL_PERIODS[interval].total_seconds())
+        batches = caps.plan_batches(tickers)
+        workers = caps.plan_concurrency(len(batches))
+        self.logger.info(
+            "[%s] %s 수집 시작 (티커: %d개, 배치: %d개, 동시성: %d, 기간: %s ~ %s%s)",
+            self.name,
+            interval,
+            len(tickers),
+            len(batches),
+            workers,
+            window_start.strftime("%Y-%m-%d %H:%M"),
+            window_end.strftime("%Y-%m-%d %H:%M"),
+            ", 최신 봉만" if latest_only else "",
+        )
+
+        # 작업 예산에서 내려온 마감 시간을 요청 스레드로 전달
+        deadline = current_deadline()
+
+        def run(batch: List[ManagedTicker]) -> List[CollectionResult]:
+            if deadline is not None and deadline.expired:
+                return [CollectionResult(symbol=t.symbol, success=False, error_message=DEADLINE_MESSAGE) for t in batch]
+            with deadline_scope(deadline):
+                return self._collect_batch(batch, interval, window_start, window_end, extended_hours, latest_only)
+
+        results: List[CollectionResult] = list(skipped)
+        if workers == 1:
+            for batch in batches:
+                results.extend(run(batch))
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.name}-fetch") as executor:
+                for batch_results in executor.map(run, batches):
+                    results.extend(batch_results)
+
+        success_count = sum(1 for r in results if r.success)
+        if deadline is not None and deadline.expired:
+            self.logger.warning(
+                "[%s] %s: 작업 마감 시간(%.0f초) 초과로 %d종목 미수집",
+                self.name,
+                interval,
+                deadline.budget_seconds,
+                sum(1 for r in results if r.error_message == DEADLINE_MESSAGE),
+            )
+        self.logger.info(
+            "[%s] %s 수집 완료 (성공: %d, 실패: %d, 저장: %d건, fetch %.1f초, parse %.1f초, write %.1f초, wait %.1f초)",
+            self.name,
+            interval,
+            success_count,
+            len(results) - success_count,
+            sum(r.records_saved for r in results),
+            sum(r.fetch_seconds for r in results),
+            sum(r.parse_seconds for r in results),
+            sum(r.write_seconds for r in results),
+            sum(r.wait_seconds for r in results),
+        )
+        return self._finish_run(interval, started_at, results)
+
+    def _finish_run(self, interval: str, started_at: datetime, results: List[CollectionResult]) -> List[CollectionResult]:
+        """수집 실행을 기록합니다. 기록 실패는 수집 결과에 영향을 주지 않습니다."""
+        if self.run_ledger is None or not results:
+            return results
+        deadline = current_deadline()
+        try:
+            # 쓰기 버퍼를 거친 실행은 신규/갱신 건수를 남기지 않음 (NULL). 실행마다 버퍼를 비우면
+            # 여러 수집기의 레코드를 모아 저장하는 버퍼의 의미가 없어지므로 flush 시점의 UPSERT 지표로 확인
+            self.run_ledger.record(
+                CollectionRun(
+                    provider=self.name,
+                    interval=interval,
+                    started_at=started_at,
+                    finished_at=datetime.now(timezone.utc),
+                    results=results,
+                    deadline_expired=deadline is not None and deadline.expired,
+                )
+            )
+        except Exception as e:
+            self.logger.error("[%s] 수집 실행 기록 저장 실패 - %s", self.name, e)
+        return results
+
+    def collect_symbol(
+        self,
+        symbol: str,
+        interval: str,
+        exchange: str = "NAS",
+        days: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        extended_hours: Optional[bool] = None,
+    ) -> CollectionResult:
+        """관리 티커로 등록되지 않은 단일 종목을 수집합니다."""
+        caps = self.provider.capabilities
+        if not caps.supports(interval):
+            return CollectionResult(symbol=symbol, success=False, error_message=f"{interval} 주기 미지원")
+
+        window_start, window_end = caps.window(interval, days, end)
+        if start is not None:
+            window_start = max(start, window_start)
+        if extended_hours is None:
+            extended_hours = caps.extended_hours
+
+        metrics = StageMetrics()
+        try:
+            with metrics_scope(metrics):
+                records = self._fetch(
+                    self.provider.fetch_candles,
+                    symbol,
+                    exchange,
+                    interval,
+                    window_start,
+                    window_end,
+                    extended_hours,
+                )
+        except Exception as e:
+            self.logger.error("[%s] %s: 수집 실패 - %s", self.name, symbol, e)
+            return CollectionResult(symbol=symbol, success=False, error_message=str(e), **asdict(metrics))
+
+        if not records and _expects_data(window_start, window_end):
+            self.logger.warning("[%s] %s: %s", self.name, symbol, NO_DATA_MESSAGE)
+            self._record_outcomes([], [symbol])
+            return CollectionResult(symbol=symbol, success=False, error_message=NO_DATA_MESSAGE, **asdict(metrics))
+        try:
+            with metrics_scope(metrics), timed_stage("write"):
+                saved_count = write_candle_records(records, lambda: _mark_collected([symbol], interval))
+        except Exception as e:
+            self.logger.error("[%s] %s: 저장 실패 - %s", self.name, symbol, e)
+            return CollectionResult(symbol=symbol, success=False, error_message=str(e), **asdict(metrics))
+        if records:
+            self._record_outcomes([symbol], [])
+        buffered = _buffered_count(records, saved_count)
+        self._log_written(symbol, saved_count, buffered)
+        return CollectionResult(
+            symbol=symbol, success=True, records_saved=saved_count, records_buffered=buffered, **asdict(metrics)
+        )
+
+    def _log_written(self, symbol: str, saved_count: int, buffered: int) -> None:
+        if saved_count:
+            self.logger.info("[%s] %s: %d건 저장 완료", self.name, symbol, saved_count)
+        elif buffered:
+            self.logger.info("[%s] %s: %d건 쓰기 버퍼 적재", self.name, symbol, buffered)
+
+    def _record_outcomes(self, succeeded: List[str], no_data: List[str]) -> None:
+        """데이터 유무를 서킷 브레이커에 기록합니다. 기록 실패는 수집 결과에 영향을 주지 않습니다."""
+        if self.breaker is None:
+            return
+        try:
+            self.breaker.record(self.name, succeeded, [(symbol, NO_DATA_MESSAGE) for symbol in no_data])
+        except Exception as e:
+            self.logger.error("[%s] 실패 기록 저장 실패 - %s", self.name, e)
+
+    def _fetch(self, fetch, *args):
+        """요청 속도 제한을 지켜 조회하고 지연 시간과 성공 여부를 기록합니다.
+
+        현재 측정값이 있으면 제한기 대기 시간(wait)과 조회 시간(fetch, 파싱 제외)을 더합니다.
+
+        Raises:
+            DeadlineExceededError: 마감 시간 안에 요청할 수 없을 때
+        """
+        metrics = current_metrics()
+        waiting = time.monotonic()
+        try:
+            with timed_stage("wait"):
+                self.limiter.acquire()
+                if self._provider_ledger is not None:
+                    self._provider_ledger.acquire(self.name, self._quota_limits)
+        finally:
+            RATE_LIMIT_WAIT_SECONDS.labels(provider=self.name).observe(time.monotonic() - waiting)
+        # 자격 증명 풀은 요청마다 한도를 차감하므로 조회 중에도 대기 시간(wait)이 쌓임
+        parse_before = metrics.parse_seconds if metrics is not None else 0.0
+        wait_before = metrics.wait_seconds if metrics is not None else 0.0
+        started = time.monotonic()
+        try:
+            result = fetch(*args)
+        except Exception:
+            self.health.record(time.monotonic() - started, success=False)
+            PROVIDER_CALL_SECONDS.labels(provider=self.name, call=fetch.__name__, outcome="error").observe(
+                time.monotonic() - started
+            )
+            raise
+        finally:
+            if metrics is not None:
+                inner = (metrics.parse_seconds - parse_before) + (metrics.wait_seconds - wait_before)
+                metrics.add("fetch", time.monotonic() - started - inner)
+        self.health.record(time.monotonic() - started, success=True)
+        PROVIDER_CALL_SECONDS.labels(provider=self.name, call=fetch.__name__, outcome="ok").observe(
+            time.monotonic() - started
+        )
+        return result
+
+    def _collect_batch(
+        self,
+        batch: List[ManagedTicker],
+        interval: str,
+        start: datetime,
+        end: datetime,
+        extended_hours: bool,
+        latest_only: bool = False,
+    ) -> List[CollectionResult]:
+        """한 번의 요청 단위(배치)를 조회하고 저장합니다."""
+        batch_metrics = StageMetrics()
+        try:
+            with metrics_scope(batch_metrics):
+                records_by_symbol = self._fetch(
+                    self.provider.fetch_batch,
+                    [(t.symbol, t.exchange) for t in batch],
+                    interval,
+                    start,
+                    end,
+                    extended_hours,
+                )
+        except Exception as e:
+            self.logger.error("[%s] %s: 수집 실패 - %s", self.name, ",".join(t.symbol for t in batch), e)
+            share = asdict(batch_metrics.share(len(batch)))
+            return [CollectionResult(symbol=t.symbol, success=False, error_message=str(e), **share) for t in batch]
+
+        # 최신 봉 갱신의 빈 응답(장 마감 후, 주말)은 정상. 데이터 없음 판정은 정기 수집이 맡음
+        expects_data = not latest_only and _expects_data(start, end)
+        succeeded: List[str] = []
+        no_data: List[str] = []
+        results = []
+        for ticker in batch:
+            metrics = batch_metrics.share(len(batch))
+            records = records_by_symbol.get(ticker.symbol)
+            if records is None:
+                # 일괄 응답 중 이 종목만 오류 (데이터 없음이 아니므로 서킷 브레이커에 기록하지 않음)
+                self.logger.warning("[%s] %s: %s", self.name, ticker.symbol, FETCH_FAILED_MESSAGE)
+                results.append(CollectionResult(
+                    symbol=ticker.symbol, success=False, error_message=FETCH_FAILED_MESSAGE, **asdict(metrics)
+                ))
+                continue
+            if not records and expects_data:
+                # 상장 폐지/종목명 변경/거래소 오지정 등: 제공자는 응답했지만 데이터가 없음
+                self.logger.warning("[%s] %s: %s", self.name, ticker.symbol, NO_DATA_MESSAGE)
+                no_data.append(ticker.symbol)
+                results.append(CollectionResult(
+                    symbol=ticker.symbol, success=False, error_message=NO_DATA_MESSAGE, **asdict(metrics)
+                ))
+                continue
+            if records:
+                succeeded.append(ticker.symbol)
+            if latest_only:
+                records = _latest_bars(records)
+            try:
+                with metrics_scope(metrics), timed_stage("write"):
+                    # 수집 시각은 레코드가 실제로 저장된 뒤에 갱신 (쓰기 버퍼면 flush 시점)
+                    saved_count = write_candle_records(records, _on_saved(ticker, interval))
+                buffered = _buffered_count(records, saved_count)
+                self._log_written(ticker.symbol, saved_count, buffered)
+                results.append(CollectionResult(
+                    symbol=ticker.symbol,
+                    success=True,
+                    records_saved=saved_count,
+                    records_buffered=buffered,
+                    **asdict(metrics),
+                ))
+            except Exception as e:
+                self.logger.error("[%s] %s: 저장 실패 - %s", self.name, ticker.symbol, e)
+                results.append(CollectionResult(
+                    symbol=ticker.symbol, success=False, error_message=str(e), **asdict(metrics)
+                ))
+        self._record_outcomes(succeeded, no_data)
+        return results
+
+
+class RoutedCollector:
+    """비용 기반 라우팅으로 (종목, 주기)마다 제공자 하나만 호출하는 수집기.
+
+    배정된 제공자가 실패한 종목만 해당 제공자를 제외하고 다시 배정합니다.
+    """
+
+    def __init__(
+        self,
+        orchestrators: List[CandleOrchestrator],
+        planner: Optional[ProviderPlanner] = None,
+        breaker: Optional[SymbolBreaker] = None,
+    ):
+        """
+        Args:
+            orchestrators: 제공자별 오케스트레이터 (지연 시간/오류 이력을 유지하도록 재사용)
+            planner: 배정기 (None이면 기본 설정)
+            breaker: (종목, 제공자) 서킷 브레이커. 조회 보류 중인 제공자는 배정에서 제외합니다
+        """
+        self.orchestrators = {o.name: o for o in orchestrators}
+        self.planner = planner or ProviderPlanner()
+        self.breaker = breaker
+        self.logger = logging.getLogger(__name__)
+
+    def states(self) -> Dict[str, ProviderState]:
+        """제공자별 현재 상태를 반환합니다."""
+        return {
+            name: ProviderState(
+                capabilities=o.provider.capabilities,
+                health=o.health,
+                remaining_quota=o.remaining_this_hour(),
+            )
+            for name, o in self.orchestrators.items()
+        }
+
+    def build_tasks(self, interval: str, tickers: Optional[List[ManagedTicker]] = None) -> List[FetchTask]:
+        """티커별 마지막 저장 봉 시각으로 수집 요청을 만듭니다."""
+        if tickers is None:
+            tickers = get_active_tickers()
+        latest = get_latest_candle_times(interval)
+        return [FetchTask(ticker, interval, latest.get(ticker.symbol)) for ticker in tickers]
+
+    def collect(
+        self,
+        interval: str,
+        tickers: Optional[List[ManagedTicker]] = None,
+        latest_only: bool = False,
+    ) -> List[CollectionResult]:
+        """티커 목록의 캔들을 배정된 제공자로 수집합니다.
+
+        Args:
+            interval: 주기 ('60m' 또는 'daily')
+            tickers: 수집할 티커 목록 (None이면 DB의 활성 티커)
+            latest_only: 최신 봉만 갱신 (CandleOrchestrator.collect 참고)
+
+        Returns:
+            각 티커별 최종 수집 결과 리스트
+        """
+        pending = self.build_tasks(interval, tickers)
+        failed_providers: Dict[str, Set[str]] = {}
+        if self.breaker is not None:
+            failed_providers = self.breaker.blocked_pairs(self.orchestrators)
+        results: Dict[str, CollectionResult] = {}
+
+        deadline = current_deadline()
+        while pending:
+            if deadline is not None and deadline.expired:
+                self.logger.warning("%s: 작업 마감 시간 초과로 %d종목 재시도 중단", interval, len(pending))
+                break
+            plan = self.planner.plan(pending, self.states(), exclude=failed_providers)
+            for task in plan.unassigned:
+                if task.symbol not in results:
+                    results[task.symbol] = CollectionResult(
+                        symbol=task.symbol,
+                        success=False,
+                        error_message="수집 가능한 제공자가 없습니다.",
+                    )
+            if not plan.assignments:
+                break
+
+            self.logger.info(
+                "%s 라우팅 (%s)",
+                interval,
+                ", ".join(f"{name}: {len(tasks)}종목" for name, tasks in plan.assignments.items()),
+            )
+            with ThreadPoolExecutor(max_workers=len(plan.assignments), thread_name_prefix="routed") as executor:
+                futures = {
+                    name: submit_in_context(executor, self._collect_assigned, name, interval, tasks, latest_only)
+                    for name, tasks in plan.assignments.items()
+                }
+
+            pending = []
+            for name, future in futures.items():
+                tasks = {task.symbol: task for task in plan.assignments[name]}
+                for result in future.result():
+                    results[result.symbol] = result
+                    if not result.success:
+                        failed_providers.setdefault(result.symbol, set()).add(name)
+                        pending.append(tasks[result.symbol])
+            if pending:
+                self.logger.warning("%s: %d종목 다른 제공자로 재시도", interval, len(pending))
+
+        return list(results.values())
+
+    def _collect_assigned(
+        self, name: str, interval: str, tasks: List[FetchTask], latest_only: bool = False
+    ) -> List[CollectionResult]:
+        """배정된 요청을 한 제공자로 수집합니다. 가장 오래된 종목이 채워지도록 조회 기간을 정합니다."""
+        orchestrator = self.orchestrators[name]
+        tickers = [task.ticker for task in tasks]
+        if latest_only:
+            return orchestrator.collect(interval, tickers=tickers, latest_only=True)
+        caps = orchestrator.provider.capabilities
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        days = max(task.window_days(caps, now) for task in tasks)
+        return orchestrator.collect(interval, tickers=tickers, days=days)
@@ -0,0 +1,359 @@
+"""KIS/Tiingo 대역(stand-in) HTTP 서버.
+
+벤치마크와 부하 테스트에서 실제 API 대신 사용합니다. 요청마다
+HTTP_FIXTURE_DIR에 녹화된 픽스처가 있으면 그대로 재생하고, 없으면
+common.synthetic_market으로 결정적인 합성 응답을 만듭니다.
+
+지연 시간 분포, 오류율, 자격 증명별 요청 한도, 데이터 없는 종목을 흉내 낼 수 있습니다.
+수집기는 KIS_BASE_URL/Tiingo_BASE_URL을 이 서버 주소로 바꿔 연결합니다.
+
+    python provider_stub_server.py --port 8900 --latency-ms 80 --latency-p99-ms 600 \\
+        --error-rate 0.01 --kis-rps 20 --tiingo-rph 500 --missing-ratio 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from common import synthetic_market as market
+from common.http_transport import DEFAULT_FIXTURE_DIR, fixture_key, load_fixture
+
+logger = logging.getLogger(__name__)
+
+# 99백분위에 해당하는 표준정규 분위수 (로그정규 지연 분포의 sigma 계산용)
+Z_99 = 2.3263
+
+
+@dataclass
+class StubConfig:
+    """대역 서버 동작 설정."""
+
+    seed: int = 0
+    latency_ms: float = 0.0  # 지연 시간 중앙값
+    latency_p99_ms: float = 0.0  # 지연 시간 99백분위 (중앙값보다 크면 꼬리가 긴 분포)
+    error_rate: float = 0.0  # 서버 오류(500) 비율
+    kis_rps: float = 0.0  # KIS 앱키별 초당 요청 한도 (0이면 무제한)
+    tiingo_rph: float = 0.0  # Tiingo 키별 시간당 요청 한도 (0이면 무제한)
+    missing_ratio: float = 0.0  # 데이터 없는 종목 비율 (종목별로 결정적)
+    missing: Set[str] = field(default_factory=set)  # 항상 데이터 없는 종목
+    fixture_dir: Optional[str] = None  # 재생할 픽스처 디렉토리
+
+    def latency_seconds(self, rng: random.Random) -> float:
+        """한 요청의 지연 시간 (로그정규 분포)."""
+        if self.latency_ms <= 0:
+            return 0.0
+        sigma = 0.0
+        if self.latency_p99_ms > self.latency_ms:
+            sigma = math.log(self.latency_p99_ms / self.latency_ms) / Z_99
+        return rng.lognormvariate(math.log(self.latency_ms), sigma) / 1000.0
+
+    def is_missing(self, symbol: str) -> bool:
+        """데이터 없는 종목인지 (같은 seed에서는 항상 같은 결과)."""
+        symbol = symbol.upper()
+        if symbol in self.missing:
+            return True
+        if self.missing_ratio <= 0:
+            return False
+        return market.symbol_seed(symbol, self.seed) % 10_000 < self.missing_ratio * 10_000
+
+
+class SlidingWindowLimiter:
+    """자격 증명별 슬라이딩 윈도 요청 한도."""
+
+    def __init__(self, limit: float, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._hits: Dict[str, Deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> Tuple[bool, float]:
+        """요청 허용 여부와, 거절 시 다시 시도할 때까지의 대기 시간(초)."""
+        if self.limit <= 0:
+            return True, 0.0
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits[key]
+            while hits and now - hits[0] >= self.window_seconds:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return False, self.window_seconds - (now - hits[0])
+            hits.append(now)
+            return True, 0.0
+
+
+class StubState:
+    """서버 전역 상태 (설정, 한도, 통계)."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.kis_limiter = SlidingWindowLimiter(config.kis_rps, 1.0)
+        self.tiingo_limiter = SlidingWindowLimiter(config.tiingo_rph, 3600.0)
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+
+    def rng(self) -> random.Random:
+        """스레드별 난수 생성기 (지연/오류 주입용)."""
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            rng = random.Random(f"{self.config.seed}:{threading.get_ident()}")
+            self._local.rng = rng
+        return rng
+
+    def count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """KIS/Tiingo 엔드포인트 라우팅."""
+
+    server_version = "ProviderStub/1.0"
+    protocol_version = "HTTP/1.1"
+    state: StubState  # make_server에서 주입
+
+    # ------------------------------------------------------------------
+    # 응답 도우미
+    # ------------------------------------------------------------------
+
+    def _send(self, status: int, payload, headers: Optional[Dict[str, str]] = None) -> None:
+        body = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.state.count(f"status_{status}")
+
+    def log_message(self, format, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    # ------------------------------------------------------------------
+    # 요청 처리
+    # ------------------------------------------------------------------
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def _handle(self, method: str) -> None:
+        parts = urlsplit(self.path)
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        body = None
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                body = None
+
+        if parts.path == "/_stub/stats":
+            self._send(200, self.state.snapshot())
+            return
+
+        config = self.state.config
+        rng = self.state.rng()
+        self.state.count("requests")
+
+        delay = config.latency_seconds(rng)
+        if delay:
+            time.sleep(delay)
+
+        is_kis = parts.path.startswith("/uapi/") or parts.path.startswith("/oauth2/")
+        if not self._admit(is_kis, parts.path, params, body):
+            return
+
+        if config.error_rate and rng.random() < config.error_rate:
+            self.state.count("injected_errors")
+            if is_kis:
+                self._send(500, market.kis_error("EGW00500", "대역 서버 오류 주입"))
+            else:
+                self._send(500, {"detail": "Injected error"})
+            return
+
+        if config.fixture_dir:
+            fixture = load_fixture(config.fixture_dir, fixture_key(method, parts.path, params, body))
+            if fixture is not None:
+                self.state.count("fixture_hits")
+                self._send(fixture["status"], fixture["body"], {
+                    k: v for k, v in (fixture.get("headers") or {}).items() if k.lower() == "retry-after"
+                })
+                return
+
+        if is_kis:
+            self._handle_kis(parts.path, params, body)
+        else:
+            self._handle_tiingo(parts.path, params)
+
+    def _admit(self, is_kis: bool, path: str, params: Dict[str, str], body) -> bool:
+        """자격 증명별 요청 한도를 검사합니다. 초과 시 각 API의 한도 초과 응답을 보냅니다."""
+        if is_kis:
+            if path.startswith("/oauth2/"):
+                return True
+            allowed, _ = self.state.kis_limiter.allow(self.headers.get("appkey", ""))
+            if not allowed:
+                self.state.count("rate_limited")
+                self._send(500, market.kis_error("EGW00201", "초당 거래건수를 초과하였습니다."))
+            return allowed
+
+        key = self.headers.get("Authorization", "") or params.get("token", "")
+        allowed, retry_after = self.state.tiingo_limiter.allow(key)
+        if not allowed:
+            self.state.count("rate_limited")
+            self._send(429, {"detail": "Error: You have run over your hourly request allocation."},
+                       {"Retry-After": str(max(1, int(math.ceil(retry_after))))})
+        return allowed
+
+    def _handle_kis(self, path: str, params: Dict[str, str], body) -> None:
+        config = self.state.config
+        if path == "/oauth2/tokenP":
+            app_key = (body or {}).get("appkey", "")
+            if not app_key:
+                self._send(403, market.kis_error("EGW00103", "유효하지 않은 AppKey입니다."))
+                return
+            self._send(200, market.kis_token_payload(app_key))
+            return
+
+        symbol = params.get("SYMB", "")
+        exchange = params.get("EXCD", "NAS")
+        if path.endswith("/quotations/dailyprice"):
+            if config.is_missing(symbol):
+                self._send(200, market.kis_envelope([]))
+                return
+            self._send(200, market.kis_daily_payload(symbol, exchange, params.get("BYMD", ""), seed=config.seed))
+        elif path.endswith("/quotations/inquire-time-itemchartprice") and symbol:
+            if config.is_missing(symbol):
+                self._send(200, market.kis_envelope([]))
+                return
+            count = min(int(params.get("NREC") or 120), 120)
+            self._send(200, market.kis_60m_payload(symbol, exchange, params.get("KEYB", ""), count, config.seed))
+        elif path.endswith("/quotations/price"):
+            if config.is_missing(symbol):
+                self._send(200, market.kis_envelope([]))
+                return
+            self._send(200, market.kis_price_payload(symbol, exchange, config.seed))
+        else:
+            self._send(404, market.kis_error("EGW00404", f"지원하지 않는 경로입니다: {path}"))
+
+    def _handle_tiingo(self, path: str, params: Dict[str, str]) -> None:
+        config = self.state.config
+        segments = [s for s in path.split("/") if s]
+        # /iex/{T}/prices, /iex/{T}, /tiingo/daily/{T}/prices
+        if len(segments) >= 2 and segments[0] == "iex":
+            symbol = segments[1]
+            if config.is_missing(symbol):
+                self._send(404, {"detail": "Error: Ticker not found"})
+                return
+            if len(segments) == 3 and segments[2] == "prices":
+                self._send(200, market.tiingo_iex_prices(
+                    symbol,
+                    params.get("startDate"),
+                    params.get("endDate"),
+                    params.get("afterHours", "false").lower() == "true",
+                    config.seed,
+                ))
+            else:
+                self._send(200, market.tiingo_top_of_book(symbol, config.seed))
+        elif len(segments) == 4 and segments[:2] == ["tiingo", "daily"] and segments[3] == "prices":
+            symbol = segments[2]
+            if config.is_missing(symbol):
+                self._send(404, {"detail": "Error: Ticker not found"})
+                return
+            self._send(200, market.tiingo_daily_prices(
+                symbol, params.get("startDate"), params.get("endDate"), config.seed
+            ))
+        else:
+            self._send(404, {"detail": f"Not found: {path}"})
+
+
+def make_server(config: StubConfig, host: str = "127.0.0.1", port: int = 8900) -> ThreadingHTTPServer:
+    """대역 서버를 생성합니다. (serve_forever는 호출하는 쪽에서 실행)"""
+    handler = type("BoundStubRequestHandler", (StubRequestHandler,), {"state": StubState(config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(config: StubConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """대역 서버를 백그라운드 스레드에서 시작합니다. port=0이면 빈 포트를 사용합니다.
+
+    Returns:
+        실행 중인 서버 (server.server_address로 주소 확인, shutdown()으로 종료)
+    """
+    server = make_server(config, host, port)
+    thread = threading.Thread(target=server.serve_forever, name="provider-stub", daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    """메인 함수."""
+    parser = argparse.ArgumentParser(description="KIS/Tiingo 대역 HTTP 서버")
+    parser.add_argument("--host", default="127.0.0.1", help="바인드 주소")
+    parser.add_argument("--port", type=int, default=8900, help="포트 (기본: 8900)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 시세 시드")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="지연 시간 중앙값 (ms)")
+    parser.add_argument("--latency-p99-ms", type=float, default=0.0, help="지연 시간 99백분위 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="서버 오류(500) 비율 (0~1)")
+    parser.add_argument("--kis-rps", type=float, default=0.0, help="KIS 앱키별 초당 요청 한도 (0=무제한)")
+    parser.add_argument("--tiingo-rph", type=float, default=0.0, help="Tiingo 키별 시간당 요청 한도 (0=무제한)")
+    parser.add_argument("--missing-ratio", type=float, default=0.0, help="데이터 없는 종목 비율 (0~1)")
+    parser.add_argument("--missing", default="", help="데이터 없는 종목 (쉼표 구분)")
+    parser.add_argument(
+        "--fixtures",
+        default=os.getenv("HTTP_FIXTURE_DIR", DEFAULT_FIXTURE_DIR),
+        help="재생할 픽스처 디렉토리 (없으면 합성 응답만 사용)",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="요청별 로그 출력")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    config = StubConfig(
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        latency_p99_ms=args.latency_p99_ms,
+        error_rate=args.error_rate,
+        kis_rps=args.kis_rps,
+        tiingo_rph=args.tiingo_rph,
+        missing_ratio=args.missing_ratio,
+        missing={s.strip().upper() for s in args.missing.split(",") if s.strip()},
+        fixture_dir=args.fixtures if os.path.isdir(args.fixtures) else None,
+    )
+    server = make_server(config, args.host, args.port)
+    logger.info("대역 서버 시작: http://%s:%d (픽스처: %s)", args.host, args.port, config.fixture_dir or "없음")
+    logger.info("  KIS_BASE_URL=http://%s:%d  Tiingo_BASE_URL=http://%s:%d", args.host, args.port, args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("대역 서버 종료")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
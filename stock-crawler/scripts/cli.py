@@ -17,12 +17,22 @@ def setup():
     """공통 설정을 초기화합니다."""
     load_dotenv()
     from config import Settings
-    from common import init_pool, ensure_managed_tickers_table, ensure_us_stock_candles_table
+    from common import (
+        init_pool,
+        ensure_managed_tickers_table,
+        ensure_us_stock_candles_table,
+        enable_candle_events,
+        enable_extremes_updates,
+        enable_indicator_updates,
+    )
 
     settings = Settings.from_env()
     init_pool(settings.db_dsn)
     ensure_managed_tickers_table()
     ensure_us_stock_candles_table()
+    enable_indicator_updates(settings.indicator_engine())
+    enable_extremes_updates(settings.extremes_engine())
+    enable_candle_events(settings.candle_event_publisher())
     return settings
 
 
@@ -57,11 +67,23 @@ def cmd_add_ticker(args):
     else:
         print("일봉 데이터가 없습니다.")
 
+    # 3. 60분봉 과거 데이터 백필 (연속 조회)
+    print(f"\n{ticker.symbol} 최근 {args.days_60m}일 60분봉 수집 시작...")
+    from candle_collector import CandleCollector
+
+    collector = CandleCollector(kis_api)
+    result = collector.backfill_ticker_60m(ticker, days=args.days_60m)
+    if result.success:
+        print(f"60분봉 수집 완료: {result.records_saved}건 저장")
+    else:
+        print(f"60분봉 수집 실패: {result.error_message}")
+
 
 def cmd_update_ticker(args):
     """티커 정보를 수정합니다."""
     setup()
     from common import get_ticker, update_ticker
+    from common.ticker_repository import PRIORITY_NAMES
 
     ticker = get_ticker(args.symbol)
     if not ticker:
@@ -72,11 +94,14 @@ def cmd_update_ticker(args):
         args.symbol,
         exchange=args.exchange,
         name=args.name,
+        priority=PRIORITY_NAMES[args.priority] if args.priority else None,
+        freshness_sla_seconds=args.sla,
     )
     if updated:
         ticker = get_ticker(args.symbol)
         name = ticker.name or "N/A"
-        print(f"티커 수정 완료: {ticker.symbol} ({ticker.exchange}) - {name}")
+        sla = f"{ticker.freshness_sla_seconds}초" if ticker.freshness_sla_seconds else "기본값"
+        print(f"티커 수정 완료: {ticker.symbol} ({ticker.exchange}) - {name} (우선순위: {ticker.priority}, SLA: {sla})")
     else:
         print(f"티커 수정 실패: {args.symbol}")
 
@@ -133,15 +158,15 @@ def cmd_list_tickers(args):
     setup()
     from common import get_active_tickers
 
-    tickers = get_active_tickers()
+    tickers = sorted(get_active_tickers(), key=lambda t: t.symbol)
     print(f"활성 티커 목록 ({len(tickers)}개):")
-    print("-" * 70)
-    print(f"  {'심볼':10} | {'거래소':5} | {'종목명':20} | 마지막 수집")
-    print("-" * 70)
+    print("-" * 80)
+    print(f"  {'심볼':10} | {'거래소':5} | {'종목명':20} | {'우선순위':4} | 마지막 수집")
+    print("-" * 80)
     for t in tickers:
         collected = t.last_collected_at.strftime("%Y-%m-%d %H:%M:%S") if t.last_collected_at else "N/A"
         name = t.name or "N/A"
-        print(f"  {t.symbol:10} | {t.exchange:5} | {name:20} | {collected}")
+        print(f"  {t.symbol:10} | {t.exchange:5} | {name:20} | {t.priority:8} | {collected}")
 
 
 def cmd_collect_60m(args):
@@ -178,6 +203,505 @@ def cmd_collect_daily(args):
         print(f"  {r.symbol}: {status} ({r.records_saved}건)")
 
 
+def cmd_backfill_60m(args):
+    """KIS 연속 조회로 과거 60분봉을 백필합니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    settings = setup()
+    from common import KisApi, get_ticker
+    from candle_collector import CandleCollector
+
+    kis_api = KisApi.from_env()
+    collector = CandleCollector(kis_api, settings.api_request_delay)
+
+    if args.symbol:
+        ticker = get_ticker(args.symbol)
+        if not ticker:
+            print(f"티커를 찾을 수 없습니다: {args.symbol}")
+            sys.exit(1)
+        results = [collector.backfill_ticker_60m(ticker, days=args.days)]
+    else:
+        results = collector.backfill_60m_candles(days=args.days)
+
+    print("\n=== 60분봉 백필 결과 ===")
+    for r in results:
+        status = "성공" if r.success else f"실패: {r.error_message}"
+        print(f"  {r.symbol}: {status} ({r.records_saved}건)")
+
+
+def cmd_scan_gaps(args):
+    """저장된 캔들의 누락 구간을 탐지하고 복구 큐에 등록합니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    setup()
+    from common.gap_scanner import ensure_candle_repair_queue_table
+    from gap_repair import GapRepairJob
+
+    ensure_candle_repair_queue_table()
+    job = GapRepairJob()
+    gaps = job.scan(
+        interval=args.interval,
+        source=args.source,
+        lookback_days=args.days,
+        min_bars_per_day=args.min_bars,
+        enqueue=not args.dry_run,
+    )
+
+    print(f"\n=== 누락 구간 ({len(gaps)}개) ===")
+    for g in gaps:
+        print(f"  {g.symbol}: {g.start_date} ~ {g.end_date} ({g.missing_days}거래일)")
+
+
+def cmd_repair_gaps(args):
+    """복구 큐에 등록된 누락 구간을 다시 수집합니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    settings = setup()
+    from common import KisApi
+    from common.gap_scanner import ensure_candle_repair_queue_table
+    from gap_repair import GapRepairJob
+
+    ensure_candle_repair_queue_table()
+    job = GapRepairJob(KisApi.from_env(), settings.api_request_delay)
+    tasks = job.repair(limit=args.limit)
+    print(f"\n복구 작업 {len(tasks)}개 처리 완료")
+
+
+def cmd_collect_routed(args):
+    """(종목, 주기)마다 비용이 가장 낮은 제공자 하나로 수집합니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    settings = setup()
+    from common import ensure_collection_runs_table
+    from common.providers import create_provider
+    from orchestrator import CandleOrchestrator, RoutedCollector
+
+    ensure_collection_runs_table()
+    orchestrators = []
+    for name in settings.collector_sources:
+        try:
+            orchestrators.append(
+                CandleOrchestrator(
+                    create_provider(name),
+                    breaker=settings.symbol_breaker(),
+                    run_ledger=settings.run_ledger(),
+                )
+            )
+        except ValueError as e:
+            print(f"[{name}] 제공자 초기화 실패 - {e}")
+    collector = RoutedCollector(orchestrators, breaker=settings.symbol_breaker())
+
+    if args.dry_run:
+        states = collector.states()
+        plan = collector.planner.plan(
+            collector.build_tasks(args.interval),
+            states,
+            exclude=collector.breaker.blocked_pairs(states),
+        )
+        requests = plan.request_counts(states)
+        print(f"\n=== {args.interval} 라우팅 계획 ===")
+        for name, tasks in plan.assignments.items():
+            print(f"  {name}: {len(tasks)}종목, 요청 {requests[name]}건 - {', '.join(t.symbol for t in tasks)}")
+        if plan.unassigned:
+            print(f"  배정 불가: {', '.join(t.symbol for t in plan.unassigned)}")
+        return
+
+    results = collector.collect(args.interval)
+    print("\n=== 수집 결과 ===")
+    for r in results:
+        status = "성공" if r.success else f"실패: {r.error_message}"
+        print(f"  {r.symbol}: {status} ({r.records_saved}건)")
+
+
+def cmd_quarantine(args):
+    """실패 누적으로 격리된 (종목, 제공자)를 조회하거나 해제합니다."""
+    settings = setup()
+    from common import ensure_symbol_failures_table
+
+    ensure_symbol_failures_table()
+    breaker = settings.symbol_breaker()
+
+    if args.release:
+        deleted = breaker.release(args.release, args.provider)
+        print(f"{args.release.upper()}: 실패 기록 {deleted}건 해제")
+        return
+
+    failures = breaker.quarantined(args.provider)
+    if not failures:
+        print("격리된 종목이 없습니다.")
+        return
+
+    print(f"\n=== 격리 종목 ({len(failures)}개, 연속 실패 {breaker.open_after_failures}회 이상) ===")
+    print(f"{'종목':<10} {'제공자':<8} {'실패':>4}  {'최초 실패':<16}  {'다음 시도':<16}  오류")
+    print("-" * 80)
+    for f in failures:
+        print(
+            f"{f.symbol:<10} {f.provider:<8} {f.consecutive_failures:>4}  "
+            f"{f.first_failed_at:%Y-%m-%d %H:%M}  {f.next_attempt_at:%Y-%m-%d %H:%M}  {f.last_error or '-'}"
+        )
+
+
+def cmd_runs(args):
+    """제공자/주기별 수집 실행 요약을 일 또는 주 단위로 조회합니다."""
+    setup()
+    from common import ensure_collection_runs_table
+    from common.run_ledger import get_run_summary
+
+    ensure_collection_runs_table()
+    unit = "week" if args.week else "day"
+    rows = get_run_summary(unit=unit, provider=args.provider, limit=args.limit)
+    if not rows:
+        print("수집 실행 기록이 없습니다.")
+        return
+
+    print(f"\n=== 수집 실행 요약 ({'주' if args.week else '일'} 단위) ===")
+    print(
+        f"{'기간':<10} {'제공자':<7} {'주기':<6} {'실행':>4} {'성공':>6} {'실패':>5} {'저장':>8} {'버퍼':>8} {'신규':>8} {'갱신':>8} "
+        f"{'응답MB':>8} {'fetch':>8} {'parse':>7} {'write':>7} {'wait':>8} {'p95(ms)':>8}"
+    )
+    print("-" * 133)
+    for r in rows:
+        inserted = "-" if r["rows_inserted"] is None else f"{r['rows_inserted']:,}"
+        updated = "-" if r["rows_updated"] is None else f"{r['rows_updated']:,}"
+        p95 = "-" if r["fetch_p95_ms"] is None else f"{r['fetch_p95_ms']:.0f}"
+        print(
+            f"{r['period']:%Y-%m-%d} {r['provider']:<7} {r['interval']:<6} {r['runs']:>4} {r['succeeded']:>6} "
+            f"{r['failed']:>5} {r['records_saved']:>8,} {r['records_buffered']:>8,} {inserted:>8} {updated:>8} "
+            f"{r['payload_bytes'] / 1_000_000:>8.1f} {r['fetch_seconds']:>7.0f}s {r['parse_seconds']:>6.1f}s "
+            f"{r['write_seconds']:>6.1f}s {r['wait_seconds']:>7.0f}s {p95:>8}"
+        )
+
+
+def cmd_screen(args):
+    """활성 티커 전체를 눌림목 조건으로 스크리닝하고 상위 종목을 출력합니다."""
+    setup()
+    from common.screening import ensure_screening_results_table, get_criteria, run_screening
+
+    if not args.no_save:
+        ensure_screening_results_table()
+    criteria = get_criteria(args.preset, args.high_window)
+    results = run_screening(
+        preset=args.preset,
+        high_window=args.high_window,
+        save=not args.no_save,
+        use_extremes=not args.full_scan,
+    )
+    if not results:
+        print("스크리닝할 일봉 데이터가 없습니다.")
+        return
+
+    shown = [r for r in results if r.passed or args.all][: args.top]
+    passed = sum(1 for r in results if r.passed)
+    print(f"\n=== 눌림목 스크리닝 ({criteria.name}, 기준 고점 {criteria.high_window}봉) - {len(results)}종목 중 통과 {passed}개 ===")
+    if not shown:
+        print("조건을 모두 충족한 종목이 없습니다. (--all로 상위 종목 확인)")
+        return
+    print(
+        f"{'순위':>4} {'종목':<8} {'충족':>4} {'종가':>10} {'눌림%':>7} {'거래량비':>8} {'MA20거리%':>9} "
+        f"{'조정일':>6} {'20일상승%':>9} {'고점일':<10}"
+    )
+    print("-" * 92)
+    for r in shown:
+        volume_ratio = "-" if r.volume_ratio is None else f"{r.volume_ratio:.2f}"
+        rise = "-" if r.rise_20d_pct is None else f"{r.rise_20d_pct:.1f}"
+        print(
+            f"{r.rank:>4} {r.symbol:<8} {r.conditions_met:>2}/{criteria.condition_count} {r.close:>10.2f} "
+            f"{r.pullback_pct:>7.1f} {volume_ratio:>8} {r.ma20_distance_pct:>9.1f} {r.correction_days:>6} "
+            f"{rise:>9} {r.high_date:%Y-%m-%d}"
+        )
+
+
+def cmd_peers(args):
+    """상관계수 이웃과 상대 강도를 계산하거나 (종목 지정 시) 저장된 결과를 조회합니다."""
+    setup()
+    from datetime import date
+    from common.peer_context import RS_HORIZONS, ensure_peer_context_table, get_peer_context, run_peer_context
+
+    ensure_peer_context_table()
+    as_of = date.fromisoformat(args.as_of) if args.as_of else None
+    if args.symbol:
+        context = get_peer_context([args.symbol], as_of=as_of).get(args.symbol.upper())
+        if context is None:
+            print(f"{args.symbol.upper()}: 저장된 상관계수/상대 강도가 없습니다. (make peers로 계산)")
+            return
+        peer_rs = "-" if context.peer_rs_rating is None else f"{context.peer_rs_rating:.0f}"
+        returns = "  ".join(
+            f"{horizon}봉 {'-' if value is None else f'{value:+.1f}%'}" for horizon, value in context.returns.items()
+        )
+        print(f"\n=== {context.symbol} 상대 강도/상관계수 이웃 ({context.as_of}, 마지막 봉 {context.last_day}) ===")
+        print(f"상대 강도 {context.rs_rating} (순위 {context.rs_rank}, 점수 {context.rs_score:.1f})  이웃 평균 {peer_rs}")
+        print(f"누적 수익률: {returns}")
+        peers = get_peer_context(context.neighbors, as_of=context.as_of)
+        print(f"{'순위':>4} {'종목':<8} {'상관계수':>8} {'상대 강도':>9}")
+        for rank, (neighbor, correlation) in enumerate(zip(context.neighbors, context.correlations), 1):
+            rating = peers[neighbor].rs_rating if neighbor in peers else "-"
+            print(f"{rank:>4} {neighbor:<8} {correlation:>8.3f} {rating:>9}")
+        return
+
+    results = run_peer_context(as_of=as_of, window=args.window, top_k=args.top_k, save=not args.no_save)
+    if not results:
+        print(f"상대 강도를 계산할 일봉 데이터가 없습니다. ({RS_HORIZONS[0] + 1}봉 이상 필요)")
+        return
+    print(f"\n=== 상대 강도 상위 {min(args.top, len(results))}종목 ({len(results)}종목, 상관계수 {args.window}거래일) ===")
+    print(f"{'순위':>4} {'종목':<8} {'RS':>3} {'3개월%':>8} {'12개월%':>8} {'이웃RS':>6}  상관계수 상위 이웃")
+    for r in results[: args.top]:
+        peer_rs = "-" if r.peer_rs_rating is None else f"{r.peer_rs_rating:.0f}"
+        r3, r12 = (r.returns[h] for h in (RS_HORIZONS[0], RS_HORIZONS[-1]))
+        neighbors = ", ".join(f"{n}({c:.2f})" for n, c in zip(r.neighbors[:3], r.correlations[:3]))
+        print(
+            f"{r.rs_rank:>4} {r.symbol:<8} {r.rs_rating:>3} {'-' if r3 is None else f'{r3:.1f}':>8} "
+            f"{'-' if r12 is None else f'{r12:.1f}':>8} {peer_rs:>6}  {neighbors}"
+        )
+
+
+def cmd_patterns(args):
+    """종목의 최근 N봉 차트와 모양이 비슷한 (종목, 날짜) 윈도우를 찾습니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    setup()
+    import time
+    from datetime import date
+    from common.pattern_index import FORWARD_BARS, build_pattern_index, load_pattern_index
+
+    if args.rebuild:
+        index = build_pattern_index(years=args.years, window=args.window, stride=args.stride)
+    else:
+        index = load_pattern_index()
+    if not args.symbol:
+        if not args.rebuild:
+            print("종목 코드를 지정하세요. (인덱스 다시 만들기는 --rebuild)")
+        return
+
+    day = date.fromisoformat(args.date) if args.date else None
+    row = index.row_of(args.symbol, day)
+    if row is None:
+        print(f"{args.symbol.upper()}: 인덱스에 윈도우가 없습니다. ({index.window + 1}봉 이상 필요)")
+        return
+    started = time.perf_counter()
+    matches = index.search_like(args.symbol, day, top_k=args.top_k, method=args.method, per_symbol=not args.all_windows)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    end_day = index.row_days[row].astype(object)
+    print(
+        f"\n=== {args.symbol.upper()} {index.window}봉 차트 ({end_day}까지) 유사 패턴 - "
+        f"{args.method}, 윈도우 {len(index):,}개 중 {elapsed:.0f}ms ==="
+    )
+    forward_header = " ".join(f"{f'이후{ahead}봉%':>9}" for ahead in FORWARD_BARS)
+    print(f"{'순위':>4} {'종목':<8} {'마지막 봉':<10} {'유사도':>6} {'DTW':>6} {forward_header}")
+    for rank, m in enumerate(matches, 1):
+        distance = "-" if m.distance is None else f"{m.distance:.2f}"
+        forward = " ".join(f"{'-' if value is None else f'{value:+.1f}':>9}" for value in m.forward)
+        print(f"{rank:>4} {m.symbol:<8} {m.end_day:%Y-%m-%d} {m.similarity:>6.3f} {distance:>6} {forward}")
+
+
+def cmd_signals_backfill(args):
+    """저장된 일봉 전체 이력으로 (종목, 거래일)별 시그널 레벨을 계산해 저장합니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    settings = setup()
+    from datetime import date
+    from common import get_active_tickers
+    from common.signal_history import backfill_signal_history, ensure_signal_history_table
+
+    ensure_signal_history_table()
+    symbols = [s.upper() for s in args.symbols] if args.symbols else [t.symbol for t in get_active_tickers()]
+    rows = backfill_signal_history(
+        settings.db_dsn,
+        symbols,
+        start=date.fromisoformat(args.start) if args.start else None,
+        end=date.fromisoformat(args.end) if args.end else None,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        overwrite=not args.keep_existing,
+    )
+    print(f"시그널 이력 저장: {len(symbols)}종목, {rows:,}행")
+
+
+def cmd_backtest(args):
+    """저장된 일봉으로 진입 규칙별 거래를 시뮬레이션하고 성과를 출력합니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    setup()
+    from datetime import date
+    from common.backtest import ENTRY_RULES, ExitRule, RuleSet, run_backtest
+
+    exit_rule = ExitRule(
+        hold_bars=args.hold,
+        stop_loss_pct=args.stop_loss or None,
+        take_profit_pct=args.take_profit or None,
+    )
+    rule_sets = [RuleSet(name=name, entry=name, exit=exit_rule) for name in (args.rules or ENTRY_RULES)]
+    stats = run_backtest(
+        rule_sets,
+        start=date.fromisoformat(args.start) if args.start else None,
+        end=date.fromisoformat(args.end) if args.end else None,
+        symbols=[s.upper() for s in args.symbols] or None,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        refresh=args.refresh,
+    )
+
+    def fmt(value, spec=".2f"):
+        return "-" if value is None else format(value, spec)
+
+    stop = "없음" if exit_rule.stop_loss_pct is None else f"{exit_rule.stop_loss_pct:g}%"
+    target = "없음" if exit_rule.take_profit_pct is None else f"{exit_rule.take_profit_pct:g}%"
+    print(f"\n=== 백테스트 (보유 {exit_rule.hold_bars}봉, 손절 {stop}, 익절 {target}) ===")
+    print(
+        f"{'규칙':<16} {'거래':>7} {'승률%':>6} {'평균%':>7} {'중앙%':>7} {'평균익%':>7} {'평균손%':>7} "
+        f"{'손익비':>6} {'보유봉':>6} {'손절%':>6} {'익절%':>6} {'누적%':>9} {'MDD%':>7}"
+    )
+    print("-" * 118)
+    for r in stats:
+        print(
+            f"{r.rule_set:<16} {r.trades:>7,} {fmt(None if r.hit_rate is None else r.hit_rate * 100, '.1f'):>6} "
+            f"{fmt(r.avg_return_pct):>7} {fmt(r.median_return_pct):>7} {fmt(r.avg_win_pct):>7} {fmt(r.avg_loss_pct):>7} "
+            f"{fmt(r.profit_factor):>6} {fmt(r.avg_bars, '.1f'):>6} "
+            f"{fmt(None if r.stop_rate is None else r.stop_rate * 100, '.1f'):>6} "
+            f"{fmt(None if r.target_rate is None else r.target_rate * 100, '.1f'):>6} "
+            f"{fmt(r.total_return_pct, '.1f'):>9} {fmt(r.max_drawdown_pct, '.1f'):>7}"
+        )
+
+
+def cmd_sweep(args):
+    """조건 기준값 조합들을 백테스트하고 성과 순위를 출력합니다."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    setup()
+    import csv
+    from datetime import date
+    from common.backtest import ExitRule
+    from common.param_sweep import DEFAULT_SPACE, parameter_grid, parameter_sample, run_sweep, sweep_rows
+
+    space = dict(DEFAULT_SPACE)
+    overrides = {
+        "high_window": args.high_window,
+        "pullback_min_pct": args.pullback_min,
+        "pullback_max_pct": args.pullback_max,
+        "max_volume_ratio": args.volume_ratio and [v or None for v in args.volume_ratio],
+        "duration_min_days": args.duration_min,
+        "duration_max_days": args.duration_max,
+        "max_consolidation_pct": args.consolidation and [v or None for v in args.consolidation],
+    }
+    space.update({name: values for name, values in overrides.items() if values})
+    params = parameter_sample(space, args.samples, args.seed) if args.samples else parameter_grid(space)
+    exit_rule = ExitRule(
+        hold_bars=args.hold,
+        stop_loss_pct=args.stop_loss or None,
+        take_profit_pct=args.take_profit or None,
+    )
+    results = run_sweep(
+        params,
+        exit_rule,
+        start=date.fromisoformat(args.start) if args.start else None,
+        end=date.fromisoformat(args.end) if args.end else None,
+        symbols=[s.upper() for s in args.symbols] or None,
+        workers=args.workers,
+        rank_by=args.rank_by,
+        min_trades=args.min_trades,
+        refresh=args.refresh,
+    )
+    if not results:
+        print("평가할 조합이 없습니다.")
+        return
+
+    if args.output:
+        rows = sweep_rows(results)
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"전체 결과 저장: {args.output} ({len(rows)}개 조합)")
+
+    def fmt(value, spec=".2f"):
+        return "-" if value is None else format(value, spec)
+
+    print(f"\n=== 파라미터 탐색 ({len(results)}개 조합, 정렬: {args.rank_by}, 최소 거래 {args.min_trades}) ===")
+    print(
+        f"{'순위':>4} {'고점봉':>5} {'눌림%':>9} {'거래량비':>7} {'기간일':>6} {'횡보%':>5} "
+        f"{'거래':>7} {'승률%':>6} {'평균%':>7} {'손익비':>6} {'누적%':>9} {'MDD%':>7}"
+    )
+    print("-" * 96)
+    for r in results[: args.top]:
+        p, st = r.params, r.stats
+        print(
+            f"{r.rank:>4} {p.high_window:>5} {f'{p.pullback_min_pct:g}~{p.pullback_max_pct:g}':>9} "
+            f"{fmt(p.max_volume_ratio, 'g'):>7} {f'{p.duration_min_days}~{p.duration_max_days}':>6} "
+            f"{fmt(p.max_consolidation_pct, 'g'):>5} {st.trades:>7,} "
+            f"{fmt(None if st.hit_rate is None else st.hit_rate * 100, '.1f'):>6} {fmt(st.avg_return_pct):>7} "
+            f"{fmt(st.profit_factor):>6} {fmt(st.total_return_pct, '.1f'):>9} {fmt(st.max_drawdown_pct, '.1f'):>7}"
+        )
+
+
+def cmd_indicators(args):
+    """보조지표 상태를 조회하거나 전체 재계산합니다."""
+    settings = setup()
+    from common import IndicatorEngine, ensure_candle_features_table, ensure_indicator_state_table, get_active_tickers
+    from common.indicator_state import get_candle_features, get_indicator_values
+
+    ensure_indicator_state_table()
+    if settings.candle_features_enabled:
+        ensure_candle_features_table()
+    if args.rebuild:
+        symbols = [args.symbol] if args.symbol else [t.symbol for t in get_active_tickers()]
+        saved = IndicatorEngine(store_features=settings.candle_features_enabled).rebuild(symbols, args.interval)
+        print(f"{args.interval} 보조지표 상태 재계산: {saved}/{len(symbols)}종목")
+        return
+
+    if not args.symbol:
+        print("종목 코드를 지정하세요. (전체 재계산은 --rebuild)")
+        return
+    values = get_indicator_values(args.symbol, args.interval)
+    if values is None:
+        print(f"{args.symbol.upper()} {args.interval}: 보조지표 상태가 없습니다.")
+        return
+
+    def fmt(value):
+        return "-" if value is None else f"{value:,.4f}"
+
+    print(f"\n=== {values['symbol']} {values['interval']} 보조지표 ({values['source']}, {values['bars']}봉) ===")
+    print(f"마지막 봉: {values['last_time']:%Y-%m-%d %H:%M}  종가 {values['last_close']:,.4f}")
+    print(f"MA20 {fmt(values['ma20'])}  MA60 {fmt(values['ma60'])}  RSI14 {fmt(values['rsi14'])}  거래량비 {fmt(values['volume_ratio'])}")
+    print(f"MACD {fmt(values['macd'])}  시그널 {fmt(values['macd_signal'])}  히스토그램 {fmt(values['macd_hist'])}")
+    print(f"볼린저 상단 {fmt(values['bb_upper'])}  중단 {fmt(values['bb_middle'])}  하단 {fmt(values['bb_lower'])}")
+    print(f"갱신: {values['updated_at']:%Y-%m-%d %H:%M:%S}")
+
+    if args.history:
+        rows = get_candle_features(args.symbol, args.interval, limit=args.history)
+        print(f"\n최근 {len(rows)}봉 (candle_features)")
+        print(f"{'시각':<16} {'종가':>10} {'MA20':>10} {'MA60':>10} {'RSI14':>7} {'MACD히스트':>10} {'거래량비':>8}")
+        for r in rows:
+            rsi = "-" if r["rsi14"] is None else f"{r['rsi14']:.1f}"
+            ratio = "-" if r["volume_ratio"] is None else f"{r['volume_ratio']:.2f}"
+            print(
+                f"{r['candle_time']:%Y-%m-%d %H:%M} {r['close']:>10.2f} {fmt(r['ma20']):>10} {fmt(r['ma60']):>10} "
+                f"{rsi:>7} {fmt(r['macd_hist']):>10} {ratio:>8}"
+            )
+
+
+def cmd_extremes(args):
+    """구간별 고점/저점(rolling_extremes)을 조회하거나 전체 재계산합니다."""
+    setup()
+    from common import ExtremesEngine, get_active_tickers, get_rolling_extremes
+    from common.rolling_extremes import EXTREME_WINDOWS, ensure_rolling_extremes_table
+
+    ensure_rolling_extremes_table()
+    if args.rebuild:
+        symbols = [args.symbol] if args.symbol else [t.symbol for t in get_active_tickers()]
+        saved = ExtremesEngine().rebuild(symbols)
+        print(f"구간별 고점/저점 재계산: {saved}/{len(symbols)}종목")
+        return
+
+    if not args.symbol:
+        print("종목 코드를 지정하세요. (전체 재계산은 --rebuild)")
+        return
+    values = get_rolling_extremes([args.symbol]).get(args.symbol.upper())
+    if values is None:
+        print(f"{args.symbol.upper()}: 구간별 고점/저점이 없습니다.")
+        return
+
+    print(f"\n=== {values.symbol} 구간별 고점/저점 ({values.source}, {values.bars}봉, 마지막 봉 {values.last_time:%Y-%m-%d}) ===")
+    print(f"{'구간':<6} {'고점':>10} {'고점일':<10} {'경과':>4} {'저점':>10} {'저점일':<10} {'경과':>4}")
+    for name, size in EXTREME_WINDOWS.items():
+        high, low = values.highs[name], values.lows[name]
+        print(
+            f"{name:<6} {high.value:>10.2f} {high.time:%Y-%m-%d} {high.back:>4} "
+            f"{low.value:>10.2f} {low.time:%Y-%m-%d} {low.back:>4}"
+        )
+
+
 def cmd_yf_collect_60m(args):
     """yfinance로 60분봉을 수집합니다 (프리마켓/애프터마켓 포함)."""
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -299,8 +823,38 @@ def cmd_tiingo_collect_single(args):
     print(f"\n{args.symbol} ({args.interval}): {status} ({result.records_saved}건)")
 
 
+def run_profiled(args):
+    """명령을 샘플링 프로파일링하며 실행하고 결과 파일과 요약을 출력합니다."""
+    load_dotenv()
+    from common.profiling import profile_run
+
+    output_dir = args.profile_dir or os.getenv("PROFILE_DIR", "profiles")
+    with profile_run(
+        args.command,
+        output_dir,
+        interval=float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000.0,
+        memory=args.profile_memory,
+        top=args.profile_top,
+        log_summary=False,
+    ) as profiler:
+        args.func(args)
+
+    report = profiler.report
+    if report is None:
+        return
+    print(f"\n{report.summary}")
+    print(f"\n프로파일 (collapsed stack): {report.stacks_path}")
+    if report.alloc_path:
+        print(f"메모리 피크 스냅샷 (collapsed stack): {report.alloc_path}")
+    print("flamegraph.pl, speedscope(https://www.speedscope.app), inferno 등으로 열 수 있습니다.")
+
+
 def main():
     parser = argparse.ArgumentParser(description="캔들 수집기 CLI")
+    parser.add_argument("--profile", action="store_true", help="명령 실행을 샘플링 프로파일링 (flamegraph용 collapsed stack 저장)")
+    parser.add_argument("--profile-memory", action="store_true", help="프로파일에 tracemalloc 피크 스냅샷 포함 (--profile 포함)")
+    parser.add_argument("--profile-dir", default=None, help="프로파일 저장 디렉토리 (기본: PROFILE_DIR 또는 profiles)")
+    parser.add_argument("--profile-top", type=int, default=20, help="요약에 보여줄 common/* 함수 수 (기본: 20)")
     subparsers = parser.add_subparsers(dest="command", help="명령어")
 
     # add-ticker
@@ -308,6 +862,7 @@ def main():
     p_add.add_argument("symbol", help="종목 코드 (예: AAPL)")
     p_add.add_argument("--exchange", "-e", default="NAS", help="거래소 코드 (기본: NAS)")
     p_add.add_argument("--name", "-n", default=None, help="종목명 (선택)")
+    p_add.add_argument("--days-60m", type=int, default=30, help="60분봉 백필 기간 (일, 기본: 30)")
     p_add.set_defaults(func=cmd_add_ticker)
 
     # update-ticker
@@ -315,6 +870,10 @@ def main():
     p_update.add_argument("symbol", help="종목 코드 (예: AAPL)")
     p_update.add_argument("--exchange", "-e", default=None, help="거래소 코드")
     p_update.add_argument("--name", "-n", default=None, help="종목명")
+    p_update.add_argument(
+        "--priority", "-p", default=None, choices=["normal", "watched", "held", "alerting"], help="수집 우선순위"
+    )
+    p_update.add_argument("--sla", type=int, default=None, help="신선도 SLA (초, 0이면 우선순위별 기본값)")
     p_update.set_defaults(func=cmd_update_ticker)
 
     # update (1년치 일봉 업데이트)
@@ -339,6 +898,147 @@ def main():
     p_daily = subparsers.add_parser("collect-daily", help="일봉 수집")
     p_daily.set_defaults(func=cmd_collect_daily)
 
+    # backfill-60m (KIS 연속 조회 60분봉 백필)
+    p_backfill = subparsers.add_parser("backfill-60m", help="60분봉 과거 데이터 백필 (KIS 연속 조회)")
+    p_backfill.add_argument("symbol", nargs="?", default=None, help="종목 코드 (생략 시 전체 활성 티커)")
+    p_backfill.add_argument("--days", "-d", type=int, default=30, help="백필 기간 (일, 기본: 30)")
+    p_backfill.set_defaults(func=cmd_backfill_60m)
+
+    # scan-gaps (누락 구간 탐지)
+    p_scan = subparsers.add_parser("scan-gaps", help="캔들 누락 구간 탐지 및 복구 큐 등록")
+    p_scan.add_argument("--interval", "-i", default="daily", choices=["60m", "daily"], help="주기 (기본: daily)")
+    p_scan.add_argument("--source", "-s", default="kis", choices=["kis", "yf", "tiingo"], help="데이터 소스 (기본: kis)")
+    p_scan.add_argument("--days", "-d", type=int, default=365, help="탐지 기간 (일, 기본: 365)")
+    p_scan.add_argument("--min-bars", type=int, default=1, help="거래일당 최소 봉 개수 (기본: 1)")
+    p_scan.add_argument("--dry-run", action="store_true", help="복구 큐에 등록하지 않고 출력만")
+    p_scan.set_defaults(func=cmd_scan_gaps)
+
+    # repair-gaps (누락 구간 복구)
+    p_repair = subparsers.add_parser("repair-gaps", help="복구 큐의 누락 구간 재수집")
+    p_repair.add_argument("--limit", "-l", type=int, default=100, help="최대 처리 작업 수 (기본: 100)")
+    p_repair.set_defaults(func=cmd_repair_gaps)
+
+    # collect-routed (비용 기반 제공자 라우팅)
+    p_routed = subparsers.add_parser("collect-routed", help="종목별로 비용이 가장 낮은 제공자 하나로 수집")
+    p_routed.add_argument("--interval", "-i", default="60m", choices=["60m", "daily"], help="주기 (기본: 60m)")
+    p_routed.add_argument("--dry-run", action="store_true", help="수집하지 않고 라우팅 계획만 출력")
+    p_routed.set_defaults(func=cmd_collect_routed)
+
+    # quarantine (실패 누적 종목 조회/해제)
+    p_quarantine = subparsers.add_parser("quarantine", help="실패 누적으로 격리된 종목 조회/해제")
+    p_quarantine.add_argument("--provider", "-s", default=None, choices=["kis", "yf", "tiingo"], help="제공자 (생략 시 전체)")
+    p_quarantine.add_argument("--release", "-r", default=None, metavar="SYMBOL", help="실패 기록을 지울 종목 코드")
+    p_quarantine.set_defaults(func=cmd_quarantine)
+
+    # runs (수집 실행 요약)
+    p_runs = subparsers.add_parser("runs", help="제공자/주기별 수집 실행 요약 (일/주 단위)")
+    p_runs.add_argument("--week", "-w", action="store_true", help="주 단위로 집계")
+    p_runs.add_argument("--provider", "-s", default=None, choices=["kis", "yf", "tiingo"], help="제공자 (생략 시 전체)")
+    p_runs.add_argument("--limit", "-n", type=int, default=30, help="최대 행 수 (기본: 30)")
+    p_runs.set_defaults(func=cmd_runs)
+
+    # screen (눌림목 스크리닝)
+    p_screen = subparsers.add_parser("screen", help="눌림목 스크리닝 (활성 티커 전체, 결과는 screening_results에 저장)")
+    p_screen.add_argument("--preset", "-p", default="basic", choices=["basic", "trend"], help="조건 프리셋 (기본: basic, trend: 강화 조건)")
+    p_screen.add_argument("--high-window", type=int, default=None, help="기준 고점 구간 (거래일, 기본: 252 = 52주 고점)")
+    p_screen.add_argument("--top", "-n", type=int, default=30, help="출력할 종목 수 (기본: 30)")
+    p_screen.add_argument("--all", "-a", action="store_true", help="조건을 모두 충족하지 않은 종목도 순위대로 출력")
+    p_screen.add_argument("--no-save", action="store_true", help="결과를 DB에 저장하지 않음")
+    p_screen.add_argument("--full-scan", action="store_true", help="저장된 구간별 고점/저점 대신 전체 일봉 구간을 읽어 계산")
+    p_screen.set_defaults(func=cmd_screen)
+
+    # peers (상관계수 이웃, 상대 강도)
+    p_peers = subparsers.add_parser("peers", help="상관계수 상위 이웃과 상대 강도 계산 (peer_context, 종목 지정 시 조회)")
+    p_peers.add_argument("symbol", nargs="?", default=None, help="조회할 종목 코드 (생략 시 활성 티커 전체 계산)")
+    p_peers.add_argument("--as-of", default=None, help="기준일 YYYY-MM-DD (생략 시 오늘 / 가장 최근 계산일)")
+    p_peers.add_argument("--window", type=int, default=60, help="상관계수 구간 (거래일, 기본: 60)")
+    p_peers.add_argument("--top-k", "-k", type=int, default=10, help="종목별 저장할 이웃 수 (기본: 10)")
+    p_peers.add_argument("--top", "-n", type=int, default=30, help="출력할 종목 수 (기본: 30)")
+    p_peers.add_argument("--no-save", action="store_true", help="결과를 DB에 저장하지 않음")
+    p_peers.set_defaults(func=cmd_peers)
+
+    # patterns (차트 모양 유사도 검색)
+    p_patterns = subparsers.add_parser("patterns", help="최근 N봉 차트와 모양이 비슷한 (종목, 날짜) 윈도우 검색")
+    p_patterns.add_argument("symbol", nargs="?", default=None, help="질의 종목 코드")
+    p_patterns.add_argument("--date", default=None, help="질의 윈도우의 마지막 날짜 YYYY-MM-DD (생략 시 최신 봉)")
+    p_patterns.add_argument("--top-k", "-k", type=int, default=10, help="결과 수 (기본: 10)")
+    p_patterns.add_argument("--method", "-m", default="cosine", choices=["cosine", "dtw"], help="유사도 (기본: cosine, dtw: 코사인 후보를 DTW로 재정렬)")
+    p_patterns.add_argument("--all-windows", action="store_true", help="같은 종목의 여러 윈도우도 결과에 포함")
+    p_patterns.add_argument("--rebuild", action="store_true", help="인덱스를 다시 만든 뒤 검색 (하루 한 번, 장 마감 후)")
+    p_patterns.add_argument("--window", type=int, default=20, help="--rebuild 윈도우 길이 (봉, 기본: 20)")
+    p_patterns.add_argument("--stride", type=int, default=5, help="--rebuild 윈도우 간격 (봉, 기본: 5)")
+    p_patterns.add_argument("--years", type=int, default=5, help="--rebuild 이력 기간 (년, 기본: 5)")
+    p_patterns.set_defaults(func=cmd_patterns)
+
+    # signals-backfill (시그널 레벨 이력)
+    p_signals = subparsers.add_parser("signals-backfill", help="저장된 일봉 전체 이력의 시그널 레벨(1~5) 일괄 계산")
+    p_signals.add_argument("symbols", nargs="*", help="종목 코드 (생략 시 활성 티커 전체)")
+    p_signals.add_argument("--start", default=None, help="첫 거래일 YYYY-MM-DD (생략 시 전체 이력)")
+    p_signals.add_argument("--end", default=None, help="마지막 거래일 YYYY-MM-DD (생략 시 오늘)")
+    p_signals.add_argument("--workers", "-w", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    p_signals.add_argument("--chunk-size", type=int, default=100, help="프로세스당 한 번에 처리할 종목 수 (기본: 100)")
+    p_signals.add_argument("--keep-existing", action="store_true", help="이미 저장된 (종목, 거래일)은 덮어쓰지 않음")
+    p_signals.set_defaults(func=cmd_signals_backfill)
+
+    # backtest (진입 규칙별 백테스트)
+    p_backtest = subparsers.add_parser("backtest", help="저장된 일봉으로 진입 규칙별 백테스트 (승률, 평균 수익률, 최대 낙폭)")
+    p_backtest.add_argument("symbols", nargs="*", help="종목 코드 (생략 시 활성 티커 전체)")
+    p_backtest.add_argument(
+        "--rules", "-r", nargs="+", default=None,
+        choices=["pullback-basic", "pullback-trend", "signal-5", "signal-4+"], help="진입 규칙 (생략 시 전체)",
+    )
+    p_backtest.add_argument("--start", default=None, help="첫 신호일 YYYY-MM-DD (생략 시 3년 전)")
+    p_backtest.add_argument("--end", default=None, help="마지막 거래일 YYYY-MM-DD (생략 시 오늘)")
+    p_backtest.add_argument("--hold", type=int, default=10, help="최대 보유 봉 수 (기본: 10)")
+    p_backtest.add_argument("--stop-loss", type=float, default=7.0, help="손절 %% (기본: 7, 0이면 없음)")
+    p_backtest.add_argument("--take-profit", type=float, default=15.0, help="익절 %% (기본: 15, 0이면 없음)")
+    p_backtest.add_argument("--workers", "-w", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    p_backtest.add_argument("--shard-size", type=int, default=250, help="프로세스당 한 번에 처리할 종목 수 (기본: 250)")
+    p_backtest.add_argument("--refresh", action="store_true", help="일봉 패널 캐시를 무시하고 DB에서 다시 읽음")
+    p_backtest.set_defaults(func=cmd_backtest)
+
+    # sweep (조건 기준값 탐색)
+    p_sweep = subparsers.add_parser("sweep", help="눌림목/시그널 조건 기준값 조합 백테스트 및 순위 (프로세스 풀, 공유 메모리)")
+    p_sweep.add_argument("symbols", nargs="*", help="종목 코드 (생략 시 활성 티커 전체)")
+    p_sweep.add_argument("--samples", "-n", type=int, default=0, help="무작위로 고를 조합 수 (기본: 0 = 전체 격자)")
+    p_sweep.add_argument("--seed", type=int, default=None, help="무작위 표본 시드")
+    p_sweep.add_argument("--high-window", type=int, nargs="+", default=None, help="기준 고점 구간 후보 (봉, 기본: 14 60 252)")
+    p_sweep.add_argument("--pullback-min", type=float, nargs="+", default=None, help="눌림 비율 하한 후보 %% (기본: 5 10 15)")
+    p_sweep.add_argument("--pullback-max", type=float, nargs="+", default=None, help="눌림 비율 상한 후보 %% (기본: 15 20 30)")
+    p_sweep.add_argument("--volume-ratio", type=float, nargs="+", default=None, help="거래량 비율 상한 후보 (기본: 0.8 1.0 1.2, 0이면 조건 없음)")
+    p_sweep.add_argument("--duration-min", type=int, nargs="+", default=None, help="고점 이후 일수 하한 후보 (기본: 2 5)")
+    p_sweep.add_argument("--duration-max", type=int, nargs="+", default=None, help="고점 이후 일수 상한 후보 (기본: 10 15)")
+    p_sweep.add_argument("--consolidation", type=float, nargs="+", default=None, help="5일 횡보 폭 상한 후보 %% (기본: 4 6 조건 없음, 0이면 조건 없음)")
+    p_sweep.add_argument("--hold", type=int, default=10, help="최대 보유 봉 수 (기본: 10)")
+    p_sweep.add_argument("--stop-loss", type=float, default=7.0, help="손절 %% (기본: 7, 0이면 없음)")
+    p_sweep.add_argument("--take-profit", type=float, default=15.0, help="익절 %% (기본: 15, 0이면 없음)")
+    p_sweep.add_argument(
+        "--rank-by", default="avg_return",
+        choices=["avg_return", "hit_rate", "profit_factor", "total_return", "drawdown"], help="정렬 기준 (기본: avg_return)",
+    )
+    p_sweep.add_argument("--min-trades", type=int, default=30, help="거래 수가 이보다 적은 조합은 순위 뒤로 (기본: 30)")
+    p_sweep.add_argument("--top", type=int, default=30, help="출력할 조합 수 (기본: 30)")
+    p_sweep.add_argument("--output", "-o", default=None, help="전체 결과를 저장할 CSV 경로")
+    p_sweep.add_argument("--start", default=None, help="첫 신호일 YYYY-MM-DD (생략 시 3년 전)")
+    p_sweep.add_argument("--end", default=None, help="마지막 거래일 YYYY-MM-DD (생략 시 오늘)")
+    p_sweep.add_argument("--workers", "-w", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    p_sweep.add_argument("--refresh", action="store_true", help="일봉 패널 캐시를 무시하고 DB에서 다시 읽음")
+    p_sweep.set_defaults(func=cmd_sweep)
+
+    # indicators (보조지표 상태)
+    p_indicators = subparsers.add_parser("indicators", help="보조지표 상태 조회/전체 재계산 (MA, RSI, MACD, 볼린저)")
+    p_indicators.add_argument("symbol", nargs="?", default=None, help="종목 코드 (--rebuild에서 생략 시 활성 티커 전체)")
+    p_indicators.add_argument("--interval", "-i", default="daily", choices=["60m", "daily"], help="주기 (기본: daily)")
+    p_indicators.add_argument("--rebuild", action="store_true", help="저장된 캔들로 상태와 봉별 지표(candle_features)를 전체 재계산")
+    p_indicators.add_argument("--history", "-n", type=int, default=0, help="최근 N봉의 봉별 지표도 출력 (candle_features)")
+    p_indicators.set_defaults(func=cmd_indicators)
+
+    # extremes (구간별 고점/저점)
+    p_extremes = subparsers.add_parser("extremes", help="구간별 고점/저점 조회/전체 재계산 (52주, 20일, 2주)")
+    p_extremes.add_argument("symbol", nargs="?", default=None, help="종목 코드 (--rebuild에서 생략 시 활성 티커 전체)")
+    p_extremes.add_argument("--rebuild", action="store_true", help="저장된 일봉으로 rolling_extremes를 전체 재계산")
+    p_extremes.set_defaults(func=cmd_extremes)
+
     # yf-collect-60m (yfinance 60분봉)
     p_yf_60m = subparsers.add_parser("yf-collect-60m", help="yfinance 60분봉 수집 (시간외 포함)")
     p_yf_60m.add_argument("--period", "-p", default="5d", help="조회 기간 (기본: 5d)")
@@ -386,7 +1086,10 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    args.func(args)
+    if args.profile or args.profile_memory:
+        run_profiled(args)
+    else:
+        args.func(args)
 
 
 if __name__ == "__main__":
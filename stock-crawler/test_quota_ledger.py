@@ -0,0 +1,99 @@
+"""공유 쿼터 장부 테스트 - 키별 차감과 남은 요청 수 합산."""
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from config import Settings
+from common import close_pool, get_connection, init_pool
+from common.quota_ledger import QuotaLedger, QuotaLimit, ensure_provider_quota_ledger_table
+
+# 운영 장부와 섞이지 않도록 테스트 전용 접두사 사용
+KEY_PREFIX = "test-quota-"
+HOURLY = QuotaLimit(window_seconds=3600, limit=50)
+
+
+def _cleanup() -> None:
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM provider_quota_ledger WHERE provider LIKE %s", (f"{KEY_PREFIX}%",))
+            conn.commit()
+
+
+def _use(ledger: QuotaLedger, key: str, count: int, now: float) -> None:
+    for _ in range(count):
+        assert ledger.try_acquire(key, HOURLY, now=now)
+
+
+def test_remaining_with_multiple_keys():
+    """키 3개가 40건씩 쓰면 남은 요청은 키마다 10건, 합계 30건."""
+    settings = Settings.from_env()
+    init_pool(settings.db_dsn, minconn=1, maxconn=2)
+    ensure_provider_quota_ledger_table()
+    ledger = QuotaLedger(key_prefix=KEY_PREFIX)
+    now = time.time()
+    try:
+        _cleanup()
+        for key_id in ("...aaaa", "...bbbb", "...cccc"):
+            _use(ledger, f"tiingo:{key_id}", 40, now)
+
+        remaining = ledger.remaining("tiingo", HOURLY, key_count=3, now=now)
+        assert remaining == 30, remaining
+        print(f"✓ 설정된 키 3개: 남은 요청 {remaining}건")
+
+        # 설정 키 수를 모르더라도 장부에 기록된 키 수로 한도를 늘림
+        remaining = ledger.remaining("tiingo", HOURLY, now=now)
+        assert remaining == 30, remaining
+        print(f"✓ 장부에 기록된 키 3개: 남은 요청 {remaining}건")
+
+        # 아직 요청하지 않은 키도 설정되어 있으면 한도에 포함
+        remaining = ledger.remaining("tiingo", HOURLY, key_count=4, now=now)
+        assert remaining == 80, remaining
+        print(f"✓ 설정된 키 4개 (1개 미사용): 남은 요청 {remaining}건")
+
+        # 키 한도는 키별로 적용
+        _use(ledger, "tiingo:...aaaa", 10, now)
+        assert not ledger.try_acquire("tiingo:...aaaa", HOURLY, now=now)
+        assert ledger.try_acquire("tiingo:...bbbb", HOURLY, now=now)
+        remaining = ledger.remaining("tiingo", HOURLY, key_count=3, now=now)
+        assert remaining == 19, remaining
+        print(f"✓ 키별 한도 적용: 소진된 키 외에 남은 요청 {remaining}건")
+    finally:
+        _cleanup()
+        close_pool()
+
+
+def test_remaining_without_pool():
+    """풀이 없는 제공자는 제공자 단위로 차감하고 한도도 하나입니다."""
+    settings = Settings.from_env()
+    init_pool(settings.db_dsn, minconn=1, maxconn=2)
+    ensure_provider_quota_ledger_table()
+    ledger = QuotaLedger(key_prefix=KEY_PREFIX)
+    now = time.time()
+    try:
+        _cleanup()
+        _use(ledger, "yf", 12, now)
+        remaining = ledger.remaining("yf", HOURLY, now=now)
+        assert remaining == 38, remaining
+        print(f"✓ 풀 없는 제공자: 남은 요청 {remaining}건")
+    finally:
+        _cleanup()
+        close_pool()
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("공유 쿼터 장부 테스트")
+    print("=" * 50)
+
+    try:
+        test_remaining_with_multiple_keys()
+        print()
+        test_remaining_without_pool()
+        print()
+        print("모든 테스트 통과!")
+    except Exception as e:
+        print(f"✗ 오류 발생: {e}")
+        sys.exit(1)
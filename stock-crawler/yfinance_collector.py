@@ -7,32 +7,50 @@ from __future__ import annotations
 
 import logging
 import time
-from dataclasses import dataclass
+from datetime import date
 from typing import List, Optional
 
 import schedule
 
 from common import (
     ManagedTicker,
+    enable_candle_events,
+    enable_extremes_updates,
+    enable_indicator_updates,
     ensure_managed_tickers_table,
     ensure_us_stock_candles_table,
-    get_active_tickers,
-    update_last_collected,
 )
 from common.yfinance_api import YFinanceApi, CandleData
-from common.db import get_connection
+from common.db import write_candle_records
+from common.providers import YFinanceProvider, candle_data_to_records
+from orchestrator import CandleOrchestrator, CollectionResult
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class CollectionResult:
-    """수집 결과."""
+# yfinance period 문자열에 해당하는 조회 기간 (일)
+PERIOD_DAYS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 30,
+    "3mo": 90,
+    "6mo": 180,
+    "1y": 365,
+    "2y": 730,
+    "5y": 1825,
+    "10y": 3650,
+    "max": 36500,
+}
 
-    symbol: str
-    success: bool
-    records_saved: int = 0
-    error_message: Optional[str] = None
+
+def _period_to_days(period: str) -> int:
+    """yfinance period 문자열을 조회 기간(일)으로 변환합니다."""
+    if period == "ytd":
+        today = date.today()
+        return (today - date(today.year, 1, 1)).days + 1
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"지원하지 않는 period입니다: {period}")
+    return PERIOD_DAYS[period]
 
 
 def save_yfinance_candles(symbol: str, interval: str, candles: List[CandleData]) -> int:
@@ -44,44 +62,23 @@ def save_yfinance_candles(symbol: str, interval: str, candles: List[CandleData])
         candles: CandleData 리스트
 
     Returns:
-        저장된 레코드 수
+        저장된 레코드 수. 쓰기 버퍼에 적재한 경우 0 (write_candle_records 참고)
     """
     if not candles:
         return 0
 
-    records = []
-    for candle in candles:
-        records.append((
+    records = candle_data_to_records(symbol, interval, candles, "yf")
+    saved = write_candle_records(records)
+    if saved:
+        logger.info("[yfinance] %s: %d건의 %s 데이터를 저장했습니다. (source=yf)", symbol, saved, interval)
+    else:
+        logger.info(
+            "[yfinance] %s: %d건의 %s 데이터를 쓰기 버퍼에 적재했습니다. (source=yf)",
             symbol,
+            len(records),
             interval,
-            candle.candle_time,
-            candle.open_price,
-            candle.high_price,
-            candle.low_price,
-            candle.close_price,
-            candle.volume,
-            "yf",  # yfinance 소스 표시
-        ))
-
-    with get_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.executemany(
-                """
-                INSERT INTO us_stock_candles (symbol, interval, candle_time, open_price, high_price, low_price, close_price, volume, source)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT ON CONSTRAINT uq_us_stock_candles DO UPDATE SET
-                    open_price = EXCLUDED.open_price,
-                    high_price = EXCLUDED.high_price,
-                    low_price = EXCLUDED.low_price,
-                    close_price = EXCLUDED.close_price,
-                    volume = EXCLUDED.volume;
-                """,
-                records,
-            )
-            conn.commit()
-
-    logger.info("[yfinance] %s: %d건의 %s 데이터를 저장했습니다. (source=yf)", symbol, len(records), interval)
-    return len(records)
+        )
+    return saved
 
 
 class YFinanceCollector:
@@ -90,6 +87,7 @@ class YFinanceCollector:
     한국투자증권 API 대비 장점:
     - 인증 불필요
     - 프리마켓/애프터마켓 데이터 포함
+    - 여러 종목을 한 번의 요청으로 조회
 
     주의: Yahoo Finance도 rate limit이 있으므로 요청 간격 유지 필요
     """
@@ -97,70 +95,51 @@ class YFinanceCollector:
     def __init__(self, request_delay: float = 2.0):
         """
         Args:
-            request_delay: 종목 간 요청 대기 시간 (초)
+            request_delay: 배치 요청 간 대기 시간 (초)
         """
         self.api = YFinanceApi()
         self.request_delay = request_delay
+        self.orchestrator = CandleOrchestrator(YFinanceProvider(self.api), min_request_interval=request_delay)
         self.logger = logging.getLogger(__name__)
 
     def collect_60m_candles(
         self,
         period: str = "5d",
         include_extended_hours: bool = True,
+        tickers: Optional[List[ManagedTicker]] = None,
     ) -> List[CollectionResult]:
         """모든 활성 티커의 60분봉을 수집합니다.
 
         Args:
             period: 조회 기간 (1d, 5d, 1mo 등)
             include_extended_hours: 프리마켓/애프터마켓 포함 여부
+            tickers: 수집할 티커 목록 (None이면 DB의 활성 티커)
 
         Returns:
             각 티커별 수집 결과 리스트
         """
-        tickers = get_active_tickers()
-        self.logger.info(
-            "[yfinance] 60분봉 수집 시작 (티커: %d개, extended_hours=%s)",
-            len(tickers),
-            include_extended_hours,
+        return self.orchestrator.collect(
+            "60m",
+            tickers=tickers,
+            days=_period_to_days(period),
+            extended_hours=include_extended_hours,
         )
 
-        results = []
-        for ticker in tickers:
-            result = self._collect_ticker_60m(ticker, period, include_extended_hours)
-            results.append(result)
-            if ticker != tickers[-1]:
-                time.sleep(self.request_delay)
-
-        success_count = sum(1 for r in results if r.success)
-        fail_count = len(results) - success_count
-        self.logger.info("[yfinance] 60분봉 수집 완료 (성공: %d, 실패: %d)", success_count, fail_count)
-
-        return results
-
-    def collect_daily_candles(self, period: str = "1mo") -> List[CollectionResult]:
+    def collect_daily_candles(
+        self,
+        period: str = "1mo",
+        tickers: Optional[List[ManagedTicker]] = None,
+    ) -> List[CollectionResult]:
         """모든 활성 티커의 일봉을 수집합니다.
 
         Args:
             period: 조회 기간 (1mo, 3mo, 1y 등)
+            tickers: 수집할 티커 목록 (None이면 DB의 활성 티커)
 
         Returns:
             각 티커별 수집 결과 리스트
         """
-        tickers = get_active_tickers()
-        self.logger.info("[yfinance] 일봉 수집 시작 (티커: %d개)", len(tickers))
-
-        results = []
-        for ticker in tickers:
-            result = self._collect_ticker_daily(ticker, period)
-            results.append(result)
-            if ticker != tickers[-1]:
-                time.sleep(self.request_delay)
-
-        success_count = sum(1 for r in results if r.success)
-        fail_count = len(results) - success_count
-        self.logger.info("[yfinance] 일봉 수집 완료 (성공: %d, 실패: %d)", success_count, fail_count)
-
-        return results
+        return self.orchestrator.collect("daily", tickers=tickers, days=_period_to_days(period))
 
     def collect_single_ticker_60m(
         self,
@@ -178,24 +157,12 @@ class YFinanceCollector:
         Returns:
             수집 결과
         """
-        try:
-            candles = self.api.fetch_candles_60m(
-                symbol=symbol,
-                period=period,
-                include_extended_hours=include_extended_hours,
-            )
-
-            if not candles:
-                return CollectionResult(symbol=symbol, success=True, records_saved=0)
-
-            saved_count = save_yfinance_candles(symbol, "60m", candles)
-
-            self.logger.info("[yfinance] %s: %d건 저장 완료", symbol, saved_count)
-            return CollectionResult(symbol=symbol, success=True, records_saved=saved_count)
-
-        except Exception as e:
-            self.logger.error("[yfinance] %s: 수집 실패 - %s", symbol, e)
-            return CollectionResult(symbol=symbol, success=False, error_message=str(e))
+        return self.orchestrator.collect_symbol(
+            symbol,
+            "60m",
+            days=_period_to_days(period),
+            extended_hours=include_extended_hours,
+        )
 
     def collect_single_ticker_daily(
         self,
@@ -211,43 +178,7 @@ class YFinanceCollector:
         Returns:
             수집 결과
         """
-        try:
-            candles = self.api.fetch_candles_daily(symbol=symbol, period=period)
-
-            if not candles:
-                return CollectionResult(symbol=symbol, success=True, records_saved=0)
-
-            saved_count = save_yfinance_candles(symbol, "daily", candles)
-
-            self.logger.info("[yfinance] %s: %d건 저장 완료", symbol, saved_count)
-            return CollectionResult(symbol=symbol, success=True, records_saved=saved_count)
-
-        except Exception as e:
-            self.logger.error("[yfinance] %s: 수집 실패 - %s", symbol, e)
-            return CollectionResult(symbol=symbol, success=False, error_message=str(e))
-
-    def _collect_ticker_60m(
-        self,
-        ticker: ManagedTicker,
-        period: str,
-        include_extended_hours: bool,
-    ) -> CollectionResult:
-        """단일 티커의 60분봉을 수집합니다."""
-        result = self.collect_single_ticker_60m(
-            symbol=ticker.symbol,
-            period=period,
-            include_extended_hours=include_extended_hours,
-        )
-        if result.success:
-            update_last_collected(ticker.id)
-        return result
-
-    def _collect_ticker_daily(self, ticker: ManagedTicker, period: str) -> CollectionResult:
-        """단일 티커의 일봉을 수집합니다."""
-        result = self.collect_single_ticker_daily(symbol=ticker.symbol, period=period)
-        if result.success:
-            update_last_collected(ticker.id)
-        return result
+        return self.orchestrator.collect_symbol(symbol, "daily", days=_period_to_days(period))
 
     def start(
         self,
@@ -312,6 +243,9 @@ def main() -> None:
     init_pool(settings.db_dsn)
     ensure_managed_tickers_table()
     ensure_us_stock_candles_table()
+    enable_indicator_updates(settings.indicator_engine())
+    enable_extremes_updates(settings.extremes_engine())
+    enable_candle_events(settings.candle_event_publisher())
 
     # yfinance 수집기 시작
     collector = YFinanceCollector(request_delay=1.0)